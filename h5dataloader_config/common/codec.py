@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+
+import struct
+from typing import Dict, List, Union
+import numpy as np
+import cv2
+
+from .structure import *
+
+# 走査時に復号後の形状を調べるために読み込む先頭のバイト数 (足りない場合は全体を読み込む)
+HEADER_BYTES:int = 4096
+# JPEGの既定の品質
+DEFAULT_JPEG_QUALITY:int = 95
+
+PNG_SIGNATURE:bytes = b'\x89PNG\r\n\x1a\n'
+# PNGのカラータイプ毎のチャンネル数 (パレットはOpenCVの復号後のチャンネル数)
+PNG_CHANNELS:Dict[int, int] = {0: 1, 2: 3, 3: 3, 4: 2, 6: 4}
+# 画像サイズを持つJPEGのSOFマーカー (DHT, JPG, DACを除く)
+JPEG_SOF_MARKERS:List[int] = [marker for marker in range(0xC0, 0xD0) if marker not in [0xC4, 0xC8, 0xCC]]
+
+def get_pixelType(data_type:str) -> str:
+    """符号化した画像の場合は復号後の型, それ以外はそのまま"""
+    return COMPRESSED_TYPES[data_type][0] if data_type in COMPRESSED_TYPES.keys() else data_type
+
+def get_compressedType(data_type:str, codec:str) -> Union[str, None]:
+    """画像の型を符号化した型 (符号化できない組み合わせの場合はNone)"""
+    for compressed_type, (pixel_type, compressed_codec) in COMPRESSED_TYPES.items():
+        if pixel_type == data_type and compressed_codec == codec: return compressed_type
+    return None
+
+def get_imageShape(item:Dict[str, Union[str, list, dict, None]]) -> Union[List[Union[int, None]], None]:
+    """src-dataの画像の形状 (符号化した画像の場合は復号後の形状)"""
+    if item.get(CONFIG_TAG_TYPE) in COMPRESSED_TYPES.keys():
+        return item.get(CONFIG_TAG_IMAGESHAPE)
+    return item.get(CONFIG_TAG_SHAPE)
+
+def parse_imageHeader(data:bytes) -> Union[List[int], None]:
+    """PNG/JPEGのヘッダから復号後の形状を得る
+
+    Args:
+        data (bytes): 符号化した画像の先頭
+
+    Returns:
+        Union[List[int], None]: [高さ, 幅] (1チャンネルの場合) または [高さ, 幅, チャンネル数]. 解釈できない場合はNone.
+    """
+    if data[:8] == PNG_SIGNATURE:
+        if len(data) < 26 or data[12:16] != b'IHDR': return None
+        width, height = struct.unpack('>II', data[16:24])
+        channels:Union[int, None] = PNG_CHANNELS.get(data[25])
+    elif data[:2] == b'\xff\xd8':
+        pos:int = 2
+        channels = None
+        while pos + 4 <= len(data):
+            if data[pos] != 0xFF: return None
+            marker:int = data[pos + 1]
+            if marker == 0xFF:
+                pos += 1
+                continue
+            if marker in JPEG_SOF_MARKERS:
+                if pos + 10 > len(data): return None
+                height, width = struct.unpack('>HH', data[pos + 5:pos + 9])
+                channels = data[pos + 9]
+                break
+            pos += 2 + struct.unpack('>H', data[pos + 2:pos + 4])[0]
+    else:
+        return None
+    if channels is None: return None
+    return [int(height), int(width)] if channels == 1 else [int(height), int(width), int(channels)]
+
+def encode_image(image:np.ndarray, codec:str, quality:Union[int, None]=None) -> np.ndarray:
+    """画像をPNG/JPEGに符号化する
+
+    チャンネルの順は入れ替えずに符号化するため, RGBの画像も復号すると同じ配列に戻る.
+
+    Args:
+        image (np.ndarray): 画像
+        codec (str): 'png' または 'jpeg'
+        quality (Union[int, None], optional): JPEGの品質 (0-100) またはPNGの圧縮レベル (0-9). Defaults to None.
+
+    Returns:
+        np.ndarray: 符号化したバイト列 (uint8)
+    """
+    if codec == CODEC_JPEG:
+        params:List[int] = [cv2.IMWRITE_JPEG_QUALITY, DEFAULT_JPEG_QUALITY if quality is None else quality]
+        success, encoded = cv2.imencode('.jpg', image, params)
+    else:
+        params = [] if quality is None else [cv2.IMWRITE_PNG_COMPRESSION, quality]
+        success, encoded = cv2.imencode('.png', image, params)
+    if success is False:
+        raise ValueError('failed to encode {0:s} image {1:s}'.format(codec, str(image.shape)))
+    return encoded.reshape(-1)
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+
+import heapq
+from typing import Dict, Iterable, List, Set, Tuple, Union
+
+from .structure import *
+
+def get_conversionCost(dst_type:str, from_types:List[str]) -> int:
+    """FROM_TYPESの組み合わせ1つ分の変換のコスト"""
+    if from_types == [dst_type]:
+        return 0
+    cost:int = 0
+    geometry_types:List[str] = [from_type for from_type in from_types if from_type not in [TYPE_POSE, TYPE_INTRINSIC]]
+    if len(from_types) == 1:
+        cost += COST_CAST
+    if any(from_type in COMPRESSED_TYPES.keys() for from_type in from_types):
+        cost += COST_DECODE
+    if set(from_types) == {TYPE_TRANSLATION, TYPE_QUATERNION}:
+        cost += COST_COMPOSE
+    if TYPE_DISPARITY in from_types:
+        cost += COST_DISPARITY
+    if TYPE_VOXEL_POINTS in from_types or TYPE_VOXEL_SEMANTIC3D in from_types:
+        cost += COST_VOXEL
+    if TYPE_DEPTH in geometry_types and TYPE_INTRINSIC in from_types:
+        cost += COST_BACKPROJECT
+    if TYPE_POSE in from_types and len(geometry_types) > 0:
+        cost += COST_TRANSFORM
+    if dst_type in PROJECTED_TYPES and TYPE_INTRINSIC in from_types and TYPE_DISPARITY not in from_types:
+        cost += COST_PROJECT
+    return cost
+
+class ConversionPlan(object):
+    """ある型のデータを得る方法. from_typesがNoneの場合はsrc-dataをそのまま用いる."""
+    def __init__(self, data_type:str, from_types:Union[List[str], None]=None, cost:int=0, inputs:Union[List['ConversionPlan'], None]=None) -> None:
+        self.data_type:str = data_type
+        self.from_types:Union[List[str], None] = from_types
+        self.cost:int = cost
+        self.inputs:List[ConversionPlan] = [] if inputs is None else inputs
+
+    def get_leaves(self) -> List[str]:
+        """計画が読み込むsrc-dataの型 (重複なし, 出現順)"""
+        if self.from_types is None:
+            return [self.data_type]
+        leaves:List[str] = []
+        for plan in self.inputs:
+            leaves += [leaf for leaf in plan.get_leaves() if leaf not in leaves]
+        return leaves
+
+    def get_types(self) -> Set[str]:
+        """計画の途中で得られる全ての型"""
+        types:Set[str] = {self.data_type}
+        for plan in self.inputs:
+            types |= plan.get_types()
+        return types
+
+    def get_steps(self) -> List[Dict[str, Union[str, List[str]]]]:
+        """実行順の変換 ('type'と'from'の組)"""
+        if self.from_types is None:
+            return []
+        steps:List[Dict[str, Union[str, List[str]]]] = []
+        for plan in self.inputs:
+            steps += [step for step in plan.get_steps() if step not in steps]
+        steps.append({CONFIG_TAG_TYPE: self.data_type, CONFIG_TAG_FROM: self.from_types})
+        return steps
+
+    def describe(self) -> str:
+        steps:List[str] = ['{0:s} → {1:s}'.format(' + '.join(step[CONFIG_TAG_FROM]), step[CONFIG_TAG_TYPE]) for step in self.get_steps()]
+        return '{0:s} (cost {1:d})'.format(', '.join(steps), self.cost)
+
+class ConversionGraph(object):
+    """FROM_TYPESを, 組み合わせ毎にコストを持つ有向ハイパーグラフとして扱い, 多段の変換を探索する
+
+    Args:
+        from_types (Dict[str, List[List[str]]], optional): 出力する型毎の入力の型の組み合わせ. Defaults to FROM_TYPES.
+    """
+    def __init__(self, from_types:Dict[str, List[List[str]]]=FROM_TYPES) -> None:
+        self.from_types:Dict[str, List[List[str]]] = from_types
+        self.edges:List[Tuple[str, List[str], int]] = []
+        self.edges_byInput:Dict[str, List[int]] = {}
+        for dst_type, combinations in from_types.items():
+            for combination in combinations:
+                edge_idx:int = len(self.edges)
+                self.edges.append((dst_type, combination, get_conversionCost(dst_type, combination)))
+                for from_type in set(combination):
+                    self.edges_byInput.setdefault(from_type, []).append(edge_idx)
+
+    def resolve(self, available_types:Iterable[str]) -> Dict[str, ConversionPlan]:
+        """available_typesのsrc-dataから, 各型のデータを得る最小コストの方法 (Knuthの一般化Dijkstra法)"""
+        best:Dict[str, ConversionPlan] = {}
+        remaining:List[int] = [len(set(combination)) for _, combination, _ in self.edges]
+        queue:List[Tuple[int, int, ConversionPlan]] = []
+        for data_type in sorted(set(available_types)):
+            heapq.heappush(queue, (0, len(queue), ConversionPlan(data_type)))
+        counter:int = len(queue)
+        while len(queue) > 0:
+            _, _, plan = heapq.heappop(queue)
+            if plan.data_type in best.keys(): continue
+            best[plan.data_type] = plan
+            for edge_idx in self.edges_byInput.get(plan.data_type, []):
+                remaining[edge_idx] -= 1
+                if remaining[edge_idx] > 0: continue
+                dst_type, combination, cost = self.edges[edge_idx]
+                if dst_type in best.keys(): continue
+                inputs:List[ConversionPlan] = [best[from_type] for from_type in combination]
+                total:int = cost + sum(input_plan.cost for input_plan in inputs)
+                heapq.heappush(queue, (total, counter, ConversionPlan(dst_type, combination, total, inputs)))
+                counter += 1
+        return best
+
+    def get_plans(self, dst_type:str, resolved:Dict[str, ConversionPlan]) -> List[Union[ConversionPlan, None]]:
+        """FROM_TYPES[dst_type]の組み合わせ毎に, それを最後の変換とする計画 (得られない場合はNone)
+
+        Args:
+            dst_type (str): 出力する型
+            resolved (Dict[str, ConversionPlan]): resolve()の結果
+        """
+        plans:List[Union[ConversionPlan, None]] = []
+        for combination in self.from_types.get(dst_type, []):
+            inputs:List[Union[ConversionPlan, None]] = [resolved.get(from_type) for from_type in combination]
+            # 自身を入力とする組み合わせは自身がsrc-dataにある場合のみ用い, 途中で自身を経由する計画は用いない
+            if any(plan is None or (plan.from_types is not None and dst_type in plan.get_types()) for plan in inputs):
+                plans.append(None)
+                continue
+            cost:int = get_conversionCost(dst_type, combination) + sum(plan.cost for plan in inputs)
+            plans.append(ConversionPlan(dst_type, combination, cost, inputs))
+        return plans
+
+    def get_reachableTypes(self, resolved:Dict[str, ConversionPlan]) -> List[str]:
+        """mini-batchとして出力できる型 (FROM_TYPESの順)"""
+        return [dst_type for dst_type in self.from_types.keys() if any(plan is not None for plan in self.get_plans(dst_type, resolved))]
+
+CONVERSION_GRAPH:ConversionGraph = ConversionGraph()
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+
+from typing import Dict, List, Tuple, Union
+
+from .structure import *
+
+def get_scaledIntrinsic(intrinsic:Dict[str, float], shape:List[int], roi:Union[List[int], None]=None) -> Dict[str, float]:
+    """出力サイズ (とROI) に合わせた内部パラメータ
+
+    Args:
+        intrinsic (Dict[str, float]): src-dataの内部パラメータ (Fx, Fy, Cx, Cy, height, width)
+        shape (List[int]): 出力の形状 (高さ, 幅, ...)
+        roi (Union[List[int], None], optional): 縮小前に切り出す範囲 [上端, 左端, 高さ, 幅]. Defaults to None.
+
+    Returns:
+        Dict[str, float]: 出力の画素に対する内部パラメータ
+    """
+    top, left, height, width = (0, 0, intrinsic[SUBTYPE_HEIGHT], intrinsic[SUBTYPE_WIDTH]) if roi is None else roi
+    sx:float = shape[1] / width
+    sy:float = shape[0] / height
+    return {
+        SUBTYPE_FX: intrinsic[SUBTYPE_FX] * sx,
+        SUBTYPE_FY: intrinsic[SUBTYPE_FY] * sy,
+        SUBTYPE_CX: (intrinsic[SUBTYPE_CX] - left) * sx,
+        SUBTYPE_CY: (intrinsic[SUBTYPE_CY] - top) * sy,
+        SUBTYPE_HEIGHT: float(shape[0]),
+        SUBTYPE_WIDTH: float(shape[1]),
+    }
+
+def get_projection(intrinsic:Dict[str, float]) -> Tuple[float, float, float, float]:
+    """投影に用いる (Fx, Fy, Cx, Cy)"""
+    return intrinsic[SUBTYPE_FX], intrinsic[SUBTYPE_FY], intrinsic[SUBTYPE_CX], intrinsic[SUBTYPE_CY]
+
+def get_intrinsicKey(config:Dict[str, dict], minibatch_config:Dict[str, Union[str, dict]]) -> Union[str, None]:
+    """mini-batchの内部パラメータの元になるsrc-dataのキー
+
+    fromのintrinsicを優先し, 無い場合はframe-idが同じintrinsicを用いる. 値が走査時に得られていない場合はNone.
+    """
+    srcdata_dict:Dict[str, dict] = config.get(CONFIG_TAG_SRCDATA, {})
+    from_key:Union[str, None] = minibatch_config[CONFIG_TAG_FROM].get(TYPE_INTRINSIC)
+    if from_key is None:
+        frame_id:Union[str, None] = minibatch_config.get(CONFIG_TAG_FRAMEID)
+        keys:List[str] = sorted(key for key, item in srcdata_dict.items() if item.get(CONFIG_TAG_TYPE) == TYPE_INTRINSIC and item.get(CONFIG_TAG_FRAMEID) == frame_id)
+        from_key = keys[0] if len(keys) > 0 else None
+    # フレーム毎のintrinsicは走査していないフレームで値が異なる可能性がある
+    if from_key is None or not from_key.startswith('/') or srcdata_dict.get(from_key, {}).get(CONFIG_TAG_INTRINSIC) is None:
+        return None
+    return from_key
+
+def get_minibatchIntrinsic(config:Dict[str, dict], minibatch_config:Dict[str, Union[str, dict]]) -> Union[Dict[str, float], None]:
+    """画像のmini-batchの出力サイズとROIに合わせた内部パラメータ (求められない場合はNone)"""
+    if minibatch_config[CONFIG_TAG_TYPE] not in IMAGE_TYPES: return None
+    shape:Union[List[Union[int, None]], None] = minibatch_config.get(CONFIG_TAG_SHAPE)
+    if shape is None or len(shape) < 2 or None in shape[:2]: return None
+    key:Union[str, None] = get_intrinsicKey(config, minibatch_config)
+    if key is None: return None
+    return get_scaledIntrinsic(config[CONFIG_TAG_SRCDATA][key][CONFIG_TAG_INTRINSIC], shape, minibatch_config.get(CONFIG_TAG_ROI))
+
+def update_intrinsics(config:Dict[str, dict]) -> List[str]:
+    """各mini-batchに出力サイズに合わせた内部パラメータを記録する
+
+    Args:
+        config (Dict[str, dict]): 設定
+
+    Returns:
+        List[str]: 内部パラメータを記録したmini-batchのタグ
+    """
+    tags:List[str] = []
+    for tag, minibatch_config in config.get(CONFIG_TAG_MINIBATCH, {}).items():
+        intrinsic:Union[Dict[str, float], None] = get_minibatchIntrinsic(config, minibatch_config)
+        if intrinsic is None:
+            minibatch_config.pop(CONFIG_TAG_INTRINSIC, None)
+            continue
+        minibatch_config[CONFIG_TAG_INTRINSIC] = intrinsic
+        tags.append(tag)
+    return tags
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import json
+import functools
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Set, Tuple, Union
+
+DEFAULT_REPORT:str = 'h5dataloader-config.memory.json'
+TOP_SOURCES:int = 5
+# tracemalloc.reset_peakはPython 3.9以降. 無い場合はフェーズ前後の増分をピークの下限として記録する.
+RESET_PEAK:bool = hasattr(tracemalloc, 'reset_peak')
+
+def get_rss() -> int:
+    """現在の常駐メモリ [B] (取得できない場合は0)"""
+    try:
+        with open('/proc/self/statm', mode='r') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return 0
+
+def get_peakRss() -> int:
+    """最大常駐メモリ [B]"""
+    try:
+        import resource
+    except ImportError:
+        return 0
+    peak:int = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+def deep_sizeof(obj:Any, seen:Union[Set[int], None]=None) -> int:
+    """dict/list等を辿ったPythonオブジェクトの合計サイズ [B] (共有するオブジェクトは1回だけ数える)"""
+    seen = set() if seen is None else seen
+    size:int = 0
+    stack:List[Any] = [obj]
+    while len(stack) > 0:
+        item = stack.pop()
+        if id(item) in seen: continue
+        seen.add(id(item))
+        size += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+    return size
+
+class MemoryReport(object):
+    """フェーズ毎のtracemallocのスナップショットの差分とRSSの増分を記録する
+
+    入れ子のフェーズは, 親のフェーズの値から子のフェーズの値を除いて記録する.
+    設定を渡したフェーズは, 終了時 (フェーズの境界) の設定のセクション毎のサイズも記録する.
+    """
+    def __init__(self) -> None:
+        if tracemalloc.is_tracing() is False:
+            tracemalloc.start()
+        self.phases:List[Dict[str, Any]] = []
+        self.sections:Dict[str, int] = {}
+        self.stack:List[List[int]] = []
+
+    @contextmanager
+    def phase(self, name:str, config:Union[Callable[[], Dict[str, Any]], None]=None) -> Iterator[None]:
+        before:tracemalloc.Snapshot = tracemalloc.take_snapshot()
+        rss_before:int = get_rss()
+        if RESET_PEAK:
+            tracemalloc.reset_peak()
+        _, traced_before = tracemalloc.get_traced_memory()
+        self.stack.append([0, 0])
+        try:
+            yield
+        finally:
+            traced_current, traced_peak = tracemalloc.get_traced_memory()
+            if RESET_PEAK is False:
+                traced_peak = max(traced_current, traced_before)
+            after:tracemalloc.Snapshot = tracemalloc.take_snapshot()
+            child_traced, child_rss = self.stack.pop()
+            stats:List[tracemalloc.StatisticDiff] = after.compare_to(before, 'lineno')
+            traced:int = sum(stat.size_diff for stat in stats)
+            rss:int = get_rss() - rss_before
+            record:Dict[str, Any] = {
+                'phase': name,
+                'traced': traced - child_traced,
+                'traced-peak': traced_peak - traced_before,
+                'rss': rss - child_rss,
+                'sources': [[str(stat.traceback[0]), stat.size_diff] for stat in stats[:TOP_SOURCES]],
+            }
+            if config is not None:
+                record['sections'] = self.measure_sections(config())
+            self.phases.append(record)
+            if len(self.stack) > 0:
+                self.stack[-1][0] += traced
+                self.stack[-1][1] += rss
+
+    def install(self, cls:type, phases:Dict[str, str], config_attr:Union[str, None]=None) -> None:
+        """クラスのprivateなメソッドをフェーズとして記録するように置き換える (インスタンス生成前に呼ぶこと)
+
+        config_attrを指定した場合は, フェーズの終了時にインスタンスのその属性の設定のセクション毎のサイズを記録する.
+        """
+        for method, name in phases.items():
+            attr:str = '_{0:s}__{1:s}'.format(cls.__name__, method)
+            func = getattr(cls, attr)
+            def wrapper(*args, _func=func, _name=name, **kwargs):
+                config = None if config_attr is None else lambda: getattr(args[0], config_attr, {})
+                with self.phase(_name, config):
+                    return _func(*args, **kwargs)
+            setattr(cls, attr, functools.wraps(func)(wrapper))
+
+    def measure_sections(self, config:Dict[str, Any]) -> Dict[str, int]:
+        """設定のセクション毎のサイズを記録 (セクション間で共有するオブジェクトは先のセクションに数える)"""
+        seen:Set[int] = set()
+        self.sections = {section: deep_sizeof(item, seen) for section, item in config.items()}
+        return self.sections
+
+    def summary(self) -> Dict[str, Dict[str, int]]:
+        """フェーズ毎の合計"""
+        totals:Dict[str, Dict[str, int]] = {}
+        for record in self.phases:
+            total:Dict[str, int] = totals.setdefault(record['phase'], {'count': 0, 'traced': 0, 'traced-peak': 0, 'rss': 0, 'config': 0})
+            total['count'] += 1
+            total['traced'] += record['traced']
+            total['traced-peak'] = max(total['traced-peak'], record['traced-peak'])
+            total['rss'] += record['rss']
+            if 'sections' in record.keys():
+                # 最後の境界での設定のサイズ
+                total['config'] = sum(record['sections'].values())
+        return totals
+
+    def format_summary(self) -> str:
+        lines:List[str] = ['{0:24s} {1:>6s} {2:>14s} {3:>14s} {4:>14s} {5:>14s}'.format('phase', 'count', 'traced [KiB]', 'peak [KiB]', 'rss [KiB]', 'config [KiB]')]
+        for name, total in self.summary().items():
+            lines.append('{0:24s} {1:6d} {2:14.1f} {3:14.1f} {4:14.1f} {5:14.1f}'.format(name, total['count'], total['traced'] / 1024, total['traced-peak'] / 1024, total['rss'] / 1024, total['config'] / 1024))
+        lines.append('')
+        lines.append('{0:24s} {1:>14s}'.format('section', 'size [KiB]'))
+        for section, size in sorted(self.sections.items(), key=lambda item: item[1], reverse=True):
+            lines.append('{0:24s} {1:14.1f}'.format(section, size / 1024))
+        lines.append('{0:24s} {1:14.1f}'.format('peak rss', get_peakRss() / 1024))
+        return '\n'.join(lines)
+
+    def save(self, path:str) -> None:
+        with open(path, mode='w') as jsonfile:
+            json.dump({'phases': self.phases, 'summary': self.summary(), 'sections': self.sections, 'peak-rss': get_peakRss()}, jsonfile, indent=2)
+
+_report:Union[MemoryReport, None] = None
+
+def enable() -> MemoryReport:
+    global _report
+    _report = MemoryReport()
+    return _report
+
+def enabled() -> bool:
+    return _report is not None
+
+@contextmanager
+def phase(name:str, config:Union[Callable[[], Dict[str, Any]], None]=None) -> Iterator[None]:
+    """メモリレポートが有効な場合のみフェーズを記録する"""
+    if _report is None:
+        yield
+    else:
+        with _report.phase(name, config):
+            yield
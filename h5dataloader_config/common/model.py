@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+
+from typing import Callable, Dict, Iterable, List, Set, Union
+
+from .structure import *
+from .search import KeyIndex
+from .graph import CONVERSION_GRAPH, ConversionPlan
+
+MODEL_EVENT_RESET:str = 'reset'
+MODEL_EVENT_INSERT:str = 'insert'
+MODEL_EVENT_UPDATE:str = 'update'
+MODEL_EVENT_REMOVE:str = 'remove'
+
+# (イベント, セクション, キー, 変更前のキー)
+ModelListener = Callable[[str, str, Union[str, None], Union[str, None]], None]
+
+class ConfigModel(object):
+    """dataloader_configを保持し, src-dataの型・frame-id・label-tag, TFのフレーム, label configのsrcの索引を管理する
+
+    mini-batchとlabel configの変更はこのクラスを通して行い, 登録したリスナーに変更を通知する.
+    """
+    def __init__(self, config:Union[Dict[str, dict], None]=None) -> None:
+        self.listeners:List[ModelListener] = []
+        self.reset({} if config is None else config)
+
+    def add_listener(self, listener:ModelListener) -> None:
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener:ModelListener) -> None:
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    def __notify(self, event:str, section:str, key:Union[str, None]=None, old_key:Union[str, None]=None) -> None:
+        for listener in self.listeners:
+            listener(event, section, key, old_key)
+
+    def reset(self, config:Dict[str, dict]) -> None:
+        """設定を置き換えて索引を作り直す"""
+        self.config:Dict[str, dict] = config
+        self.by_type:Dict[str, List[str]] = {}
+        self.by_frameId:Dict[str, List[str]] = {}
+        self.by_labelTag:Dict[str, List[str]] = {}
+        for tag, item in config.get(CONFIG_TAG_SRCDATA, {}).items():
+            self.by_type.setdefault(item.get(CONFIG_TAG_TYPE), []).append(tag)
+            self.by_frameId.setdefault(item.get(CONFIG_TAG_FRAMEID), []).append(tag)
+            self.by_labelTag.setdefault(item.get(CONFIG_TAG_LABELTAG), []).append(tag)
+        for index in [self.by_type, self.by_frameId, self.by_labelTag]:
+            for tags in index.values():
+                tags.sort()
+        self.tf_list:List[str] = sorted(config.get(CONFIG_TAG_TF, {}).get(CONFIG_TAG_LIST, []))
+        self.src_index:KeyIndex = KeyIndex(config.get(CONFIG_TAG_SRCDATA, {}).keys())
+        self.tf_index:KeyIndex = KeyIndex(self.tf_list)
+        self.conversions:Dict[str, ConversionPlan] = CONVERSION_GRAPH.resolve(data_type for data_type in self.by_type.keys() if isinstance(data_type, str))
+        self.reachable_types:List[str] = CONVERSION_GRAPH.get_reachableTypes(self.conversions)
+        self.__index_labelConfigs()
+        self.__notify(MODEL_EVENT_RESET, '')
+
+    def __index_labelConfigs(self) -> None:
+        self.by_labelSrc:Dict[str, List[str]] = {}
+        for config_tag, label_config in self.config.get(CONFIG_TAG_LABEL, {}).get(CONFIG_TAG_CONFIG, {}).items():
+            self.by_labelSrc.setdefault(label_config[CONFIG_TAG_SRC], []).append(config_tag)
+
+    def get_srcKeys(self, data_type:Union[str, Iterable[str], None]=None, frame_id:Union[str, None]=None, label_tag:Union[str, None]=None) -> List[str]:
+        """条件を全て満たすsrc-dataのキー (昇順)
+
+        Args:
+            data_type (Union[str, Iterable[str], None], optional): 型. 複数指定した場合はいずれか. Defaults to None.
+            frame_id (Union[str, None], optional): frame-id. Defaults to None.
+            label_tag (Union[str, None], optional): label-tag. Defaults to None.
+        """
+        candidates:List[List[str]] = []
+        if data_type is not None:
+            data_types:List[str] = [data_type] if isinstance(data_type, str) else list(data_type)
+            candidates.append(sorted(tag for t in data_types for tag in self.by_type.get(t, [])) if len(data_types) > 1 else self.by_type.get(data_types[0], []))
+        if frame_id is not None:
+            candidates.append(self.by_frameId.get(frame_id, []))
+        if label_tag is not None:
+            candidates.append(self.by_labelTag.get(label_tag, []))
+        if len(candidates) == 0:
+            return sorted(self.config.get(CONFIG_TAG_SRCDATA, {}).keys())
+        candidates.sort(key=len)
+        others:List[Set[str]] = [set(tags) for tags in candidates[1:]]
+        return [tag for tag in candidates[0] if all(tag in other for other in others)]
+
+    def get_typeCompatibility(self, src_type:Union[str, None], dst_type:Union[str, None]) -> int:
+        """src-dataの型とmini-batchの型の相性 (0: 同じ型, 1: 変換元になる型, 2: それ以外)"""
+        if dst_type is None or src_type == dst_type:
+            return 0
+        for from_types in FROM_TYPES.get(dst_type, []):
+            if src_type in from_types:
+                return 1
+        return 2
+
+    def search_srcKeys(self, text:str, data_type:Union[str, None]=None, dst_type:Union[str, None]=None) -> List[str]:
+        """textを含むsrc-dataのキーを, dst_typeとの型の相性, 一致の種類, キーの順に並べる
+
+        Args:
+            text (str): 検索文字列
+            data_type (Union[str, None], optional): 型で絞り込む. Defaults to None.
+            dst_type (Union[str, None], optional): mini-batchの型. Defaults to None.
+        """
+        matches:Dict[str, int] = self.src_index.search(text)
+        if data_type is not None:
+            matches = {key: matches[key] for key in self.by_type.get(data_type, []) if key in matches}
+        srcdata_dict:Dict[str, dict] = self.config[CONFIG_TAG_SRCDATA]
+        return sorted(matches.keys(), key=lambda key: (self.get_typeCompatibility(srcdata_dict[key].get(CONFIG_TAG_TYPE), dst_type), matches[key], key))
+
+    def search_tfList(self, text:str) -> List[str]:
+        """textを含むTFのフレームを一致の種類, フレームの順に並べる"""
+        matches:Dict[str, int] = self.tf_index.search(text)
+        return sorted(matches.keys(), key=lambda frame_id: (matches[frame_id], frame_id))
+
+    def get_srcTypes(self) -> Set[str]:
+        return set(self.by_type.keys())
+
+    def get_reachableTypes(self) -> List[str]:
+        """src-dataから (多段の変換を含めて) 出力できるmini-batchの型"""
+        return self.reachable_types
+
+    def get_conversionPlans(self, dst_type:str) -> List[Union[ConversionPlan, None]]:
+        """FROM_TYPES[dst_type]の組み合わせ毎の最小コストの計画 (得られない場合はNone)"""
+        return CONVERSION_GRAPH.get_plans(dst_type, self.conversions)
+
+    def get_tfList(self) -> List[str]:
+        """TFのフレーム (昇順)"""
+        return self.tf_list
+
+    def get_labelConfigs(self, src_tag:str) -> List[str]:
+        """label-tagをsrcとするlabel configのタグ"""
+        return self.by_labelSrc.get(src_tag, [])
+
+    def set_minibatch(self, tag:str, minibatch_config:Dict[str, dict], old_tag:Union[str, None]=None) -> None:
+        """mini-batchを追加・変更する. old_tagを指定した場合はold_tagのmini-batchを置き換える."""
+        minibatch_dict:Dict[str, dict] = self.config[CONFIG_TAG_MINIBATCH]
+        if old_tag is None:
+            event:str = MODEL_EVENT_UPDATE if tag in minibatch_dict.keys() else MODEL_EVENT_INSERT
+        else:
+            event = MODEL_EVENT_UPDATE
+            if old_tag != tag:
+                minibatch_dict.pop(old_tag, None)
+        minibatch_dict[tag] = minibatch_config
+        self.__notify(event, CONFIG_TAG_MINIBATCH, tag, tag if old_tag is None else old_tag)
+
+    def remove_minibatch(self, tag:str) -> None:
+        if self.config[CONFIG_TAG_MINIBATCH].pop(tag, None) is None: return
+        self.__notify(MODEL_EVENT_REMOVE, CONFIG_TAG_MINIBATCH, tag)
+
+    def set_labelConfig(self, tag:str, label_config:Dict[str, dict], old_tag:Union[str, None]=None) -> None:
+        """label configを追加・変更する. old_tagを指定した場合はold_tagのlabel configを置き換える."""
+        config_dict:Dict[str, dict] = self.config[CONFIG_TAG_LABEL][CONFIG_TAG_CONFIG]
+        event:str = MODEL_EVENT_UPDATE if tag in config_dict.keys() or old_tag is not None else MODEL_EVENT_INSERT
+        if old_tag is not None and old_tag != tag:
+            config_dict.pop(old_tag, None)
+        config_dict[tag] = label_config
+        self.__index_labelConfigs()
+        self.__notify(event, CONFIG_TAG_LABEL, tag, tag if old_tag is None else old_tag)
+
+    def remove_labelConfig(self, tag:str) -> None:
+        if self.config[CONFIG_TAG_LABEL][CONFIG_TAG_CONFIG].pop(tag, None) is None: return
+        self.__index_labelConfigs()
+        self.__notify(MODEL_EVENT_REMOVE, CONFIG_TAG_LABEL, tag)
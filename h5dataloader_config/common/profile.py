@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import time
+import threading
+import functools
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Tuple, Union
+
+DEFAULT_TRACE:str = 'h5dataloader-config.trace.json'
+
+class Profiler(object):
+    """計測区間 (span) を記録し, Chrome trace-event形式と集計表で出力する"""
+    def __init__(self) -> None:
+        self.origin:float = time.perf_counter()
+        self.events:List[Dict[str, Any]] = []
+        self.pid:int = os.getpid()
+
+    @contextmanager
+    def span(self, name:str, category:str='gui') -> Iterator[None]:
+        start:float = time.perf_counter()
+        try:
+            yield
+        finally:
+            end:float = time.perf_counter()
+            self.events.append({
+                'name': name, 'cat': category, 'ph': 'X', 'pid': self.pid, 'tid': threading.get_ident(),
+                'ts': (start - self.origin) * 1e6, 'dur': (end - start) * 1e6,
+            })
+
+    def wrap(self, name:str, func:Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with self.span(name):
+                return func(*args, **kwargs)
+        return wrapper
+
+    def install(self, cls:type, methods:List[str]) -> None:
+        """クラスのprivateなメソッドを計測付きに置き換える (インスタンス生成前に呼ぶこと)"""
+        for method in methods:
+            attr:str = '_{0:s}__{1:s}'.format(cls.__name__, method)
+            setattr(cls, attr, self.wrap(method, getattr(cls, attr)))
+
+    def summary(self) -> List[Tuple[str, int, float, float, float]]:
+        """span毎の回数, 合計, 平均, 最大 [ms] (合計の降順)"""
+        durations:Dict[str, List[float]] = {}
+        for event in self.events:
+            durations.setdefault(event['name'], []).append(event['dur'] / 1e3)
+        rows:List[Tuple[str, int, float, float, float]] = [(name, len(durs), sum(durs), sum(durs) / len(durs), max(durs)) for name, durs in durations.items()]
+        return sorted(rows, key=lambda row: row[2], reverse=True)
+
+    def format_summary(self) -> str:
+        lines:List[str] = ['{0:48s} {1:>6s} {2:>12s} {3:>12s} {4:>12s}'.format('span', 'count', 'total [ms]', 'mean [ms]', 'max [ms]')]
+        for name, count, total, mean, maximum in self.summary():
+            lines.append('{0:48s} {1:6d} {2:12.3f} {3:12.3f} {4:12.3f}'.format(name, count, total, mean, maximum))
+        return '\n'.join(lines)
+
+    def save(self, path:str) -> None:
+        with open(path, mode='w') as jsonfile:
+            json.dump({'traceEvents': self.events, 'displayTimeUnit': 'ms'}, jsonfile)
+
+_profiler:Union[Profiler, None] = None
+
+def enable() -> Profiler:
+    global _profiler
+    _profiler = Profiler()
+    return _profiler
+
+@contextmanager
+def span(name:str, category:str='gui') -> Iterator[None]:
+    """計測が有効な場合のみ区間を記録する"""
+    if _profiler is None:
+        yield
+    else:
+        with _profiler.span(name, category):
+            yield
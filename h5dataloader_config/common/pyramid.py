@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+
+from typing import Dict, List, Union
+
+from .structure import *
+
+def is_pyramidType(data_type:str) -> bool:
+    """ピラミッドを出力できる型 (縮小の補間方法が決まっている画像)"""
+    return data_type in IMAGE_TYPES and INTERPOLATION_FLAG.get(data_type) is not None
+
+def parse_pyramid(text:str, shape:Union[List[Union[int, None]], None]) -> Union[List[List[int]], None]:
+    """ピラミッドの文字列を2段目以降の形状に変換する
+
+    Args:
+        text (str): 'HxW, HxW, ...' または1段目に対する倍率 ('0.5, 0.25, ...'). 空の場合はピラミッドなし.
+        shape (Union[List[Union[int, None]], None]): 1段目 (mini-batchのshape) の形状
+
+    Raises:
+        ValueError: 解釈できない場合や, 前の段より大きい段がある場合
+
+    Returns:
+        Union[List[List[int]], None]: 段毎の [高さ, 幅]
+    """
+    values:List[str] = [value.strip() for value in text.split(',') if value.strip() != '']
+    if len(values) == 0: return None
+    known:bool = shape is not None and len(shape) >= 2 and None not in shape[:2]
+    levels:List[List[int]] = []
+    for value in values:
+        if 'x' in value.lower():
+            height, width = [int(size) for size in value.lower().split('x')]
+        else:
+            scale:float = float(value)
+            if not known or not 0.0 < scale <= 1.0:
+                raise ValueError('pyramid scale needs a known shape and 0 < scale <= 1')
+            height, width = max(1, int(round(shape[0] * scale))), max(1, int(round(shape[1] * scale)))
+        levels.append([height, width])
+    previous:Union[List[Union[int, None]], None] = shape[:2] if known else None
+    for level in levels:
+        if level[0] < 1 or level[1] < 1:
+            raise ValueError('pyramid level out of range')
+        if previous is not None and (level[0] > previous[0] or level[1] > previous[1]):
+            raise ValueError('pyramid levels must not be larger than the previous level')
+        previous = level
+    return levels
+
+def format_pyramid(pyramid:Union[List[List[int]], None]) -> str:
+    return '' if pyramid is None else ', '.join('{0:d}x{1:d}'.format(level[0], level[1]) for level in pyramid)
+
+def get_pyramidTags(tag:str, minibatch_config:Dict[str, Union[str, dict]]) -> List[str]:
+    """2段目以降の出力のタグ"""
+    return [PYRAMID_TAG_FORMAT.format(tag, level_idx) for level_idx in range(1, len(minibatch_config.get(CONFIG_TAG_PYRAMID) or []) + 1)]
+
+def get_levelShape(minibatch_config:Dict[str, Union[str, dict]], level:List[int]) -> List[Union[int, None]]:
+    """段の形状 (3次元目以降はmini-batchのshapeと同じ)"""
+    return list(level[:2]) + list(minibatch_config[CONFIG_TAG_SHAPE][2:])
@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+
+from typing import Dict, List, Union
+
+from .structure import *
+
+def get_directSource(minibatch_config:Dict[str, Union[str, dict]]) -> Union[str, None]:
+    """値を変えずに出力するsrc-dataのキー (rangeの判定を入力の値で行えるmini-batchのみ, それ以外はNone)
+
+    同じ型をそのまま出力する場合と, 出力と同じ座標系の点群 (座標変換が恒等変換) の場合.
+    """
+    if CONFIG_TAG_STEPS in minibatch_config.keys(): return None
+    dst_type:str = minibatch_config[CONFIG_TAG_TYPE]
+    from_dict:Dict[str, str] = minibatch_config[CONFIG_TAG_FROM]
+    if dst_type == TYPE_POINTS:
+        if set(from_dict.keys()) != {TYPE_POINTS, TYPE_POSE} or from_dict[TYPE_POSE] != minibatch_config.get(CONFIG_TAG_FRAMEID): return None
+        return from_dict[TYPE_POINTS]
+    if list(from_dict.keys()) != [dst_type]: return None
+    return from_dict[dst_type]
+
+def is_certified(config:Dict[str, dict], minibatch_config:Dict[str, Union[str, dict]]) -> bool:
+    """qualityで検査済みの値がrangeに収まり, 出力でrangeを適用しなくてよいmini-batchか
+
+    検査後にHDF5ファイルを差し替えた場合や, 検査した値の範囲がrangeに収まらない場合はFalse.
+    """
+    value_range:Union[List[float], None] = minibatch_config.get(CONFIG_TAG_RANGE)
+    key:Union[str, None] = get_directSource(minibatch_config)
+    if value_range is None or key is None: return False
+    quality:Union[Dict[str, Union[bool, int, list, str]], None] = config[CONFIG_TAG_SRCDATA].get(key, {}).get(CONFIG_TAG_QUALITY)
+    if quality is None or quality[CONFIG_TAG_CLEAN] is not True or quality.get(CONFIG_TAG_FILE) != config.get(H5_ATTR_FILEPATH): return False
+    span:Union[List[float], None] = quality[CONFIG_TAG_SPAN]
+    return span is None or (value_range[0] <= span[0] and span[1] <= value_range[1])
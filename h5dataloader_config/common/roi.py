@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+
+from typing import Dict, List, Tuple, Union
+
+from .structure import *
+from .intrinsic import get_intrinsicKey, get_minibatchIntrinsic
+from .codec import get_imageShape, get_pixelType
+
+def get_centerCrop(src_shape:List[int], ratio_h:float, ratio_w:float) -> List[int]:
+    """高さ・幅をそれぞれの割合にした中央の切り出し範囲 [上端, 左端, 高さ, 幅]"""
+    height:int = max(1, int(round(src_shape[0] * ratio_h)))
+    width:int = max(1, int(round(src_shape[1] * ratio_w)))
+    return [(src_shape[0] - height) // 2, (src_shape[1] - width) // 2, height, width]
+
+def parse_roi(text:str, src_shape:Union[List[Union[int, None]], None]) -> Union[List[int], None]:
+    """ROIの文字列を切り出し範囲に変換する
+
+    Args:
+        text (str): '上端, 左端, 高さ, 幅' または中央の切り出しの割合 ('0.8' または '高さの割合, 幅の割合'). 空の場合はROIなし.
+        src_shape (Union[List[Union[int, None]], None]): 切り出す前の画像の形状
+
+    Raises:
+        ValueError: 解釈できない場合や, 切り出し範囲が画像の外側にはみ出す場合
+
+    Returns:
+        Union[List[int], None]: [上端, 左端, 高さ, 幅]
+    """
+    values:List[str] = [value.strip() for value in text.replace(' ', ',').split(',') if value.strip() != '']
+    if len(values) == 0: return None
+    known:bool = src_shape is not None and len(src_shape) >= 2 and None not in src_shape[:2]
+    if len(values) in [1, 2]:
+        ratios:List[float] = [float(value) for value in values] * (2 if len(values) == 1 else 1)
+        if not known or not all(0.0 < ratio <= 1.0 for ratio in ratios):
+            raise ValueError('center-crop ratio needs a known source shape and 0 < ratio <= 1')
+        roi:List[int] = get_centerCrop(src_shape, ratios[0], ratios[1])
+    elif len(values) == 4:
+        roi = [int(value) for value in values]
+    else:
+        raise ValueError('ROI is "top, left, height, width" or a center-crop ratio')
+    top, left, height, width = roi
+    if top < 0 or left < 0 or height < 1 or width < 1:
+        raise ValueError('ROI out of range')
+    if known and (top + height > src_shape[0] or left + width > src_shape[1]):
+        raise ValueError('ROI out of range')
+    return roi
+
+def format_roi(roi:Union[List[int], None]) -> str:
+    return '' if roi is None else ', '.join(str(value) for value in roi)
+
+def get_roiSlices(roi:List[int]) -> Tuple[slice, slice]:
+    top, left, height, width = roi
+    return slice(top, top + height), slice(left, left + width)
+
+def get_roiShape(shape:List[Union[int, None]], roi:Union[List[int], None]) -> List[Union[int, None]]:
+    """切り出した後の形状 (3次元目以降はそのまま)"""
+    if roi is None or shape is None or len(shape) < 2: return shape
+    return [roi[2], roi[3]] + list(shape[2:])
+
+def is_projected(minibatch_config:Dict[str, Union[str, dict]]) -> bool:
+    """点群を画像平面に投影して出力するmini-batchか (ROIは読み込みではなく内部パラメータに反映する)"""
+    steps:List[Dict[str, Union[str, List[str]]]] = minibatch_config.get(CONFIG_TAG_STEPS) or [{CONFIG_TAG_TYPE: minibatch_config[CONFIG_TAG_TYPE], CONFIG_TAG_FROM: list(minibatch_config[CONFIG_TAG_FROM].keys())}]
+    return any(step[CONFIG_TAG_TYPE] in PROJECTED_TYPES and TYPE_INTRINSIC in step[CONFIG_TAG_FROM] and TYPE_DISPARITY not in step[CONFIG_TAG_FROM] for step in steps)
+
+def is_imageSource(srcdata_dict:Dict[str, dict], from_type:str, from_key:str) -> bool:
+    """画像 (符号化した画像を含む) のsrc-dataか"""
+    return get_pixelType(from_type) in IMAGE_TYPES and get_pixelType(srcdata_dict.get(from_key, {}).get(CONFIG_TAG_TYPE, '')) in IMAGE_TYPES
+
+def get_roiSources(config:Dict[str, dict], minibatch_config:Dict[str, Union[str, dict]]) -> List[str]:
+    """ROIで切り出して読み込む画像のsrc-dataのキー"""
+    if minibatch_config.get(CONFIG_TAG_ROI) is None or is_projected(minibatch_config): return []
+    srcdata_dict:Dict[str, dict] = config.get(CONFIG_TAG_SRCDATA, {})
+    return [from_key for from_type, from_key in minibatch_config[CONFIG_TAG_FROM].items() if is_imageSource(srcdata_dict, from_type, from_key)]
+
+def get_sourceShape(config:Dict[str, dict], minibatch_config:Dict[str, Union[str, dict]]) -> Union[List[Union[int, None]], None]:
+    """ROIを指定する画像の形状 (投影する場合はintrinsicの画像サイズ, それ以外は最初の画像のsrc-data)"""
+    srcdata_dict:Dict[str, dict] = config.get(CONFIG_TAG_SRCDATA, {})
+    if is_projected(minibatch_config):
+        key:Union[str, None] = get_intrinsicKey(config, minibatch_config)
+        if key is None: return None
+        intrinsic:Dict[str, float] = srcdata_dict[key][CONFIG_TAG_INTRINSIC]
+        return [int(intrinsic[SUBTYPE_HEIGHT]), int(intrinsic[SUBTYPE_WIDTH])]
+    for from_type, from_key in minibatch_config[CONFIG_TAG_FROM].items():
+        if is_imageSource(srcdata_dict, from_type, from_key):
+            return get_imageShape(srcdata_dict[from_key])
+    return None
+
+def describe_roi(config:Dict[str, dict], minibatch_config:Dict[str, Union[str, dict]], roi:Union[List[int], None]) -> str:
+    """切り出し範囲, 縮小率, 読み込む画素の割合と内部パラメータの説明"""
+    src_shape:Union[List[Union[int, None]], None] = get_sourceShape(config, minibatch_config)
+    known:bool = src_shape is not None and len(src_shape) >= 2 and None not in src_shape[:2]
+    if roi is None:
+        if not known: return ''
+        crop:List[int] = [0, 0, src_shape[0], src_shape[1]]
+    else:
+        crop = roi
+    texts:List[str] = ['{0:d}x{1:d} at ({2:d}, {3:d})'.format(crop[2], crop[3], crop[0], crop[1])]
+    shape:Union[List[Union[int, None]], None] = minibatch_config.get(CONFIG_TAG_SHAPE)
+    if shape is not None and len(shape) >= 2 and None not in shape[:2]:
+        texts[0] += ' → {0:d}x{1:d} (x{2:.3g}, x{3:.3g})'.format(shape[0], shape[1], shape[0] / crop[2], shape[1] / crop[3])
+    if known:
+        ratio:float = crop[2] * crop[3] / (src_shape[0] * src_shape[1])
+        texts.append('{0:.0%} of {1:d}x{2:d} {3:s}'.format(ratio, src_shape[0], src_shape[1], 'projected' if is_projected(minibatch_config) else 'read'))
+    scoped:Dict[str, Union[str, dict]] = dict(minibatch_config)
+    scoped[CONFIG_TAG_ROI] = roi
+    intrinsic:Union[Dict[str, float], None] = get_minibatchIntrinsic(config, scoped)
+    if intrinsic is not None:
+        texts.append(', '.join('{0:s} {1:.6g}'.format(subtype, intrinsic[subtype]) for subtype in [SUBTYPE_FX, SUBTYPE_FY, SUBTYPE_CX, SUBTYPE_CY]))
+    return ', '.join(texts)
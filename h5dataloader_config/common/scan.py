@@ -0,0 +1,286 @@
+# -*- coding: utf-8 -*-
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple, Union
+import numpy as np
+import h5py
+
+from .structure import *
+from .codec import HEADER_BYTES, parse_imageHeader
+
+DEFAULT_SCHEMA_SAMPLES:int = 16
+
+def byte2str(obj) -> Union[str, None]:
+    return obj.decode() if isinstance(obj, bytes) else obj
+
+def get_length(h5file:h5py.File) -> int:
+    """HDF5ファイルのフレーム数を取得
+
+    Args:
+        h5file (h5py.File): HDF5ファイル
+
+    Returns:
+        int: フレーム数
+    """
+    if H5_KEY_HEADER in h5file.keys() and H5_KEY_LENGTH in h5file[H5_KEY_HEADER].keys():
+        return int(h5file[H5_KEY_HEADER][H5_KEY_LENGTH][()])
+    return len(h5file[H5_KEY_DATA])
+
+def index_dtype(length:int) -> np.dtype:
+    return np.int32 if length <= np.iinfo(np.int32).max else np.int64
+
+def get_h5Key(key:str, idx:int) -> str:
+    """src-dataのキーをHDF5内のパスに変換
+
+    Args:
+        key (str): src-dataのキー. '/'で始まる場合はフレームに依存しない.
+        idx (int): フレームインデックス
+
+    Returns:
+        str: HDF5内のパス
+    """
+    if key.startswith('/'): return key
+    return '{0:s}/{1:d}/{2:s}'.format(H5_KEY_DATA, idx, key)
+
+def sample_frameIndices(length:int, num_samples:int, seed:Union[int, None]=None) -> np.ndarray:
+    """インデックス範囲を層化して, 各層から1フレームずつ選ぶ
+
+    Args:
+        length (int): フレーム数
+        num_samples (int): サンプル数
+        seed (Union[int, None], optional): Noneの場合は各層の先頭 (最終層は末尾) を選ぶ. Defaults to None.
+
+    Returns:
+        np.ndarray: 昇順のフレームインデックス
+    """
+    if length < 1: return np.zeros((0,), dtype=np.int64)
+    if num_samples >= length or num_samples < 1:
+        return np.arange(length, dtype=np.int64)
+    bounds:np.ndarray = np.linspace(0, length, num_samples + 1).astype(np.int64)
+    if seed is None:
+        indices = bounds[:-1].copy()
+        indices[-1] = length - 1
+    else:
+        rng = np.random.default_rng(seed)
+        indices = rng.integers(bounds[:-1], np.maximum(bounds[1:], bounds[:-1] + 1))
+    return np.unique(indices)
+
+def get_voxelAttrs(item:Union[h5py.Dataset, h5py.Group]) -> Dict[str, Union[float, List[float]]]:
+    """ボクセル地図の属性 (voxel_size, voxel_min, voxel_max, voxel_center, voxel_origin) のうち存在するもの"""
+    attrs:Dict[str, Union[float, List[float]]] = {}
+    for attr in H5_ATTRS_VOXEL:
+        if attr in item.attrs:
+            attrs[attr] = np.asarray(item.attrs[attr], dtype=np.float64).tolist()
+    return attrs
+
+def get_encoding(item:h5py.Dataset) -> Union[Dict[str, Union[str, float]], None]:
+    """scale_factor/add_offsetで符号化されたデータセットの保存形式 (符号化されていない場合はNone)"""
+    if H5_ATTR_SCALEFACTOR not in item.attrs and H5_ATTR_ADDOFFSET not in item.attrs: return None
+    return {
+        CONFIG_TAG_DTYPE: str(item.dtype),
+        CONFIG_TAG_SCALE: float(item.attrs.get(H5_ATTR_SCALEFACTOR, 1.0)),
+        CONFIG_TAG_OFFSET: float(item.attrs.get(H5_ATTR_ADDOFFSET, 0.0)),
+    }
+
+def get_encodedShape(item:h5py.Dataset) -> Union[List[int], None]:
+    """符号化した画像のデータセットの復号後の形状 (ヘッダを解釈できない場合はNone)"""
+    if item.ndim != 1 or len(item) == 0: return None
+    shape:Union[List[int], None] = parse_imageHeader(item[:HEADER_BYTES].tobytes())
+    if shape is None and len(item) > HEADER_BYTES:
+        shape = parse_imageHeader(item[()].tobytes())
+    return shape
+
+def get_intrinsicValues(item:h5py.Group) -> Union[Dict[str, float], None]:
+    """intrinsicの値 (Fx, Fy, Cx, Cy, height, width). データセットまたは属性に無いものがある場合はNone"""
+    values:Dict[str, float] = {}
+    for subtype in SUBTYPES_INTRINSIC:
+        if subtype in item:
+            values[subtype] = float(item[subtype][()])
+        elif subtype in item.attrs:
+            values[subtype] = float(item.attrs[subtype])
+        else:
+            return None
+    return values
+
+def get_nestPose(config:Dict[str, Dict[str, str]], key_tag:str, item_tag:Union[h5py.Dataset, h5py.Group], key_root:str='') -> None:
+    key = os.path.join(key_root ,key_tag).replace('\\', '/')
+    if isinstance(item_tag, h5py.Group):
+        data_type:str = byte2str(item_tag.attrs.get(H5_ATTR_TYPE))
+        if data_type in [TYPE_POSE]:
+            frame_id:str = byte2str(item_tag.attrs.get(H5_ATTR_FRAMEID))
+            child_frame_id:str = byte2str(item_tag.attrs.get(H5_ATTR_CHILDFRAMEID))
+
+            config_pose_dict = {}
+            config_pose_dict[CONFIG_TAG_KEY] = key
+            config_pose_dict[CONFIG_TAG_FRAMEID] = frame_id
+            config_pose_dict[CONFIG_TAG_CHILDFRAMEID] = child_frame_id
+            config[child_frame_id] = config_pose_dict
+
+        for key_child, item_child in item_tag.items():
+            get_nestPose(config, key_child, item_child, key)
+
+def get_nestData(config:dict, key_tag:str, item_tag:Union[h5py.Dataset, h5py.Group], key_root:str='') -> None:
+    key = os.path.join(key_root, key_tag).replace('\\', '/')
+    if isinstance(item_tag, h5py.Group):
+        data_type:str = byte2str(item_tag.attrs.get(H5_ATTR_TYPE))
+        if data_type in [TYPE_POSE, TYPE_INTRINSIC, TYPE_SEMANTIC3D]:
+            config_tag_dict = {}
+            config_tag_dict[CONFIG_TAG_TAG] = key
+            config_tag_dict[CONFIG_TAG_TYPE] = data_type
+            config_tag_dict[CONFIG_TAG_SHAPE] = None
+            config_tag_dict[CONFIG_TAG_FRAMEID] = byte2str(item_tag.attrs.get(H5_ATTR_FRAMEID))
+            config_tag_dict[CONFIG_TAG_CHILDFRAMEID] = byte2str(item_tag.attrs.get(H5_ATTR_CHILDFRAMEID))
+            config_tag_dict[CONFIG_TAG_LABELTAG] = byte2str(item_tag.attrs.get(H5_ATTR_LABELTAG))
+            if data_type in [TYPE_INTRINSIC]:
+                config_tag_dict[CONFIG_TAG_INTRINSIC] = get_intrinsicValues(item_tag)
+            config[key] = config_tag_dict
+            if data_type in [TYPE_INTRINSIC]: return
+
+        for key_child, item_child in item_tag.items():
+            get_nestData(config, key_child, item_child, key)
+    elif isinstance(item_tag, h5py.Dataset):
+        data_type:Union[str, None] = byte2str(item_tag.attrs.get(H5_ATTR_TYPE))
+        if data_type is None:
+            data_type = str(item_tag.dtype)
+        config_tag_dict = {}
+        config_tag_dict[CONFIG_TAG_TAG] = key
+        config_tag_dict[CONFIG_TAG_TYPE] = data_type
+        config_tag_dict[CONFIG_TAG_SHAPE] = list(item_tag.shape)
+        config_tag_dict[CONFIG_TAG_FRAMEID] = byte2str(item_tag.attrs.get(H5_ATTR_FRAMEID))
+        config_tag_dict[CONFIG_TAG_CHILDFRAMEID] = byte2str(item_tag.attrs.get(H5_ATTR_CHILDFRAMEID))
+        config_tag_dict[CONFIG_TAG_LABELTAG] = byte2str(item_tag.attrs.get(H5_ATTR_LABELTAG))
+        if data_type in [TYPE_VOXEL_POINTS, TYPE_VOXEL_SEMANTIC3D]:
+            config_tag_dict[CONFIG_TAG_VOXEL] = get_voxelAttrs(item_tag)
+        if data_type in COMPRESSED_TYPES.keys():
+            config_tag_dict[CONFIG_TAG_IMAGESHAPE] = get_encodedShape(item_tag)
+        encoding:Union[Dict[str, Union[str, float]], None] = get_encoding(item_tag)
+        if encoding is not None:
+            config_tag_dict[CONFIG_TAG_ENCODING] = encoding
+        config[key] = config_tag_dict
+
+def merge_shape(dst:Union[List[Union[int, None]], None], src:Union[List[Union[int, None]], None]) -> Union[List[Union[int, None]], None]:
+    """形状が変化する次元をNoneにする (次元数が異なる場合はNone)"""
+    if dst is None or src is None or len(dst) != len(src): return None
+    return [d if d == s else None for d, s in zip(dst, src)]
+
+def merge_srcData(dst:Dict[str, dict], src:Dict[str, dict]) -> Dict[str, dict]:
+    """フレーム毎のsrc-dataを統合する. 形状が変化する次元はNoneとし, 最小・最大値を記録する.
+
+    Args:
+        dst (Dict[str, dict]): 統合先
+        src (Dict[str, dict]): 統合するsrc-data
+
+    Returns:
+        Dict[str, dict]: 統合先
+    """
+    for key, item in src.items():
+        shape:Union[List[int], None] = item[CONFIG_TAG_SHAPE]
+        shape_min:Union[List[int], None] = item.get(CONFIG_TAG_SHAPEMIN, shape)
+        shape_max:Union[List[int], None] = item.get(CONFIG_TAG_SHAPEMAX, shape)
+        if key not in dst.keys():
+            merged = item.copy()
+            if shape is not None:
+                merged[CONFIG_TAG_SHAPE] = list(shape)
+                merged[CONFIG_TAG_SHAPEMIN] = list(shape_min)
+                merged[CONFIG_TAG_SHAPEMAX] = list(shape_max)
+            dst[key] = merged
+            continue
+
+        merged = dst[key]
+        if merged.get(CONFIG_TAG_INTRINSIC) != item.get(CONFIG_TAG_INTRINSIC):
+            # フレーム毎に異なる内部パラメータは記録しない
+            merged[CONFIG_TAG_INTRINSIC] = None
+        if merged.get(CONFIG_TAG_ENCODING) != item.get(CONFIG_TAG_ENCODING):
+            # フレームによって保存形式が異なる場合は復号できない
+            merged[CONFIG_TAG_ENCODING] = None
+        if CONFIG_TAG_IMAGESHAPE in merged.keys():
+            merged[CONFIG_TAG_IMAGESHAPE] = merge_shape(merged[CONFIG_TAG_IMAGESHAPE], item.get(CONFIG_TAG_IMAGESHAPE))
+        dst_shape:Union[List[int], None] = merged[CONFIG_TAG_SHAPE]
+        if dst_shape is None or shape is None: continue
+        if len(dst_shape) != len(shape):
+            merged[CONFIG_TAG_SHAPE] = None
+            merged.pop(CONFIG_TAG_SHAPEMIN, None)
+            merged.pop(CONFIG_TAG_SHAPEMAX, None)
+            continue
+        merged[CONFIG_TAG_SHAPE] = [d if d == s else None for d, s in zip(dst_shape, shape)]
+        merged[CONFIG_TAG_SHAPEMIN] = [min(d, s) for d, s in zip(merged[CONFIG_TAG_SHAPEMIN], shape_min)]
+        merged[CONFIG_TAG_SHAPEMAX] = [max(d, s) for d, s in zip(merged[CONFIG_TAG_SHAPEMAX], shape_max)]
+    return dst
+
+def finalize_srcData(config:Dict[str, dict]) -> Dict[str, dict]:
+    """形状が一定のキーから最小・最大値を取り除く
+
+    Args:
+        config (Dict[str, dict]): 統合したsrc-data
+
+    Returns:
+        Dict[str, dict]: src-data
+    """
+    for item in config.values():
+        shape = item[CONFIG_TAG_SHAPE]
+        if shape is None or None not in shape:
+            item.pop(CONFIG_TAG_SHAPEMIN, None)
+            item.pop(CONFIG_TAG_SHAPEMAX, None)
+    return config
+
+def scan_frames(h5file:h5py.File, indices:np.ndarray) -> Tuple[Dict[str, dict], Dict[str, Dict[str, str]]]:
+    """指定したフレームのsrc-dataとposeを走査して統合する
+
+    Args:
+        h5file (h5py.File): HDF5ファイル
+        indices (np.ndarray): フレームインデックス
+
+    Returns:
+        Tuple[Dict[str, dict], Dict[str, Dict[str, str]]]: src-data, pose
+    """
+    config_srcdata_dict:Dict[str, dict] = {}
+    config_pose_dict:Dict[str, Dict[str, str]] = {}
+    h5file_data:h5py.Group = h5file[H5_KEY_DATA]
+    for idx in indices:
+        if str(idx) not in h5file_data: continue
+        frame_srcdata_dict = {}
+        for key_tag, item_tag in h5file_data[str(idx)].items():
+            get_nestData(frame_srcdata_dict, key_tag, item_tag)
+            get_nestPose(config_pose_dict, key_tag, item_tag)
+        merge_srcData(config_srcdata_dict, frame_srcdata_dict)
+    return config_srcdata_dict, config_pose_dict
+
+def _scan_framesWorker(h5path:str, indices:np.ndarray) -> Tuple[Dict[str, dict], Dict[str, Dict[str, str]]]:
+    with h5py.File(h5path, mode='r') as h5file:
+        return scan_frames(h5file, indices)
+
+def infer_schema(h5file:h5py.File, num_samples:int=DEFAULT_SCHEMA_SAMPLES, full_scan:bool=False, processes:Union[int, None]=None, seed:Union[int, None]=None) -> Tuple[Dict[str, dict], Dict[str, Dict[str, str]]]:
+    """フレームをサンプリングしてsrc-dataとposeのスキーマを推定する
+
+    Args:
+        h5file (h5py.File): HDF5ファイル
+        num_samples (int, optional): サンプリングするフレーム数. Defaults to DEFAULT_SCHEMA_SAMPLES.
+        full_scan (bool, optional): Trueの場合は全フレームをプロセスプールで走査する. Defaults to False.
+        processes (Union[int, None], optional): プロセス数. Defaults to None.
+        seed (Union[int, None], optional): 層内のサンプリングに用いるシード. Defaults to None.
+
+    Returns:
+        Tuple[Dict[str, dict], Dict[str, Dict[str, str]]]: src-data, pose
+    """
+    length:int = get_length(h5file)
+    if full_scan is False:
+        config_srcdata_dict, config_pose_dict = scan_frames(h5file, sample_frameIndices(length, num_samples, seed))
+    else:
+        processes = os.cpu_count() if processes is None else processes
+        chunks:List[np.ndarray] = [chunk for chunk in np.array_split(np.arange(length), max(processes, 1)) if len(chunk) > 0]
+        config_srcdata_dict = {}
+        config_pose_dict = {}
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            for chunk_srcdata_dict, chunk_pose_dict in executor.map(_scan_framesWorker, [h5file.filename] * len(chunks), chunks):
+                merge_srcData(config_srcdata_dict, chunk_srcdata_dict)
+                config_pose_dict.update(chunk_pose_dict)
+
+    for key_root, item_root in h5file.items():
+        if key_root in [H5_KEY_HEADER, H5_KEY_DATA, H5_KEY_LABEL]: continue
+        if isinstance(item_root, h5py.Group):
+            for key_tag, item_tag in item_root.items():
+                get_nestData(config_srcdata_dict, key_tag, item_tag, key_root='/'+key_root)
+                get_nestPose(config_pose_dict, key_tag, item_tag, key_root='/'+key_root)
+
+    return finalize_srcData(config_srcdata_dict), config_pose_dict
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, List, Tuple
+
+# キー中で単語の区切りとみなす文字
+KEY_SEPARATORS:str = '/_-.'
+
+MATCH_PREFIX:int = 0
+MATCH_WORD:int = 1
+MATCH_SUBSTRING:int = 2
+
+class KeyIndex(object):
+    """キーの部分文字列検索のための接尾辞配列 (大文字・小文字は区別しない)
+
+    全てのキーの全ての接尾辞を辞書順に並べ, 検索文字列で始まる接尾辞の範囲を二分探索で求める.
+    """
+    def __init__(self, keys:Iterable[str]) -> None:
+        self.keys:List[str] = sorted(set(keys))
+        suffixes:List[Tuple[str, int, int]] = []
+        for keyIdx, key in enumerate(self.keys):
+            lowerKey:str = key.lower()
+            for pos in range(len(lowerKey)):
+                suffixes.append((lowerKey[pos:], keyIdx, pos))
+        suffixes.sort()
+        self.suffixes:List[str] = [suffix for suffix, _, _ in suffixes]
+        self.positions:List[Tuple[int, int]] = [(keyIdx, pos) for _, keyIdx, pos in suffixes]
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def search(self, text:str) -> Dict[str, int]:
+        """textを含むキーと一致の種類 (MATCH_PREFIX, MATCH_WORD, MATCH_SUBSTRING)
+
+        Args:
+            text (str): 検索文字列. 空の場合は全てのキーをMATCH_PREFIXとして返す.
+        """
+        text = text.lower()
+        if len(text) == 0:
+            return {key: MATCH_PREFIX for key in self.keys}
+        begin:int = bisect_left(self.suffixes, text)
+        end:int = bisect_right(self.suffixes, text + '\uffff', begin)
+        matches:Dict[str, int] = {}
+        for keyIdx, pos in self.positions[begin:end]:
+            key:str = self.keys[keyIdx]
+            if pos == 0:
+                match:int = MATCH_PREFIX
+            elif key[pos - 1] in KEY_SEPARATORS:
+                match = MATCH_WORD
+            else:
+                match = MATCH_SUBSTRING
+            if match < matches.get(key, MATCH_SUBSTRING + 1):
+                matches[key] = match
+        return matches
@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+
+from typing import Dict, List, Union
+import numpy as np
+
+from .structure import *
+from .roi import is_projected
+
+# 疎な出力にできる投影後の型 (画素毎に1つの値)
+SPARSE_TYPES:List[str] = [TYPE_DEPTH, TYPE_SEMANTIC2D]
+
+def is_sparseMinibatch(minibatch_config:Dict[str, Union[str, dict]]) -> bool:
+    """点群を投影して作る深度・セマンティクス画像のmini-batchか"""
+    return minibatch_config[CONFIG_TAG_TYPE] in SPARSE_TYPES and is_projected(minibatch_config)
+
+def get_sparseZero(minibatch_config:Dict[str, Union[str, dict]]) -> Union[int, float]:
+    """出力で点の無い画素の値 (正規化する場合は正規化後の値)"""
+    zero:Union[int, float, None] = ZERO_VALUE[minibatch_config[CONFIG_TAG_TYPE]]
+    zero = 0 if zero is None else zero
+    value_range:Union[List[float], None] = minibatch_config.get(CONFIG_TAG_RANGE)
+    if value_range is not None and minibatch_config[CONFIG_TAG_TYPE] != TYPE_DEPTH:
+        zero = min(max(zero, value_range[0]), value_range[1])
+    if minibatch_config.get(CONFIG_TAG_NORMALIZE) is True and value_range is not None:
+        # apply_outputと同じくfloat32の配列で計算する
+        return float(((np.array([zero], dtype=np.float32) - value_range[0]) / (value_range[1] - value_range[0])).astype(np.float32)[0])
+    return zero
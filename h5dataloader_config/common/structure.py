@@ -31,6 +31,15 @@ TYPE_TRANSLATION:str = 'translation'
 TYPE_QUATERNION:str = 'quaternion'
 TYPE_INTRINSIC:str = 'intrinsic'
 TYPE_COLOR:str = 'color'
+# PNG/JPEGで符号化した画像 (フレーム毎に符号化したバイト列を1次元のuint8のデータセットに保存する)
+TYPE_MONO8_PNG:str = 'mono8-png'
+TYPE_MONO8_JPEG:str = 'mono8-jpeg'
+TYPE_MONO16_PNG:str = 'mono16-png'
+TYPE_BGR8_PNG:str = 'bgr8-png'
+TYPE_BGR8_JPEG:str = 'bgr8-jpeg'
+TYPE_RGB8_PNG:str = 'rgb8-png'
+TYPE_RGB8_JPEG:str = 'rgb8-jpeg'
+TYPE_SEMANTIC2D_PNG:str = 'semantic2d-png'
 
 SUBTYPE_TRANSLATION:str = 'translation'
 SUBTYPE_ROTATION:str = 'rotation'
@@ -45,11 +54,14 @@ SUBTYPE_WIDTH:str = 'width'
 SUBTYPE_NAME:str = 'name'
 SUBTYPE_VOXEL_POINTS:str = 'points-voxel'
 SUBTYPE_VOXEL_SEMANTIC3D:str = 'semantic3d-voxel'
+SUBTYPES_INTRINSIC:List[str] = [SUBTYPE_FX, SUBTYPE_FY, SUBTYPE_CX, SUBTYPE_CY, SUBTYPE_HEIGHT, SUBTYPE_WIDTH]
 
 CONFIG_TAG_MINIBATCH:str = 'mini-batch'
 CONFIG_TAG_TYPE:str = 'type'
 CONFIG_TAG_FROM:str = 'from'
 CONFIG_TAG_SHAPE:str = 'shape'
+CONFIG_TAG_SHAPEMIN:str = 'shape-min'
+CONFIG_TAG_SHAPEMAX:str = 'shape-max'
 CONFIG_TAG_NORMALIZE:str = 'normalize'
 CONFIG_TAG_RANGE:str = 'range'
 CONFIG_TAG_KEY:str = 'key'
@@ -70,6 +82,73 @@ CONFIG_TAG_CONFIG:str = 'config'
 CONFIG_TAG_CONVERT:str = 'convert'
 CONFIG_TAG_COLOR:str = 'color'
 CONFIG_TAG_LABELTAG:str = 'label-tag'
+CONFIG_TAG_SIDECAR:str = 'sidecar'
+CONFIG_TAG_FILE:str = 'file'
+CONFIG_TAG_SHUFFLE:str = 'shuffle'
+CONFIG_TAG_WEIGHTS:str = 'weights'
+CONFIG_TAG_SPLIT:str = 'split'
+CONFIG_TAG_WINDOW:str = 'window'
+CONFIG_TAG_LENGTH:str = 'length'
+CONFIG_TAG_STRIDE:str = 'stride'
+CONFIG_TAG_MAXGAP:str = 'max-gap'
+CONFIG_TAG_PLAN:str = 'plan'
+CONFIG_TAG_BYTES:str = 'bytes'
+CONFIG_TAG_STATIC:str = 'static'
+CONFIG_TAG_INTERPOLATION:str = 'interpolation'
+CONFIG_TAG_INVERSE:str = 'inverse'
+CONFIG_TAG_STEPS:str = 'steps'
+CONFIG_TAG_CULL:str = 'cull'
+CONFIG_TAG_VOXEL:str = 'voxel'
+CONFIG_TAG_INTRINSIC:str = 'intrinsic'
+CONFIG_TAG_ROI:str = 'roi'
+CONFIG_TAG_PYRAMID:str = 'pyramid'
+
+# ピラミッドの2段目以降の出力のタグ (mini-batchのタグ, 段数)
+PYRAMID_TAG_FORMAT:str = '{0:s}@{1:d}'
+CONFIG_TAG_SPARSE:str = 'sparse'
+CONFIG_TAG_ZERO:str = 'zero'
+CONFIG_TAG_ENCODING:str = 'encoding'
+CONFIG_TAG_DTYPE:str = 'dtype'
+CONFIG_TAG_SCALE:str = 'scale'
+CONFIG_TAG_OFFSET:str = 'offset'
+# 符号化した画像の復号後の形状
+CONFIG_TAG_IMAGESHAPE:str = 'image-shape'
+# src-dataの値の検査結果 (clean: NaN/Infが無い, span: 有限の値 (点群は距離) の最小・最大値)
+CONFIG_TAG_QUALITY:str = 'quality'
+CONFIG_TAG_CLEAN:str = 'clean'
+CONFIG_TAG_FRAMES:str = 'frames'
+CONFIG_TAG_NAN:str = 'nan'
+CONFIG_TAG_INF:str = 'inf'
+CONFIG_TAG_ZEROFRAMES:str = 'zero-frames'
+CONFIG_TAG_OUTOFRANGE:str = 'out-of-range'
+CONFIG_TAG_SPAN:str = 'span'
+
+# 浮動小数点のsrc-dataの保存形式の候補
+ENCODING_FLOAT16:str = 'float16'
+ENCODING_UINT16:str = 'uint16'
+ENCODING_INT16:str = 'int16'
+ENCODINGS:List[str] = [ENCODING_UINT16, ENCODING_INT16, ENCODING_FLOAT16]
+
+# 投影した画像の疎な出力形式 (COO: 画素の[行, 列]と値, rows: 行毎の開始位置・列・値)
+SPARSE_COO:str = 'coo'
+SPARSE_ROWS:str = 'rows'
+SPARSE_FORMATS:List[str] = [SPARSE_COO, SPARSE_ROWS]
+
+# 画像の符号化方式
+CODEC_PNG:str = 'png'
+CODEC_JPEG:str = 'jpeg'
+CODECS:List[str] = [CODEC_PNG, CODEC_JPEG]
+# 符号化した画像の型毎の, 復号後の型と符号化方式
+COMPRESSED_TYPES:Dict[str, Tuple[str, str]] = {
+    TYPE_MONO8_PNG: (TYPE_MONO8, CODEC_PNG),
+    TYPE_MONO8_JPEG: (TYPE_MONO8, CODEC_JPEG),
+    TYPE_MONO16_PNG: (TYPE_MONO16, CODEC_PNG),
+    TYPE_BGR8_PNG: (TYPE_BGR8, CODEC_PNG),
+    TYPE_BGR8_JPEG: (TYPE_BGR8, CODEC_JPEG),
+    TYPE_RGB8_PNG: (TYPE_RGB8, CODEC_PNG),
+    TYPE_RGB8_JPEG: (TYPE_RGB8, CODEC_JPEG),
+    TYPE_SEMANTIC2D_PNG: (TYPE_SEMANTIC2D, CODEC_PNG),
+}
 
 H5_KEY_HEADER:str = 'header'
 H5_KEY_LENGTH:str = 'length'
@@ -91,6 +170,10 @@ H5_ATTR_VOXELMIN:str = 'voxel_min'
 H5_ATTR_VOXELMAX:str = 'voxel_max'
 H5_ATTR_VOXELCENTER:str = 'voxel_center'
 H5_ATTR_VOXELORIGIN:str = 'voxel_origin'
+H5_ATTRS_VOXEL:List[str] = [H5_ATTR_VOXELSIZE, H5_ATTR_VOXELMIN, H5_ATTR_VOXELMAX, H5_ATTR_VOXELCENTER, H5_ATTR_VOXELORIGIN]
+# 符号化したデータセットの復号 (値 = 保存値 * scale_factor + add_offset)
+H5_ATTR_SCALEFACTOR:str = 'scale_factor'
+H5_ATTR_ADDOFFSET:str = 'add_offset'
 
 DTYPE_NUMPY:Dict[str, np.dtype] = {
     TYPE_FLOAT16: np.float16,
@@ -122,6 +205,14 @@ DTYPE_NUMPY:Dict[str, np.dtype] = {
     TYPE_QUATERNION: np.float32,
     TYPE_INTRINSIC: np.float32,
     TYPE_COLOR: np.uint8,
+    TYPE_MONO8_PNG: np.uint8,
+    TYPE_MONO8_JPEG: np.uint8,
+    TYPE_MONO16_PNG: np.uint8,
+    TYPE_BGR8_PNG: np.uint8,
+    TYPE_BGR8_JPEG: np.uint8,
+    TYPE_RGB8_PNG: np.uint8,
+    TYPE_RGB8_JPEG: np.uint8,
+    TYPE_SEMANTIC2D_PNG: np.uint8,
 }
 
 INTERPOLATION_FLAG:Dict[str, Union[int, None]] = {
@@ -152,6 +243,14 @@ INTERPOLATION_FLAG:Dict[str, Union[int, None]] = {
     TYPE_QUATERNION: None,
     TYPE_INTRINSIC: None,
     TYPE_COLOR: None,
+    TYPE_MONO8_PNG: None,
+    TYPE_MONO8_JPEG: None,
+    TYPE_MONO16_PNG: None,
+    TYPE_BGR8_PNG: None,
+    TYPE_BGR8_JPEG: None,
+    TYPE_RGB8_PNG: None,
+    TYPE_RGB8_JPEG: None,
+    TYPE_SEMANTIC2D_PNG: None,
 }
 
 DEFAULT_RANGE:Dict[str, Tuple[Union[int, float], Union[int, float]]] = {
@@ -182,6 +281,14 @@ DEFAULT_RANGE:Dict[str, Tuple[Union[int, float], Union[int, float]]] = {
     TYPE_QUATERNION: None,
     TYPE_INTRINSIC: None,
     TYPE_COLOR: (np.iinfo(np.uint8).min, np.iinfo(np.uint8).max),
+    TYPE_MONO8_PNG: None,
+    TYPE_MONO8_JPEG: None,
+    TYPE_MONO16_PNG: None,
+    TYPE_BGR8_PNG: None,
+    TYPE_BGR8_JPEG: None,
+    TYPE_RGB8_PNG: None,
+    TYPE_RGB8_JPEG: None,
+    TYPE_SEMANTIC2D_PNG: None,
 }
 
 ZERO_VALUE:Dict[str, Union[int, np.ndarray]] = {
@@ -212,6 +319,14 @@ ZERO_VALUE:Dict[str, Union[int, np.ndarray]] = {
     TYPE_QUATERNION: None,
     TYPE_INTRINSIC: None,
     TYPE_COLOR: np.array([0, 0, 0], dtype=np.uint8),
+    TYPE_MONO8_PNG: None,
+    TYPE_MONO8_JPEG: None,
+    TYPE_MONO16_PNG: None,
+    TYPE_BGR8_PNG: None,
+    TYPE_BGR8_JPEG: None,
+    TYPE_RGB8_PNG: None,
+    TYPE_RGB8_JPEG: None,
+    TYPE_SEMANTIC2D_PNG: None,
 }
 
 FROM_TYPES:Dict[str, List[List[str]]] = {
@@ -297,6 +412,8 @@ FROM_TYPES:Dict[str, List[List[str]]] = {
     ],
     TYPE_MONO8: [
         [TYPE_MONO8],
+        [TYPE_MONO8_PNG],
+        [TYPE_MONO8_JPEG],
         [TYPE_MONO16],
         [TYPE_BGR8],
         [TYPE_RGB8],
@@ -305,6 +422,7 @@ FROM_TYPES:Dict[str, List[List[str]]] = {
     ],
     TYPE_MONO16: [
         [TYPE_MONO16],
+        [TYPE_MONO16_PNG],
         [TYPE_MONO8],
         [TYPE_BGR8],
         [TYPE_RGB8],
@@ -313,6 +431,8 @@ FROM_TYPES:Dict[str, List[List[str]]] = {
     ],
     TYPE_BGR8: [
         [TYPE_BGR8],
+        [TYPE_BGR8_PNG],
+        [TYPE_BGR8_JPEG],
         [TYPE_MONO8],
         [TYPE_MONO16],
         [TYPE_RGB8],
@@ -324,6 +444,8 @@ FROM_TYPES:Dict[str, List[List[str]]] = {
     ],
     TYPE_RGB8: [
         [TYPE_RGB8],
+        [TYPE_RGB8_PNG],
+        [TYPE_RGB8_JPEG],
         [TYPE_MONO8],
         [TYPE_MONO16],
         [TYPE_BGR8],
@@ -376,6 +498,7 @@ FROM_TYPES:Dict[str, List[List[str]]] = {
     ],
     TYPE_SEMANTIC2D: [
         [TYPE_SEMANTIC2D],
+        [TYPE_SEMANTIC2D_PNG],
         [TYPE_POINTS, TYPE_SEMANTIC1D, TYPE_POSE, TYPE_INTRINSIC],
         [TYPE_SEMANTIC3D, TYPE_POSE, TYPE_INTRINSIC],
         [TYPE_VOXEL_SEMANTIC3D, TYPE_INTRINSIC, TYPE_POSE],
@@ -407,6 +530,22 @@ FROM_TYPES:Dict[str, List[List[str]]] = {
     ],
 }
 
+# 画像として出力する型 (出力サイズに合わせた内部パラメータを持つ)
+IMAGE_TYPES:List[str] = [TYPE_MONO8, TYPE_MONO16, TYPE_BGR8, TYPE_RGB8, TYPE_BGRA8, TYPE_RGBA8, TYPE_DEPTH, TYPE_DISPARITY, TYPE_SEMANTIC2D]
+
+# 画像平面に投影して出力する型
+PROJECTED_TYPES:List[str] = [TYPE_DEPTH, TYPE_SEMANTIC2D, TYPE_BGR8, TYPE_RGB8, TYPE_BGRA8, TYPE_RGBA8]
+
+# 変換の種類毎のコスト. FROM_TYPESの組み合わせのコストは, 含まれる変換のコストの和とする.
+COST_CAST:int = 1
+COST_DECODE:int = 2
+COST_COMPOSE:int = 1
+COST_DISPARITY:int = 2
+COST_VOXEL:int = 2
+COST_BACKPROJECT:int = 4
+COST_TRANSFORM:int = 4
+COST_PROJECT:int = 8
+
 ENABLE_NORMALIZE:Dict[str, bool] = {
     TYPE_FLOAT16: True,
     TYPE_FLOAT32: True,
@@ -435,6 +574,14 @@ ENABLE_NORMALIZE:Dict[str, bool] = {
     TYPE_QUATERNION: False,
     TYPE_INTRINSIC: False,
     TYPE_COLOR: True,
+    TYPE_MONO8_PNG: False,
+    TYPE_MONO8_JPEG: False,
+    TYPE_MONO16_PNG: False,
+    TYPE_BGR8_PNG: False,
+    TYPE_BGR8_JPEG: False,
+    TYPE_RGB8_PNG: False,
+    TYPE_RGB8_JPEG: False,
+    TYPE_SEMANTIC2D_PNG: False,
 }
 
 USE_LABEL:Dict[str, bool] = {
@@ -465,4 +612,12 @@ USE_LABEL:Dict[str, bool] = {
     TYPE_QUATERNION: False,
     TYPE_INTRINSIC: False,
     TYPE_COLOR: False,
+    TYPE_MONO8_PNG: False,
+    TYPE_MONO8_JPEG: False,
+    TYPE_MONO16_PNG: False,
+    TYPE_BGR8_PNG: False,
+    TYPE_BGR8_JPEG: False,
+    TYPE_RGB8_PNG: False,
+    TYPE_RGB8_JPEG: False,
+    TYPE_SEMANTIC2D_PNG: True,
 }
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+
+import threading
+from typing import Callable, Dict, List, Tuple, Union
+import numpy as np
+import h5py
+
+from .structure import *
+from .scan import get_h5Key, get_length, index_dtype
+
+# 自動で決める場合の, フレーム間隔の中央値に対する許容する間隔の倍率
+DEFAULT_GAP_FACTOR:float = 1.5
+
+def get_frameMeta(h5file:h5py.File, key:str) -> Tuple[np.ndarray, np.ndarray]:
+    """フレーム毎のsrc-dataの有無とタイムスタンプを取得
+
+    Args:
+        h5file (h5py.File): HDF5ファイル
+        key (str): フレーム毎のsrc-dataのキー
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: 有無 (bool), タイムスタンプ [s] (無い場合はnan)
+    """
+    length:int = get_length(h5file)
+    presence:np.ndarray = np.zeros((length,), dtype=np.bool_)
+    stamps:np.ndarray = np.full((length,), np.nan, dtype=np.float64)
+    for idx in range(length):
+        h5key:str = get_h5Key(key, idx)
+        if h5key not in h5file: continue
+        presence[idx] = True
+        attrs = h5file[h5key].attrs
+        sec = attrs.get(H5_ATTR_STAMPSEC)
+        if sec is None: continue
+        stamps[idx] = float(sec) + float(attrs.get(H5_ATTR_STAMPNSEC, 0)) * 1e-9
+    return presence, stamps
+
+def get_windowKeys(minibatch_config:Dict[str, Union[str, dict]]) -> List[str]:
+    return [from_key for from_type, from_key in minibatch_config[CONFIG_TAG_FROM].items() if from_type not in [TYPE_POSE] and not from_key.startswith('/')]
+
+def valid_stampWindows(stamps:np.ndarray, window:np.ndarray, stride:int, max_gap:Union[float, None]) -> np.ndarray:
+    """1つのキーのタイムスタンプについて, ウィンドウ内で単調増加し間隔がmax_gap以下か"""
+    deltas:np.ndarray = np.diff(stamps[window], axis=1)
+    if max_gap is None:
+        frame_deltas:np.ndarray = np.diff(stamps)
+        frame_deltas = frame_deltas[np.isfinite(frame_deltas) & (frame_deltas > 0)]
+        max_gap = float(np.median(frame_deltas)) * max(stride, 1) * DEFAULT_GAP_FACTOR if len(frame_deltas) > 0 else np.inf
+    with np.errstate(invalid='ignore'):
+        return np.all((deltas > 0) & (deltas <= max_gap), axis=1)
+
+def valid_windowStarts(presence:np.ndarray, stamps:np.ndarray, length:int, stride:int=1, max_gap:Union[float, None]=None) -> np.ndarray:
+    """有効なウィンドウの先頭フレームインデックス
+
+    ウィンドウは t, t+stride, ..., t+(length-1)*stride のフレームからなり,
+    全フレームにデータが存在し, タイムスタンプを持つ全てのキーでタイムスタンプが単調増加で, 隣接フレームの間隔がmax_gap以下のとき有効とする.
+
+    Args:
+        presence (np.ndarray): (参照するキー数, フレーム数) または (フレーム数,) のデータの有無
+        stamps (np.ndarray): (参照するキー数, フレーム数) または (フレーム数,) のタイムスタンプ [s]. 全てnanのキーは検査しない.
+        length (int): ウィンドウのフレーム数
+        stride (int, optional): ウィンドウ内のフレーム間隔. Defaults to 1.
+        max_gap (Union[float, None], optional): 許容する間隔 [s]. Noneの場合はキー毎に中央値から自動で決める. Defaults to None.
+
+    Returns:
+        np.ndarray: 昇順の先頭フレームインデックス
+    """
+    all_present:np.ndarray = np.all(np.atleast_2d(presence), axis=0)
+    num_frames:int = len(all_present)
+    span:int = (max(length, 1) - 1) * max(stride, 1)
+    if num_frames - span <= 0: return np.zeros((0,), dtype=index_dtype(num_frames))
+
+    window:np.ndarray = np.arange(num_frames - span)[:, np.newaxis] + np.arange(0, span + 1, max(stride, 1))[np.newaxis, :]
+    valid:np.ndarray = np.all(all_present[window], axis=1)
+    if span > 0:
+        for key_stamps in np.atleast_2d(stamps):
+            if np.any(np.isfinite(key_stamps)):
+                valid &= valid_stampWindows(key_stamps, window, stride, max_gap)
+    return np.flatnonzero(valid).astype(index_dtype(num_frames))
+
+class FrameMetaCache(object):
+    """キー毎のフレームの有無とタイムスタンプを保持し, 再走査を避ける
+
+    scan_asyncで別スレッドから走査できるため, キャッシュの更新はロックで保護する.
+    """
+    def __init__(self, h5path:str) -> None:
+        self.h5path:str = h5path
+        self.meta:Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self.lock:threading.Lock = threading.Lock()
+
+    def is_cached(self, keys:List[str]) -> bool:
+        return all(key in self.meta.keys() for key in keys)
+
+    def scan(self, keys:List[str]) -> None:
+        """キャッシュに無いキーを走査する"""
+        with self.lock:
+            missing:List[str] = [key for key in keys if key not in self.meta.keys()]
+            if len(missing) == 0: return
+            with h5py.File(self.h5path, mode='r') as h5file:
+                for key in missing:
+                    self.meta[key] = get_frameMeta(h5file, key)
+
+    def scan_async(self, keys:List[str], callback:Callable[[bool], None]) -> threading.Thread:
+        """別スレッドで走査し, 終了後にそのスレッドで走査できたか (ファイルを読めない場合はFalse) をcallbackに渡す"""
+        def worker() -> None:
+            try:
+                self.scan(keys)
+            except (OSError, KeyError):
+                callback(False)
+                return
+            callback(True)
+        thread = threading.Thread(target=worker, daemon=True)
+        thread.start()
+        return thread
+
+    def get(self, keys:List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """(キー数, フレーム数) の有無とタイムスタンプ"""
+        self.scan(keys)
+        presence:np.ndarray = np.stack([self.meta[key][0] for key in keys])
+        stamps:np.ndarray = np.stack([self.meta[key][1] for key in keys])
+        return presence, stamps
+
+    def valid_windowStarts(self, minibatch_config:Dict[str, Union[str, dict]]) -> Union[np.ndarray, None]:
+        window_dict:Union[Dict[str, Union[int, float]], None] = minibatch_config.get(CONFIG_TAG_WINDOW)
+        keys:List[str] = get_windowKeys(minibatch_config)
+        if window_dict is None or len(keys) == 0: return None
+        presence, stamps = self.get(keys)
+        return valid_windowStarts(presence, stamps, window_dict[CONFIG_TAG_LENGTH], window_dict[CONFIG_TAG_STRIDE], window_dict.get(CONFIG_TAG_MAXGAP))
@@ -1,16 +1,28 @@
 import os
 import sys
-from typing import Any, Dict, Union
+import argparse
+from typing import Any, Callable, Dict, Union
 import json
 import h5py
-from PySide2.QtCore import Qt
+from PySide2.QtCore import QObject, QStringListModel, Qt, Signal
 from PySide2.QtGui import QColor, QPalette
-from PySide2.QtWidgets import QApplication, QColorDialog, QComboBox, QDialog, QFileDialog, QFormLayout, QInputDialog, QLabel, QLineEdit, QMainWindow, QPushButton, QTreeWidget, QWidget
+from PySide2.QtWidgets import QAction, QApplication, QColorDialog, QComboBox, QCompleter, QDialog, QFileDialog, QFormLayout, QHBoxLayout, QInputDialog, QLabel, QLineEdit, QMainWindow, QPushButton, QSpinBox, QTreeView, QTreeWidget, QWidget
 
 from .common.structure import *
+from .common.scan import byte2str, infer_schema
+from .common import memory, profile
+from .common.model import MODEL_EVENT_INSERT, MODEL_EVENT_REMOVE, MODEL_EVENT_RESET, MODEL_EVENT_UPDATE, ConfigModel
+from .common.graph import ConversionPlan
+from .common.intrinsic import update_intrinsics
+from .common.roi import describe_roi, format_roi, get_sourceShape, parse_roi
+from .common.pyramid import format_pyramid, is_pyramidType, parse_pyramid
+from .common.sparse import SPARSE_TYPES, is_sparseMinibatch
+from .common.codec import get_imageShape, get_pixelType
+from .common.window import FrameMetaCache, get_windowKeys
 from .structure import *
 from .ui import mainwindow, minibatch_dialog, label_tab, label_dialog
 from .ui.TreeWidget import TreeWidgetItem
+from .ui.TreeModel import DictListModel, LazyTreeModel
 
 DEFAULT_OPEN_DIR:str = os.path.expanduser('~')
 DEFAULT_EXPORT_DIR:str = os.path.expanduser('~')
@@ -27,12 +39,56 @@ class LabelDialog(QDialog):
         self.ui = label_dialog.Ui_Dialog()
         self.ui.setupUi(self)
 
+class FrameMetaSignal(QObject):
+    """別スレッドでのフレームの走査の終了をGUIスレッドに伝える"""
+    scanned = Signal(bool)
+
 class MinibatchConfigDialog(QDialog):
     def __init__(self, parent=None) -> None:
         super(MinibatchConfigDialog, self).__init__()
         self.ui = minibatch_dialog.Ui_Dialog()
         self.ui.setupUi(self)
 
+        self.windowLayout = QHBoxLayout()
+        self.windowLengthSpinBox = QSpinBox()
+        self.windowLengthSpinBox.setMinimum(1)
+        self.windowLengthSpinBox.setPrefix('length: ')
+        self.windowStrideSpinBox = QSpinBox()
+        self.windowStrideSpinBox.setMinimum(1)
+        self.windowStrideSpinBox.setPrefix('stride: ')
+        self.windowSamplesLabel = QLabel()
+        self.windowLayout.addWidget(self.windowLengthSpinBox)
+        self.windowLayout.addWidget(self.windowStrideSpinBox)
+        self.windowLayout.addWidget(self.windowSamplesLabel)
+        self.ui.formLayout.addRow(QLabel('Window'), self.windowLayout)
+
+        self.roiLayout = QHBoxLayout()
+        self.roiLineEdit = QLineEdit()
+        self.roiLineEdit.setPlaceholderText('top, left, height, width / center-crop ratio')
+        self.roiLabel = QLabel()
+        self.roiLabel.setWordWrap(True)
+        self.roiLayout.addWidget(self.roiLineEdit)
+        self.roiLayout.addWidget(self.roiLabel)
+        self.ui.formLayout.addRow(QLabel('ROI'), self.roiLayout)
+
+        self.pyramidLayout = QHBoxLayout()
+        self.pyramidLineEdit = QLineEdit()
+        self.pyramidLineEdit.setPlaceholderText('HxW, HxW, ... / scales (0.5, 0.25, ...)')
+        self.pyramidLabel = QLabel()
+        self.pyramidLabel.setWordWrap(True)
+        self.pyramidLayout.addWidget(self.pyramidLineEdit)
+        self.pyramidLayout.addWidget(self.pyramidLabel)
+        self.ui.formLayout.addRow(QLabel('Pyramid'), self.pyramidLayout)
+
+        self.sparseComboBox = QComboBox()
+        self.sparseComboBox.addItems([SPARSE_DENSE] + SPARSE_FORMATS)
+        self.sparseComboBox.setToolTip('output format of depth / semantic2d projected from a point cloud')
+        self.ui.formLayout.addRow(QLabel('Sparse'), self.sparseComboBox)
+
+        self.planLabel = QLabel()
+        self.planLabel.setWordWrap(True)
+        self.ui.formLayout.addRow(QLabel('Plan'), self.planLabel)
+
 class H5DataLoaderConfig(QMainWindow):
     def __init__(self, parent=None) -> None:
         super(H5DataLoaderConfig, self).__init__()
@@ -42,7 +98,14 @@ class H5DataLoaderConfig(QMainWindow):
         self.minibatchDialog.ui.fromTabWidget.tabBarClicked.connect(self.__minibatchDialogFromTabBarClicked_callback)
         self.minibatchDialog.ui.okButton.clicked.connect(self.__minibatchDialogOkButtonClicked_callback)
         self.minibatchDialog.ui.cancelButton.clicked.connect(lambda: self.minibatchDialog.close())
+        self.minibatchDialog.windowLengthSpinBox.valueChanged.connect(lambda: self.__minibatchDialogWindow_update())
+        self.minibatchDialog.windowStrideSpinBox.valueChanged.connect(lambda: self.__minibatchDialogWindow_update())
+        self.frameMetaSignal = FrameMetaSignal()
+        self.frameMetaSignal.scanned.connect(self.__frameMetaScanned_callback)
+        self.minibatchDialog.roiLineEdit.textChanged.connect(lambda: self.__minibatchDialogRoi_update())
+        self.minibatchDialog.pyramidLineEdit.textChanged.connect(lambda: self.__minibatchDialogPyramid_update())
         self.minibatchFromDataList:List[List[Tuple[str, QComboBox]]] = []
+        self.minibatchFromPlanList:List[Union[ConversionPlan, None]] = []
         self.minibatchShapeDataList:List[QLineEdit] = []
 
         self.labelDialog = LabelDialog()
@@ -53,6 +116,9 @@ class H5DataLoaderConfig(QMainWindow):
         self.ui = mainwindow.Ui_MainWindow()
         self.ui.setupUi(self)
         self.ui.action_Open.triggered.connect(lambda: self.__fileOpen_callback())
+        self.action_OpenFullScan = QAction('Open (&Full Scan)', self)
+        self.action_OpenFullScan.triggered.connect(lambda: self.__fileOpen_callback(fullScan=True))
+        self.ui.menu_File.insertAction(self.ui.action_Save, self.action_OpenFullScan)
         self.ui.action_Save.triggered.connect(lambda: self.__fileSave_callback())
         self.ui.action_Exit.triggered.connect(lambda: self.close())
         self.labelConfigAddButton = QPushButton('+', self)
@@ -62,14 +128,102 @@ class H5DataLoaderConfig(QMainWindow):
         self.ui.labelTabWidget.tabCloseRequested.connect(self.__labelTabCloseRequested_callback)
         self.ui.labelTabWidget.tabBarDoubleClicked.connect(self.__labelTabBarDoubleClicked_callback)
 
-        self.ui.minibatchSrcDataTree.itemSelectionChanged.connect(lambda: self.__minibatchSrcDataTreeItemSelectionChanged_callback())
-        self.ui.minibatchDstDataTree.itemSelectionChanged.connect(lambda: self.__minibatchDstDataTreeItemSelectionChanged_callback())
+        dataColumns = lambda tag, item: [tag, item.get(CONFIG_TAG_TYPE), str(item.get(CONFIG_TAG_FRAMEID))]
+        self.minibatchSrcDataModel = DictListModel(self.__treeHeaders(self.ui.minibatchSrcDataTree), dataColumns, self)
+        self.minibatchDstDataModel = DictListModel(self.__treeHeaders(self.ui.minibatchDstDataTree), dataColumns, self)
+        self.minibatchSrcPropertyModel = LazyTreeModel(self.__treeHeaders(self.ui.minibatchSrcPropertyTree), self.__propertyChildren, lambda payload: isinstance(payload, dict) and len(payload) > 0, self)
+        self.minibatchDstPropertyModel = LazyTreeModel(self.__treeHeaders(self.ui.minibatchDstPropertyTree), self.__propertyChildren, lambda payload: isinstance(payload, dict) and len(payload) > 0, self)
+        self.tfModel = LazyTreeModel(self.__treeHeaders(self.ui.treeWidget), self.__tfChildren, lambda payload: len(payload) > 0, self)
+        self.minibatchSrcDataView = self.__replaceTreeWidget(self.ui.minibatchSrcDataTree, self.minibatchSrcDataModel)
+        self.minibatchDstDataView = self.__replaceTreeWidget(self.ui.minibatchDstDataTree, self.minibatchDstDataModel)
+        self.minibatchSrcPropertyView = self.__replaceTreeWidget(self.ui.minibatchSrcPropertyTree, self.minibatchSrcPropertyModel)
+        self.minibatchDstPropertyView = self.__replaceTreeWidget(self.ui.minibatchDstPropertyTree, self.minibatchDstPropertyModel)
+        self.tfView = self.__replaceTreeWidget(self.ui.treeWidget, self.tfModel)
+        self.minibatchSrcFilterLineEdit = QLineEdit()
+        self.minibatchSrcFilterLineEdit.setPlaceholderText('Filter')
+        self.minibatchSrcFilterLineEdit.setClearButtonEnabled(True)
+        self.minibatchSrcFilterLineEdit.textChanged.connect(lambda text: self.__minibatchSrcFilter_update())
+        self.ui.minibatchSrcDataLayout.insertWidget(self.ui.minibatchSrcDataLayout.indexOf(self.minibatchSrcDataView), self.minibatchSrcFilterLineEdit)
+
+        self.configModel = ConfigModel()
+        self.configModel.add_listener(self.__configModel_changed)
+
+        self.minibatchSrcDataView.selectionModel().currentChanged.connect(lambda current, previous: self.__minibatchSrcDataTreeItemSelectionChanged_callback())
+        self.minibatchDstDataView.selectionModel().currentChanged.connect(lambda current, previous: self.__minibatchDstDataTreeItemSelectionChanged_callback())
 
         self.ui.addButton.clicked.connect(lambda: self.__minibatchAdd_callback())
         self.ui.editButton.clicked.connect(lambda: self.__minibatchEdit_callback())
         self.ui.deleteButton.clicked.connect(lambda: self.__minibatchDelete_callback())
 
-    def __fileOpen_callback(self) -> None:
+    def __treeHeaders(self, treeWidget:QTreeWidget) -> List[str]:
+        headerItem = treeWidget.headerItem()
+        return [headerItem.text(column) for column in range(treeWidget.columnCount())]
+
+    def __replaceTreeWidget(self, treeWidget:QTreeWidget, model) -> QTreeView:
+        treeView = QTreeView(treeWidget.parentWidget())
+        treeView.setModel(model)
+        treeView.setUniformRowHeights(True)
+        treeView.setSortingEnabled(treeWidget.isSortingEnabled())
+        treeWidget.parentWidget().layout().replaceWidget(treeWidget, treeView)
+        treeWidget.hide()
+        return treeView
+
+    def __setTypeahead(self, combobox:QComboBox, search:Callable[[str], List[str]], activated:Callable[[int], None]) -> None:
+        """入力した文字列を含む項目を候補として表示するコンボボックスにする"""
+        combobox.setEditable(True)
+        combobox.setInsertPolicy(QComboBox.NoInsert)
+        completerModel = QStringListModel(combobox)
+        completer = QCompleter(completerModel, combobox)
+        completer.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+        combobox.setCompleter(completer)
+        def textEdited(text:str) -> None:
+            completerModel.setStringList(search(text))
+            completer.complete()
+        def completerActivated(text:str) -> None:
+            index:int = combobox.findText(text)
+            if index < 0: return
+            combobox.setCurrentIndex(index)
+            activated(index)
+        def editingFinished() -> None:
+            if combobox.findText(combobox.currentText()) < 0:
+                combobox.setEditText(combobox.itemText(combobox.currentIndex()))
+        combobox.lineEdit().textEdited.connect(textEdited)
+        combobox.lineEdit().editingFinished.connect(editingFinished)
+        completer.activated[str].connect(completerActivated)
+
+    def __minibatchSrcFilter_update(self) -> None:
+        text:str = self.minibatchSrcFilterLineEdit.text()
+        if len(text) == 0:
+            self.minibatchSrcDataModel.setSource(self.dataloader_config[CONFIG_TAG_SRCDATA])
+            return
+        dstTag:Union[str, None] = self.minibatchDstDataModel.key(self.minibatchDstDataView.currentIndex())
+        dstType:Union[str, None] = None if dstTag is None else self.dataloader_config[CONFIG_TAG_MINIBATCH][dstTag][CONFIG_TAG_TYPE]
+        self.minibatchSrcDataModel.setKeys(self.configModel.search_srcKeys(text, dst_type=dstType))
+
+    def __propertyChildren(self, payload:Dict[str, Any]) -> List[Tuple[List[str], Any]]:
+        return [([property, ''], value) if isinstance(value, dict) else ([property, str(value)], None) for property, value in payload.items()]
+
+    def __tfChildren(self, payload:Dict[str, dict]) -> List[Tuple[List[str], Any]]:
+        tfData:Dict[str, Dict[str, str]] = self.dataloader_config[CONFIG_TAG_TF][CONFIG_TAG_DATA]
+        return [([frameId, tfData[frameId][CONFIG_TAG_KEY] if frameId in tfData.keys() else ''], item) for frameId, item in payload.items()]
+
+    def __configModel_changed(self, event:str, section:str, key:Union[str, None], oldKey:Union[str, None]) -> None:
+        if event == MODEL_EVENT_RESET:
+            self.minibatchSrcFilterLineEdit.clear()
+            self.minibatchSrcDataModel.setSource(self.dataloader_config[CONFIG_TAG_SRCDATA])
+            self.minibatchDstDataModel.setSource(self.dataloader_config[CONFIG_TAG_MINIBATCH])
+            self.minibatchSrcPropertyModel.setRoot(None)
+            self.minibatchDstPropertyModel.setRoot(None)
+        elif section == CONFIG_TAG_MINIBATCH:
+            if event == MODEL_EVENT_INSERT:
+                self.minibatchDstDataModel.insertKey(key)
+            elif event == MODEL_EVENT_UPDATE:
+                self.minibatchDstDataModel.updateKey(oldKey, key)
+                self.__minibatchDstDataTreeItemSelectionChanged_callback()
+            elif event == MODEL_EVENT_REMOVE:
+                self.minibatchDstDataModel.removeKey(key)
+
+    def __fileOpen_callback(self, fullScan:bool=False) -> None:
         fname = QFileDialog.getOpenFileName(self,
             'Open HDF5 file', DEFAULT_OPEN_DIR,
             "HDF5, JSON (*.hdf5 *.h5 *.json);;HDF5 (*.hdf5 *.h5);;JSON (*.json)"
@@ -78,7 +232,7 @@ class H5DataLoaderConfig(QMainWindow):
         filename = fname[0]
         if os.path.isfile(filename):
             if filename[-5:] == '.hdf5' or filename[-3:] == '.h5':
-                self.__loadHdf5(filename)
+                self.__loadHdf5(filename, fullScan)
             elif filename[-5:] == '.json':
                 self.__loadJson(filename)
     
@@ -88,33 +242,28 @@ class H5DataLoaderConfig(QMainWindow):
         filename = fname[0]
         if filename[-5:] != '.json':
             filename += '.json'
-        with open(filename, mode='w') as jsonfile:
+        self.__saveJson(filename)
+
+    def __saveJson(self, jsonpath:str) -> None:
+        # 実行計画のコンパイラはtoolsパッケージにあるため, 起動時には読み込まず保存時に読み込む
+        from .tools.plan import PLAN_TAG_REPORT, compile_plan
+        update_intrinsics(self.dataloader_config)
+        self.dataloader_config[CONFIG_TAG_PLAN] = compile_plan(self.dataloader_config)
+        report:Dict[str, int] = self.dataloader_config[CONFIG_TAG_PLAN][PLAN_TAG_REPORT]
+        with open(jsonpath, mode='w') as jsonfile:
             json.dump(self.dataloader_config, jsonfile, indent=2)
+        self.ui.statusbar.showMessage('Saved: {0:d} bytes and {1:d} ops per sample shared by the execution plan'.format(report['saved-bytes'], report['saved-ops']))
 
-    def __loadHdf5(self, h5path:str) -> None:
+    def __loadHdf5(self, h5path:str, fullScan:bool=False) -> None:
         if os.path.isfile(h5path) is False:
             return
         with h5py.File(h5path, mode='r') as h5file:
             self.dataloader_config:Dict[str, Dict[str, Dict[str, Dict[str, dict]]]] = {}
             self.dataloader_config[H5_ATTR_FILEPATH] = h5path
-            h5file_data:h5py.Group = h5file['data/0']
-
-            config_srcdata_dict = {}
-            config_pose_dict = {}
-
-            for key_tag, item_tag in h5file_data.items():
-                self.__get_nestData(config_srcdata_dict, key_tag, item_tag)
-                self.__get_nestPose(config_pose_dict, key_tag, item_tag)
-            
-            for key_root, item_root in h5file.items():
-                if key_root in [H5_KEY_HEADER, H5_KEY_DATA, H5_KEY_LABEL]: continue
-                if isinstance(item_root, h5py.Group):
-                    for key_tag, item_tag in item_root.items():
-                        self.__get_nestData(config_srcdata_dict, key_tag, item_tag, key_root='/'+key_root)
-                        self.__get_nestPose(config_pose_dict, key_tag, item_tag, key_root='/'+key_root)
-
             self.dataloader_config[CONFIG_TAG_MINIBATCH] = {}
-            self.dataloader_config[CONFIG_TAG_SRCDATA] = config_srcdata_dict
+            with profile.span('infer_schema', 'scan'), memory.phase('scan', lambda: self.dataloader_config):
+                config_srcdata_dict, config_pose_dict = infer_schema(h5file, full_scan=fullScan)
+                self.dataloader_config[CONFIG_TAG_SRCDATA] = config_srcdata_dict
 
             pose_parent = {cf[CONFIG_TAG_FRAMEID] for cf in config_pose_dict.values()}
             pose_children = {cf[CONFIG_TAG_CHILDFRAMEID] for cf in config_pose_dict.values()}
@@ -171,23 +320,17 @@ class H5DataLoaderConfig(QMainWindow):
     
     def __loadData(self) -> None:
         self.ui.minibatchSrcPathLineEdit.setText(self.dataloader_config[H5_ATTR_FILEPATH])
+        self.frameMetaCache = FrameMetaCache(self.dataloader_config[H5_ATTR_FILEPATH])
+        self.configModel.reset(self.dataloader_config)
         self.minibatchDialog.ui.frameidComboBox.clear()
         self.minibatchDialog.ui.frameidComboBox.addItems(self.__getTfList())
+        self.minibatchDialog.ui.typeComboBox.clear()
         self.minibatchDialog.ui.typeComboBox.addItems(self.__get_availableTypes())
 
-        self.ui.minibatchSrcDataTree.clear()
-        for key_tag, item_tag in self.dataloader_config[CONFIG_TAG_SRCDATA].items():
-            treeitem = TreeWidgetItem([key_tag, item_tag.get(CONFIG_TAG_TYPE), str(item_tag.get(CONFIG_TAG_FRAMEID))])
-            self.ui.minibatchSrcDataTree.addTopLevelItem(treeitem)
         self.ui.addButton.setEnabled(True)
         self.ui.editButton.setEnabled(True)
         self.ui.deleteButton.setEnabled(True)
         
-        self.ui.minibatchDstDataTree.clear()
-        for key_tag, item_tag in self.dataloader_config[CONFIG_TAG_MINIBATCH].items():
-            treeItem = TreeWidgetItem([key_tag, item_tag.get(CONFIG_TAG_TYPE), str(item_tag.get(CONFIG_TAG_FRAMEID))])
-            self.ui.minibatchDstDataTree.addTopLevelItem(treeItem)
-
         self.ui.labelTabWidget.clear()
         if len(self.dataloader_config[CONFIG_TAG_LABEL]) > 0:
             self.ui.tabWidget.setCurrentWidget(self.ui.labelTab)
@@ -206,120 +349,40 @@ class H5DataLoaderConfig(QMainWindow):
                     self.__labelTreeItem_setColor(treeitem)
                     tabwidget.ui.dstTree.addTopLevelItem(treeitem)
                 
-        self.ui.treeWidget.clear()
-
-        def setTfTree(parentItem:TreeWidgetItem, treeConfig:Dict[str, Union[str, dict]]):
-            for key_frameid, item_frameid in treeConfig.items():
-                data = self.dataloader_config[CONFIG_TAG_TF][CONFIG_TAG_DATA][key_frameid][CONFIG_TAG_KEY]
-                treeItem = TreeWidgetItem([key_frameid, data])
-                parentItem.addChild(treeItem)
-                setTfTree(treeItem, item_frameid)
-                treeItem.setExpanded(True)
-
-        for key_frameid, item_frameid in self.dataloader_config[CONFIG_TAG_TF][CONFIG_TAG_TREE].items():
-            item = TreeWidgetItem([key_frameid])
-            self.ui.treeWidget.addTopLevelItem(item)
-            setTfTree(item, item_frameid)
-            item.setExpanded(True)
-
-    def __get_nestPose(self, config:Dict[str, Dict[str, str]], key_tag:str, item_tag:Union[h5py.Dataset, h5py.Group], key_root:str='') -> None:
-        key = os.path.join(key_root ,key_tag).replace('\\', '/')
-        if isinstance(item_tag, h5py.Group):
-            data_type:str = byte2str(item_tag.attrs.get(H5_ATTR_TYPE))
-            if data_type in [TYPE_POSE]:
-                frame_id:str = byte2str(item_tag.attrs.get(H5_ATTR_FRAMEID))
-                child_frame_id:str = byte2str(item_tag.attrs.get(H5_ATTR_CHILDFRAMEID))
-
-                config_pose_dict = {}
-                config_pose_dict[CONFIG_TAG_KEY] = key
-                config_pose_dict[CONFIG_TAG_FRAMEID] = frame_id
-                config_pose_dict[CONFIG_TAG_CHILDFRAMEID] = child_frame_id
-                config[child_frame_id] = config_pose_dict
-
-            for key_child, item_child in item_tag.items():
-                self.__get_nestPose(config, key_child, item_child, key)
-
-    def __get_nestData(self, config:dict, key_tag:str, item_tag:Union[h5py.Dataset, h5py.Group], key_root:str='') -> None:
-        key = os.path.join(key_root, key_tag).replace('\\', '/')
-        if isinstance(item_tag, h5py.Group):
-            data_type:str = byte2str(item_tag.attrs.get(H5_ATTR_TYPE))
-            if data_type in [TYPE_POSE, TYPE_INTRINSIC, TYPE_SEMANTIC3D]:
-                config_tag_dict = {}
-                config_tag_dict[CONFIG_TAG_TAG] = key
-                config_tag_dict[CONFIG_TAG_TYPE] = data_type
-                config_tag_dict[CONFIG_TAG_SHAPE] = None
-                config_tag_dict[CONFIG_TAG_FRAMEID] = byte2str(item_tag.attrs.get(H5_ATTR_FRAMEID))
-                config_tag_dict[CONFIG_TAG_CHILDFRAMEID] = byte2str(item_tag.attrs.get(H5_ATTR_CHILDFRAMEID))
-                config_tag_dict[CONFIG_TAG_LABELTAG] = byte2str(item_tag.attrs.get(H5_ATTR_LABELTAG))
-                config[key] = config_tag_dict
-                if data_type in [TYPE_INTRINSIC]: return
-
-            for key_child, item_child in item_tag.items():
-                self.__get_nestData(config, key_child, item_child, key)
-        elif isinstance(item_tag, h5py.Dataset):
-            data_type:Union[str, None] = byte2str(item_tag.attrs.get(H5_ATTR_TYPE))
-            if data_type is None:
-                data_type = str(item_tag.dtype)
-            config_tag_dict = {}
-            config_tag_dict[CONFIG_TAG_TAG] = key
-            config_tag_dict[CONFIG_TAG_TYPE] = data_type
-            config_tag_dict[CONFIG_TAG_SHAPE] = item_tag.shape
-            config_tag_dict[CONFIG_TAG_FRAMEID] = byte2str(item_tag.attrs.get(H5_ATTR_FRAMEID))
-            config_tag_dict[CONFIG_TAG_CHILDFRAMEID] = byte2str(item_tag.attrs.get(H5_ATTR_CHILDFRAMEID))
-            config_tag_dict[CONFIG_TAG_LABELTAG] = byte2str(item_tag.attrs.get(H5_ATTR_LABELTAG))
-            config[key] = config_tag_dict
-    
+        self.tfModel.setRoot(self.dataloader_config[CONFIG_TAG_TF][CONFIG_TAG_TREE])
+        self.tfView.expandAll()
+
+        if memory.enabled():
+            with memory.phase('render', lambda: self.dataloader_config):
+                self.grab()
+
     def __get_availableTypes(self) -> List[str]:
-        srcTypes:set = {value[CONFIG_TAG_TYPE] for value in self.dataloader_config[CONFIG_TAG_SRCDATA].values()}
-        availableTypes:List[str] = []
-        for dstType, fromTypes in FROM_TYPES.items():
-            available:bool = False
-            for fromTypeComb in fromTypes:
-                if set(fromTypeComb) <= srcTypes: available = True
-            if available is True:
-                availableTypes.append(dstType)
-        return availableTypes
+        return self.configModel.get_reachableTypes()
 
     def __minibatchSrcDataTreeItemSelectionChanged_callback(self) -> None:
-        dataItem:TreeWidgetItem = self.ui.minibatchSrcDataTree.currentItem()
-        if dataItem is None: return
-        tag = dataItem.text(0)
-        dataDict:Dict[str, Union[str, List[int], List[float]]] = self.dataloader_config[CONFIG_TAG_SRCDATA].get(tag)
-
-        self.ui.minibatchSrcPropertyTree.clear()
-        if dataDict is None: return
-        for property, value in dataDict.items():
-            propertyItem = TreeWidgetItem([property, str(value)])
-            self.ui.minibatchSrcPropertyTree.addTopLevelItem(propertyItem)
+        tag:Union[str, None] = self.minibatchSrcDataModel.key(self.minibatchSrcDataView.currentIndex())
+        if tag is None: return
+        self.minibatchSrcPropertyModel.setRoot(self.dataloader_config[CONFIG_TAG_SRCDATA].get(tag))
 
     def __minibatchDstDataTreeItemSelectionChanged_callback(self) -> None:
-        dataItem:TreeWidgetItem = self.ui.minibatchDstDataTree.currentItem()
-        if dataItem is None: return
-        tag = dataItem.text(0)
-        dataDict:Dict[str, Union[str, List[int], List[float], Dict[str, str]]] = self.dataloader_config[CONFIG_TAG_MINIBATCH].get(tag)
-
-        self.ui.minibatchDstPropertyTree.clear()
-        if dataDict is None: return
-        for property, value in dataDict.items():
-            if property == CONFIG_TAG_FROM:
-                propertyItem = TreeWidgetItem([property, ''])
-                for fromKey, fromItem in value.items():
-                    fromTreeItem = TreeWidgetItem([fromKey, fromItem])
-                    propertyItem.addChild(fromTreeItem)
-            else:
-                propertyItem = TreeWidgetItem([property, str(value)])
-            self.ui.minibatchDstPropertyTree.addTopLevelItem(propertyItem)
-            propertyItem.setExpanded(True)
+        tag:Union[str, None] = self.minibatchDstDataModel.key(self.minibatchDstDataView.currentIndex())
+        if tag is None: return
+        self.minibatchDstPropertyModel.setRoot(self.dataloader_config[CONFIG_TAG_MINIBATCH].get(tag))
+        self.minibatchDstPropertyView.expandAll()
+        if len(self.minibatchSrcFilterLineEdit.text()) > 0:
+            self.__minibatchSrcFilter_update()
 
     def __minibatchAdd_callback(self) -> None:
         self.minibatchDialog_targetTag:str = ''
         self.minibatchDialog.ui.tagLineEdit.setText('')
-        treeItem = self.ui.minibatchSrcDataTree.currentItem()
-        if treeItem is None:
+        self.minibatchDialog.windowLengthSpinBox.setValue(1)
+        self.minibatchDialog.windowStrideSpinBox.setValue(1)
+        srcTag:Union[str, None] = self.minibatchSrcDataModel.key(self.minibatchSrcDataView.currentIndex())
+        if srcTag is None:
             initialIdx = 0
             self.minibatchDialog.ui.typeComboBox.setCurrentIndex(initialIdx)
         else:
-            dataType:str = treeItem.text(1)
+            dataType:str = self.dataloader_config[CONFIG_TAG_SRCDATA][srcTag][CONFIG_TAG_TYPE]
             self.minibatchDialog.ui.typeComboBox.setCurrentText(dataType)
             initialIdx = self.minibatchDialog.ui.typeComboBox.currentIndex()
         self.__minibatchDialogTypeComboboxActivated_callback(initialIdx)
@@ -327,10 +390,9 @@ class H5DataLoaderConfig(QMainWindow):
         self.minibatchDialog.exec_()
     
     def __minibatchEdit_callback(self) -> None:
-        treeItem = self.ui.minibatchDstDataTree.currentItem()
-        if treeItem is None: return
+        dataTag:Union[str, None] = self.minibatchDstDataModel.key(self.minibatchDstDataView.currentIndex())
+        if dataTag is None: return
 
-        dataTag:str = treeItem.text(0)
         self.minibatchDialog.ui.tagLineEdit.setText(dataTag)
         minibatchConfig = self.dataloader_config[CONFIG_TAG_MINIBATCH][dataTag]
         dataType:str = minibatchConfig[CONFIG_TAG_TYPE]
@@ -343,10 +405,15 @@ class H5DataLoaderConfig(QMainWindow):
 
         dialogTabIdx:int = 0
         fromTypeSet:set = set(minibatchConfig[CONFIG_TAG_FROM].keys())
-        for itr, fromTypeComb in enumerate(FROM_TYPES[dataType]):
-            if set(fromTypeComb) == fromTypeSet:
+        fromSteps:Union[list, None] = minibatchConfig.get(CONFIG_TAG_STEPS)
+        if len(self.minibatchFromDataList) != len(self.minibatchFromPlanList):
+            raise ValueError('{0:d} from tabs for {1:d} conversion plans'.format(len(self.minibatchFromDataList), len(self.minibatchFromPlanList)))
+        for itr, (minibatchFromData, fromPlan) in enumerate(zip(self.minibatchFromDataList, self.minibatchFromPlanList)):
+            if {fromType for fromType, _ in minibatchFromData} == fromTypeSet and self.__get_planSteps(fromPlan) == fromSteps:
                 dialogTabIdx = itr
                 break
+        self.minibatchDialog.ui.fromTabWidget.setCurrentIndex(dialogTabIdx)
+        self.minibatchDialog.planLabel.setText(self.__get_planText(dialogTabIdx))
         for dialogFromLabel, dialogFromCombobox in self.minibatchFromDataList[dialogTabIdx]:
             dialogFromCombobox.setCurrentText(minibatchConfig[CONFIG_TAG_FROM][dialogFromLabel])
 
@@ -356,6 +423,9 @@ class H5DataLoaderConfig(QMainWindow):
         for shapeLineEdit, shapeValue in zip(self.minibatchShapeDataList, minibatchConfig[CONFIG_TAG_SHAPE]):
             if shapeLineEdit.isReadOnly() is False:
                 shapeLineEdit.setText(str(shapeValue))
+        self.minibatchDialog.roiLineEdit.setText(format_roi(minibatchConfig.get(CONFIG_TAG_ROI)))
+        self.minibatchDialog.pyramidLineEdit.setText(format_pyramid(minibatchConfig.get(CONFIG_TAG_PYRAMID)))
+        self.minibatchDialog.sparseComboBox.setCurrentText(minibatchConfig.get(CONFIG_TAG_SPARSE, SPARSE_DENSE))
         
         rangeList = DEFAULT_RANGE[dataType]
         if isinstance(rangeList, tuple):
@@ -364,6 +434,11 @@ class H5DataLoaderConfig(QMainWindow):
             if rangeList[1] != minibatchConfig[CONFIG_TAG_RANGE][1]:
                 self.minibatchDialog.ui.rangeMaxLineEdit.setText(str(minibatchConfig[CONFIG_TAG_RANGE][1]))
         
+        windowConfig:Dict[str, int] = minibatchConfig.get(CONFIG_TAG_WINDOW, {})
+        self.minibatchDialog.windowLengthSpinBox.setValue(windowConfig.get(CONFIG_TAG_LENGTH, 1))
+        self.minibatchDialog.windowStrideSpinBox.setValue(windowConfig.get(CONFIG_TAG_STRIDE, 1))
+        self.__minibatchDialogWindow_update()
+
         labelTagList = [self.minibatchDialog.ui.labelComboBox.itemText(i) for i in range(self.minibatchDialog.ui.labelComboBox.count())]
         labelTag = minibatchConfig[CONFIG_TAG_LABELTAG]
         if labelTag in labelTagList:
@@ -372,13 +447,10 @@ class H5DataLoaderConfig(QMainWindow):
         self.minibatchDialog.exec_()
     
     def __minibatchDelete_callback(self) -> None:
-        treeItem = self.ui.minibatchDstDataTree.currentItem()
-        if treeItem is None: return
+        dataTag:Union[str, None] = self.minibatchDstDataModel.key(self.minibatchDstDataView.currentIndex())
+        if dataTag is None: return
 
-        dataTag:str = treeItem.text(0)
-        self.dataloader_config[CONFIG_TAG_MINIBATCH].pop(dataTag, None)
-        treeItemIndex:int = self.ui.minibatchDstDataTree.indexOfTopLevelItem(treeItem)
-        self.ui.minibatchDstDataTree.takeTopLevelItem(treeItemIndex)
+        self.configModel.remove_minibatch(dataTag)
 
     def __minibatchDialogTypeComboboxActivated_callback(self, idx:int):
         dataType:str = self.minibatchDialog.ui.typeComboBox.itemText(idx)
@@ -403,39 +475,63 @@ class H5DataLoaderConfig(QMainWindow):
                 else:
                     shapeDataWidget.setText('N')
                     shapeDataWidget.setReadOnly(True)
+                shapeDataWidget.textChanged.connect(lambda: self.__minibatchDialogRoi_update())
+                shapeDataWidget.textChanged.connect(lambda: self.__minibatchDialogPyramid_update())
                 self.minibatchDialog.ui.shapeLayout.addWidget(shapeDataWidget)
                 self.minibatchShapeDataList.append(shapeDataWidget)
+
+        # ROI
+        self.minibatchDialog.roiLineEdit.setText('')
+        self.minibatchDialog.roiLineEdit.setEnabled(dataType in IMAGE_TYPES)
+
+        # Pyramid
+        self.minibatchDialog.pyramidLineEdit.setText('')
+        self.minibatchDialog.pyramidLineEdit.setEnabled(is_pyramidType(dataType))
+        self.minibatchDialog.pyramidLabel.setText('')
+
+        # Sparse
+        self.minibatchDialog.sparseComboBox.setCurrentText(SPARSE_DENSE)
+        self.minibatchDialog.sparseComboBox.setEnabled(dataType in SPARSE_TYPES)
         
         # FromTab
         self.minibatchDialog.ui.fromTabWidget.clear()
         self.minibatchFromDataList:List[List[Tuple[str, QComboBox]]] = []
+        self.minibatchFromPlanList:List[Union[ConversionPlan, None]] = self.configModel.get_conversionPlans(dataType)
+        # タブと計画はFROM_TYPESの組み合わせ毎に1つずつ対応する (zipで黙って切り詰めない)
+        if len(self.minibatchFromPlanList) != len(dataFromTypes):
+            raise ValueError('{0:d} conversion plans for {1:d} from-type combinations of {2:s}'.format(len(self.minibatchFromPlanList), len(dataFromTypes), dataType))
         initialIdx:int = -1
-        for tabItr, dataFromTypeComb in enumerate(dataFromTypes):
+        for tabItr, (dataFromTypeComb, fromPlan) in enumerate(zip(dataFromTypes, self.minibatchFromPlanList)):
+            # 多段の変換の場合は, 計画が読み込むsrc-dataの型を入力とする
+            if fromPlan is not None:
+                dataFromTypeComb = fromPlan.get_leaves()
             dataFromWidget = QWidget()
             self.minibatchDialog.ui.fromTabWidget.addTab(dataFromWidget, '')
             dataFromLayout = QFormLayout(dataFromWidget)
             minibatchFromData:List[Tuple[str, QComboBox]] = []
-            isDataExist:bool = False
             for fromItr, dataFromType in enumerate(dataFromTypeComb):
                 dataCombobox = QComboBox()
-                dataCombobox.activated.connect(lambda index, tabItr=tabItr, fromItr=fromItr: self.__minibatchDialogFromComboboxActivated_callback(index, tabItr, fromItr))
+                fromActivated = lambda index, tabItr=tabItr, fromItr=fromItr: self.__minibatchDialogFromComboboxActivated_callback(index, tabItr, fromItr)
+                dataCombobox.activated.connect(fromActivated)
                 if dataFromType == TYPE_POSE:
                     tfList:List[str] = self.__getTfList()
-                    isDataExist = True if len(tfList) > 0 else isDataExist
                     dataCombobox.addItems(tfList)
+                    self.__setTypeahead(dataCombobox, self.configModel.search_tfList, fromActivated)
                     dataFromLayout.addRow(QLabel(dataFromType + ' (Frame ID)'), dataCombobox)
                 else:
                     dataList:List[str] = self.__minibatchSrcTypeFilter(dataFromType)
-                    isDataExist = True if len(dataList) > 0 else isDataExist
                     dataCombobox.addItems(dataList)
+                    self.__setTypeahead(dataCombobox, lambda text, dataFromType=dataFromType: self.configModel.search_srcKeys(text, data_type=dataFromType, dst_type=dataType), fromActivated)
                     dataFromLayout.addRow(QLabel(dataFromType), dataCombobox)
                 minibatchFromData.append((dataFromType, dataCombobox))
-            if initialIdx < 0 and isDataExist is True:
+            if fromPlan is not None and (initialIdx < 0 or fromPlan.cost < self.minibatchFromPlanList[initialIdx].cost):
                 initialIdx = tabItr
             self.minibatchFromDataList.append(minibatchFromData)
         if initialIdx >= 0:
             self.minibatchDialog.ui.fromTabWidget.setCurrentIndex(initialIdx)
             self.__minibatchDialogFromTabBarClicked_callback(initialIdx)
+        else:
+            self.minibatchDialog.planLabel.setText('N/A')
         
         # Normalize
         if ENABLE_NORMALIZE[dataType] is True:
@@ -463,12 +559,7 @@ class H5DataLoaderConfig(QMainWindow):
             self.minibatchDialog.ui.rangeMaxLineEdit.setPlaceholderText('')
     
     def __minibatchSrcTypeFilter(self, dataType:str) -> List[str]:
-        dataList:List[str] = []
-        for itr in range(self.ui.minibatchSrcDataTree.topLevelItemCount()):
-            treeItem:TreeWidgetItem = self.ui.minibatchSrcDataTree.topLevelItem(itr)
-            if treeItem.text(1) == dataType:
-                dataList.append(treeItem.text(0))
-        return sorted(dataList)
+        return self.configModel.get_srcKeys(data_type=dataType)
     
     def __minibatchDialogFromTabBarClicked_callback(self, idx) -> None:
         labelTagEnable:bool = False
@@ -478,6 +569,19 @@ class H5DataLoaderConfig(QMainWindow):
             self.__minibatchDialogFromComboboxActivated_callback(itemIdx, idx, fromItr)
             labelTagEnable |= USE_LABEL[fromLabel]
         self.minibatchDialog.ui.labelComboBox.setEnabled(labelTagEnable)
+        self.minibatchDialog.planLabel.setText(self.__get_planText(idx))
+        self.__minibatchDialogWindow_update(idx)
+
+    def __get_planSteps(self, fromPlan:Union[ConversionPlan, None]) -> Union[List[Dict[str, Union[str, List[str]]]], None]:
+        """多段の変換の場合のみ, 変換の手順"""
+        if fromPlan is None: return None
+        steps:List[Dict[str, Union[str, List[str]]]] = fromPlan.get_steps()
+        return steps if len(steps) > 1 else None
+
+    def __get_planText(self, tabIdx:int) -> str:
+        if tabIdx < 0 or tabIdx >= len(self.minibatchFromPlanList) or self.minibatchFromPlanList[tabIdx] is None:
+            return 'N/A'
+        return self.minibatchFromPlanList[tabIdx].describe()
 
     def __minibatchDialogFromComboboxActivated_callback(self, idx:int, tabIdx:int, fromIdx:int) -> None:
         fromLabel, fromDataCombobox = self.minibatchFromDataList[tabIdx][fromIdx]
@@ -495,15 +599,97 @@ class H5DataLoaderConfig(QMainWindow):
                     for tmpFromLabel, tmpFromDataCombobox in self.minibatchFromDataList[tabIdx][1:]:
                         if tmpFromLabel in [TYPE_POSE]:
                             tmpFromDataCombobox.setCurrentText(frameId)
-            if fromLabel == self.minibatchDialog.ui.typeComboBox.currentText():
-                for shapeLineEdit, shapeValue in zip(self.minibatchShapeDataList, self.dataloader_config[CONFIG_TAG_SRCDATA][fromData][CONFIG_TAG_SHAPE]):
-                    if shapeLineEdit.isReadOnly() is False:
+            if get_pixelType(fromLabel) == self.minibatchDialog.ui.typeComboBox.currentText():
+                for shapeLineEdit, shapeValue in zip(self.minibatchShapeDataList, get_imageShape(self.dataloader_config[CONFIG_TAG_SRCDATA][fromData]) or []):
+                    if shapeLineEdit.isReadOnly() is False and shapeValue is not None:
                         shapeLineEdit.setText(str(shapeValue))
             if USE_LABEL[fromLabel] is True:
                 self.minibatchDialog.ui.labelComboBox.clear()
                 labelTag:str = self.dataloader_config[CONFIG_TAG_SRCDATA][fromData][CONFIG_TAG_LABELTAG]
-                labelConfigList:List[str] = [key for key, item in self.dataloader_config[CONFIG_TAG_LABEL][CONFIG_TAG_CONFIG].items() if item[CONFIG_TAG_SRC] == labelTag]
+                labelConfigList:List[str] = self.configModel.get_labelConfigs(labelTag)
                 self.minibatchDialog.ui.labelComboBox.addItems(labelConfigList)
+        self.__minibatchDialogWindow_update(tabIdx)
+        self.__minibatchDialogRoi_update(tabIdx)
+
+    def __minibatchDialogWindow_update(self, tabIdx:Union[int, None]=None) -> None:
+        windowLength:int = self.minibatchDialog.windowLengthSpinBox.value()
+        if tabIdx is None:
+            tabIdx = self.minibatchDialog.ui.fromTabWidget.currentIndex()
+        if windowLength < 2 or tabIdx < 0 or tabIdx >= len(self.minibatchFromDataList):
+            self.minibatchDialog.windowSamplesLabel.setText('')
+            return
+        minibatchConfig:Dict[str, dict] = {
+            CONFIG_TAG_FROM: {fromType: fromDataCombobox.currentText() for fromType, fromDataCombobox in self.minibatchFromDataList[tabIdx]},
+            CONFIG_TAG_WINDOW: {CONFIG_TAG_LENGTH: windowLength, CONFIG_TAG_STRIDE: self.minibatchDialog.windowStrideSpinBox.value()},
+        }
+        keys:List[str] = get_windowKeys(minibatchConfig)
+        if self.frameMetaCache.is_cached(keys) is False:
+            # 走査は別スレッドで行い, 終了後に再度更新する
+            self.minibatchDialog.windowSamplesLabel.setText('scanning...')
+            self.frameMetaCache.scan_async(keys, self.frameMetaSignal.scanned.emit)
+            return
+        windowStarts = self.frameMetaCache.valid_windowStarts(minibatchConfig)
+        if windowStarts is None:
+            self.minibatchDialog.windowSamplesLabel.setText('N/A')
+        else:
+            self.minibatchDialog.windowSamplesLabel.setText('{0:d} samples'.format(len(windowStarts)))
+
+    def __frameMetaScanned_callback(self, scanned:bool) -> None:
+        if scanned is True:
+            self.__minibatchDialogWindow_update()
+        else:
+            self.minibatchDialog.windowSamplesLabel.setText('N/A')
+
+    def __get_dialogMinibatch(self, tabIdx:int) -> Dict[str, Union[str, list, dict]]:
+        """ダイアログの入力中のmini-batch (ROIの確認用)"""
+        dstType:str = self.minibatchDialog.ui.typeComboBox.currentText()
+        minibatchConfig:Dict[str, Union[str, list, dict]] = {
+            CONFIG_TAG_TYPE: dstType,
+            CONFIG_TAG_FRAMEID: self.minibatchDialog.ui.frameidComboBox.currentText(),
+            CONFIG_TAG_FROM: {fromType: fromDataCombobox.currentText() for fromType, fromDataCombobox in self.minibatchFromDataList[tabIdx]},
+            CONFIG_TAG_SHAPE: self.__get_dialogShape(),
+        }
+        fromSteps = self.__get_planSteps(self.minibatchFromPlanList[tabIdx])
+        if fromSteps is not None:
+            minibatchConfig[CONFIG_TAG_STEPS] = fromSteps
+        return minibatchConfig
+
+    def __minibatchDialogRoi_update(self, tabIdx:Union[int, None]=None) -> None:
+        """ROIの切り出し範囲, 内部パラメータ, 読み込むバイト数を表示"""
+        if tabIdx is None:
+            tabIdx = self.minibatchDialog.ui.fromTabWidget.currentIndex()
+        roiText:str = self.minibatchDialog.roiLineEdit.text()
+        if self.minibatchDialog.roiLineEdit.isEnabled() is False or tabIdx < 0 or tabIdx >= len(self.minibatchFromDataList):
+            self.minibatchDialog.roiLabel.setText('')
+            return
+        minibatchConfig = self.__get_dialogMinibatch(tabIdx)
+        srcShape = get_sourceShape(self.dataloader_config, minibatchConfig)
+        try:
+            roi = parse_roi(roiText, srcShape)
+        except ValueError as e:
+            self.minibatchDialog.roiLabel.setText(str(e))
+            return
+        self.minibatchDialog.roiLabel.setText(describe_roi(self.dataloader_config, minibatchConfig, roi))
+
+    def __get_dialogShape(self) -> List[Union[int, None]]:
+        return [int(shapeLineEdit.text()) if shapeLineEdit.text().isdecimal() else None for shapeLineEdit in self.minibatchShapeDataList]
+
+    def __minibatchDialogPyramid_update(self) -> None:
+        """ピラミッドの段毎の形状を表示"""
+        if self.minibatchDialog.pyramidLineEdit.isEnabled() is False:
+            self.minibatchDialog.pyramidLabel.setText('')
+            return
+        shape:List[Union[int, None]] = self.__get_dialogShape()
+        try:
+            pyramid = parse_pyramid(self.minibatchDialog.pyramidLineEdit.text(), shape)
+        except ValueError as e:
+            self.minibatchDialog.pyramidLabel.setText(str(e))
+            return
+        if pyramid is None:
+            self.minibatchDialog.pyramidLabel.setText('')
+            return
+        levels:List[str] = ['x'.join('N' if size is None else str(size) for size in shape[:2])] + [format_pyramid([level]) for level in pyramid]
+        self.minibatchDialog.pyramidLabel.setText('{0:s} from one read'.format(' → '.join(levels)))
 
     def __minibatchDialogOkButtonClicked_callback(self) -> None:
         dstTag:str = self.minibatchDialog.ui.tagLineEdit.text()
@@ -545,6 +731,9 @@ class H5DataLoaderConfig(QMainWindow):
             useLabel |= USE_LABEL[key]
         if useLabel is True:
             if dstLabelTag == '': return
+        fromSteps = self.__get_planSteps(self.minibatchFromPlanList[fromTabIdx])
+        if fromSteps is not None:
+            minibatchConfig[CONFIG_TAG_STEPS] = fromSteps
 
         dstShape:List[Union[int, None]] = []
         for dstShapeStr in dstShapeList:
@@ -554,6 +743,26 @@ class H5DataLoaderConfig(QMainWindow):
                 dstShape.append(None)
         minibatchConfig[CONFIG_TAG_SHAPE] = dstShape
 
+        if self.minibatchDialog.roiLineEdit.isEnabled() is True:
+            try:
+                dstRoi = parse_roi(self.minibatchDialog.roiLineEdit.text(), get_sourceShape(self.dataloader_config, minibatchConfig))
+            except ValueError:
+                return
+            if dstRoi is not None:
+                minibatchConfig[CONFIG_TAG_ROI] = dstRoi
+
+        if self.minibatchDialog.pyramidLineEdit.isEnabled() is True:
+            try:
+                dstPyramid = parse_pyramid(self.minibatchDialog.pyramidLineEdit.text(), dstShape)
+            except ValueError:
+                return
+            if dstPyramid is not None:
+                minibatchConfig[CONFIG_TAG_PYRAMID] = dstPyramid
+
+        dstSparse:str = self.minibatchDialog.sparseComboBox.currentText()
+        if dstSparse in SPARSE_FORMATS and is_sparseMinibatch(minibatchConfig):
+            minibatchConfig[CONFIG_TAG_SPARSE] = dstSparse
+
         minibatchConfig[CONFIG_TAG_NORMALIZE] = dstNormalize
 
         defaultValidator = RANGE_VALIDATOR[dstType]
@@ -573,36 +782,26 @@ class H5DataLoaderConfig(QMainWindow):
 
         minibatchConfig[CONFIG_TAG_LABELTAG] = dstLabelTag
 
-        self.dataloader_config[CONFIG_TAG_MINIBATCH][dstTag] = minibatchConfig
+        windowLength:int = self.minibatchDialog.windowLengthSpinBox.value()
+        if windowLength > 1:
+            minibatchConfig[CONFIG_TAG_WINDOW] = {
+                CONFIG_TAG_LENGTH: windowLength,
+                CONFIG_TAG_STRIDE: self.minibatchDialog.windowStrideSpinBox.value(),
+            }
 
-        if self.minibatchDialog_targetTag == '':
-            self.__minibatchDstDataTree_addItem(dstTag)
-        else:
-            self.__minibatchDstDataTree_editItem(dstTag)
+        self.configModel.set_minibatch(dstTag, minibatchConfig, None if self.minibatchDialog_targetTag == '' else self.minibatchDialog_targetTag)
         
         self.minibatchDialog.close()
 
-    def __minibatchDstDataTree_addItem(self, minibatchTag:str) -> None:
-        minibatchConfig = self.dataloader_config[CONFIG_TAG_MINIBATCH][minibatchTag]
-        treeItem = TreeWidgetItem([minibatchTag, minibatchConfig[CONFIG_TAG_TYPE], minibatchConfig[CONFIG_TAG_FRAMEID]])
-        self.ui.minibatchDstDataTree.addTopLevelItem(treeItem)
-    
-    def __minibatchDstDataTree_editItem(self, minibatchTag:str) -> None:
-        minibatchConfig = self.dataloader_config[CONFIG_TAG_MINIBATCH][minibatchTag]
-        treeItem:TreeWidgetItem = self.ui.minibatchDstDataTree.currentItem()
-        treeItem.setText(0, minibatchTag)
-        treeItem.setText(1, minibatchConfig[CONFIG_TAG_TYPE])
-        treeItem.setText(2, minibatchConfig[CONFIG_TAG_FRAMEID])
-
     def __getTfList(self) -> List[str]:
-        return sorted(self.dataloader_config[CONFIG_TAG_TF][CONFIG_TAG_LIST])
+        return self.configModel.get_tfList()
 
     def __labelTabAddButton_callback(self) -> None:
         newLabelConfigTag, status = QInputDialog.getText(self.ui.labelTabWidget, 'Add New Label Config', 'Specify new label-config tag', QLineEdit.Normal)
         if not status: return
         srcTag = list(self.dataloader_config[CONFIG_TAG_LABEL][CONFIG_TAG_SRC].keys())[0]
         config_dict = {CONFIG_TAG_SRC: srcTag, CONFIG_TAG_CONVERT: {}, CONFIG_TAG_DST: {}}
-        self.dataloader_config[CONFIG_TAG_LABEL][CONFIG_TAG_CONFIG][newLabelConfigTag] = config_dict
+        self.configModel.set_labelConfig(newLabelConfigTag, config_dict)
         self.__labelTabAdd(newLabelConfigTag, srcTag)
 
     def __labelTabAdd(self, configTag:str, srcTag:str) -> LabelTab:
@@ -632,8 +831,8 @@ class H5DataLoaderConfig(QMainWindow):
         renamedLabelConfigTag, status = QInputDialog.getText(self.ui.labelTabWidget, 'Rename Label Config', 'Specify label-config tag', QLineEdit.Normal)
         if not status: return
         srcConfigTag:str = self.ui.labelTabWidget.tabText(index)
-        tmp_configDict:dict = self.dataloader_config[CONFIG_TAG_LABEL][CONFIG_TAG_CONFIG].pop(srcConfigTag)
-        self.dataloader_config[CONFIG_TAG_LABEL][CONFIG_TAG_CONFIG][renamedLabelConfigTag] = tmp_configDict
+        tmp_configDict:dict = self.dataloader_config[CONFIG_TAG_LABEL][CONFIG_TAG_CONFIG][srcConfigTag]
+        self.configModel.set_labelConfig(renamedLabelConfigTag, tmp_configDict, srcConfigTag)
         self.ui.labelTabWidget.setTabText(index, renamedLabelConfigTag)
 
     def __labelTabCloseRequested_callback(self, index:int):
@@ -641,7 +840,7 @@ class H5DataLoaderConfig(QMainWindow):
 
         configTag:str = self.ui.labelTabWidget.tabText(index)
         self.ui.labelTabWidget.removeTab(index)
-        self.dataloader_config[CONFIG_TAG_LABEL][CONFIG_TAG_CONFIG].pop(configTag, None)
+        self.configModel.remove_labelConfig(configTag)
 
         if self.ui.labelTabWidget.count() > 1:
             self.ui.labelTabWidget.setTabsClosable(True)
@@ -661,6 +860,7 @@ class H5DataLoaderConfig(QMainWindow):
         for key in self.dataloader_config[CONFIG_TAG_LABEL][CONFIG_TAG_SRC][targetSrc].keys():
             convert_dict[key] = int(key)
         config_dict[CONFIG_TAG_CONVERT] = convert_dict
+        self.configModel.set_labelConfig(tab_label, config_dict)
 
         self.__labelSrcTree_load(currentTab.ui.srcTree, targetSrc, tab_label)
 
@@ -919,11 +1119,48 @@ class H5DataLoaderConfig(QMainWindow):
             else:
                 return Qt.black
 
-def byte2str(obj) -> Union[str, None]:
-    return obj.decode() if isinstance(obj, bytes) else obj
+# --profileで計測するメソッド
+PROFILED_METHODS:List[str] = [
+    'fileOpen_callback',
+    'loadHdf5',
+    'loadData',
+    'labelSrcTree_load',
+    'labelSrcDstCombobox_update',
+    'minibatchDialogTypeComboboxActivated_callback',
+    'fileSave_callback',
+]
+
+# --memory-reportで記録するメソッドとフェーズ
+MEMORY_PHASES:Dict[str, str] = {
+    'loadData': 'populate',
+}
 
 def main() -> None:
-    app = QApplication(sys.argv)
+    parser = argparse.ArgumentParser(prog='h5dataloader-config')
+    parser.add_argument('--profile', type=str, nargs='?', const=profile.DEFAULT_TRACE, default=None, metavar='TRACE', help='record GUI actions to a Chrome trace-event file and print a summary on exit')
+    parser.add_argument('--memory-report', type=str, nargs='?', const=memory.DEFAULT_REPORT, default=None, metavar='REPORT', help='record memory per scan/populate/render phase and config section and print a summary on exit')
+    args, qt_args = parser.parse_known_args()
+
+    profiler:Union[profile.Profiler, None] = None
+    if args.profile is not None:
+        profiler = profile.enable()
+        profiler.install(H5DataLoaderConfig, PROFILED_METHODS)
+    report:Union[memory.MemoryReport, None] = None
+    if args.memory_report is not None:
+        report = memory.enable()
+        report.install(H5DataLoaderConfig, MEMORY_PHASES, config_attr='dataloader_config')
+
+    app = QApplication(sys.argv[:1] + qt_args)
     h5dlc = H5DataLoaderConfig(app)
     h5dlc.show()
-    sys.exit(app.exec_())
+    status:int = app.exec_()
+    if profiler is not None:
+        profiler.save(args.profile)
+        print(profiler.format_summary())
+        print('saved: {0:s}'.format(args.profile))
+    if report is not None:
+        report.measure_sections(getattr(h5dlc, 'dataloader_config', {}))
+        report.save(args.memory_report)
+        print(report.format_summary())
+        print('saved: {0:s}'.format(args.memory_report))
+    sys.exit(status)
@@ -43,6 +43,14 @@ SHAPE_TYPES:Dict[str, Union[Tuple[Union[int, QValidator, None], ...], None]] = {
     TYPE_QUATERNION: (4,),
     TYPE_INTRINSIC: None,
     TYPE_COLOR: (3,),
+    TYPE_MONO8_PNG: None,
+    TYPE_MONO8_JPEG: None,
+    TYPE_MONO16_PNG: None,
+    TYPE_BGR8_PNG: None,
+    TYPE_BGR8_JPEG: None,
+    TYPE_RGB8_PNG: None,
+    TYPE_RGB8_JPEG: None,
+    TYPE_SEMANTIC2D_PNG: None,
 }
 
 SHAPE_PLACEHOLDER:Dict[str, Union[Tuple[str], None]] = {
@@ -73,6 +81,14 @@ SHAPE_PLACEHOLDER:Dict[str, Union[Tuple[str], None]] = {
     TYPE_QUATERNION: (None,),
     TYPE_INTRINSIC: None,
     TYPE_COLOR: (None,),
+    TYPE_MONO8_PNG: None,
+    TYPE_MONO8_JPEG: None,
+    TYPE_MONO16_PNG: None,
+    TYPE_BGR8_PNG: None,
+    TYPE_BGR8_JPEG: None,
+    TYPE_RGB8_PNG: None,
+    TYPE_RGB8_JPEG: None,
+    TYPE_SEMANTIC2D_PNG: None,
 }
 
 RANGE_VALIDATOR:Dict[str, Union[QValidator, None]] = {
@@ -103,4 +119,15 @@ RANGE_VALIDATOR:Dict[str, Union[QValidator, None]] = {
     TYPE_QUATERNION: None,
     TYPE_INTRINSIC: None,
     TYPE_COLOR: ValidatorUInt8,
+    TYPE_MONO8_PNG: None,
+    TYPE_MONO8_JPEG: None,
+    TYPE_MONO16_PNG: None,
+    TYPE_BGR8_PNG: None,
+    TYPE_BGR8_JPEG: None,
+    TYPE_RGB8_PNG: None,
+    TYPE_RGB8_JPEG: None,
+    TYPE_SEMANTIC2D_PNG: None,
 }
+
+# mini-batchダイアログで疎な出力を使わない場合の選択肢
+SPARSE_DENSE:str = 'dense'
@@ -0,0 +1,17 @@
+# -*- coding: utf-8 -*-
+
+import argparse
+import importlib
+from typing import List
+
+# サブコマンドのモジュール. GUIが一部のモジュールだけを読み込めるように, main()で読み込む.
+COMMANDS:List[str] = ['shuffle', 'weights', 'split', 'window', 'plan', 'codegen', 'synthetic', 'benchmark', 'cull', 'voxel', 'precision', 'compress', 'quality', 'validate']
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog='h5dataloader-tools')
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.required = True
+    for command in COMMANDS:
+        importlib.import_module('.' + command, __name__).add_parser(subparsers)
+    args = parser.parse_args()
+    args.func(args)
@@ -0,0 +1,389 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import json
+import time
+import zlib
+import pickle
+import platform
+import tempfile
+import subprocess
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Tuple, Union
+import numpy as np
+import h5py
+
+from ..common.structure import *
+from ..common.scan import infer_schema
+from ..common.memory import get_peakRss
+from .synthetic import DEFAULT_LABELTAG, create_dataset
+from .loader import ReferenceLoader
+from .compress import get_compressSources, write_compressed
+
+DEFAULT_HISTORY:str = 'benchmark-history.json'
+DEFAULT_REPEAT:int = 5
+DEFAULT_THRESHOLD:float = 0.1
+# メモリのケースは比ではなく増加量 [B] で判定する (最大RSSの差は0付近や負にもなるため)
+DEFAULT_MEMORY_THRESHOLD:int = 256 * 1024
+
+# 合成データのパラメータ (create_datasetの引数)
+DATASET_PARAMS:Dict[str, Dict[str, Any]] = {
+    'small': {'length': 20, 'cameras': 1, 'image_shape': (240, 320), 'points': 10000, 'map_points': 100000, 'classes': 32},
+    'large': {'length': 1000, 'cameras': 4, 'image_shape': (120, 160), 'points': 1000, 'map_points': 100000, 'classes': 32, 'extra_keys': 50},
+    'labels': {'length': 2, 'cameras': 1, 'image_shape': (60, 80), 'points': 100, 'map_points': 0, 'classes': 256},
+    'keys-1k': {'length': 2, 'cameras': 0, 'points': 0, 'map_points': 0, 'classes': 8, 'extra_keys': 1000},
+    'keys-5k': {'length': 2, 'cameras': 0, 'points': 0, 'map_points': 0, 'classes': 8, 'extra_keys': 5000},
+}
+NUM_SRCDATA:int = 10000
+# 1k keys当たりの最大RSSを, キー数の異なる2つのデータの差から求める
+MEMORY_DATASETS:Tuple[Tuple[str, int], Tuple[str, int]] = (('keys-1k', 1000), ('keys-5k', 5000))
+
+class BenchmarkContext(object):
+    """合成データとオフスクリーンのウィンドウを必要になった時点で用意する"""
+    def __init__(self, data_dir:str) -> None:
+        self.data_dir:str = data_dir
+        self.app = None
+        self.window = None
+
+    def dataset(self, name:str) -> str:
+        """合成データのパス (パラメータが同じ場合は再利用する)"""
+        params:Dict[str, Any] = DATASET_PARAMS[name]
+        h5path:str = os.path.join(self.data_dir, 'synthetic_{0:s}_{1:08x}.h5'.format(name, zlib.crc32(json.dumps(params, sort_keys=True).encode())))
+        if os.path.isfile(h5path) is False:
+            with h5py.File(h5path + '.tmp', mode='w') as h5file:
+                create_dataset(h5file, **params)
+            os.replace(h5path + '.tmp', h5path)
+        return h5path
+
+    def compressed(self, name:str, codec:str) -> str:
+        """合成データの画像をPNG/JPEGで符号化した複製のパス (元の合成データと同じく再利用する)"""
+        src_path:str = self.dataset(name)
+        h5path:str = '{0:s}_{1:s}.h5'.format(os.path.splitext(src_path)[0], codec)
+        if os.path.isfile(h5path) is False:
+            with h5py.File(src_path, mode='r') as h5file:
+                srcdata_dict, _ = infer_schema(h5file)
+            with h5py.File(h5path + '.tmp', mode='w') as h5file:
+                write_compressed(src_path, h5file, get_compressSources({CONFIG_TAG_SRCDATA: srcdata_dict}, codec), codec)
+            os.replace(h5path + '.tmp', h5path)
+        return h5path
+
+    def gui(self) -> Any:
+        if self.window is None:
+            os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+            from PySide2.QtWidgets import QApplication
+            from ..main import H5DataLoaderConfig
+            self.app = QApplication.instance() or QApplication(sys.argv[:1])
+            self.window = H5DataLoaderConfig(self.app)
+        return self.window
+
+    def call(self, method:str, *args) -> Any:
+        """H5DataLoaderConfigのprivateなメソッドを呼び, イベントを処理する"""
+        result = getattr(self.gui(), '_H5DataLoaderConfig__' + method)(*args)
+        self.app.processEvents()
+        return result
+
+def case_scan(size:str) -> Callable[[BenchmarkContext], Callable[[], Any]]:
+    def setup(context:BenchmarkContext) -> Callable[[], Any]:
+        h5path:str = context.dataset(size)
+        def func() -> None:
+            with h5py.File(h5path, mode='r') as h5file:
+                infer_schema(h5file)
+        return func
+    return setup
+
+def case_loadHdf5(size:str) -> Callable[[BenchmarkContext], Callable[[], Any]]:
+    def setup(context:BenchmarkContext) -> Callable[[], Any]:
+        h5path:str = context.dataset(size)
+        return lambda: context.call('loadHdf5', h5path)
+    return setup
+
+def case_loadData(context:BenchmarkContext) -> Callable[[], Any]:
+    context.call('loadHdf5', context.dataset('small'))
+    srcdata_dict:Dict[str, dict] = context.window.dataloader_config[CONFIG_TAG_SRCDATA]
+    for idx in range(NUM_SRCDATA - len(srcdata_dict)):
+        tag:str = 'extra_{0:05d}'.format(idx)
+        srcdata_dict[tag] = {CONFIG_TAG_TAG: tag, CONFIG_TAG_TYPE: TYPE_FLOAT32, CONFIG_TAG_SHAPE: [16], CONFIG_TAG_FRAMEID: None, CONFIG_TAG_CHILDFRAMEID: None, CONFIG_TAG_LABELTAG: None}
+    return lambda: context.call('loadData')
+
+def case_labelTab(context:BenchmarkContext) -> Callable[[], Any]:
+    context.call('loadHdf5', context.dataset('labels'))
+    window = context.window
+    def func() -> None:
+        window.ui.labelTabWidget.clear()
+        context.call('labelTabAdd', DEFAULT_LABELTAG, DEFAULT_LABELTAG)
+        context.call('labelSrcDstCombobox_update', DEFAULT_LABELTAG)
+    return func
+
+def case_minibatchType(context:BenchmarkContext) -> Callable[[], Any]:
+    context.call('loadHdf5', context.dataset('small'))
+    typeComboBox = context.window.minibatchDialog.ui.typeComboBox
+    def func() -> None:
+        for idx in range(typeComboBox.count()):
+            typeComboBox.setCurrentIndex(idx)
+            context.call('minibatchDialogTypeComboboxActivated_callback', idx)
+    return func
+
+def case_saveJson(context:BenchmarkContext) -> Callable[[], Any]:
+    context.call('loadHdf5', context.dataset('large'))
+    jsonpath:str = os.path.join(context.data_dir, 'benchmark_config.json')
+    return lambda: context.call('saveJson', jsonpath)
+
+def get_loaderConfig(h5path:str, minibatches:Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """走査したsrc-dataとmini-batchからなる, ReferenceLoaderで読み込むための設定"""
+    with h5py.File(h5path, mode='r') as h5file:
+        srcdata_dict, pose_dict = infer_schema(h5file)
+    return {
+        H5_ATTR_FILEPATH: h5path,
+        CONFIG_TAG_SRCDATA: srcdata_dict,
+        CONFIG_TAG_TF: {CONFIG_TAG_DATA: pose_dict},
+        CONFIG_TAG_LABEL: {CONFIG_TAG_SRC: {}, CONFIG_TAG_CONFIG: {}},
+        CONFIG_TAG_MINIBATCH: minibatches,
+    }
+
+# 合成データ'small'のカメラ画像をそのまま出力するmini-batch (入力の型は読み込むデータの型に合わせる)
+IMAGE_MINIBATCH:Dict[str, Any] = {
+    CONFIG_TAG_TYPE: TYPE_BGR8,
+    CONFIG_TAG_FRAMEID: 'cam0',
+    CONFIG_TAG_SHAPE: [240, 320, 3],
+    CONFIG_TAG_NORMALIZE: False,
+    CONFIG_TAG_RANGE: None,
+    CONFIG_TAG_LABELTAG: '',
+}
+
+def case_readImage(codec:Union[str, None]) -> Callable[[BenchmarkContext], Callable[[], Any]]:
+    """全フレームの画像の読み込み (符号化した画像は復号まで)"""
+    def setup(context:BenchmarkContext) -> Callable[[], Any]:
+        h5path:str = context.dataset('small') if codec is None else context.compressed('small', codec)
+        minibatch_config:Dict[str, Any] = dict(IMAGE_MINIBATCH)
+        config:Dict[str, Any] = get_loaderConfig(h5path, {TYPE_BGR8: minibatch_config})
+        minibatch_config[CONFIG_TAG_FROM] = {config[CONFIG_TAG_SRCDATA]['image_00'][CONFIG_TAG_TYPE]: 'image_00'}
+        def func() -> None:
+            with h5py.File(h5path, mode='r') as h5file:
+                loader = ReferenceLoader(config, h5file)
+                for idx in range(len(loader)):
+                    loader[idx]
+        return func
+    return setup
+
+BENCHMARK_CASES:Dict[str, Callable[[BenchmarkContext], Callable[[], Any]]] = {
+    'scan-small': case_scan('small'),
+    'scan-large': case_scan('large'),
+    'load-hdf5-small': case_loadHdf5('small'),
+    'load-hdf5-large': case_loadHdf5('large'),
+    'load-data-10k': case_loadData,
+    'label-tab-256': case_labelTab,
+    'minibatch-type-switch': case_minibatchType,
+    'config-save': case_saveJson,
+    'read-image-raw': case_readImage(None),
+    'read-image-png': case_readImage(CODEC_PNG),
+    'read-image-jpeg': case_readImage(CODEC_JPEG),
+}
+
+def print_peakRss(mode:str, h5path:str) -> None:
+    """別プロセスで読み込み, 最大RSS [B] を出力する"""
+    if mode == 'gui':
+        context = BenchmarkContext(os.path.dirname(h5path))
+        context.call('loadHdf5', h5path)
+    else:
+        with h5py.File(h5path, mode='r') as h5file:
+            infer_schema(h5file)
+    print(get_peakRss())
+
+def case_peakRss(mode:str) -> Callable[[BenchmarkContext], Callable[[], float]]:
+    def setup(context:BenchmarkContext) -> Callable[[], float]:
+        h5paths:List[str] = [context.dataset(name) for name, _ in MEMORY_DATASETS]
+        env:Dict[str, str] = dict(os.environ, PYTHONPATH=os.pathsep.join([os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), os.environ.get('PYTHONPATH', '')]))
+        def func() -> float:
+            peaks:List[int] = []
+            for h5path in h5paths:
+                script:str = 'from h5dataloader_config.tools.benchmark import print_peakRss; print_peakRss({0:s}, {1:s})'.format(repr(mode), repr(h5path))
+                result = subprocess.run([sys.executable, '-c', script], env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True, check=True)
+                peaks.append(int(result.stdout.strip().splitlines()[-1]))
+            keys:int = MEMORY_DATASETS[1][1] - MEMORY_DATASETS[0][1]
+            return (peaks[1] - peaks[0]) / keys * 1000 / 1024
+        return func
+    return setup
+
+# 疎な出力と密な出力を比較する, 合成データ'small'の点群を投影した深度のmini-batch
+SPARSE_MINIBATCH:Dict[str, Any] = {
+    CONFIG_TAG_TYPE: TYPE_DEPTH,
+    CONFIG_TAG_FRAMEID: 'cam0',
+    CONFIG_TAG_FROM: {TYPE_POINTS: 'velodyne_points', TYPE_POSE: 'velodyne', TYPE_INTRINSIC: '/intrinsic/image_00'},
+    CONFIG_TAG_SHAPE: [240, 320],
+    CONFIG_TAG_NORMALIZE: False,
+    CONFIG_TAG_RANGE: [0.0, 100.0],
+    CONFIG_TAG_LABELTAG: '',
+}
+
+def get_sampleBytes(data:Any) -> int:
+    """サンプルの配列のバイト数の合計"""
+    if isinstance(data, np.ndarray): return data.nbytes
+    if isinstance(data, dict): return sum(get_sampleBytes(item) for item in data.values())
+    if isinstance(data, (tuple, list)): return sum(get_sampleBytes(item) for item in data)
+    return 0
+
+def get_ipcBytes(data:Any) -> int:
+    """プロセス間でサンプルを受け渡す際のpickleのバイト数"""
+    return len(pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL))
+
+def case_sampleBytes(sparse_format:Union[str, None], ipc:bool) -> Callable[[BenchmarkContext], Callable[[], float]]:
+    def setup(context:BenchmarkContext) -> Callable[[], float]:
+        h5path:str = context.dataset('small')
+        minibatch_config:Dict[str, Any] = dict(SPARSE_MINIBATCH)
+        if sparse_format is not None:
+            minibatch_config[CONFIG_TAG_SPARSE] = sparse_format
+        config:Dict[str, Any] = get_loaderConfig(h5path, {TYPE_DEPTH: minibatch_config})
+        def func() -> float:
+            with h5py.File(h5path, mode='r') as h5file:
+                loader = ReferenceLoader(config, h5file)
+                sizes:List[int] = [(get_ipcBytes if ipc else get_sampleBytes)(loader[idx]) for idx in range(len(loader))]
+            return float(np.mean(sizes)) / 1024
+        return func
+    return setup
+
+# 最大RSSのケース [KiB / 1k keys] と, 1サンプル当たりの配列・pickleのサイズのケース [KiB]
+MEMORY_CASES:Dict[str, Callable[[BenchmarkContext], Callable[[], float]]] = {
+    'rss-scan-per-1k-keys': case_peakRss('scan'),
+    'rss-gui-per-1k-keys': case_peakRss('gui'),
+}
+MEMORY_CASES.update({
+    '{0:s}-depth-{1:s}'.format(kind, sparse_format or 'dense'): case_sampleBytes(sparse_format, kind == 'ipc')
+    for kind in ['bytes', 'ipc'] for sparse_format in [None] + SPARSE_FORMATS
+})
+
+def measure_memory(func:Callable[[], float], repeat:int=DEFAULT_REPEAT) -> Dict[str, Union[int, float, str]]:
+    values:List[float] = [func() for _ in range(repeat)]
+    return {'median': float(np.median(values)), 'min': float(np.min(values)), 'max': float(np.max(values)), 'repeat': repeat, 'unit': 'KiB'}
+
+def is_memory(result:Dict[str, Union[int, float, str]]) -> bool:
+    return result.get('unit') == 'KiB'
+
+def format_value(result:Dict[str, Union[int, float, str]], key:str) -> str:
+    if result.get('unit') == 'KiB':
+        return '{0:10.1f} KiB'.format(result[key])
+    return '{0:10.3f} ms '.format(result[key] * 1e3)
+
+def measure(func:Callable[[], Any], repeat:int=DEFAULT_REPEAT) -> Dict[str, Union[int, float]]:
+    """1回のウォームアップの後にrepeat回計測 [s]"""
+    func()
+    times:List[float] = []
+    for _ in range(repeat):
+        start:float = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return {'median': float(np.median(times)), 'min': float(np.min(times)), 'max': float(np.max(times)), 'repeat': repeat}
+
+def get_commit() -> Union[str, None]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=os.path.dirname(os.path.abspath(__file__)), stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def load_history(path:str) -> List[Dict[str, Any]]:
+    if os.path.isfile(path) is False: return []
+    with open(path, mode='r') as jsonfile:
+        return json.load(jsonfile)
+
+def run_benchmarks(cases:List[str], data_dir:str, repeat:int=DEFAULT_REPEAT) -> Dict[str, Any]:
+    """ベンチマークを実行して履歴の1エントリを返す"""
+    context = BenchmarkContext(data_dir)
+    results:Dict[str, Dict[str, Union[int, float]]] = {}
+    for case in cases:
+        if case in MEMORY_CASES.keys():
+            results[case] = measure_memory(MEMORY_CASES[case](context), repeat)
+        else:
+            results[case] = measure(BENCHMARK_CASES[case](context), repeat)
+        print('{0:24s} median {1:s}  min {2:s}'.format(case, format_value(results[case], 'median'), format_value(results[case], 'min')))
+    return {
+        'time': datetime.now().isoformat(timespec='seconds'),
+        'commit': get_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+
+def get_change(base_result:Dict[str, Union[int, float, str]], target_result:Dict[str, Union[int, float, str]]) -> float:
+    """baseからtargetへの変化. 時間は比 (速くなった場合は1), メモリは増加量 [B]"""
+    base_median:float = base_result['median']
+    target_median:float = target_result['median']
+    if is_memory(target_result):
+        return (target_median - base_median) * 1024
+    if target_median <= base_median:
+        return 1.0
+    return target_median / base_median if base_median > 0 else np.inf
+
+def format_change(base_result:Dict[str, Union[int, float, str]], target_result:Dict[str, Union[int, float, str]]) -> str:
+    if is_memory(target_result):
+        return '{0:+.1f} KiB'.format(target_result['median'] - base_result['median'])
+    if base_result['median'] > 0:
+        return '{0:+.1f}%'.format((target_result['median'] / base_result['median'] - 1.0) * 100.0)
+    return '{0:+.1f}%'.format(0.0 if target_result['median'] <= 0 else np.inf)
+
+def compare_runs(base:Dict[str, Any], target:Dict[str, Any], threshold:float=DEFAULT_THRESHOLD, memory_threshold:int=DEFAULT_MEMORY_THRESHOLD) -> List[Tuple[str, float, float, float]]:
+    """時間のmedianがbaseの(1 + threshold)倍を超えるケースと, メモリのmedianがmemory_threshold [B] を超えて増えたケース
+
+    Returns:
+        List[Tuple[str, float, float, float]]: ケース名, baseのmedian, targetのmedian, 変化 (時間は比, メモリは増加量 [B])
+    """
+    regressions:List[Tuple[str, float, float, float]] = []
+    for case, result in target['results'].items():
+        if case not in base['results'].keys(): continue
+        change:float = get_change(base['results'][case], result)
+        if change > (memory_threshold if is_memory(result) else 1.0 + threshold):
+            regressions.append((case, base['results'][case]['median'], result['median'], change))
+    return regressions
+
+def add_parser(subparsers) -> None:
+    parser = subparsers.add_parser('benchmark', help='benchmark scan, load, render and export hot paths (offscreen)')
+    parser.add_argument('--history', type=str, default=DEFAULT_HISTORY, help='JSON history file')
+    commands = parser.add_subparsers(dest='benchmark_command')
+    commands.required = True
+
+    run_parser = commands.add_parser('run', help='run benchmarks and append the results to the history')
+    cases:List[str] = list(BENCHMARK_CASES.keys()) + list(MEMORY_CASES.keys())
+    run_parser.add_argument('--cases', type=str, nargs='+', default=cases, choices=cases, help='cases to run')
+    run_parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help='measurements per case')
+    run_parser.add_argument('--data-dir', type=str, default=None, help='directory to cache synthetic datasets (default: temporary)')
+    run_parser.set_defaults(func=run)
+
+    compare_parser = commands.add_parser('compare', help='compare two runs in the history and flag regressions')
+    compare_parser.add_argument('--base', type=int, default=-2, help='index of the base run')
+    compare_parser.add_argument('--target', type=int, default=-1, help='index of the compared run')
+    compare_parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help='allowed growth ratio of time')
+    compare_parser.add_argument('--memory-threshold', type=int, default=DEFAULT_MEMORY_THRESHOLD, help='allowed growth of memory cases in bytes')
+    compare_parser.set_defaults(func=compare)
+
+def run(args) -> None:
+    history:List[Dict[str, Any]] = load_history(args.history)
+    if args.data_dir is None:
+        with tempfile.TemporaryDirectory() as data_dir:
+            entry:Dict[str, Any] = run_benchmarks(args.cases, data_dir, args.repeat)
+    else:
+        os.makedirs(args.data_dir, exist_ok=True)
+        entry = run_benchmarks(args.cases, args.data_dir, args.repeat)
+    history.append(entry)
+    with open(args.history, mode='w') as jsonfile:
+        json.dump(history, jsonfile, indent=2)
+    print('saved: {0:s} ({1:d} runs)'.format(args.history, len(history)))
+
+def compare(args) -> None:
+    history:List[Dict[str, Any]] = load_history(args.history)
+    if len(history) < 2:
+        print('{0:s}: at least 2 runs are required'.format(args.history))
+        return
+    base:Dict[str, Any] = history[args.base]
+    target:Dict[str, Any] = history[args.target]
+    print('base  : {0:s} ({1:s})'.format(base['time'], str(base['commit'])))
+    print('target: {0:s} ({1:s})'.format(target['time'], str(target['commit'])))
+    for case, result in target['results'].items():
+        if case not in base['results'].keys(): continue
+        print('{0:24s} {1:s} -> {2:s} ({3:s})'.format(case, format_value(base['results'][case], 'median'), format_value(result, 'median'), format_change(base['results'][case], result)))
+    regressions = compare_runs(base, target, args.threshold, args.memory_threshold)
+    for case, base_median, target_median, change in regressions:
+        if is_memory(target['results'][case]):
+            print('REGRESSION {0:s}: {1:+.0f} B'.format(case, change))
+        else:
+            print('REGRESSION {0:s}: {1:.2f}x'.format(case, change))
+    if len(regressions) > 0:
+        sys.exit(1)
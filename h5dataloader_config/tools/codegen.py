@@ -0,0 +1,373 @@
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import inspect
+from typing import Any, Callable, Dict, List, Set, Tuple, Union
+import numpy as np
+import h5py
+
+from ..common.structure import *
+from ..common.roi import get_roiShape
+from ..common.codec import get_imageShape
+from .utils import *
+from .plan import *
+from . import loader
+from .loader import ReferenceLoader, create_labelLuts, create_palette, get_cvtColorSteps, scale_intrinsic
+
+# 生成するモジュールに埋め込む関数
+EMBEDDED_FUNCTIONS:List[Any] = [
+    loader.read_intrinsic,
+    loader.quaternion2matrix,
+    loader.matrix2quaternion,
+    loader.read_pose,
+    loader.read_voxels,
+    loader.compose_tf,
+    loader.apply_label,
+    loader.backproject,
+    loader.disparity2depth,
+    loader.to_mono8,
+    loader.to_mono16,
+    loader.transform_points,
+    loader.project,
+    loader.gather,
+    loader.scale_intrinsic,
+    loader.decode,
+    loader.to_sparse,
+    loader.to_dense,
+    loader.decode_image,
+]
+
+# 定数として埋め込む静的な値の要素数の上限
+MAX_INLINE_SIZE:int = 256
+
+MODULE_HEADER:str = '''# -*- coding: utf-8 -*-
+# Generated by `h5dataloader-tools codegen` from {config:s}.
+# Do not edit: regenerate the module after changing the config.
+
+import sys
+import json
+import time
+import numpy as np
+import cv2
+import h5py
+
+FILE_PATH = {file_path:s}
+'''
+
+MODULE_FOOTER:str = '''
+class Loader(object):
+    def __init__(self, h5path=FILE_PATH, culls=None):
+        self.h5file = h5py.File(h5path, mode='r')
+        self.static = load_static(self.h5file)
+        for tag, cull in (culls or {{}}).items():
+            self.static['cull:' + tag] = cull
+
+    def __len__(self):
+        return int(self.h5file['header/length'][()])
+
+    def __getitem__(self, idx):
+        return load_sample(self.h5file, self.static, idx)
+
+CONFIG = json.loads({config_json:s})
+
+STATIC_SOURCES = {static_sources:s}
+
+def _equal(a, b):
+    if isinstance(a, tuple):
+        return all(_equal(x, y) for x, y in zip(a, b))
+    return a.shape == b.shape and np.allclose(a, b, equal_nan=True)
+
+def benchmark(frames=100, max_points=100000):
+    """Compare against the interpretive reference loader on synthetic data."""
+    from h5dataloader_config.tools.loader import ReferenceLoader
+    from h5dataloader_config.tools.synthetic import create_fromConfig
+    with h5py.File('synthetic.h5', mode='w', driver='core', backing_store=False) as h5file:
+        create_fromConfig(CONFIG, h5file, frames, max_points=max_points, overrides=STATIC_SOURCES)
+        reference = ReferenceLoader(CONFIG, h5file)
+        static = load_static(h5file)
+        results = {{}}
+        for name, func in [('reference', lambda idx: reference[idx]), ('generated', lambda idx: load_sample(h5file, static, idx))]:
+            start = time.perf_counter()
+            outputs = [func(idx) for idx in range(frames)]
+            results[name] = (time.perf_counter() - start, outputs)
+        mismatch = [tag for ref, gen in zip(results['reference'][1], results['generated'][1]) for tag in ref.keys() if not _equal(ref[tag], gen[tag])]
+    reference_time = results['reference'][0]
+    generated_time = results['generated'][0]
+    print('reference: {{0:.3f}} ms/sample'.format(reference_time / frames * 1e3))
+    print('generated: {{0:.3f}} ms/sample'.format(generated_time / frames * 1e3))
+    print('speedup  : {{0:.2f}}x'.format(reference_time / generated_time))
+    print('mismatch : {{0:s}}'.format(', '.join(sorted(set(mismatch))) if len(mismatch) > 0 else 'none'))
+    return len(mismatch) == 0
+
+if __name__ == '__main__':
+    sys.exit(0 if benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 100) else 1)
+'''
+
+def literal(value:Any) -> str:
+    """値をPythonのリテラルに変換"""
+    if isinstance(value, np.ndarray):
+        return 'np.array({0:s}, dtype=np.{1:s})'.format(repr(value.tolist()), value.dtype.name)
+    if isinstance(value, float):
+        if np.isnan(value): return 'np.nan'
+        return repr(float(value)) if np.isfinite(value) else ('np.inf' if value > 0 else '-np.inf')
+    if isinstance(value, (list, tuple)):
+        items:str = ', '.join(literal(item) for item in value)
+        return '({0:s},)'.format(items) if isinstance(value, tuple) and len(value) == 1 else ('({0:s})' if isinstance(value, tuple) else '[{0:s}]').format(items)
+    if isinstance(value, dict):
+        return '{' + ', '.join('{0:s}: {1:s}'.format(repr(key), literal(item)) for key, item in value.items()) + '}'
+    return repr(value)
+
+def is_inlinable(value:Any) -> bool:
+    if isinstance(value, dict): return True
+    if isinstance(value, np.ndarray): return value.size <= MAX_INLINE_SIZE
+    return False
+
+class LoaderGenerator(object):
+    """実行計画から, キー毎の処理を直列に並べたローダのソースコードを生成する"""
+    def __init__(self, config:Dict[str, dict], h5file:Union[h5py.File, None]=None) -> None:
+        self.config:Dict[str, dict] = config
+        self.h5file:Union[h5py.File, None] = h5file
+        self.plan:Dict[str, dict] = compile_plan(config)
+        self.nodes:Dict[str, dict] = self.plan[PLAN_TAG_NODES]
+        self.luts:Dict[str, np.ndarray] = create_labelLuts(config)
+        self.static:Set[str] = set()
+        self.constants:Dict[str, Any] = {}
+        self.static_sources:Dict[str, Dict[str, Any]] = {}
+        # 演算子毎に, 出力先・ノードID・パラメータ・入力の参照からソースの行を生成する
+        self.emitters:Dict[str, Callable[[str, str, Dict[str, Any], List[str]], List[str]]] = {
+            PLAN_OP_READ: self.__read,
+            PLAN_OP_DECODE: lambda dst, node_id, params, inputs: ['{0:s} = decode_image({1:s}, {2:s})'.format(dst, inputs[0], literal(params.get(CONFIG_TAG_ROI)))],
+            PLAN_OP_TF: lambda dst, node_id, params, inputs: ['{0:s} = compose_tf([{1:s}], {2:s})'.format(dst, ', '.join(inputs), literal(params[CONFIG_TAG_INVERSE]))],
+            PLAN_OP_LABEL: lambda dst, node_id, params, inputs: ['{0:s} = apply_label(LUT_{1:d}, {2:s})'.format(dst, list(self.luts.keys()).index(params[CONFIG_TAG_LABELTAG]), inputs[0])],
+            PLAN_OP_CVTCOLOR: self.__cvtColor,
+            PLAN_OP_CAST: lambda dst, node_id, params, inputs: ['{0:s} = {1:s}.astype(np.{2:s})'.format(dst, inputs[0], np.dtype(DTYPE_NUMPY[params[CONFIG_TAG_DST]]).name)],
+            PLAN_OP_COLORIZE: lambda dst, node_id, params, inputs: ['{0:s} = PALETTE_{1:s}[{2:s}]'.format(dst, node_id, inputs[0])],
+            PLAN_OP_DISPARITY2DEPTH: lambda dst, node_id, params, inputs: ["{0:s} = disparity2depth({1:s}, {2:s}['{3:s}'], float(h5file[{4:s}].attrs['{5:s}']))".format(dst, inputs[0], inputs[1], SUBTYPE_FX, self.h5key(params[CONFIG_TAG_KEY]), H5_ATTR_BASELINE)],
+            PLAN_OP_EXTRACT: self.__extract,
+            PLAN_OP_COMPOSEPOSE: lambda dst, node_id, params, inputs: ['{0:s} = quaternion2matrix({1:s}, {2:s})'.format(dst, inputs[0], inputs[1])],
+            PLAN_OP_GATHER: lambda dst, node_id, params, inputs: ["{0:s} = gather({1:s}, S.get('cull:{2:s}'), idx)".format(dst, inputs[0], params[CONFIG_TAG_MINIBATCH])],
+            PLAN_OP_TRANSFORM: lambda dst, node_id, params, inputs: self.emit_transform(dst, params[CONFIG_TAG_FROM], self.nodes[node_id][PLAN_TAG_INPUTS][:-1], inputs[-1]),
+            PLAN_OP_PROJECT: lambda dst, node_id, params, inputs: self.emit_project(dst, self.nodes[node_id][PLAN_TAG_INPUTS], params),
+            PLAN_OP_OUTPUT: lambda dst, node_id, params, inputs: self.emit_output(dst, self.nodes[node_id][PLAN_TAG_INPUTS][0], params),
+            PLAN_OP_SPARSE: lambda dst, node_id, params, inputs: ['{0:s} = to_sparse({1:s}, {2:s}, {3:s})'.format(dst, inputs[0], literal(params[CONFIG_TAG_SPARSE]), literal(params[CONFIG_TAG_ZERO]))],
+            PLAN_OP_DOWNSAMPLE: lambda dst, node_id, params, inputs: ['{0:s} = cv2.resize({1:s}, ({2:d}, {3:d}), interpolation={4:d})'.format(dst, inputs[0], params[CONFIG_TAG_SHAPE][1], params[CONFIG_TAG_SHAPE][0], params[CONFIG_TAG_INTERPOLATION])],
+        }
+
+        for node_id, node in self.nodes.items():
+            params:Dict[str, Any] = node[PLAN_TAG_PARAMS]
+            if node[PLAN_TAG_OP] == PLAN_OP_READ:
+                if params[CONFIG_TAG_STATIC] is True: self.static.add(node_id)
+            elif node[PLAN_TAG_OP] not in [PLAN_OP_OUTPUT, PLAN_OP_DOWNSAMPLE, PLAN_OP_SPARSE, PLAN_OP_GATHER] and all(input_id in self.static for input_id in node[PLAN_TAG_INPUTS]):
+                self.static.add(node_id)
+        if h5file is not None:
+            self.__evaluate_constants()
+
+    def __evaluate_constants(self) -> None:
+        reference = ReferenceLoader(self.config, self.h5file)
+        values:Dict[str, Any] = {}
+        for node_id, node in self.nodes.items():
+            if node_id not in self.static: continue
+            params:Dict[str, Any] = node[PLAN_TAG_PARAMS]
+            if node[PLAN_TAG_OP] == PLAN_OP_READ:
+                if params[CONFIG_TAG_TYPE] not in [TYPE_POSE, TYPE_INTRINSIC]: continue
+                item:Union[h5py.Group, h5py.Dataset] = self.h5file[params[CONFIG_TAG_KEY]]
+                if params[CONFIG_TAG_TYPE] == TYPE_POSE:
+                    self.static_sources[params[CONFIG_TAG_KEY]] = {
+                        SUBTYPE_TRANSLATION: item[SUBTYPE_TRANSLATION][()].tolist(),
+                        SUBTYPE_ROTATION: item[SUBTYPE_ROTATION][()].tolist(),
+                    }
+                else:
+                    self.static_sources[params[CONFIG_TAG_KEY]] = loader.read_intrinsic(item)
+            elif node[PLAN_TAG_OP] not in reference.ops.keys() or any(input_id not in values.keys() for input_id in node[PLAN_TAG_INPUTS]):
+                # 未知の演算子はemitで報告する
+                continue
+            inputs:List[Any] = [values[input_id] for input_id in node[PLAN_TAG_INPUTS]]
+            values[node_id] = reference.ops[node[PLAN_TAG_OP]](params, inputs, 0)
+            if is_inlinable(values[node_id]):
+                self.constants[node_id] = values[node_id]
+
+    def ref(self, node_id:str) -> str:
+        if node_id in self.constants.keys(): return 'C_' + node_id
+        if node_id in self.static: return "S['{0:s}']".format(node_id)
+        return node_id
+
+    def h5key(self, key:str) -> str:
+        if key.startswith('/'): return repr(key)
+        return "'{0:s}/%d/{1:s}' % idx".format(H5_KEY_DATA, key)
+
+    def is_tuple(self, node_id:str) -> bool:
+        node:dict = self.nodes[node_id]
+        if node[PLAN_TAG_OP] == PLAN_OP_TRANSFORM: return True
+        if node[PLAN_TAG_OP] == PLAN_OP_READ: return node[PLAN_TAG_PARAMS][CONFIG_TAG_TYPE] in [TYPE_SEMANTIC3D, TYPE_VOXEL_SEMANTIC3D]
+        if node[PLAN_TAG_OP] in [PLAN_OP_LABEL, PLAN_OP_GATHER]: return self.is_tuple(node[PLAN_TAG_INPUTS][0])
+        return False
+
+    def shape_of(self, node_id:str) -> Union[List[Union[int, None]], None]:
+        node:dict = self.nodes[node_id]
+        params:Dict[str, Any] = node[PLAN_TAG_PARAMS]
+        if node[PLAN_TAG_OP] == PLAN_OP_READ:
+            return get_roiShape(self.config[CONFIG_TAG_SRCDATA].get(params[CONFIG_TAG_KEY], {}).get(CONFIG_TAG_SHAPE), params.get(CONFIG_TAG_ROI))
+        if node[PLAN_TAG_OP] == PLAN_OP_DECODE:
+            read_params:Dict[str, Any] = self.nodes[node[PLAN_TAG_INPUTS][0]][PLAN_TAG_PARAMS]
+            return get_roiShape(get_imageShape(self.config[CONFIG_TAG_SRCDATA].get(read_params[CONFIG_TAG_KEY], {})), params.get(CONFIG_TAG_ROI))
+        if node[PLAN_TAG_OP] == PLAN_OP_PROJECT: return params[CONFIG_TAG_SHAPE]
+        if node[PLAN_TAG_OP] in [PLAN_OP_LABEL, PLAN_OP_CVTCOLOR, PLAN_OP_CAST, PLAN_OP_COLORIZE, PLAN_OP_DISPARITY2DEPTH]: return self.shape_of(node[PLAN_TAG_INPUTS][0])
+        return None
+
+    def emit(self, node_id:str) -> List[str]:
+        node:dict = self.nodes[node_id]
+        emitter = self.emitters.get(node[PLAN_TAG_OP])
+        if emitter is None:
+            raise ValueError('unknown plan op {0:s} at node {1:s}'.format(str(node[PLAN_TAG_OP]), node_id))
+        inputs:List[str] = [self.ref(input_id) for input_id in node[PLAN_TAG_INPUTS]]
+        return emitter(self.ref(node_id), node_id, node[PLAN_TAG_PARAMS], inputs)
+
+    def __read(self, dst:str, node_id:str, params:Dict[str, Any], inputs:List[str]) -> List[str]:
+        item:str = 'h5file[{0:s}]'.format(self.h5key(params[CONFIG_TAG_KEY]))
+        data_type:str = params[CONFIG_TAG_TYPE]
+        if data_type == TYPE_POSE:
+            return ['{0:s} = read_pose({1:s})'.format(dst, item)]
+        if data_type == TYPE_INTRINSIC:
+            return ['{0:s} = read_intrinsic({1:s})'.format(dst, item)]
+        if data_type == TYPE_SEMANTIC3D:
+            return ["{0:s} = {1:s}['{2:s}'][()], {1:s}['{3:s}'][()]".format(dst, item, SUBTYPE_POINTS, SUBTYPE_SEMANTIC1D)]
+        if data_type in [TYPE_VOXEL_POINTS, TYPE_VOXEL_SEMANTIC3D]:
+            return ['{0:s} = read_voxels({1:s})'.format(dst, item)]
+        if CONFIG_TAG_ROI in params.keys():
+            top, left, height, width = params[CONFIG_TAG_ROI]
+            lines:List[str] = ['{0:s} = {1:s}[{2:d}:{3:d}, {4:d}:{5:d}]'.format(dst, item, top, top + height, left, left + width)]
+        else:
+            lines = ['{0:s} = {1:s}[()]'.format(dst, item)]
+        if CONFIG_TAG_ENCODING in params.keys():
+            lines.append('{0:s} = decode({0:s}, {1:s}, {2:s})'.format(dst, literal(params[CONFIG_TAG_ENCODING][0]), literal(params[CONFIG_TAG_ENCODING][1])))
+        return lines
+
+    def __cvtColor(self, dst:str, node_id:str, params:Dict[str, Any], inputs:List[str]) -> List[str]:
+        before, code, after = get_cvtColorSteps(params[CONFIG_TAG_SRC], params[CONFIG_TAG_DST])
+        lines:List[str] = ['{0:s} = to_mono8({1:s})'.format(dst, inputs[0]) if before else '{0:s} = {1:s}'.format(dst, inputs[0])]
+        if code is not None:
+            lines.append('{0:s} = cv2.cvtColor({0:s}, {1:d})'.format(dst, code))
+        if after:
+            lines.append('{0:s} = to_mono16({0:s})'.format(dst))
+        return lines
+
+    def __extract(self, dst:str, node_id:str, params:Dict[str, Any], inputs:List[str]) -> List[str]:
+        if params[CONFIG_TAG_SRC] == TYPE_SEMANTIC3D:
+            return ['{0:s} = {1:s}[1]'.format(dst, inputs[0])]
+        if params[CONFIG_TAG_DST] == TYPE_TRANSLATION:
+            return ['{0:s} = {1:s}[:3, 3].astype(np.float32)'.format(dst, inputs[0])]
+        return ['{0:s} = matrix2quaternion({1:s})'.format(dst, inputs[0])]
+
+    def emit_transform(self, dst:str, from_types:List[str], input_ids:List[str], tf:str) -> List[str]:
+        data:Dict[str, str] = {from_type: self.ref(input_id) for from_type, input_id in zip(from_types, input_ids)}
+        if TYPE_DEPTH in data.keys():
+            lines:List[str] = ['points, (v, u) = backproject({0:s}, {1:s})'.format(data[TYPE_DEPTH], data[TYPE_INTRINSIC])]
+            lines.append('values = {0:s}[v, u]'.format(data[TYPE_SEMANTIC2D]) if TYPE_SEMANTIC2D in data.keys() else 'values = None')
+        elif TYPE_SEMANTIC3D in data.keys() or TYPE_VOXEL_SEMANTIC3D in data.keys():
+            lines = ['points, values = {0:s}'.format(data.get(TYPE_SEMANTIC3D, data.get(TYPE_VOXEL_SEMANTIC3D)))]
+        else:
+            lines = ['points, values = {0:s}, {1:s}'.format(data.get(TYPE_POINTS, data.get(TYPE_VOXEL_POINTS)), data.get(TYPE_SEMANTIC1D, 'None'))]
+        lines.append('{0:s} = transform_points(points, values, {1:s})'.format(dst, tf))
+        return lines
+
+    def emit_project(self, dst:str, input_ids:List[str], params:Dict[str, Any]) -> List[str]:
+        dst_type:str = params[CONFIG_TAG_TYPE]
+        shape:Tuple[int, int] = tuple(params[CONFIG_TAG_SHAPE][:2])
+        points:str = self.ref(input_ids[0])
+        lines:List[str] = ['points, values = {0:s}'.format(points) if self.is_tuple(input_ids[0]) else 'points, values = {0:s}, None'.format(points)]
+        if dst_type == TYPE_DEPTH: lines.append('values = None')
+        zero = ZERO_VALUE[dst_type]
+        zero = 0 if zero is None else zero
+        if CONFIG_TAG_INTRINSIC in params.keys():
+            # mini-batchに記録した内部パラメータを埋め込む
+            fx, fy, cx, cy = params[CONFIG_TAG_INTRINSIC]
+            lines.append('{0:s} = project(points, values, {1:s}, {2:s}, {3:s}, {4:s}, {5:s}, {6:s})'.format(dst, literal(fx), literal(fy), literal(cx), literal(cy), literal(shape), literal(zero)))
+        elif input_ids[1] in self.constants.keys():
+            # 出力サイズに合わせた内部パラメータを埋め込む
+            fx, fy, cx, cy = scale_intrinsic(self.constants[input_ids[1]], shape, params.get(CONFIG_TAG_ROI))
+            lines.append('{0:s} = project(points, values, {1:s}, {2:s}, {3:s}, {4:s}, {5:s}, {6:s})'.format(dst, literal(fx), literal(fy), literal(cx), literal(cy), literal(shape), literal(zero)))
+        else:
+            lines.append('{0:s} = project(points, values, *scale_intrinsic({1:s}, {2:s}, {3:s}), {2:s}, {4:s})'.format(dst, self.ref(input_ids[1]), literal(shape), literal(params.get(CONFIG_TAG_ROI)), literal(zero)))
+        return lines
+
+    def emit_output(self, dst:str, input_id:str, params:Dict[str, Any]) -> List[str]:
+        data_type:str = params[CONFIG_TAG_TYPE]
+        shape:Union[List[Union[int, None]], None] = params[CONFIG_TAG_SHAPE]
+        interpolation:Union[int, None] = params[CONFIG_TAG_INTERPOLATION]
+        value_range:Union[List[float], None] = params[CONFIG_TAG_RANGE]
+        lines:List[str] = ['{0:s} = {1:s}'.format(dst, self.ref(input_id))]
+        if data_type == TYPE_POINTS and self.is_tuple(input_id):
+            # 座標変換の結果は (点群, 点毎の値) のため, 点群だけを出力する
+            lines = ['{0:s} = {1:s}[0]'.format(dst, self.ref(input_id))]
+        if interpolation is not None and shape is not None:
+            src_shape = self.shape_of(input_id)
+            resize:str = '{0:s} = cv2.resize({0:s}, ({1:d}, {2:d}), interpolation={3:d})'.format(dst, shape[1], shape[0], interpolation)
+            if src_shape is None or None in src_shape[:2]:
+                lines.append('if {0:s}.shape[:2] != ({1:d}, {2:d}): {3:s}'.format(dst, shape[0], shape[1], resize))
+            elif tuple(src_shape[:2]) != tuple(shape[:2]):
+                lines.append(resize)
+        if value_range is not None and params.get(CONFIG_TAG_CLEAN) is not True:
+            low, high = literal(float(value_range[0])), literal(float(value_range[1]))
+            if data_type in [TYPE_DEPTH, TYPE_DISPARITY]:
+                lines.append('{0:s} = np.where(({0:s} < {1:s}) | ({0:s} > {2:s}), {3:s}, {0:s})'.format(dst, low, high, literal(ZERO_VALUE[data_type])))
+            elif data_type in [TYPE_POINTS]:
+                lines.append('norm = np.linalg.norm({0:s}, axis=1)'.format(dst))
+                lines.append('{0:s} = {0:s}[(norm >= {1:s}) & (norm <= {2:s})]'.format(dst, low, high))
+            elif data_type in [TYPE_SEMANTIC3D]:
+                lines.append('norm = np.linalg.norm({0:s}[0], axis=1)'.format(dst))
+                lines.append('mask = (norm >= {0:s}) & (norm <= {1:s})'.format(low, high))
+                lines.append('{0:s} = {0:s}[0][mask], {0:s}[1][mask]'.format(dst))
+            else:
+                lines.append('{0:s} = np.clip({0:s}, {1:s}, {2:s})'.format(dst, literal(value_range[0]), literal(value_range[1])))
+        if params[CONFIG_TAG_NORMALIZE] is True:
+            lines.append('{0:s} = (({0:s}.astype(np.float32) - {1:s}) / ({2:s} - {1:s})).astype(np.float32)'.format(dst, literal(value_range[0]), literal(value_range[1])))
+        return lines
+
+    def generate(self, config_name:str='config') -> str:
+        source:List[str] = [MODULE_HEADER.format(config=config_name, file_path=repr(self.config.get(H5_ATTR_FILEPATH, '')))]
+        source += [inspect.getsource(func) for func in EMBEDDED_FUNCTIONS]
+
+        for lut_idx, (label_tag, lut) in enumerate(self.luts.items()):
+            source.append('# label-tag: {0:s}\nLUT_{1:d} = {2:s}\n'.format(label_tag, lut_idx, literal(lut)))
+        for node_id, value in self.constants.items():
+            source.append('C_{0:s} = {1:s}\n'.format(node_id, literal(value)))
+        for node_id, node in self.nodes.items():
+            if node[PLAN_TAG_OP] != PLAN_OP_COLORIZE or node_id in self.constants.keys(): continue
+            palette:np.ndarray = create_palette(node[PLAN_TAG_PARAMS][CONFIG_TAG_COLOR], node[PLAN_TAG_PARAMS][CONFIG_TAG_DST])
+            source.append('PALETTE_{0:s} = {1:s}\n'.format(node_id, literal(palette)))
+
+        static_lines:List[str] = []
+        sample_lines:List[str] = []
+        for node_id in self.nodes.keys():
+            if node_id in self.constants.keys(): continue
+            lines:List[str] = self.emit(node_id)
+            (static_lines if node_id in self.static else sample_lines).extend(lines)
+        outputs:str = ', '.join("'{0:s}': {1:s}".format(tag, self.ref(node_id)) for tag, node_id in self.plan[PLAN_TAG_OUTPUTS].items())
+
+        source.append('def load_static(h5file):\n    S = {}\n' + ''.join('    {0:s}\n'.format(line) for line in static_lines) + '    return S\n')
+        source.append('def load_sample(h5file, S, idx):\n' + ''.join('    {0:s}\n'.format(line) for line in sample_lines) + '    return {' + outputs + '}\n')
+
+        config_json:str = json.dumps({key: item for key, item in self.config.items() if key != CONFIG_TAG_PLAN})
+        source.append(MODULE_FOOTER.format(config_json=repr(config_json), static_sources=literal(self.static_sources)))
+        return '\n'.join(source)
+
+def add_parser(subparsers) -> None:
+    parser = subparsers.add_parser('codegen', help='generate a specialized loader module from a config')
+    parser.add_argument('config', type=str, help='config file (JSON)')
+    parser.add_argument('-o', '--output', type=str, default=None, help='output module (default: <config>_loader.py)')
+    parser.set_defaults(func=run)
+
+def run(args) -> None:
+    config = load_config(args.config)
+    output:str = args.output if args.output is not None else os.path.splitext(args.config)[0] + '_loader.py'
+    h5path:str = config.get(H5_ATTR_FILEPATH, '')
+    if os.path.isfile(h5path):
+        with h5py.File(h5path, mode='r') as h5file:
+            source:str = LoaderGenerator(config, h5file).generate(os.path.basename(args.config))
+    else:
+        print('{0:s} not found: static transforms and intrinsics are loaded at runtime'.format(h5path))
+        source = LoaderGenerator(config).generate(os.path.basename(args.config))
+    with open(output, mode='w') as pyfile:
+        pyfile.write(source)
+    print('saved: {0:s}'.format(output))
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Union
+import numpy as np
+import h5py
+
+from ..common.structure import *
+from ..common.codec import encode_image, get_compressedType, get_pixelType
+from .utils import *
+
+def get_compressSources(config:Dict[str, dict], codec:str, keys:Union[List[str], None]=None) -> Dict[str, str]:
+    """符号化できる画像のsrc-dataと符号化後の型
+
+    Args:
+        config (Dict[str, dict]): 設定
+        codec (str): 'png' または 'jpeg'
+        keys (Union[List[str], None], optional): 対象のsrc-dataのキー. Noneの場合は全てのsrc-data. Defaults to None.
+
+    Returns:
+        Dict[str, str]: src-dataのキー, 符号化後の型
+    """
+    srcdata_dict:Dict[str, dict] = config[CONFIG_TAG_SRCDATA]
+    sources:Dict[str, str] = {}
+    for key in (srcdata_dict.keys() if keys is None else keys):
+        item:Union[dict, None] = srcdata_dict.get(key)
+        if item is None or item.get(CONFIG_TAG_SHAPE) is None: continue
+        compressed_type:Union[str, None] = get_compressedType(item[CONFIG_TAG_TYPE], codec)
+        if compressed_type is not None:
+            sources[key] = compressed_type
+    return sources
+
+def _encode_chunk(h5path:str, names:List[str], codec:str, quality:Union[int, None]) -> List[np.ndarray]:
+    with h5py.File(h5path, mode='r') as h5file:
+        return [encode_image(h5file[name][()], codec, quality) for name in names]
+
+def write_compressed(h5path:str, dst:h5py.File, sources:Dict[str, str], codec:str, quality:Union[int, None]=None, jobs:int=1, chunk_size:int=64) -> Dict[str, List[int]]:
+    """HDF5ファイルを複製し, 指定したsrc-dataの画像をフレーム毎にPNG/JPEGで符号化して書き込む
+
+    符号化はフレームをchunk_size毎に分けてプロセスプールで行い, 書き込みは順に行う.
+
+    Args:
+        h5path (str): 元のHDF5ファイルのパス
+        dst (h5py.File): 書き込み先
+        sources (Dict[str, str]): src-dataのキー, 符号化後の型
+        codec (str): 'png' または 'jpeg'
+        quality (Union[int, None], optional): JPEGの品質またはPNGの圧縮レベル. Defaults to None.
+        jobs (int, optional): プロセス数. Defaults to 1.
+        chunk_size (int, optional): 1プロセスが1度に符号化するフレーム数. Defaults to 64.
+
+    Returns:
+        Dict[str, List[int]]: src-dataのキー毎の, フレーム毎の符号化後のバイト数
+    """
+    sizes:Dict[str, List[int]] = {key: [] for key in sources.keys()}
+    with h5py.File(h5path, mode='r') as src:
+        targets:Dict[str, str] = get_frameDatasets(src, list(sources.keys()))
+        copy_h5Tree(src, dst, targets)
+        names:List[str] = list(targets.keys())
+        chunks:List[List[str]] = [names[begin:begin + chunk_size] for begin in range(0, len(names), chunk_size)]
+
+        def write_chunk(chunk:List[str], encoded_list:List[np.ndarray]) -> None:
+            for name, encoded in zip(chunk, encoded_list):
+                key:str = targets[name]
+                dataset:h5py.Dataset = dst[os.path.dirname(name) or '/'].create_dataset(os.path.basename(name), data=encoded)
+                dataset.attrs.update(src[name].attrs)
+                dataset.attrs[H5_ATTR_TYPE] = sources[key]
+                sizes[key].append(len(encoded))
+
+        if jobs > 1 and len(chunks) > 1:
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                results:Iterable[List[np.ndarray]] = executor.map(_encode_chunk, [h5path] * len(chunks), chunks, [codec] * len(chunks), [quality] * len(chunks))
+                for chunk, encoded_list in zip(chunks, results):
+                    write_chunk(chunk, encoded_list)
+        else:
+            for chunk in chunks:
+                write_chunk(chunk, [encode_image(src[name][()], codec, quality) for name in chunk])
+    return sizes
+
+def update_srcData(item:Dict[str, Union[str, list, dict, None]], compressed_type:str, sizes:List[int]) -> None:
+    """src-dataを符号化した画像の型と, フレーム毎のバイト数の形状に書き換える"""
+    item[CONFIG_TAG_IMAGESHAPE] = item[CONFIG_TAG_SHAPE]
+    item[CONFIG_TAG_TYPE] = compressed_type
+    item.pop(CONFIG_TAG_SHAPEMIN, None)
+    item.pop(CONFIG_TAG_SHAPEMAX, None)
+    if len(set(sizes)) == 1:
+        item[CONFIG_TAG_SHAPE] = [sizes[0]]
+    else:
+        item[CONFIG_TAG_SHAPE] = [None]
+        item[CONFIG_TAG_SHAPEMIN] = [min(sizes, default=0)]
+        item[CONFIG_TAG_SHAPEMAX] = [max(sizes, default=0)]
+
+def retype_minibatches(config:Dict[str, dict], key:str, compressed_type:str) -> List[str]:
+    """符号化したsrc-dataを参照するmini-batchの入力を, 復号してから元の型として用いる変換に書き換える
+
+    Returns:
+        List[str]: 書き換えたmini-batchのタグ
+    """
+    pixel_type:str = get_pixelType(compressed_type)
+    tags:List[str] = []
+    for minibatch_tag, minibatch_config in config[CONFIG_TAG_MINIBATCH].items():
+        from_dict:Dict[str, str] = minibatch_config[CONFIG_TAG_FROM]
+        if from_dict.get(pixel_type) != key: continue
+        steps:List[Dict[str, Union[str, List[str]]]] = minibatch_config.get(CONFIG_TAG_STEPS) or [{CONFIG_TAG_TYPE: minibatch_config[CONFIG_TAG_TYPE], CONFIG_TAG_FROM: list(from_dict.keys())}]
+        minibatch_config[CONFIG_TAG_FROM] = {(compressed_type if from_type == pixel_type else from_type): from_key for from_type, from_key in from_dict.items()}
+        if steps != [{CONFIG_TAG_TYPE: pixel_type, CONFIG_TAG_FROM: [pixel_type]}]:
+            minibatch_config[CONFIG_TAG_STEPS] = [{CONFIG_TAG_TYPE: pixel_type, CONFIG_TAG_FROM: [compressed_type]}] + steps
+        tags.append(minibatch_tag)
+    return tags
+
+def add_parser(subparsers) -> None:
+    parser = subparsers.add_parser('compress', help='re-encode image sources as per-frame PNG/JPEG datasets in a copy of the HDF5 file')
+    parser.add_argument('config', type=str, help='config file (JSON)')
+    parser.add_argument('-o', '--output', type=str, required=True, help='HDF5 file to write; the config is pointed to it')
+    parser.add_argument('--codec', type=str, default=CODEC_PNG, choices=CODECS, help='png is lossless, jpeg is lossy')
+    parser.add_argument('--quality', type=int, default=None, help='JPEG quality (0-100) or PNG compression level (0-9)')
+    parser.add_argument('--keys', type=str, nargs='+', default=None, help='src-data keys to encode (default: all image sources)')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1, help='number of processes')
+    parser.add_argument('--chunk-size', type=int, default=64, help='frames per process task')
+    parser.set_defaults(func=run)
+
+def run(args) -> None:
+    config = load_config(args.config)
+    sources:Dict[str, str] = get_compressSources(config, args.codec, args.keys)
+    for key in (args.keys or []):
+        if key not in sources.keys():
+            print('{0:s}: not an image source that can be encoded as {1:s}'.format(key, args.codec))
+    if len(sources) == 0:
+        print('no image source to encode')
+        return
+    with h5py.File(args.output, mode='w') as dst:
+        sizes:Dict[str, List[int]] = write_compressed(config[H5_ATTR_FILEPATH], dst, sources, args.codec, args.quality, args.jobs, args.chunk_size)
+    for key, compressed_type in sources.items():
+        item:Dict[str, Union[str, list, dict, None]] = config[CONFIG_TAG_SRCDATA][key]
+        raw_bytes:int = int(np.prod(item[CONFIG_TAG_SHAPE])) * np.dtype(DTYPE_NUMPY[item[CONFIG_TAG_TYPE]]).itemsize if None not in item[CONFIG_TAG_SHAPE] else 0
+        encoded_bytes:float = float(np.mean(sizes[key])) if len(sizes[key]) > 0 else 0.0
+        update_srcData(item, compressed_type, sizes[key])
+        tags:List[str] = retype_minibatches(config, key, compressed_type)
+        print('{0:s} -> {1:s}: {2:.1f} KiB per frame{3:s}{4:s}'.format(
+            key, compressed_type, encoded_bytes / 1024,
+            ' ({0:.1%} of raw)'.format(encoded_bytes / raw_bytes) if raw_bytes > 0 else '',
+            ', mini-batch {0:s}'.format(', '.join(tags)) if len(tags) > 0 else ''
+        ))
+    config[H5_ATTR_FILEPATH] = os.path.abspath(args.output)
+    save_config(config, args.config)
+    print('saved: {0:s}'.format(args.output))
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple, Union
+import numpy as np
+import h5py
+
+from ..common.structure import *
+from ..common.scan import get_length
+from ..common.intrinsic import get_projection
+from .utils import *
+from .plan import get_tfChain
+from .loader import compose_tf, read_dataset, read_intrinsic, read_pose, scale_intrinsic
+
+# 1度に座標変換する点数
+CULL_BLOCK_SIZE:int = 1 << 20
+# 画像の外側に余分に残す幅 [px] と, 距離の上限に対する相対的な余裕 (ローダと丸めが異なる点を落とさないため)
+CULL_MARGIN_PIXELS:float = 1.0
+CULL_MARGIN_DEPTH:float = 1e-6
+
+def get_cullSources(minibatch_config:Dict[str, Union[str, dict]]) -> List[str]:
+    """間引きの対象とするフレームに依存しない点群のキー (対象外のmini-batchでは空)"""
+    if minibatch_config[CONFIG_TAG_TYPE] not in PROJECTED_TYPES or CONFIG_TAG_STEPS in minibatch_config.keys(): return []
+    from_dict:Dict[str, str] = minibatch_config[CONFIG_TAG_FROM]
+    if TYPE_POSE not in from_dict.keys() or TYPE_INTRINSIC not in from_dict.keys(): return []
+    shape:Union[List[Union[int, None]], None] = minibatch_config.get(CONFIG_TAG_SHAPE)
+    if shape is None or len(shape) < 2 or None in shape[:2]: return []
+    keys:List[str] = [from_key for from_type, from_key in from_dict.items() if from_type in [TYPE_POINTS, TYPE_SEMANTIC1D, TYPE_SEMANTIC3D]]
+    if len(keys) == 0 or not all(key.startswith('/') for key in keys): return []
+    return keys
+
+def get_culledMinibatches(config:Dict[str, dict]) -> List[str]:
+    """間引きのインデックスがサイドカーにあるmini-batch"""
+    return config.get(CONFIG_TAG_SIDECAR, {}).get(CONFIG_TAG_CULL, {}).get(CONFIG_TAG_MINIBATCH, [])
+
+def load_culls(config:Dict[str, dict], jsonpath:str) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+    """mini-batch毎の可視点のCSRインデックス (indptr, indices)"""
+    arrays:Union[Dict[str, np.ndarray], None] = load_sidecar(config, jsonpath, CONFIG_TAG_CULL)
+    if arrays is None: return {}
+    return {tag: (arrays[tag + '.indptr'], arrays[tag + '.indices']) for tag in get_culledMinibatches(config)}
+
+def get_pointsDataset(h5file:h5py.File, key:str) -> h5py.Dataset:
+    item:Union[h5py.Group, h5py.Dataset] = h5file[key]
+    return item[SUBTYPE_POINTS] if isinstance(item, h5py.Group) else item
+
+def get_visibleIndices(points:np.ndarray, matrix:np.ndarray, intrinsic:Tuple[float, float, float, float], shape:Tuple[int, int], max_depth:Union[float, None]=None) -> np.ndarray:
+    """視錐台 (と距離の上限) に含まれる点のインデックス
+
+    Args:
+        points (np.ndarray): 点群 (N, 3)
+        matrix (np.ndarray): 点群の座標系から出力の座標系への変換行列 (4, 4)
+        intrinsic (Tuple[float, float, float, float]): 出力サイズに合わせたFx, Fy, Cx, Cy
+        shape (Tuple[int, int]): 出力の高さと幅
+        max_depth (Union[float, None], optional): 距離の上限. Defaults to None.
+
+    Returns:
+        np.ndarray: 昇順のインデックス
+    """
+    fx, fy, cx, cy = intrinsic
+    height, width = shape
+    rotation:np.ndarray = matrix[:3, :3].T.astype(np.float32)
+    translation:np.ndarray = matrix[:3, 3].astype(np.float32)
+    indices:List[np.ndarray] = []
+    for begin in range(0, len(points), CULL_BLOCK_SIZE):
+        block:np.ndarray = points[begin:begin + CULL_BLOCK_SIZE] @ rotation + translation
+        z:np.ndarray = block[:, 2]
+        visible:np.ndarray = z > 0
+        if max_depth is not None:
+            visible &= z <= max_depth * (1.0 + CULL_MARGIN_DEPTH)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            u:np.ndarray = block[:, 0] * fx / z + cx
+            v:np.ndarray = block[:, 1] * fy / z + cy
+        visible &= (u >= -CULL_MARGIN_PIXELS) & (u < width + CULL_MARGIN_PIXELS) & (v >= -CULL_MARGIN_PIXELS) & (v < height + CULL_MARGIN_PIXELS)
+        indices.append(np.flatnonzero(visible) + begin)
+    return np.concatenate(indices) if len(indices) > 0 else np.zeros((0,), dtype=np.int64)
+
+def get_frameParams(h5file:h5py.File, config:Dict[str, dict], minibatch_config:Dict[str, Union[str, dict]], idx:int) -> Union[Tuple[np.ndarray, Tuple[float, float, float, float]], None]:
+    """フレーム毎の変換行列と内部パラメータ (データが無い場合はNone)"""
+    from_dict:Dict[str, str] = minibatch_config[CONFIG_TAG_FROM]
+    src_keys, dst_keys = get_tfChain(config, from_dict[TYPE_POSE], minibatch_config[CONFIG_TAG_FRAMEID])
+    h5keys:List[str] = [get_h5Key(key, idx) for key in src_keys + dst_keys + [from_dict[TYPE_INTRINSIC]]]
+    if not all(h5key in h5file for h5key in h5keys): return None
+    matrices:List[np.ndarray] = [read_pose(h5file[h5key]) for h5key in h5keys[:-1]]
+    matrix:np.ndarray = compose_tf(matrices, [False] * len(src_keys) + [True] * len(dst_keys))
+    if CONFIG_TAG_INTRINSIC in minibatch_config.keys():
+        intrinsic = get_projection(minibatch_config[CONFIG_TAG_INTRINSIC])
+    else:
+        intrinsic = scale_intrinsic(read_intrinsic(h5file[h5keys[-1]]), minibatch_config[CONFIG_TAG_SHAPE], minibatch_config.get(CONFIG_TAG_ROI))
+    return matrix, intrinsic
+
+# ワーカープロセスで読み込んだ点群と, その (HDF5ファイルのパス, キー)
+# ProcessPoolExecutorのinitializerはPython 3.7以降のため, 最初のチャンクで読み込んで再利用する
+_worker_points:Union[Tuple[Tuple[str, str], np.ndarray], None] = None
+
+def _get_workerPoints(h5path:str, key:str) -> np.ndarray:
+    global _worker_points
+    if _worker_points is None or _worker_points[0] != (h5path, key):
+        with h5py.File(h5path, mode='r') as h5file:
+            _worker_points = ((h5path, key), read_dataset(get_pointsDataset(h5file, key)))
+    return _worker_points[1]
+
+def _cull_chunk(h5path:str, key:str, matrices:np.ndarray, intrinsics:np.ndarray, shape:Tuple[int, int], max_depth:Union[float, None]) -> List[np.ndarray]:
+    points:np.ndarray = _get_workerPoints(h5path, key)
+    return [get_visibleIndices(points, matrix, tuple(intrinsic), shape, max_depth) for matrix, intrinsic in zip(matrices, intrinsics)]
+
+def cull_minibatch(h5path:str, config:Dict[str, dict], minibatch_config:Dict[str, Union[str, dict]], jobs:int=1, chunk_size:int=64) -> Tuple[np.ndarray, np.ndarray]:
+    """フレーム毎の可視点のインデックスを求め, CSR形式で返す
+
+    Args:
+        h5path (str): HDF5ファイルのパス
+        config (Dict[str, dict]): 設定
+        minibatch_config (Dict[str, Union[str, dict]]): 対象のmini-batch
+        jobs (int, optional): プロセス数. Defaults to 1.
+        chunk_size (int, optional): 1プロセスが1度に処理するフレーム数. Defaults to 64.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: indptr (フレーム数 + 1), indices
+    """
+    key:str = get_cullSources(minibatch_config)[0]
+    shape:Tuple[int, int] = tuple(minibatch_config[CONFIG_TAG_SHAPE][:2])
+    value_range = minibatch_config.get(CONFIG_TAG_RANGE)
+    max_depth:Union[float, None] = float(value_range[1]) if minibatch_config[CONFIG_TAG_TYPE] == TYPE_DEPTH and value_range is not None else None
+
+    with h5py.File(h5path, mode='r') as h5file:
+        length:int = get_length(h5file)
+        num_points:int = len(get_pointsDataset(h5file, key))
+        frame_params = [get_frameParams(h5file, config, minibatch_config, idx) for idx in range(length)]
+    frames:List[int] = [idx for idx, params in enumerate(frame_params) if params is not None]
+    matrices:np.ndarray = np.array([frame_params[idx][0] for idx in frames], dtype=np.float64).reshape((-1, 4, 4))
+    intrinsics:np.ndarray = np.array([frame_params[idx][1] for idx in frames], dtype=np.float64).reshape((-1, 4))
+
+    chunks:List[slice] = [slice(begin, begin + chunk_size) for begin in range(0, len(frames), chunk_size)]
+    if jobs > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = executor.map(_cull_chunk, [h5path] * len(chunks), [key] * len(chunks), [matrices[chunk] for chunk in chunks], [intrinsics[chunk] for chunk in chunks], [shape] * len(chunks), [max_depth] * len(chunks))
+            visible:List[np.ndarray] = [indices for result in results for indices in result]
+    else:
+        with h5py.File(h5path, mode='r') as h5file:
+            points:np.ndarray = read_dataset(get_pointsDataset(h5file, key))
+        visible = [get_visibleIndices(points, matrix, tuple(intrinsic), shape, max_depth) for matrix, intrinsic in zip(matrices, intrinsics)]
+
+    counts:np.ndarray = np.zeros((length,), dtype=np.int64)
+    counts[frames] = [len(indices) for indices in visible]
+    indptr:np.ndarray = np.zeros((length + 1,), dtype=np.int64)
+    np.cumsum(counts, out=indptr[1:])
+    indices:np.ndarray = np.concatenate(visible).astype(index_dtype(num_points)) if len(visible) > 0 else np.zeros((0,), dtype=index_dtype(num_points))
+    return indptr, indices
+
+def add_parser(subparsers) -> None:
+    parser = subparsers.add_parser('cull', help='precompute per-frame visible map point indices of projected mini-batches')
+    parser.add_argument('config', type=str, help='config file (JSON)')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1, help='number of processes')
+    parser.add_argument('--chunk-size', type=int, default=64, help='frames per process task')
+    parser.set_defaults(func=run)
+
+def run(args) -> None:
+    config = load_config(args.config)
+    arrays:Dict[str, np.ndarray] = {}
+    tags:List[str] = []
+    for minibatch_tag, minibatch_config in config[CONFIG_TAG_MINIBATCH].items():
+        keys:List[str] = get_cullSources(minibatch_config)
+        if len(keys) == 0: continue
+        indptr, indices = cull_minibatch(config[H5_ATTR_FILEPATH], config, minibatch_config, args.jobs, args.chunk_size)
+        arrays[minibatch_tag + '.indptr'] = indptr
+        arrays[minibatch_tag + '.indices'] = indices
+        tags.append(minibatch_tag)
+        with h5py.File(config[H5_ATTR_FILEPATH], mode='r') as h5file:
+            num_points:int = len(get_pointsDataset(h5file, keys[0]))
+        frames:int = len(indptr) - 1
+        print('{0:s}: {1:.1f} of {2:d} points visible per frame ({3:.2%})'.format(minibatch_tag, indptr[-1] / max(frames, 1), num_points, indptr[-1] / max(frames * num_points, 1)))
+
+    if len(tags) == 0:
+        print('no projected mini-batch from a static point cloud')
+        return
+    path = save_sidecar(config, args.config, CONFIG_TAG_CULL, arrays, **{CONFIG_TAG_MINIBATCH: tags})
+    save_config(config, args.config)
+    print('saved: {0:s}'.format(path))
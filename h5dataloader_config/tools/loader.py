@@ -0,0 +1,364 @@
+# -*- coding: utf-8 -*-
+
+from typing import Any, Callable, Dict, List, Tuple, Union
+import numpy as np
+import cv2
+import h5py
+
+from ..common.structure import *
+from ..common.scan import get_length
+from ..common.roi import get_roiSlices
+from .utils import *
+from .plan import *
+
+CVTCOLOR_CODE:Dict[Tuple[str, str], int] = {
+    (TYPE_BGR8, TYPE_RGB8): cv2.COLOR_BGR2RGB,
+    (TYPE_RGB8, TYPE_BGR8): cv2.COLOR_RGB2BGR,
+    (TYPE_BGRA8, TYPE_BGR8): cv2.COLOR_BGRA2BGR,
+    (TYPE_RGBA8, TYPE_BGR8): cv2.COLOR_RGBA2BGR,
+    (TYPE_BGRA8, TYPE_RGB8): cv2.COLOR_BGRA2RGB,
+    (TYPE_RGBA8, TYPE_RGB8): cv2.COLOR_RGBA2RGB,
+    (TYPE_BGR8, TYPE_BGRA8): cv2.COLOR_BGR2BGRA,
+    (TYPE_RGB8, TYPE_BGRA8): cv2.COLOR_RGB2BGRA,
+    (TYPE_RGBA8, TYPE_BGRA8): cv2.COLOR_RGBA2BGRA,
+    (TYPE_BGR8, TYPE_RGBA8): cv2.COLOR_BGR2RGBA,
+    (TYPE_RGB8, TYPE_RGBA8): cv2.COLOR_RGB2RGBA,
+    (TYPE_BGRA8, TYPE_RGBA8): cv2.COLOR_BGRA2RGBA,
+    (TYPE_BGR8, TYPE_MONO8): cv2.COLOR_BGR2GRAY,
+    (TYPE_RGB8, TYPE_MONO8): cv2.COLOR_RGB2GRAY,
+    (TYPE_BGRA8, TYPE_MONO8): cv2.COLOR_BGRA2GRAY,
+    (TYPE_RGBA8, TYPE_MONO8): cv2.COLOR_RGBA2GRAY,
+    (TYPE_MONO8, TYPE_BGR8): cv2.COLOR_GRAY2BGR,
+    (TYPE_MONO8, TYPE_RGB8): cv2.COLOR_GRAY2RGB,
+    (TYPE_MONO8, TYPE_BGRA8): cv2.COLOR_GRAY2BGRA,
+    (TYPE_MONO8, TYPE_RGBA8): cv2.COLOR_GRAY2RGBA,
+}
+# 色に変換する型のチャンネルの並び (BGRの色のインデックス, 3はアルファ)
+PALETTE_CHANNELS:Dict[str, List[int]] = {
+    TYPE_BGR8: [0, 1, 2],
+    TYPE_RGB8: [2, 1, 0],
+    TYPE_BGRA8: [0, 1, 2, 3],
+    TYPE_RGBA8: [2, 1, 0, 3],
+}
+
+# 以下の関数はcodegenで生成するモジュールにソースごと埋め込むため, numpyとcv2以外に依存しないこと
+
+def read_intrinsic(item):
+    return {name: float(item[name][()]) if name in item else float(item.attrs[name]) for name in ['Fx', 'Fy', 'Cx', 'Cy', 'height', 'width']}
+
+def quaternion2matrix(translation, rotation):
+    x, y, z, w = [float(v) for v in rotation]
+    matrix = np.eye(4, dtype=np.float64)
+    matrix[:3, :3] = [
+        [1.0 - 2.0 * (y * y + z * z), 2.0 * (x * y - z * w), 2.0 * (x * z + y * w)],
+        [2.0 * (x * y + z * w), 1.0 - 2.0 * (x * x + z * z), 2.0 * (y * z - x * w)],
+        [2.0 * (x * z - y * w), 2.0 * (y * z + x * w), 1.0 - 2.0 * (x * x + y * y)],
+    ]
+    matrix[:3, 3] = translation
+    return matrix
+
+def matrix2quaternion(matrix):
+    m = matrix[:3, :3]
+    w = np.sqrt(max(0.0, 1.0 + m[0, 0] + m[1, 1] + m[2, 2])) / 2.0
+    x = np.copysign(np.sqrt(max(0.0, 1.0 + m[0, 0] - m[1, 1] - m[2, 2])) / 2.0, m[2, 1] - m[1, 2])
+    y = np.copysign(np.sqrt(max(0.0, 1.0 - m[0, 0] + m[1, 1] - m[2, 2])) / 2.0, m[0, 2] - m[2, 0])
+    z = np.copysign(np.sqrt(max(0.0, 1.0 - m[0, 0] - m[1, 1] + m[2, 2])) / 2.0, m[1, 0] - m[0, 1])
+    return np.array([x, y, z, w], dtype=np.float32)
+
+def read_pose(item):
+    return quaternion2matrix(item['translation'][()], item['rotation'][()])
+
+def read_voxels(item):
+    voxels = item[()]
+    cells = [cell for cell in voxels.reshape(-1) if cell is not None and len(cell) > 0] if voxels.dtype == object else [voxels.reshape(-1)]
+    if len(cells) == 0:
+        return np.zeros((0, 3), dtype=np.float32)
+    records = np.concatenate(cells)
+    points = np.stack([records['x'], records['y'], records['z']], axis=1).astype(np.float32)
+    if 'label' in records.dtype.names:
+        return points, records['label']
+    return points
+
+def compose_tf(matrices, inverse):
+    src = np.eye(4, dtype=np.float64)
+    dst = np.eye(4, dtype=np.float64)
+    for matrix, inv in zip(matrices, inverse):
+        if inv:
+            dst = matrix @ dst
+        else:
+            src = matrix @ src
+    return np.linalg.inv(dst) @ src
+
+def apply_label(lut, data):
+    if isinstance(data, tuple):
+        return data[0], lut[data[1]]
+    return lut[data]
+
+def backproject(depth, intrinsic):
+    height, width = depth.shape[:2]
+    fx = intrinsic['Fx'] * width / intrinsic['width']
+    fy = intrinsic['Fy'] * height / intrinsic['height']
+    cx = intrinsic['Cx'] * width / intrinsic['width']
+    cy = intrinsic['Cy'] * height / intrinsic['height']
+    v, u = np.nonzero(depth > 0)
+    z = depth[v, u].astype(np.float32)
+    return np.stack([(u - cx) * z / fx, (v - cy) * z / fy, z], axis=1).astype(np.float32), (v, u)
+
+def disparity2depth(disparity, fx, baseline):
+    depth = np.zeros(disparity.shape, dtype=np.float32)
+    valid = disparity > 0
+    depth[valid] = np.float32(fx * baseline) / disparity[valid].astype(np.float32)
+    return depth
+
+def to_mono8(data):
+    return (data >> 8).astype(np.uint8)
+
+def to_mono16(data):
+    return data.astype(np.uint16) * np.uint16(257)
+
+def transform_points(points, values, matrix):
+    points = points @ matrix[:3, :3].T.astype(np.float32) + matrix[:3, 3].astype(np.float32)
+    return points, values
+
+def project(points, values, fx, fy, cx, cy, shape, zero):
+    height, width = shape[0], shape[1]
+    z = points[:, 2]
+    valid = z > 0
+    u = np.floor(points[valid, 0] * fx / z[valid] + cx).astype(np.int64)
+    v = np.floor(points[valid, 1] * fy / z[valid] + cy).astype(np.int64)
+    z = z[valid]
+    inside = (u >= 0) & (u < width) & (v >= 0) & (v < height)
+    u, v, z = u[inside], v[inside], z[inside]
+    if values is None:
+        dst = np.full((height, width), zero, dtype=np.float32)
+        data = z
+    else:
+        values = values[valid][inside]
+        dst = np.full((height, width), zero, dtype=values.dtype)
+        data = values
+    # 同じ画素に投影される点は最も近い点を採用する
+    order = np.argsort(z, kind='stable')
+    pixels, first = np.unique((v * width + u)[order], return_index=True)
+    dst.reshape(-1)[pixels] = data[order][first]
+    return dst
+
+def gather(data, cull, idx):
+    if cull is None:
+        return data
+    indices = cull[1][cull[0][idx]:cull[0][idx + 1]]
+    if isinstance(data, tuple):
+        return tuple(item[indices] for item in data)
+    return data[indices]
+
+def scale_intrinsic(intrinsic, shape, roi=None):
+    top, left, height, width = (0, 0, intrinsic['height'], intrinsic['width']) if roi is None else roi
+    sx = shape[1] / width
+    sy = shape[0] / height
+    return intrinsic['Fx'] * sx, intrinsic['Fy'] * sy, (intrinsic['Cx'] - left) * sx, (intrinsic['Cy'] - top) * sy
+
+def apply_output(data, data_type, shape, interpolation, value_range, normalize, zero, clean=False):
+    if data_type in ['points'] and isinstance(data, tuple):
+        # 座標変換の結果は (点群, 点毎の値) のため, 点群だけを出力する
+        data = data[0]
+    if interpolation is not None and shape is not None and tuple(data.shape[:2]) != (shape[0], shape[1]):
+        data = cv2.resize(data, (shape[1], shape[0]), interpolation=interpolation)
+    if value_range is not None and not clean:
+        if data_type in ['depth', 'disparity']:
+            data = np.where((data < value_range[0]) | (data > value_range[1]), zero, data)
+        elif data_type in ['points', 'semantic3d']:
+            norm = np.linalg.norm(data[0] if isinstance(data, tuple) else data, axis=1)
+            mask = (norm >= value_range[0]) & (norm <= value_range[1])
+            data = tuple(item[mask] for item in data) if isinstance(data, tuple) else data[mask]
+        else:
+            data = np.clip(data, value_range[0], value_range[1])
+    if normalize:
+        data = ((data.astype(np.float32) - value_range[0]) / (value_range[1] - value_range[0])).astype(np.float32)
+    return data
+
+def decode(data, scale, offset):
+    return data.astype(np.float32) * np.float32(scale) + np.float32(offset)
+
+def to_sparse(data, sparse_format, zero):
+    height, width = data.shape[:2]
+    mask = data != zero
+    rows, cols = np.nonzero(mask)
+    index_type = np.uint16 if max(height, width) <= 65536 else np.int32
+    values = data[rows, cols]
+    if sparse_format == 'coo':
+        return np.stack([rows, cols], axis=1).astype(index_type), values
+    indptr = np.zeros((height + 1,), dtype=np.int32)
+    np.cumsum(np.count_nonzero(mask, axis=1), out=indptr[1:])
+    return indptr, cols.astype(index_type), values
+
+def to_dense(sparse, shape, zero):
+    dst = np.full((shape[0], shape[1]), zero, dtype=sparse[-1].dtype)
+    if len(sparse) == 2:
+        rows, cols = sparse[0][:, 0], sparse[0][:, 1]
+    else:
+        rows, cols = np.repeat(np.arange(shape[0]), np.diff(sparse[0])), sparse[1]
+    dst[rows, cols] = sparse[-1]
+    return dst
+
+def decode_image(data, roi=None):
+    image = cv2.imdecode(data, cv2.IMREAD_UNCHANGED)
+    if roi is not None:
+        image = image[roi[0]:roi[0] + roi[2], roi[1]:roi[1] + roi[3]]
+    return image
+
+# ここまで
+
+def create_labelLuts(config:Dict[str, dict]) -> Dict[str, np.ndarray]:
+    """label configのtag毎に, 保存値 (uint8) から変換後のクラスへのLUTを作成 (対応しない値は0)"""
+    luts:Dict[str, np.ndarray] = {}
+    for label_tag, label_config in config[CONFIG_TAG_LABEL].get(CONFIG_TAG_CONFIG, {}).items():
+        lut:np.ndarray = np.zeros((256,), dtype=np.uint8)
+        for src_idx, dst_idx in label_config[CONFIG_TAG_CONVERT].items():
+            if dst_idx is None: continue
+            lut[int(src_idx) % 256] = dst_idx
+        luts[label_tag] = lut
+    return luts
+
+def read_node(h5file:h5py.File, params:Dict[str, Any], idx:int) -> Any:
+    item:Union[h5py.Group, h5py.Dataset] = h5file[get_h5Key(params[CONFIG_TAG_KEY], idx)]
+    data_type:str = params[CONFIG_TAG_TYPE]
+    if data_type == TYPE_POSE:
+        return read_pose(item)
+    if data_type == TYPE_INTRINSIC:
+        return read_intrinsic(item)
+    if data_type == TYPE_SEMANTIC3D:
+        return item[SUBTYPE_POINTS][()], item[SUBTYPE_SEMANTIC1D][()]
+    if data_type in [TYPE_VOXEL_POINTS, TYPE_VOXEL_SEMANTIC3D]:
+        return read_voxels(item)
+    # 切り出す範囲だけをHDF5から読み込む
+    data:np.ndarray = item[get_roiSlices(params[CONFIG_TAG_ROI])] if CONFIG_TAG_ROI in params.keys() else item[()]
+    if CONFIG_TAG_ENCODING in params.keys():
+        return decode(data, *params[CONFIG_TAG_ENCODING])
+    return data
+
+def get_cvtColorSteps(src_type:str, dst_type:str) -> Tuple[bool, Union[int, None], bool]:
+    """画像の型の変換の手順. mono16はmono8を介して変換する.
+
+    Returns:
+        Tuple[bool, Union[int, None], bool]: mono16からmono8にするか, cv2.cvtColorのコード (不要な場合はNone), mono8からmono16にするか
+    """
+    before:bool = src_type == TYPE_MONO16
+    after:bool = dst_type == TYPE_MONO16
+    src_type = TYPE_MONO8 if before else src_type
+    dst_type = TYPE_MONO8 if after else dst_type
+    if src_type == dst_type:
+        return before, None, after
+    if (src_type, dst_type) not in CVTCOLOR_CODE.keys():
+        raise ValueError('cannot convert {0:s} to {1:s}'.format(src_type, dst_type))
+    return before, CVTCOLOR_CODE[(src_type, dst_type)], after
+
+def create_palette(colors:Dict[str, List[int]], dst_type:str) -> np.ndarray:
+    """クラス毎のBGRの色から, semantic2dの値を出力の型の色にするLUT (256, チャンネル数) を作成 (色の無いクラスは黒)"""
+    palette:np.ndarray = np.zeros((256, 4), dtype=np.uint8)
+    palette[:, 3] = 255
+    for idx, color in colors.items():
+        palette[int(idx) % 256, :3] = color
+    return np.ascontiguousarray(palette[:, PALETTE_CHANNELS[dst_type]])
+
+def read_dataset(item:h5py.Dataset) -> np.ndarray:
+    """データセットを読み込み, scale_factor/add_offsetで符号化されている場合は復号する"""
+    if H5_ATTR_SCALEFACTOR not in item.attrs and H5_ATTR_ADDOFFSET not in item.attrs:
+        return item[()]
+    return decode(item[()], item.attrs.get(H5_ATTR_SCALEFACTOR, 1.0), item.attrs.get(H5_ATTR_ADDOFFSET, 0.0))
+
+class ReferenceLoader(object):
+    """設定をサンプル毎に解釈して読み込むローダ
+
+    mini-batch毎に独立して実行計画を組み立てて評価するため, 共有するソースも毎回読み込む.
+    codegenで生成したローダの出力と速度の比較対象とする.
+
+    Args:
+        culls (Union[Dict[str, Tuple[np.ndarray, np.ndarray]], None], optional): cullで求めたmini-batch毎の可視点のCSRインデックス. 無い場合は全ての点を用いる. Defaults to None.
+    """
+    def __init__(self, config:Dict[str, dict], h5file:h5py.File, culls:Union[Dict[str, Tuple[np.ndarray, np.ndarray]], None]=None) -> None:
+        self.config:Dict[str, dict] = config
+        self.h5file:h5py.File = h5file
+        self.culls:Dict[str, Tuple[np.ndarray, np.ndarray]] = {} if culls is None else culls
+        self.luts:Dict[str, np.ndarray] = create_labelLuts(config)
+        self.ops:Dict[str, Callable[[Dict[str, Any], List[Any], int], Any]] = {
+            PLAN_OP_READ: lambda params, inputs, idx: read_node(self.h5file, params, idx),
+            PLAN_OP_TF: lambda params, inputs, idx: compose_tf(inputs, params[CONFIG_TAG_INVERSE]),
+            PLAN_OP_LABEL: lambda params, inputs, idx: apply_label(self.luts[params[CONFIG_TAG_LABELTAG]], inputs[0]),
+            PLAN_OP_CVTCOLOR: self.__cvtColor,
+            PLAN_OP_EXTRACT: self.__extract,
+            PLAN_OP_COMPOSEPOSE: lambda params, inputs, idx: quaternion2matrix(inputs[0], inputs[1]),
+            PLAN_OP_CAST: lambda params, inputs, idx: inputs[0].astype(DTYPE_NUMPY[params[CONFIG_TAG_DST]]),
+            PLAN_OP_COLORIZE: lambda params, inputs, idx: create_palette(params[CONFIG_TAG_COLOR], params[CONFIG_TAG_DST])[inputs[0]],
+            PLAN_OP_DISPARITY2DEPTH: lambda params, inputs, idx: disparity2depth(inputs[0], inputs[1][SUBTYPE_FX], float(self.h5file[get_h5Key(params[CONFIG_TAG_KEY], idx)].attrs[H5_ATTR_BASELINE])),
+            PLAN_OP_TRANSFORM: self.__transform,
+            PLAN_OP_PROJECT: self.__project,
+            PLAN_OP_GATHER: lambda params, inputs, idx: gather(inputs[0], self.culls.get(params[CONFIG_TAG_MINIBATCH]), idx),
+            PLAN_OP_OUTPUT: lambda params, inputs, idx: apply_output(
+                inputs[0], params[CONFIG_TAG_TYPE], params[CONFIG_TAG_SHAPE], params[CONFIG_TAG_INTERPOLATION],
+                params[CONFIG_TAG_RANGE], params[CONFIG_TAG_NORMALIZE], ZERO_VALUE[params[CONFIG_TAG_TYPE]], params.get(CONFIG_TAG_CLEAN, False)
+            ),
+            PLAN_OP_SPARSE: lambda params, inputs, idx: to_sparse(inputs[0], params[CONFIG_TAG_SPARSE], params[CONFIG_TAG_ZERO]),
+            PLAN_OP_DECODE: lambda params, inputs, idx: decode_image(inputs[0], params.get(CONFIG_TAG_ROI)),
+            PLAN_OP_DOWNSAMPLE: lambda params, inputs, idx: cv2.resize(inputs[0], (params[CONFIG_TAG_SHAPE][1], params[CONFIG_TAG_SHAPE][0]), interpolation=params[CONFIG_TAG_INTERPOLATION]),
+        }
+
+    def __len__(self) -> int:
+        return get_length(self.h5file)
+
+    def __getitem__(self, idx:int) -> Dict[str, np.ndarray]:
+        minibatch:Dict[str, np.ndarray] = {}
+        for tag, minibatch_config in self.config[CONFIG_TAG_MINIBATCH].items():
+            builder = PlanBuilder(self.config)
+            outputs:Dict[str, str] = builder.add_outputs(minibatch_config, tag)
+            values:Dict[str, Any] = {}
+            for node_id, node in builder.nodes.items():
+                inputs:List[Any] = [values[input_id] for input_id in node[PLAN_TAG_INPUTS]]
+                op = self.ops.get(node[PLAN_TAG_OP])
+                if op is None:
+                    raise ValueError('unknown plan op {0:s} at node {1:s}'.format(str(node[PLAN_TAG_OP]), node_id))
+                values[node_id] = op(node[PLAN_TAG_PARAMS], inputs, idx)
+            for output_tag, output_id in outputs.items():
+                minibatch[output_tag] = values[output_id]
+        return minibatch
+
+    def __cvtColor(self, params:Dict[str, Any], inputs:List[Any], idx:int) -> np.ndarray:
+        before, code, after = get_cvtColorSteps(params[CONFIG_TAG_SRC], params[CONFIG_TAG_DST])
+        data:np.ndarray = to_mono8(inputs[0]) if before else inputs[0]
+        if code is not None:
+            data = cv2.cvtColor(data, code)
+        return to_mono16(data) if after else data
+
+    def __extract(self, params:Dict[str, Any], inputs:List[Any], idx:int) -> np.ndarray:
+        if params[CONFIG_TAG_SRC] == TYPE_SEMANTIC3D:
+            return inputs[0][1]
+        if params[CONFIG_TAG_DST] == TYPE_TRANSLATION:
+            return inputs[0][:3, 3].astype(np.float32)
+        return matrix2quaternion(inputs[0])
+
+    def __transform(self, params:Dict[str, Any], inputs:List[Any], idx:int) -> Tuple[np.ndarray, Union[np.ndarray, None]]:
+        points, values = get_geometry(params[CONFIG_TAG_FROM], inputs[:-1])
+        return transform_points(points, values, inputs[-1])
+
+    def __project(self, params:Dict[str, Any], inputs:List[Any], idx:int) -> np.ndarray:
+        points, values = inputs[0] if isinstance(inputs[0], tuple) else (inputs[0], None)
+        fx, fy, cx, cy = params[CONFIG_TAG_INTRINSIC] if CONFIG_TAG_INTRINSIC in params.keys() else scale_intrinsic(inputs[1], params[CONFIG_TAG_SHAPE], params.get(CONFIG_TAG_ROI))
+        zero = ZERO_VALUE[params[CONFIG_TAG_TYPE]]
+        return project(points, values if params[CONFIG_TAG_TYPE] == TYPE_SEMANTIC2D else None, fx, fy, cx, cy, params[CONFIG_TAG_SHAPE], 0 if zero is None else zero)
+
+def get_geometry(from_types:List[str], inputs:List[Any]) -> Tuple[np.ndarray, Union[np.ndarray, None]]:
+    """transformの入力を点群と点毎の値に揃える
+
+    Args:
+        from_types (List[str]): 入力の型. 深度画像の場合は末尾にintrinsicを含む.
+        inputs (List[Any]): 入力
+
+    Returns:
+        Tuple[np.ndarray, Union[np.ndarray, None]]: 点群 (N, 3), 点毎の値
+    """
+    data:Dict[str, Any] = dict(zip(from_types, inputs))
+    if TYPE_DEPTH in data.keys():
+        points, (v, u) = backproject(data[TYPE_DEPTH], data[TYPE_INTRINSIC])
+        values = data[TYPE_SEMANTIC2D][v, u] if TYPE_SEMANTIC2D in data.keys() else None
+        return points, values
+    for from_type in [TYPE_SEMANTIC3D, TYPE_VOXEL_SEMANTIC3D]:
+        if from_type in data.keys(): return data[from_type]
+    return data.get(TYPE_POINTS, data.get(TYPE_VOXEL_POINTS)), data.get(TYPE_SEMANTIC1D)
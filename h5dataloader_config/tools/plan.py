@@ -0,0 +1,326 @@
+# -*- coding: utf-8 -*-
+
+import json
+from typing import Dict, List, Tuple, Union
+import numpy as np
+
+from ..common.structure import *
+from ..common.intrinsic import get_projection, update_intrinsics
+from ..common.roi import get_roiShape, get_roiSources, is_projected
+from ..common.pyramid import get_levelShape, get_pyramidTags
+from ..common.sparse import get_sparseZero, is_sparseMinibatch
+from ..common.codec import get_pixelType
+from ..common.quality import is_certified
+from .utils import *
+
+PLAN_STAGE_READ:str = 'read'
+PLAN_STAGE_CONVERT:str = 'convert'
+PLAN_STAGE_OUTPUT:str = 'output'
+
+PLAN_OP_READ:str = 'read'
+PLAN_OP_TF:str = 'tf'
+PLAN_OP_LABEL:str = 'label'
+PLAN_OP_CVTCOLOR:str = 'cvt-color'
+PLAN_OP_TRANSFORM:str = 'transform'
+PLAN_OP_DISPARITY2DEPTH:str = 'disparity-to-depth'
+PLAN_OP_COMPOSEPOSE:str = 'compose-pose'
+PLAN_OP_EXTRACT:str = 'extract'
+PLAN_OP_PROJECT:str = 'project'
+PLAN_OP_GATHER:str = 'gather'
+PLAN_OP_OUTPUT:str = 'output'
+PLAN_OP_DOWNSAMPLE:str = 'downsample'
+PLAN_OP_SPARSE:str = 'sparse'
+PLAN_OP_DECODE:str = 'decode'
+PLAN_OP_CAST:str = 'cast'
+PLAN_OP_COLORIZE:str = 'colorize'
+
+# cvt-colorで変換する画像の型
+COLOR_TYPES:List[str] = [TYPE_MONO8, TYPE_MONO16, TYPE_BGR8, TYPE_RGB8, TYPE_BGRA8, TYPE_RGBA8]
+# 値の型を変換する数値の型
+NUMERIC_TYPES:List[str] = [TYPE_FLOAT16, TYPE_FLOAT32, TYPE_FLOAT64, TYPE_UINT8, TYPE_INT8, TYPE_INT16, TYPE_INT32, TYPE_INT64]
+
+PLAN_TAG_NODES:str = 'nodes'
+PLAN_TAG_OUTPUTS:str = 'outputs'
+PLAN_TAG_REPORT:str = 'report'
+PLAN_TAG_STAGE:str = 'stage'
+PLAN_TAG_OP:str = 'op'
+PLAN_TAG_INPUTS:str = 'inputs'
+PLAN_TAG_PARAMS:str = 'params'
+
+def get_tfChain(config:Dict[str, dict], src_frame:str, dst_frame:str) -> Tuple[List[str], List[str]]:
+    """src_frameからdst_frameへの座標変換に必要なtf/dataのキー
+
+    Returns:
+        Tuple[List[str], List[str]]: src_frame, dst_frameから共通の祖先へ遡る経路上のposeのキー. 経路が無い場合は空.
+    """
+    tf_data:Dict[str, Dict[str, str]] = config[CONFIG_TAG_TF][CONFIG_TAG_DATA]
+
+    def ancestors(frame:str) -> List[str]:
+        frames:List[str] = [frame]
+        while frames[-1] in tf_data.keys() and tf_data[frames[-1]][CONFIG_TAG_FRAMEID] not in frames:
+            frames.append(tf_data[frames[-1]][CONFIG_TAG_FRAMEID])
+        return frames
+
+    src_ancestors:List[str] = ancestors(src_frame)
+    dst_ancestors:List[str] = ancestors(dst_frame)
+    common:List[str] = [frame for frame in src_ancestors if frame in dst_ancestors]
+    if len(common) == 0: return [], []
+    src_keys:List[str] = [tf_data[frame][CONFIG_TAG_KEY] for frame in src_ancestors[:src_ancestors.index(common[0])]]
+    dst_keys:List[str] = [tf_data[frame][CONFIG_TAG_KEY] for frame in dst_ancestors[:dst_ancestors.index(common[0])]]
+    return src_keys, dst_keys
+
+def get_itemsize(data_type:str) -> int:
+    dtype = DTYPE_NUMPY.get(data_type)
+    if dtype is None or dtype is object:
+        try:
+            return np.dtype(data_type).itemsize
+        except TypeError:
+            return 0
+    return np.dtype(dtype).itemsize
+
+def get_readBytes(config:Dict[str, dict], key:str, roi:Union[List[int], None]=None) -> int:
+    """src-dataの1サンプル当たりの読み込みバイト数 (可変長の次元は最大値を用いる). roiを指定した場合は切り出した範囲のみ."""
+    srcdata_dict:Dict[str, dict] = config[CONFIG_TAG_SRCDATA]
+    item:Union[dict, None] = srcdata_dict.get(key)
+    if item is None: return 0
+    shape:Union[List[Union[int, None]], None] = get_roiShape(item.get(CONFIG_TAG_SHAPEMAX, item[CONFIG_TAG_SHAPE]), roi)
+    if shape is None:
+        return sum(get_readBytes(config, child) for child in srcdata_dict.keys() if child.startswith(key + '/') and '/' not in child[len(key) + 1:])
+    encoding:Union[Dict[str, Union[str, float]], None] = item.get(CONFIG_TAG_ENCODING)
+    itemsize:int = get_itemsize(item[CONFIG_TAG_TYPE] if encoding is None else encoding[CONFIG_TAG_DTYPE])
+    return int(np.prod([0 if dim is None else dim for dim in shape])) * itemsize
+
+class PlanBuilder(object):
+    """mini-batchのパイプラインを, 同じ演算を共有するDAGに組み立てる"""
+    def __init__(self, config:Dict[str, dict]) -> None:
+        self.config:Dict[str, dict] = config
+        self.nodes:Dict[str, Dict[str, Union[str, list, dict]]] = {}
+        self.signatures:Dict[str, str] = {}
+        self.naive_reads:int = 0
+        self.naive_ops:int = 0
+        self.naive_bytes:int = 0
+
+    def add_node(self, stage:str, op:str, inputs:List[str], params:dict) -> str:
+        self.naive_ops += 1
+        if op == PLAN_OP_READ:
+            self.naive_reads += 1
+            # 静的なデータは1度だけ読み込むため, サンプル毎のバイト数に含めない
+            if params[CONFIG_TAG_STATIC] is False:
+                self.naive_bytes += params[CONFIG_TAG_BYTES]
+        signature:str = json.dumps([op, inputs, params], sort_keys=True)
+        if signature in self.signatures.keys():
+            return self.signatures[signature]
+        node_id:str = '{0:s}{1:d}'.format(stage, len(self.nodes))
+        self.nodes[node_id] = {PLAN_TAG_STAGE: stage, PLAN_TAG_OP: op, PLAN_TAG_INPUTS: inputs, PLAN_TAG_PARAMS: params}
+        self.signatures[signature] = node_id
+        return node_id
+
+    def add_read(self, key:str, roi:Union[List[int], None]=None) -> str:
+        data_type = self.config[CONFIG_TAG_SRCDATA].get(key, {}).get(CONFIG_TAG_TYPE)
+        params:Dict[str, Union[str, int, bool, List[int]]] = {
+            CONFIG_TAG_KEY: key,
+            CONFIG_TAG_TYPE: data_type,
+            CONFIG_TAG_BYTES: get_readBytes(self.config, key, roi),
+            CONFIG_TAG_STATIC: key.startswith('/'),
+        }
+        if roi is not None:
+            params[CONFIG_TAG_ROI] = roi
+        encoding:Union[Dict[str, Union[str, float]], None] = self.config[CONFIG_TAG_SRCDATA].get(key, {}).get(CONFIG_TAG_ENCODING)
+        if encoding is not None:
+            params[CONFIG_TAG_ENCODING] = [encoding[CONFIG_TAG_SCALE], encoding[CONFIG_TAG_OFFSET]]
+        return self.add_node(PLAN_STAGE_READ, PLAN_OP_READ, [], params)
+
+    def add_source(self, key:str, roi:Union[List[int], None]=None) -> str:
+        """src-dataを読み込むノードを追加. 符号化した画像は全体を読み込んで復号してから切り出す."""
+        data_type = self.config[CONFIG_TAG_SRCDATA].get(key, {}).get(CONFIG_TAG_TYPE)
+        if data_type not in COMPRESSED_TYPES.keys():
+            return self.add_read(key, roi)
+        params:Dict[str, Union[str, List[int]]] = {CONFIG_TAG_TYPE: get_pixelType(data_type)}
+        if roi is not None:
+            params[CONFIG_TAG_ROI] = roi
+        return self.add_node(PLAN_STAGE_CONVERT, PLAN_OP_DECODE, [self.add_read(key)], params)
+
+    def add_tf(self, src_frame:str, dst_frame:str) -> str:
+        src_keys, dst_keys = get_tfChain(self.config, src_frame, dst_frame)
+        inputs:List[str] = [self.add_read(key) for key in src_keys + dst_keys]
+        static:bool = all(key.startswith('/') for key in src_keys + dst_keys)
+        return self.add_node(PLAN_STAGE_CONVERT, PLAN_OP_TF, inputs, {
+            CONFIG_TAG_SRC: src_frame,
+            CONFIG_TAG_DST: dst_frame,
+            CONFIG_TAG_STATIC: static,
+            CONFIG_TAG_INVERSE: [False] * len(src_keys) + [True] * len(dst_keys),
+        })
+
+    def get_labelColors(self, minibatch_config:Dict[str, Union[str, dict]]) -> Dict[str, List[int]]:
+        """semantic2dを色の画像にする際のクラス毎のBGRの色. label-tagがある場合は変換後のクラス, 無い場合はソースのクラスの色とする."""
+        label_config:Dict[str, dict] = self.config.get(CONFIG_TAG_LABEL, {})
+        label_tag:str = minibatch_config.get(CONFIG_TAG_LABELTAG, '')
+        if label_tag != '':
+            classes:Dict[str, dict] = label_config.get(CONFIG_TAG_CONFIG, {}).get(label_tag, {}).get(CONFIG_TAG_DST, {})
+        else:
+            src_keys:List[str] = [from_key for from_type, from_key in minibatch_config[CONFIG_TAG_FROM].items() if USE_LABEL.get(from_type) is True]
+            src_tag:str = self.config[CONFIG_TAG_SRCDATA].get(src_keys[0], {}).get(CONFIG_TAG_LABELTAG, '') if len(src_keys) > 0 else ''
+            classes = label_config.get(CONFIG_TAG_SRC, {}).get(src_tag, {})
+        return {str(idx): list(value[CONFIG_TAG_COLOR]) for idx, value in classes.items() if value is not None and CONFIG_TAG_COLOR in value.keys()}
+
+    def add_conversion(self, dst_type:str, from_types:List[str], sources:Dict[str, str], dst_frame:str, shape:List[Union[int, None]], intrinsic:Union[Dict[str, float], None]=None, roi:Union[List[int], None]=None, colors:Union[Dict[str, List[int]], None]=None) -> str:
+        """FROM_TYPESの組み合わせ1つ分の変換を追加. intrinsicを指定した場合は投影にその値を用い, 無い場合は投影時にroiを反映する. colorsはsemantic2dを色の画像にする場合のクラス毎の色."""
+        if len(from_types) == 1:
+            node_id = sources[from_types[0]]
+            # 符号化した画像は復号済みのため, 復号後の型から変換する
+            src_type:str = get_pixelType(from_types[0])
+            if src_type == dst_type:
+                pass
+            elif src_type in [TYPE_POSE, TYPE_SEMANTIC3D]:
+                node_id = self.add_node(PLAN_STAGE_CONVERT, PLAN_OP_EXTRACT, [node_id], {CONFIG_TAG_SRC: src_type, CONFIG_TAG_DST: dst_type})
+            elif src_type == TYPE_SEMANTIC2D:
+                node_id = self.add_node(PLAN_STAGE_CONVERT, PLAN_OP_COLORIZE, [node_id], {CONFIG_TAG_DST: dst_type, CONFIG_TAG_COLOR: colors or {}})
+            elif src_type in NUMERIC_TYPES:
+                node_id = self.add_node(PLAN_STAGE_CONVERT, PLAN_OP_CAST, [node_id], {CONFIG_TAG_SRC: src_type, CONFIG_TAG_DST: dst_type})
+            else:
+                node_id = self.add_node(PLAN_STAGE_CONVERT, PLAN_OP_CVTCOLOR, [node_id], {CONFIG_TAG_SRC: src_type, CONFIG_TAG_DST: dst_type})
+        elif set(from_types) == {TYPE_TRANSLATION, TYPE_QUATERNION}:
+            node_id = self.add_node(PLAN_STAGE_CONVERT, PLAN_OP_COMPOSEPOSE, [sources[TYPE_TRANSLATION], sources[TYPE_QUATERNION]], {})
+        elif TYPE_DISPARITY in from_types:
+            # 基線長はフレーム毎の視差のデータセットの属性から読み込む
+            disparity_key:str = self.nodes[sources[TYPE_DISPARITY]][PLAN_TAG_PARAMS][CONFIG_TAG_KEY]
+            node_id = self.add_node(PLAN_STAGE_CONVERT, PLAN_OP_DISPARITY2DEPTH, [sources[TYPE_DISPARITY], sources[TYPE_INTRINSIC]], {CONFIG_TAG_KEY: disparity_key})
+        else:
+            geometry_types:List[str] = [from_type for from_type in from_types if from_type not in [TYPE_POSE, TYPE_INTRINSIC]]
+            if TYPE_DEPTH in from_types and TYPE_INTRINSIC in from_types:
+                # 深度画像は逆投影してから座標変換する
+                geometry_types.append(TYPE_INTRINSIC)
+            geometry_inputs:List[str] = [sources[from_type] for from_type in geometry_types]
+            if TYPE_POSE in from_types:
+                node_id = self.add_node(PLAN_STAGE_CONVERT, PLAN_OP_TRANSFORM, geometry_inputs + [sources[TYPE_POSE]], {CONFIG_TAG_FRAMEID: dst_frame, CONFIG_TAG_FROM: geometry_types})
+            else:
+                node_id = geometry_inputs[0]
+            # 色の画像はクラスを投影してから色にする
+            project_type:str = TYPE_DEPTH if dst_type == TYPE_DEPTH else TYPE_SEMANTIC2D
+            if dst_type in PROJECTED_TYPES and TYPE_INTRINSIC in from_types and intrinsic is not None:
+                node_id = self.add_node(PLAN_STAGE_CONVERT, PLAN_OP_PROJECT, [node_id], {CONFIG_TAG_TYPE: project_type, CONFIG_TAG_SHAPE: shape, CONFIG_TAG_INTRINSIC: list(get_projection(intrinsic))})
+            elif dst_type in PROJECTED_TYPES and TYPE_INTRINSIC in from_types:
+                params:Dict[str, Union[str, list]] = {CONFIG_TAG_TYPE: project_type, CONFIG_TAG_SHAPE: shape}
+                if roi is not None:
+                    params[CONFIG_TAG_ROI] = roi
+                node_id = self.add_node(PLAN_STAGE_CONVERT, PLAN_OP_PROJECT, [node_id, sources[TYPE_INTRINSIC]], params)
+            if dst_type in PROJECTED_TYPES and project_type != dst_type and TYPE_INTRINSIC in from_types:
+                node_id = self.add_node(PLAN_STAGE_CONVERT, PLAN_OP_COLORIZE, [node_id], {CONFIG_TAG_DST: dst_type, CONFIG_TAG_COLOR: colors or {}})
+        return node_id
+
+    def add_minibatch(self, minibatch_config:Dict[str, Union[str, dict]], tag:Union[str, None]=None) -> str:
+        dst_type:str = minibatch_config[CONFIG_TAG_TYPE]
+        dst_frame:str = minibatch_config[CONFIG_TAG_FRAMEID]
+        label_tag:str = minibatch_config.get(CONFIG_TAG_LABELTAG, '')
+        from_dict:Dict[str, str] = minibatch_config[CONFIG_TAG_FROM]
+
+        # 多段の変換はstepsの順に行い, 途中の結果はその型の入力として後の変換に渡す
+        steps:List[Dict[str, Union[str, List[str]]]] = minibatch_config.get(CONFIG_TAG_STEPS) or [{CONFIG_TAG_TYPE: dst_type, CONFIG_TAG_FROM: list(from_dict.keys())}]
+        # 記録済みの内部パラメータで投影する場合, 逆投影と視差の変換に用いなければintrinsicは読み込まない
+        intrinsic:Union[Dict[str, float], None] = minibatch_config.get(CONFIG_TAG_INTRINSIC)
+        read_intrinsic:bool = intrinsic is None or any(TYPE_DEPTH in step[CONFIG_TAG_FROM] or TYPE_DISPARITY in step[CONFIG_TAG_FROM] for step in steps)
+
+        # ROIは画像を読み込む場合は切り出して読み込み, 投影する場合は内部パラメータに反映する
+        roi:Union[List[int], None] = minibatch_config.get(CONFIG_TAG_ROI)
+        roi_sources:List[str] = get_roiSources(self.config, minibatch_config)
+
+        colors:Union[Dict[str, List[int]], None] = self.get_labelColors(minibatch_config) if dst_type in COLOR_TYPES and any(USE_LABEL.get(from_type) is True for from_type in from_dict.keys()) else None
+
+        culled:List[str] = self.config.get(CONFIG_TAG_SIDECAR, {}).get(CONFIG_TAG_CULL, {}).get(CONFIG_TAG_MINIBATCH, [])
+        sources:Dict[str, str] = {}
+        for from_type, from_key in from_dict.items():
+            if from_type == TYPE_POSE:
+                sources[from_type] = self.add_tf(from_key, dst_frame)
+                continue
+            if from_type == TYPE_INTRINSIC and read_intrinsic is False: continue
+            node_id:str = self.add_source(from_key, roi if from_key in roi_sources else None)
+            if USE_LABEL[from_type] is True and label_tag != '':
+                node_id = self.add_node(PLAN_STAGE_CONVERT, PLAN_OP_LABEL, [node_id], {CONFIG_TAG_LABELTAG: label_tag})
+            if tag in culled and from_type in [TYPE_POINTS, TYPE_SEMANTIC1D, TYPE_SEMANTIC3D] and from_key.startswith('/'):
+                # cullで求めたフレーム毎の可視点だけを取り出す
+                node_id = self.add_node(PLAN_STAGE_CONVERT, PLAN_OP_GATHER, [node_id], {CONFIG_TAG_MINIBATCH: tag})
+            sources[from_type] = node_id
+
+        for step_idx, step in enumerate(steps):
+            node_id = self.add_conversion(step[CONFIG_TAG_TYPE], step[CONFIG_TAG_FROM], sources, dst_frame, minibatch_config[CONFIG_TAG_SHAPE], intrinsic, roi if is_projected(minibatch_config) else None, colors)
+            sources[step[CONFIG_TAG_TYPE]] = node_id
+            if step_idx < len(steps) - 1 and TYPE_POSE in step[CONFIG_TAG_FROM] and len(step[CONFIG_TAG_FROM]) > 1:
+                # 座標変換済みの結果は, 後の変換では恒等変換で扱う
+                sources[TYPE_POSE] = self.add_tf(dst_frame, dst_frame)
+
+        params:Dict[str, Union[str, int, bool, list, None]] = {
+            CONFIG_TAG_TYPE: dst_type,
+            CONFIG_TAG_SHAPE: minibatch_config[CONFIG_TAG_SHAPE],
+            CONFIG_TAG_INTERPOLATION: INTERPOLATION_FLAG[dst_type],
+            CONFIG_TAG_RANGE: minibatch_config[CONFIG_TAG_RANGE],
+            CONFIG_TAG_NORMALIZE: minibatch_config[CONFIG_TAG_NORMALIZE],
+        }
+        if is_certified(self.config, minibatch_config):
+            # qualityで全ての値がrangeに収まることを確認済みのため, rangeは正規化にのみ用いる
+            params[CONFIG_TAG_CLEAN] = True
+        return self.add_node(PLAN_STAGE_OUTPUT, PLAN_OP_OUTPUT, [node_id], params)
+
+    def add_pyramid(self, output_id:str, minibatch_config:Dict[str, Union[str, dict]]) -> List[str]:
+        """2段目以降を前の段の出力から順に縮小して追加し, 段毎のノードを返す"""
+        node_ids:List[str] = []
+        for level in minibatch_config.get(CONFIG_TAG_PYRAMID) or []:
+            output_id = self.add_node(PLAN_STAGE_OUTPUT, PLAN_OP_DOWNSAMPLE, [output_id], {
+                CONFIG_TAG_TYPE: minibatch_config[CONFIG_TAG_TYPE],
+                CONFIG_TAG_SHAPE: get_levelShape(minibatch_config, level),
+                CONFIG_TAG_INTERPOLATION: INTERPOLATION_FLAG[minibatch_config[CONFIG_TAG_TYPE]],
+            })
+            node_ids.append(output_id)
+        return node_ids
+
+    def add_outputs(self, minibatch_config:Dict[str, Union[str, dict]], tag:str) -> Dict[str, str]:
+        """mini-batchの出力 (ピラミッドの場合は全ての段) のタグとノード"""
+        output_id:str = self.add_minibatch(minibatch_config, tag)
+        outputs:Dict[str, str] = {tag: output_id}
+        if minibatch_config.get(CONFIG_TAG_SPARSE) in SPARSE_FORMATS and is_sparseMinibatch(minibatch_config):
+            # 疎な出力は1段目のみ (ピラミッドの段は密な出力から縮小する)
+            outputs[tag] = self.add_node(PLAN_STAGE_OUTPUT, PLAN_OP_SPARSE, [output_id], {
+                CONFIG_TAG_SPARSE: minibatch_config[CONFIG_TAG_SPARSE],
+                CONFIG_TAG_ZERO: get_sparseZero(minibatch_config),
+            })
+        outputs.update(zip(get_pyramidTags(tag, minibatch_config), self.add_pyramid(output_id, minibatch_config)))
+        return outputs
+
+def compile_plan(config:Dict[str, dict]) -> Dict[str, dict]:
+    """mini-batchを, 重複のない読み込み・共有する中間変換・出力毎の処理からなる実行計画に変換
+
+    Args:
+        config (Dict[str, dict]): 設定
+
+    Returns:
+        Dict[str, dict]: 'nodes', 'outputs', 'report' からなる実行計画
+    """
+    builder = PlanBuilder(config)
+    outputs:Dict[str, str] = {}
+    for tag, minibatch_config in config[CONFIG_TAG_MINIBATCH].items():
+        outputs.update(builder.add_outputs(minibatch_config, tag))
+    read_nodes:List[dict] = [node for node in builder.nodes.values() if node[PLAN_TAG_OP] == PLAN_OP_READ]
+    plan_bytes:int = sum(node[PLAN_TAG_PARAMS][CONFIG_TAG_BYTES] for node in read_nodes if node[PLAN_TAG_PARAMS][CONFIG_TAG_STATIC] is False)
+    report:Dict[str, int] = {
+        'naive-reads': builder.naive_reads,
+        'plan-reads': len(read_nodes),
+        'naive-ops': builder.naive_ops,
+        'plan-ops': len(builder.nodes),
+        'naive-bytes': builder.naive_bytes,
+        'plan-bytes': plan_bytes,
+        'saved-bytes': builder.naive_bytes - plan_bytes,
+        'saved-ops': builder.naive_ops - len(builder.nodes),
+    }
+    return {PLAN_TAG_NODES: builder.nodes, PLAN_TAG_OUTPUTS: outputs, PLAN_TAG_REPORT: report}
+
+def add_parser(subparsers) -> None:
+    parser = subparsers.add_parser('plan', help='compile the mini-batch section into a shared-read execution plan')
+    parser.add_argument('config', type=str, help='config file (JSON)')
+    parser.set_defaults(func=run)
+
+def run(args) -> None:
+    config = load_config(args.config)
+    update_intrinsics(config)
+    config[CONFIG_TAG_PLAN] = compile_plan(config)
+    save_config(config, args.config)
+    for key, value in config[CONFIG_TAG_PLAN][PLAN_TAG_REPORT].items():
+        print('{0:s}: {1:d}'.format(key, value))
@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+from typing import Dict, List, Tuple, Union
+import numpy as np
+import h5py
+
+from ..common.structure import *
+from ..common.scan import get_length, sample_frameIndices
+from .utils import *
+from .loader import decode
+
+DEFAULT_SAMPLES:int = 32
+# 許容する最大誤差 (値の範囲に対する割合)
+DEFAULT_TOLERANCE:float = 1e-4
+
+ENCODING_DTYPE:Dict[str, np.dtype] = {
+    ENCODING_FLOAT16: np.float16,
+    ENCODING_UINT16: np.uint16,
+    ENCODING_INT16: np.int16,
+}
+
+def get_floatSources(config:Dict[str, dict]) -> Dict[str, Union[List[float], None]]:
+    """mini-batchが参照する浮動小数点のsrc-dataと, 出力で有効な値の範囲
+
+    範囲は, 全てのmini-batchが同じ型の深度・視差としてrangeで範囲外を0にする場合のみ (それ以外はNone).
+
+    Returns:
+        Dict[str, Union[List[float], None]]: src-dataのキー, 範囲
+    """
+    srcdata_dict:Dict[str, dict] = config[CONFIG_TAG_SRCDATA]
+    ranges:Dict[str, List[Union[List[float], None]]] = {}
+    for minibatch_config in config[CONFIG_TAG_MINIBATCH].values():
+        for from_type, from_key in minibatch_config[CONFIG_TAG_FROM].items():
+            item:dict = srcdata_dict.get(from_key, {})
+            dtype = DTYPE_NUMPY.get(item.get(CONFIG_TAG_TYPE))
+            if item.get(CONFIG_TAG_SHAPE) is None or dtype is None or dtype is object or np.dtype(dtype).kind != 'f': continue
+            if item.get(CONFIG_TAG_ENCODING) is not None: continue
+            direct:bool = from_type == minibatch_config[CONFIG_TAG_TYPE] and from_type in [TYPE_DEPTH, TYPE_DISPARITY] and CONFIG_TAG_STEPS not in minibatch_config.keys()
+            value_range = minibatch_config.get(CONFIG_TAG_RANGE)
+            ranges.setdefault(from_key, []).append([float(value_range[0]), float(value_range[1])] if direct and value_range is not None else None)
+    sources:Dict[str, Union[List[float], None]] = {}
+    for key, key_ranges in ranges.items():
+        if any(value_range is None for value_range in key_ranges) or min(value_range[0] for value_range in key_ranges) < 0.0:
+            sources[key] = None
+        else:
+            sources[key] = [min(value_range[0] for value_range in key_ranges), max(value_range[1] for value_range in key_ranges)]
+    return sources
+
+def apply_range(data:np.ndarray, value_range:Union[List[float], None]) -> np.ndarray:
+    """apply_outputと同じく範囲外を0にする"""
+    if value_range is None: return data
+    return np.where((data < value_range[0]) | (data > value_range[1]), 0.0, data).astype(data.dtype, copy=False)
+
+def get_encoding(name:str, span:Tuple[float, float], value_range:Union[List[float], None]) -> Dict[str, Union[str, float]]:
+    """保存形式のscaleとoffset
+
+    Args:
+        name (str): 保存形式
+        span (Tuple[float, float]): 符号化する値の最小・最大値 (範囲がある場合は範囲)
+        value_range (Union[List[float], None]): 出力で有効な値の範囲
+
+    Returns:
+        Dict[str, Union[str, float]]: dtype, scale, offset
+    """
+    low, high = span
+    if name == ENCODING_UINT16:
+        # 範囲外を0にする場合は0を0のまま保存する
+        offset:float = 0.0 if value_range is not None else low
+        scale:float = (high - offset) / np.iinfo(np.uint16).max
+    elif name == ENCODING_INT16:
+        peak:float = max(abs(low), abs(high))
+        bits:int = int(np.floor(np.log2(np.iinfo(np.int16).max / peak))) if peak > 0.0 else 15
+        offset, scale = 0.0, float(2.0 ** -bits)
+    else:
+        offset, scale = 0.0, 1.0
+    return {CONFIG_TAG_DTYPE: name, CONFIG_TAG_SCALE: scale if scale > 0.0 else 1.0, CONFIG_TAG_OFFSET: offset}
+
+def encode(data:np.ndarray, encoding:Dict[str, Union[str, float]], value_range:Union[List[float], None]) -> Tuple[np.ndarray, int]:
+    """値を保存形式に変換する
+
+    範囲がある場合は範囲外を0とし, 復号した値が範囲の外に出ないように量子化値を寄せる.
+
+    Returns:
+        Tuple[np.ndarray, int]: 保存値, 表せずに飽和・0にした値の数
+    """
+    data = apply_range(data.astype(np.float32, copy=False), value_range)
+    dtype = ENCODING_DTYPE[encoding[CONFIG_TAG_DTYPE]]
+    if encoding[CONFIG_TAG_DTYPE] == ENCODING_FLOAT16:
+        encoded:np.ndarray = data.astype(np.float16)
+        return encoded, int(np.count_nonzero(np.isinf(encoded) & np.isfinite(data)))
+    info = np.iinfo(dtype)
+    finite:np.ndarray = np.isfinite(data)
+    quantized:np.ndarray = np.rint((np.where(finite, data, 0.0) - encoding[CONFIG_TAG_OFFSET]) / encoding[CONFIG_TAG_SCALE])
+    lost:int = int(np.count_nonzero(~finite | (quantized < info.min) | (quantized > info.max)))
+    quantized = np.clip(quantized, info.min, info.max)
+    if value_range is not None:
+        valid:np.ndarray = finite & (data >= value_range[0]) & (data <= value_range[1])
+        decoded:np.ndarray = decode(quantized, encoding[CONFIG_TAG_SCALE], encoding[CONFIG_TAG_OFFSET])
+        quantized -= valid & (decoded > value_range[1]) & (quantized > info.min)
+        quantized += valid & (decoded < value_range[0]) & (quantized < info.max)
+    return quantized.astype(dtype), lost
+
+def measure_error(data:np.ndarray, encoding:Dict[str, Union[str, float]], value_range:Union[List[float], None]) -> Dict[str, Union[int, float]]:
+    """出力 (範囲外を0にした後) の量子化誤差"""
+    encoded, lost = encode(data, encoding, value_range)
+    original:np.ndarray = apply_range(data.astype(np.float32, copy=False), value_range)
+    restored:np.ndarray = apply_range(decode(encoded, encoding[CONFIG_TAG_SCALE], encoding[CONFIG_TAG_OFFSET]), value_range)
+    finite:np.ndarray = np.isfinite(original) & np.isfinite(restored)
+    error:np.ndarray = np.abs(restored[finite].astype(np.float64) - original[finite])
+    return {
+        'max': float(error.max(initial=0.0)),
+        'rms': float(np.sqrt(np.mean(error ** 2))) if len(error) > 0 else 0.0,
+        'lost': lost + int(np.count_nonzero(np.isfinite(original) != np.isfinite(restored))),
+    }
+
+def read_samples(h5file:h5py.File, key:str, indices:np.ndarray) -> Union[List[np.ndarray], None]:
+    """フレームのデータ (浮動小数点のデータセットでない場合はNone)"""
+    samples:List[np.ndarray] = []
+    for idx in ([0] if key.startswith('/') else indices):
+        h5key:str = get_h5Key(key, int(idx))
+        if h5key not in h5file: continue
+        item = h5file[h5key]
+        if not isinstance(item, h5py.Dataset) or item.dtype.kind != 'f' or item.dtype.itemsize <= 2: return None
+        samples.append(item[()])
+    return samples if len(samples) > 0 else None
+
+def analyze_source(h5file:h5py.File, key:str, value_range:Union[List[float], None], indices:np.ndarray, tolerance:float) -> Union[Dict[str, Union[str, float, list, dict, None]], None]:
+    """src-data 1つの保存形式の候補毎の誤差と, 許容誤差以内で最も誤差の小さい候補
+
+    Returns:
+        Union[Dict[str, Union[str, float, list, dict, None]], None]: 浮動小数点のデータセットでない場合はNone
+    """
+    samples:Union[List[np.ndarray], None] = read_samples(h5file, key, indices)
+    if samples is None: return None
+    data:np.ndarray = np.concatenate([sample.reshape(-1) for sample in samples])
+    finite:np.ndarray = data[np.isfinite(data)]
+    if value_range is not None:
+        span:Tuple[float, float] = (value_range[0], value_range[1])
+    else:
+        span = (float(finite.min()), float(finite.max())) if len(finite) > 0 else (0.0, 0.0)
+    allowed:float = tolerance * max(span[1] - span[0], abs(span[0]), abs(span[1]))
+    candidates:Dict[str, dict] = {}
+    for name in ENCODINGS:
+        encoding:Dict[str, Union[str, float]] = get_encoding(name, span, value_range)
+        candidates[name] = dict(encoding, **measure_error(data, encoding, value_range))
+    accepted:List[str] = [name for name in ENCODINGS if candidates[name]['lost'] == 0 and candidates[name]['max'] <= allowed]
+    itemsize:int = samples[0].dtype.itemsize
+    return {
+        'dtype': str(samples[0].dtype),
+        'range': value_range,
+        'span': list(span),
+        'allowed': allowed,
+        'bytes': float(np.mean([sample.nbytes for sample in samples])),
+        'saving': 1.0 - np.dtype(np.uint16).itemsize / itemsize,
+        'candidates': candidates,
+        'recommended': min(accepted, key=lambda name: candidates[name]['max']) if len(accepted) > 0 else None,
+    }
+
+def write_encoded(src:h5py.File, dst:h5py.File, encodings:Dict[str, Dict[str, Union[str, float]]], ranges:Dict[str, Union[List[float], None]]) -> Dict[str, int]:
+    """HDF5ファイルを複製し, 指定したsrc-dataのデータセットを保存形式を変えて書き込む
+
+    Args:
+        src (h5py.File): 元のHDF5ファイル
+        dst (h5py.File): 書き込み先
+        encodings (Dict[str, Dict[str, Union[str, float]]]): src-dataのキー毎の保存形式
+        ranges (Dict[str, Union[List[float], None]]): src-dataのキー毎の範囲
+
+    Returns:
+        Dict[str, int]: src-dataのキー毎の, 表せずに飽和・0にした値の数
+    """
+    targets:Dict[str, str] = get_frameDatasets(src, list(encodings.keys()))
+    lost:Dict[str, int] = {key: 0 for key in encodings.keys()}
+    copy_h5Tree(src, dst, targets)
+    for name, key in targets.items():
+        item:h5py.Dataset = src[name]
+        encoded, count = encode(item[()], encodings[key], ranges.get(key))
+        lost[key] += count
+        dataset:h5py.Dataset = dst[os.path.dirname(name) or '/'].create_dataset(os.path.basename(name), data=encoded, chunks=item.chunks, compression=item.compression, compression_opts=item.compression_opts)
+        dataset.attrs.update(item.attrs)
+        dataset.attrs[H5_ATTR_SCALEFACTOR] = encodings[key][CONFIG_TAG_SCALE]
+        dataset.attrs[H5_ATTR_ADDOFFSET] = encodings[key][CONFIG_TAG_OFFSET]
+    return lost
+
+def add_parser(subparsers) -> None:
+    parser = subparsers.add_parser('precision', help='measure quantization error of 16-bit encodings of float sources and optionally rewrite them')
+    parser.add_argument('config', type=str, help='config file (JSON)')
+    parser.add_argument('--samples', type=int, default=DEFAULT_SAMPLES, help='frames to analyze (0: all)')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE, help='allowed max error relative to the value span')
+    parser.add_argument('--seed', type=int, default=None, help='seed of the frame sampling')
+    parser.add_argument('-o', '--output', type=str, default=None, help='write a copy of the HDF5 file with the recommended encodings and point the config to it (analyzes all frames)')
+    parser.set_defaults(func=run)
+
+def run(args) -> None:
+    config = load_config(args.config)
+    ranges:Dict[str, Union[List[float], None]] = get_floatSources(config)
+    results:Dict[str, dict] = {}
+    with h5py.File(config[H5_ATTR_FILEPATH], mode='r') as h5file:
+        length:int = get_length(h5file)
+        # 書き込む場合は, 全てのフレームの値が符号化の範囲に収まるように全てのフレームを調べる
+        indices:np.ndarray = sample_frameIndices(length, 0 if args.output is not None else args.samples, args.seed)
+        for key, value_range in ranges.items():
+            result = analyze_source(h5file, key, value_range, indices, args.tolerance)
+            if result is not None:
+                results[key] = result
+
+    if len(results) == 0:
+        print('no float source referenced by the mini-batches')
+        return
+    total_saved:float = 0.0
+    for key, result in results.items():
+        frames:int = 1 if key.startswith('/') else length
+        print('{0:s} ({1:s}, {2:s} {3:.6g}..{4:.6g}, max error {5:.3g}):'.format(key, result['dtype'], 'range' if result['range'] is not None else 'span', result['span'][0], result['span'][1], result['allowed']))
+        for name, candidate in result['candidates'].items():
+            print('    {0:8s} max {1:10.4g}  rms {2:10.4g}  lost {3:d}{4:s}'.format(name, candidate['max'], candidate['rms'], candidate['lost'], '  <- recommended' if name == result['recommended'] else ''))
+        if result['recommended'] is not None:
+            saved:float = result['bytes'] * result['saving'] * frames
+            total_saved += saved
+            print('    saves {0:.1f} KiB per sample, {1:.1f} MiB in total'.format(result['bytes'] * result['saving'] / 1024, saved / 1024 ** 2))
+    print('total: {0:.1f} MiB less to read'.format(total_saved / 1024 ** 2))
+
+    if args.output is None: return
+    encodings:Dict[str, Dict[str, Union[str, float]]] = {key: {attr: result['candidates'][result['recommended']][attr] for attr in [CONFIG_TAG_DTYPE, CONFIG_TAG_SCALE, CONFIG_TAG_OFFSET]} for key, result in results.items() if result['recommended'] is not None}
+    if len(encodings) == 0:
+        print('no encoding within the tolerance')
+        return
+    with h5py.File(config[H5_ATTR_FILEPATH], mode='r') as src, h5py.File(args.output, mode='w') as dst:
+        lost:Dict[str, int] = write_encoded(src, dst, encodings, ranges)
+    if any(count > 0 for count in lost.values()):
+        # 飽和した値を持つファイルは使わず, 設定も変更しない
+        for key, count in lost.items():
+            if count > 0:
+                print('{0:s}: {1:d} values could not be represented'.format(key, count))
+        os.remove(args.output)
+        print('removed: {0:s} (config not changed)'.format(args.output))
+        sys.exit(1)
+    for key, encoding in encodings.items():
+        config[CONFIG_TAG_SRCDATA][key][CONFIG_TAG_ENCODING] = encoding
+    config[H5_ATTR_FILEPATH] = os.path.abspath(args.output)
+    save_config(config, args.config)
+    print('saved: {0:s}'.format(args.output))
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple, Union
+import numpy as np
+import h5py
+
+from ..common.structure import *
+from ..common.scan import get_length
+from ..common.quality import get_directSource, is_certified
+from .utils import *
+from .loader import read_dataset
+
+def get_qualitySources(config:Dict[str, dict]) -> Dict[str, Dict[str, List[float]]]:
+    """検査するsrc-data (mini-batchが参照する数値のデータセット) と, 値をそのまま出力するmini-batch毎のrange
+
+    Returns:
+        Dict[str, Dict[str, List[float]]]: src-dataのキー, mini-batchのタグ毎のrange
+    """
+    srcdata_dict:Dict[str, dict] = config[CONFIG_TAG_SRCDATA]
+    sources:Dict[str, Dict[str, List[float]]] = {}
+    for key in get_minibatchSources(config):
+        item:dict = srcdata_dict.get(key, {})
+        if item.get(CONFIG_TAG_SHAPE) is None or item.get(CONFIG_TAG_TYPE) in COMPRESSED_TYPES.keys(): continue
+        dtype = DTYPE_NUMPY.get(item[CONFIG_TAG_TYPE], item[CONFIG_TAG_TYPE])
+        try:
+            if dtype is None or dtype is object or np.dtype(dtype).kind not in 'fiu': continue
+        except TypeError:
+            continue
+        sources[key] = {}
+    for minibatch_tag, minibatch_config in config[CONFIG_TAG_MINIBATCH].items():
+        key:Union[str, None] = get_directSource(minibatch_config)
+        if key in sources.keys() and minibatch_config.get(CONFIG_TAG_RANGE) is not None:
+            sources[key][minibatch_tag] = [float(value) for value in minibatch_config[CONFIG_TAG_RANGE]]
+    return sources
+
+def create_stats(ranges:Dict[str, List[float]]) -> Dict[str, Union[int, list, dict, None]]:
+    return {CONFIG_TAG_FRAMES: 0, CONFIG_TAG_NAN: 0, CONFIG_TAG_INF: 0, CONFIG_TAG_ZEROFRAMES: 0, CONFIG_TAG_SPAN: None, CONFIG_TAG_OUTOFRANGE: {tag: 0 for tag in ranges.keys()}}
+
+def update_stats(stats:Dict[str, Union[int, list, dict, None]], data:np.ndarray, points:bool, ranges:Dict[str, List[float]]) -> None:
+    """1フレーム分の値を集計する. 点群は原点からの距離をrangeと比較する (apply_outputと同じ)."""
+    stats[CONFIG_TAG_FRAMES] += 1
+    if data.dtype.kind == 'f':
+        stats[CONFIG_TAG_NAN] += int(np.count_nonzero(np.isnan(data)))
+        stats[CONFIG_TAG_INF] += int(np.count_nonzero(np.isinf(data)))
+    if not np.any(data):
+        stats[CONFIG_TAG_ZEROFRAMES] += 1
+    values:np.ndarray = np.linalg.norm(data.reshape((-1, data.shape[-1])), axis=1) if points and data.ndim > 1 else data.reshape(-1)
+    if values.dtype.kind == 'f':
+        values = values[np.isfinite(values)]
+    if len(values) == 0: return
+    low, high = float(values.min()), float(values.max())
+    span:Union[List[float], None] = stats[CONFIG_TAG_SPAN]
+    stats[CONFIG_TAG_SPAN] = [low, high] if span is None else [min(span[0], low), max(span[1], high)]
+    for tag, value_range in ranges.items():
+        stats[CONFIG_TAG_OUTOFRANGE][tag] += int(np.count_nonzero((values < value_range[0]) | (values > value_range[1])))
+
+def merge_stats(dst:Dict[str, Union[int, list, dict, None]], src:Dict[str, Union[int, list, dict, None]]) -> Dict[str, Union[int, list, dict, None]]:
+    for tag in [CONFIG_TAG_FRAMES, CONFIG_TAG_NAN, CONFIG_TAG_INF, CONFIG_TAG_ZEROFRAMES]:
+        dst[tag] += src[tag]
+    if src[CONFIG_TAG_SPAN] is not None:
+        span:Union[List[float], None] = dst[CONFIG_TAG_SPAN]
+        dst[CONFIG_TAG_SPAN] = list(src[CONFIG_TAG_SPAN]) if span is None else [min(span[0], src[CONFIG_TAG_SPAN][0]), max(span[1], src[CONFIG_TAG_SPAN][1])]
+    for tag, count in src[CONFIG_TAG_OUTOFRANGE].items():
+        dst[CONFIG_TAG_OUTOFRANGE][tag] += count
+    return dst
+
+def check_frames(h5file:h5py.File, sources:Dict[str, Tuple[bool, Dict[str, List[float]]]], indices:List[int]) -> Dict[str, Dict[str, Union[int, list, dict, None]]]:
+    """指定したフレームのsrc-dataを集計する
+
+    Args:
+        h5file (h5py.File): HDF5ファイル
+        sources (Dict[str, Tuple[bool, Dict[str, List[float]]]]): src-dataのキー毎の, 点群か否かとmini-batch毎のrange
+        indices (List[int]): フレームインデックス
+
+    Returns:
+        Dict[str, Dict[str, Union[int, list, dict, None]]]: src-dataのキー毎の集計
+    """
+    results:Dict[str, Dict[str, Union[int, list, dict, None]]] = {}
+    for key, (points, ranges) in sources.items():
+        stats = create_stats(ranges)
+        for idx in indices:
+            h5key:str = get_h5Key(key, idx)
+            if h5key not in h5file: continue
+            update_stats(stats, read_dataset(h5file[h5key]), points, ranges)
+        results[key] = stats
+    return results
+
+def _check_chunk(h5path:str, sources:Dict[str, Tuple[bool, Dict[str, List[float]]]], indices:List[int]) -> Dict[str, Dict[str, Union[int, list, dict, None]]]:
+    with h5py.File(h5path, mode='r') as h5file:
+        return check_frames(h5file, sources, indices)
+
+def check_sources(h5path:str, config:Dict[str, dict], jobs:int=1, chunk_size:int=256) -> Dict[str, Dict[str, Union[bool, int, list, dict, str, None]]]:
+    """mini-batchが参照するsrc-dataの全フレームのNaN/Inf, range外の値, 全て0のフレームを数える
+
+    フレームをchunk_size毎に分けてプロセスプールで集計する.
+
+    Args:
+        h5path (str): HDF5ファイルのパス
+        config (Dict[str, dict]): 設定
+        jobs (int, optional): プロセス数. Defaults to 1.
+        chunk_size (int, optional): 1プロセスが1度に集計するフレーム数. Defaults to 256.
+
+    Returns:
+        Dict[str, Dict[str, Union[bool, int, list, dict, str, None]]]: src-dataのキー毎の検査結果 (src-dataの'quality')
+    """
+    srcdata_dict:Dict[str, dict] = config[CONFIG_TAG_SRCDATA]
+    sources:Dict[str, Tuple[bool, Dict[str, List[float]]]] = {key: (srcdata_dict[key][CONFIG_TAG_TYPE] == TYPE_POINTS, ranges) for key, ranges in get_qualitySources(config).items()}
+    static_sources = {key: item for key, item in sources.items() if key.startswith('/')}
+    frame_sources = {key: item for key, item in sources.items() if not key.startswith('/')}
+    with h5py.File(h5path, mode='r') as h5file:
+        length:int = get_length(h5file)
+        results:Dict[str, dict] = check_frames(h5file, static_sources, [0])
+        results.update({key: create_stats(ranges) for key, (_, ranges) in frame_sources.items()})
+        chunks:List[List[int]] = [list(range(begin, min(begin + chunk_size, length))) for begin in range(0, length, chunk_size)]
+        if jobs > 1 and len(chunks) > 1 and len(frame_sources) > 0:
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                chunk_results = list(executor.map(_check_chunk, [h5path] * len(chunks), [frame_sources] * len(chunks), chunks))
+        else:
+            chunk_results = [check_frames(h5file, frame_sources, chunk) for chunk in chunks]
+    for chunk_result in chunk_results:
+        for key, stats in chunk_result.items():
+            merge_stats(results[key], stats)
+    for key, stats in results.items():
+        stats[CONFIG_TAG_CLEAN] = stats[CONFIG_TAG_NAN] == 0 and stats[CONFIG_TAG_INF] == 0
+        stats[CONFIG_TAG_FILE] = config[H5_ATTR_FILEPATH]
+    return results
+
+def add_parser(subparsers) -> None:
+    parser = subparsers.add_parser('quality', help='count NaN/Inf, out-of-range values and all-zero frames of referenced sources and certify clean ones')
+    parser.add_argument('config', type=str, help='config file (JSON)')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1, help='number of processes')
+    parser.add_argument('--chunk-size', type=int, default=256, help='frames per process task')
+    parser.set_defaults(func=run)
+
+def run(args) -> None:
+    config = load_config(args.config)
+    results:Dict[str, dict] = check_sources(config[H5_ATTR_FILEPATH], config, args.jobs, args.chunk_size)
+    if len(results) == 0:
+        print('no numeric source referenced by the mini-batches')
+        return
+    for key, stats in results.items():
+        span:str = 'none' if stats[CONFIG_TAG_SPAN] is None else '{0:.6g}..{1:.6g}'.format(*stats[CONFIG_TAG_SPAN])
+        print('{0:s}: {1:s} ({2:d} frames, nan {3:d}, inf {4:d}, all-zero frames {5:d}, span {6:s})'.format(
+            key, 'clean' if stats[CONFIG_TAG_CLEAN] else 'NOT clean', stats[CONFIG_TAG_FRAMES], stats[CONFIG_TAG_NAN], stats[CONFIG_TAG_INF], stats[CONFIG_TAG_ZEROFRAMES], span
+        ))
+        config[CONFIG_TAG_SRCDATA][key][CONFIG_TAG_QUALITY] = stats
+        for tag, count in stats[CONFIG_TAG_OUTOFRANGE].items():
+            print('    {0:s}: {1:d} values outside range, {2:s}'.format(tag, count, 'range check skipped' if is_certified(config, config[CONFIG_TAG_MINIBATCH][tag]) else 'range check kept'))
+    save_config(config, args.config)
+    print('saved: {0:s}'.format(args.config))
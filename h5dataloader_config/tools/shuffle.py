@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+
+import time
+import warnings
+from typing import Dict, List, Union
+import numpy as np
+import h5py
+
+from ..common.structure import *
+from ..common.scan import get_length
+from .utils import *
+
+DEFAULT_BLOCK_SIZE:int = 64
+# 読み込み速度の計測回数 (順序毎. 交互に計測する)
+DEFAULT_BENCHMARK_REPEAT:int = 3
+# チャンクの位置を取得できるか (h5py 2.10にはget_chunk_infoが無い)
+CHUNK_INFO:bool = hasattr(h5py.h5d.DatasetID, 'get_chunk_info')
+
+def get_datasetOffset(dataset:h5py.Dataset) -> Union[int, None]:
+    """データセットの先頭バイトオフセット (チャンク化されたデータセットはCHUNK_INFOがTrueの場合のみ. 取得できない場合はNone)"""
+    offset:Union[int, None] = dataset.id.get_offset()
+    if offset is None and CHUNK_INFO is True and dataset.chunks is not None and dataset.id.get_num_chunks() > 0:
+        offset = dataset.id.get_chunk_info(0).byte_offset
+    return offset
+
+def get_frameOffsets(h5file:h5py.File, keys:List[str]) -> np.ndarray:
+    """フレーム毎に, 参照するデータセットのファイル内の先頭バイトオフセットを取得
+
+    Args:
+        h5file (h5py.File): HDF5ファイル
+        keys (List[str]): フレーム毎のsrc-dataのキー
+
+    Returns:
+        np.ndarray: フレーム毎のバイトオフセット. 取得できないフレームがある場合は警告し, フレームインデックス順とみなす.
+    """
+    length:int = get_length(h5file)
+    offsets:np.ndarray = np.full((length,), -1, dtype=np.int64)
+    for idx in range(length):
+        frame_offsets:List[int] = []
+        for key in keys:
+            h5key:str = get_h5Key(key, idx)
+            if h5key not in h5file: continue
+            for dataset in get_datasets(h5file[h5key]):
+                offset = get_datasetOffset(dataset)
+                if offset is not None: frame_offsets.append(offset)
+        if len(frame_offsets) > 0:
+            offsets[idx] = min(frame_offsets)
+    if np.any(offsets < 0):
+        warnings.warn('byte offsets of {0:d}/{1:d} frames are unavailable (e.g. compact or empty datasets): falling back to the frame index order'.format(int(np.count_nonzero(offsets < 0)), length))
+        return np.arange(length, dtype=np.int64)
+    return offsets
+
+def block_shuffle(offsets:np.ndarray, block_size:int, seed:int) -> np.ndarray:
+    """オフセット順にフレームをブロックに分け, ブロックの順序とブロック内の順序をシャッフルする
+
+    Args:
+        offsets (np.ndarray): フレーム毎のバイトオフセット
+        block_size (int): ブロック当たりのフレーム数
+        seed (int): シード
+
+    Returns:
+        np.ndarray: フレームインデックスの順序
+    """
+    rng = np.random.default_rng(seed)
+    sorted_indices:np.ndarray = np.argsort(offsets, kind='stable')
+    blocks:List[np.ndarray] = [sorted_indices[i:i + block_size] for i in range(0, len(sorted_indices), block_size)]
+    order:List[np.ndarray] = [rng.permutation(blocks[block_idx]) for block_idx in rng.permutation(len(blocks))]
+    if len(order) == 0: return np.zeros((0,), dtype=index_dtype(len(offsets)))
+    return np.concatenate(order).astype(index_dtype(len(offsets)))
+
+def locality_metric(order:np.ndarray, offsets:np.ndarray) -> Dict[str, float]:
+    """読み込み順序の局所性
+
+    Returns:
+        Dict[str, float]: 'mean-seek': 連続する読み込み間の平均シーク距離 [byte],
+                          'sequential': オフセットが前方に進む読み込みの割合
+    """
+    if len(order) < 2: return {'mean-seek': 0.0, 'sequential': 1.0}
+    diff:np.ndarray = np.diff(offsets[order])
+    return {'mean-seek': float(np.mean(np.abs(diff))), 'sequential': float(np.mean(diff > 0))}
+
+def create_shuffleIndex(offsets:np.ndarray, seeds:List[int], block_size:int=DEFAULT_BLOCK_SIZE) -> Dict[str, np.ndarray]:
+    return {'epoch_{0:d}'.format(seed): block_shuffle(offsets, block_size, seed) for seed in seeds}
+
+def benchmark_readThroughput(h5path:str, keys:List[str], order:np.ndarray) -> Dict[str, float]:
+    """指定した順序で全データセットを読み込んだときのスループット
+
+    ページキャッシュは破棄しないため, 比較する順序は同じフレームを交互に繰り返し読み込んで計測すること (benchmark_orders).
+    """
+    nbytes:int = 0
+    start:float = time.perf_counter()
+    with h5py.File(h5path, mode='r') as h5file:
+        for idx in order:
+            for key in keys:
+                h5key:str = get_h5Key(key, int(idx))
+                if h5key not in h5file: continue
+                for dataset in get_datasets(h5file[h5key]):
+                    nbytes += dataset[()].nbytes
+    elapsed:float = time.perf_counter() - start
+    return {'frames': len(order), 'bytes': nbytes, 'seconds': elapsed, 'MB/s': nbytes / elapsed / 1e6 if elapsed > 0 else 0.0}
+
+def benchmark_orders(h5path:str, keys:List[str], orders:Dict[str, np.ndarray], repeat:int=DEFAULT_BENCHMARK_REPEAT) -> Dict[str, Dict[str, float]]:
+    """同じフレームを読み込む順序毎の読み込み速度
+
+    ページキャッシュの影響が偏らないように, 順序を入れ替えながら交互に計測し, 順序毎の中央値を返す.
+
+    Args:
+        h5path (str): HDF5ファイル
+        keys (List[str]): フレーム毎のsrc-dataのキー
+        orders (Dict[str, np.ndarray]): 名前, 同じフレームの集合を並べた順序
+        repeat (int, optional): 順序毎の計測回数. Defaults to DEFAULT_BENCHMARK_REPEAT.
+
+    Returns:
+        Dict[str, Dict[str, float]]: 名前, 計測時間が中央値の結果
+    """
+    names:List[str] = list(orders.keys())
+    results:Dict[str, List[Dict[str, float]]] = {name: [] for name in names}
+    for round_idx in range(max(repeat, 1)):
+        for name in (names if round_idx % 2 == 0 else names[::-1]):
+            results[name].append(benchmark_readThroughput(h5path, keys, orders[name]))
+    return {name: sorted(name_results, key=lambda result: result['seconds'])[len(name_results) // 2] for name, name_results in results.items()}
+
+def add_parser(subparsers) -> None:
+    parser = subparsers.add_parser('shuffle', help='generate chunk-locality-aware shuffle orders')
+    parser.add_argument('config', type=str, help='config file (JSON)')
+    parser.add_argument('--seeds', type=int, nargs='+', default=[0], help='epoch seeds')
+    parser.add_argument('--block-size', type=int, default=DEFAULT_BLOCK_SIZE, help='frames per block')
+    parser.add_argument('--benchmark', type=int, default=0, metavar='N', help='compare random and block-shuffled reads of N frames')
+    parser.set_defaults(func=run)
+
+def run(args) -> None:
+    config = load_config(args.config)
+    h5path:str = config[H5_ATTR_FILEPATH]
+    keys:List[str] = get_minibatchSources(config, perFrame=True)
+    if len(keys) == 0:
+        keys = [key for key in config[CONFIG_TAG_SRCDATA].keys() if not key.startswith('/')]
+
+    with h5py.File(h5path, mode='r') as h5file:
+        offsets:np.ndarray = get_frameOffsets(h5file, keys)
+    arrays:Dict[str, np.ndarray] = create_shuffleIndex(offsets, args.seeds, args.block_size)
+
+    random_order:np.ndarray = np.random.default_rng(args.seeds[0]).permutation(len(offsets))
+    block_order:np.ndarray = arrays['epoch_{0:d}'.format(args.seeds[0])]
+    random_metric = locality_metric(random_order, offsets)
+    block_metric = locality_metric(block_order, offsets)
+    print('random       : mean-seek {0:.3e} B, sequential {1:.3f}'.format(random_metric['mean-seek'], random_metric['sequential']))
+    print('block-shuffle: mean-seek {0:.3e} B, sequential {1:.3f}'.format(block_metric['mean-seek'], block_metric['sequential']))
+
+    path = save_sidecar(config, args.config, CONFIG_TAG_SHUFFLE, arrays, **{
+        'block-size': args.block_size,
+        'seeds': args.seeds,
+        'mean-seek': block_metric['mean-seek'],
+    })
+    save_config(config, args.config)
+    print('saved: {0:s}'.format(path))
+
+    if args.benchmark > 0:
+        # 同じフレームをランダムな順序とブロック単位の順序で読み込む
+        frames:np.ndarray = block_order[:args.benchmark]
+        orders:Dict[str, np.ndarray] = {'random': np.random.default_rng(args.seeds[0]).permutation(frames), 'block-shuffle': frames}
+        for name, result in benchmark_orders(h5path, keys, orders).items():
+            print('{0:13s}: {1:.1f} MB/s ({2:d} frames, {3:.3f} s)'.format(name, result['MB/s'], result['frames'], result['seconds']))
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+
+from typing import Dict, List, Union
+import numpy as np
+import h5py
+
+from ..common.structure import *
+from ..common.scan import get_length
+from .utils import *
+
+SPLIT_CONTIGUOUS:str = 'contiguous'
+SPLIT_STRATIFIED:str = 'stratified'
+
+DEFAULT_SPLIT_NAMES:List[str] = ['train', 'val', 'test']
+DEFAULT_SPLIT_RATIOS:List[float] = [0.8, 0.1, 0.1]
+DEFAULT_SEGMENT_LENGTH:int = 100
+# 区間のフレーム数を自動で決める場合の, 最も小さいスプリットに割り当てる区間数
+MIN_SPLIT_SEGMENTS:int = 2
+
+def get_segments(length:int, segment_length:int) -> np.ndarray:
+    """フレームを連続区間に分ける
+
+    Returns:
+        np.ndarray: 区間の先頭フレームインデックス. 末尾にlengthを含む.
+    """
+    return np.append(np.arange(0, length, max(segment_length, 1)), length)
+
+def get_segmentLength(length:int, ratios:List[float], segment_length:int=DEFAULT_SEGMENT_LENGTH) -> int:
+    """最も小さいスプリットにもMIN_SPLIT_SEGMENTS個の区間が割り当たるように, segment_length以下で区間のフレーム数を決める"""
+    ratios_array:np.ndarray = np.asarray(ratios, dtype=np.float64)
+    min_ratio:float = float(ratios_array[ratios_array > 0].min() / ratios_array.sum()) if np.any(ratios_array > 0) else 1.0
+    num_units:int = int(np.ceil(MIN_SPLIT_SEGMENTS / min_ratio))
+    return int(min(segment_length, max(length // num_units, 1)))
+
+def assign_units(weights:np.ndarray, ratios:List[float], order:np.ndarray) -> np.ndarray:
+    """順序に従って, 累積重みが比率に達するまで単位を各スプリットに割り当てる
+
+    Returns:
+        np.ndarray: 単位毎のスプリット番号
+    """
+    bounds:np.ndarray = np.cumsum(np.asarray(ratios, dtype=np.float64) / np.sum(ratios))
+    cumulative:np.ndarray = np.cumsum(weights[order]) / max(np.sum(weights), 1)
+    # 単位の中央が属する区間に割り当てる
+    centers:np.ndarray = cumulative - weights[order] / max(np.sum(weights), 1) / 2.0
+    assignment:np.ndarray = np.empty((len(order),), dtype=np.int64)
+    assignment[order] = np.minimum(np.searchsorted(bounds, centers, side='right'), len(ratios) - 1)
+    return assignment
+
+def get_strata(counts:np.ndarray) -> np.ndarray:
+    """単位毎に, 含まれるクラスのうち最も出現の少ないクラスを層とする
+
+    Args:
+        counts (np.ndarray): (単位数, クラス数) の計数行列
+
+    Returns:
+        np.ndarray: 単位毎の層. どのクラスも含まない場合は-1.
+    """
+    presence:np.ndarray = counts > 0
+    frequency:np.ndarray = presence.sum(axis=0).astype(np.float64)
+    rarity:np.ndarray = np.where(presence, frequency[np.newaxis, :], np.inf)
+    strata:np.ndarray = np.argmin(rarity, axis=1)
+    strata[~np.any(presence, axis=1)] = -1
+    return strata
+
+def create_splits(length:int, ratios:List[float], mode:str=SPLIT_CONTIGUOUS, segment_length:int=DEFAULT_SEGMENT_LENGTH, gap:int=0, seed:int=0, counts:Union[np.ndarray, None]=None) -> List[np.ndarray]:
+    """スプリット毎のフレームインデックスを作成
+
+    フレームは連続区間 (segment_length) 単位で割り当てるため, 区間内の時間的な漏洩は起きない.
+
+    Args:
+        length (int): フレーム数
+        ratios (List[float]): スプリット毎の比率
+        mode (str, optional): 'contiguous' または 'stratified'. Defaults to SPLIT_CONTIGUOUS.
+        segment_length (int, optional): 区間のフレーム数. Defaults to DEFAULT_SEGMENT_LENGTH.
+        gap (int, optional): 異なるスプリットの区間と隣接する区間の末尾から除くフレーム数. Defaults to 0.
+        seed (int, optional): シード. Defaults to 0.
+        counts (Union[np.ndarray, None], optional): 'stratified'で用いるフレーム毎のクラス計数行列. Defaults to None.
+
+    Returns:
+        List[np.ndarray]: スプリット毎の昇順のフレームインデックス
+    """
+    rng = np.random.default_rng(seed)
+    bounds:np.ndarray = get_segments(length, segment_length)
+    num_units:int = len(bounds) - 1
+    unit_weights:np.ndarray = np.diff(bounds).astype(np.float64)
+
+    if mode == SPLIT_STRATIFIED:
+        if counts is None:
+            raise ValueError('stratified split requires class counts (run the "weights" command first)')
+        strata:np.ndarray = get_strata(np.add.reduceat(counts, bounds[:-1], axis=0))
+        assignment:np.ndarray = np.empty((num_units,), dtype=np.int64)
+        for stratum in np.unique(strata):
+            units:np.ndarray = np.flatnonzero(strata == stratum)
+            order:np.ndarray = rng.permutation(len(units))
+            assignment[units] = assign_units(unit_weights[units], ratios, order)
+    else:
+        assignment = assign_units(unit_weights, ratios, rng.permutation(num_units))
+
+    unit_of_frame:np.ndarray = np.repeat(np.arange(num_units), np.diff(bounds))
+    frame_assignment:np.ndarray = assignment[unit_of_frame]
+    if gap > 0 and num_units > 1:
+        boundary_units:np.ndarray = np.flatnonzero(assignment[:-1] != assignment[1:])
+        for unit in boundary_units:
+            frame_assignment[max(bounds[unit + 1] - gap, bounds[unit]):bounds[unit + 1]] = -1
+
+    dtype:np.dtype = index_dtype(length)
+    return [np.flatnonzero(frame_assignment == split_idx).astype(dtype) for split_idx in range(len(ratios))]
+
+def add_parser(subparsers) -> None:
+    parser = subparsers.add_parser('split', help='generate train/val/test split indices')
+    parser.add_argument('config', type=str, help='config file (JSON)')
+    parser.add_argument('--names', type=str, nargs='+', default=DEFAULT_SPLIT_NAMES, help='split names')
+    parser.add_argument('--ratios', type=float, nargs='+', default=DEFAULT_SPLIT_RATIOS, help='split ratios')
+    parser.add_argument('--mode', type=str, choices=[SPLIT_CONTIGUOUS, SPLIT_STRATIFIED], default=SPLIT_CONTIGUOUS)
+    parser.add_argument('--segment-length', type=int, default=None, help='frames per contiguous segment (default: {0:d}, shortened so that every split gets {1:d} segments)'.format(DEFAULT_SEGMENT_LENGTH, MIN_SPLIT_SEGMENTS))
+    parser.add_argument('--gap', type=int, default=0, help='frames dropped at boundaries between different splits')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--minibatch', type=str, default=None, help='mini-batch whose class counts are used for stratification')
+    parser.set_defaults(func=run, error=parser.error)
+
+def run(args) -> None:
+    if len(args.names) != len(args.ratios):
+        args.error('--names and --ratios must have the same length')
+    config = load_config(args.config)
+
+    counts:Union[np.ndarray, None] = None
+    if args.mode == SPLIT_STRATIFIED:
+        weights_arrays:Union[Dict[str, np.ndarray], None] = load_sidecar(config, args.config, CONFIG_TAG_WEIGHTS)
+        if weights_arrays is None:
+            args.error('stratified split requires the "weights" sidecar (run the "weights" command first)')
+        counts_keys:List[str] = [key for key in weights_arrays.keys() if key.endswith('.counts')]
+        if len(counts_keys) == 0:
+            args.error('the "weights" sidecar has no class counts (no mini-batch with labels)')
+        if args.minibatch is not None:
+            if args.minibatch + '.counts' not in counts_keys:
+                args.error('--minibatch {0:s} has no class counts (choose from {1:s})'.format(args.minibatch, ', '.join(key[:-len('.counts')] for key in counts_keys)))
+            counts_keys = [args.minibatch + '.counts']
+        counts = weights_arrays[counts_keys[0]]
+        length:int = counts.shape[0]
+    else:
+        with h5py.File(config[H5_ATTR_FILEPATH], mode='r') as h5file:
+            length:int = get_length(h5file)
+
+    segment_length:int = get_segmentLength(length, args.ratios) if args.segment_length is None else args.segment_length
+    if segment_length < DEFAULT_SEGMENT_LENGTH and args.segment_length is None:
+        print('{0:d} frames: segment length shortened to {1:d}'.format(length, segment_length))
+    splits:List[np.ndarray] = create_splits(length, args.ratios, args.mode, segment_length, args.gap, args.seed, counts)
+    arrays:Dict[str, np.ndarray] = {name: indices for name, indices in zip(args.names, splits)}
+    path = save_sidecar(config, args.config, CONFIG_TAG_SPLIT, arrays, **{
+        'mode': args.mode,
+        'ratios': args.ratios,
+        'segment-length': segment_length,
+        'gap': args.gap,
+        'seed': args.seed,
+    })
+    save_config(config, args.config)
+    for name, indices in arrays.items():
+        print('{0:s}: {1:d} frames'.format(name, len(indices)))
+    empty:List[str] = [name for name, indices in arrays.items() if len(indices) == 0]
+    if len(empty) > 0:
+        print('warning: {0:s} got no frames (use a shorter --segment-length)'.format(', '.join(empty)))
+    print('saved: {0:s}'.format(path))
@@ -0,0 +1,317 @@
+# -*- coding: utf-8 -*-
+
+from typing import Any, Dict, List, Tuple, Union
+import numpy as np
+import h5py
+
+from ..common.structure import *
+from ..common.model import ConfigModel
+from ..common.codec import encode_image, get_imageShape, get_pixelType
+from .utils import *
+from .loader import matrix2quaternion
+
+DEFAULT_POINTS:int = 1024
+DEFAULT_IMAGE_SHAPE:Tuple[int, int] = (480, 640)
+DEFAULT_FRAME_RATE:float = 10.0
+DEFAULT_SPEED:float = 10.0
+DEFAULT_LABELTAG:str = 'synthetic'
+DEFAULT_VOXEL_SIZE:float = 1.0
+DEFAULT_BASELINE:float = 0.1
+
+# pose (x: 前方, y: 左, z: 上) からカメラ (x: 右, y: 下, z: 前方) への回転
+POSE_TO_CAMERA:np.ndarray = np.array([[0.0, 0.0, 1.0], [-1.0, 0.0, 0.0], [0.0, -1.0, 0.0]])
+
+def set_attrs(item:Union[h5py.Group, h5py.Dataset], data_type:str, frame_id:Union[str, None]=None, child_frame_id:Union[str, None]=None, label_tag:Union[str, None]=None, stamp:Union[float, None]=None) -> None:
+    item.attrs[H5_ATTR_TYPE] = data_type
+    if frame_id is not None: item.attrs[H5_ATTR_FRAMEID] = frame_id
+    if child_frame_id is not None: item.attrs[H5_ATTR_CHILDFRAMEID] = child_frame_id
+    if label_tag is not None: item.attrs[H5_ATTR_LABELTAG] = label_tag
+    if stamp is not None:
+        item.attrs[H5_ATTR_STAMPSEC] = int(np.floor(stamp))
+        item.attrs[H5_ATTR_STAMPNSEC] = int(round((stamp - np.floor(stamp)) * 1e9))
+
+def write_dataset(group:h5py.Group, name:str, data:np.ndarray, data_type:str, frame_id:Union[str, None]=None, label_tag:Union[str, None]=None, stamp:Union[float, None]=None, chunks:Union[bool, Tuple[int, ...], None]=None, compression:Union[str, None]=None) -> h5py.Dataset:
+    if data.ndim == 0:
+        chunks, compression = None, None
+    dataset:h5py.Dataset = group.create_dataset(name, data=data, chunks=chunks, compression=compression)
+    set_attrs(dataset, data_type, frame_id=frame_id, label_tag=label_tag, stamp=stamp)
+    return dataset
+
+def write_pose(group:h5py.Group, name:str, translation:np.ndarray, rotation:np.ndarray, frame_id:str, child_frame_id:str, stamp:Union[float, None]=None) -> h5py.Group:
+    """poseグループを書き込む (rotationは(x, y, z, w)の四元数)"""
+    pose_group:h5py.Group = group.create_group(name)
+    set_attrs(pose_group, TYPE_POSE, frame_id=frame_id, child_frame_id=child_frame_id, stamp=stamp)
+    write_dataset(pose_group, SUBTYPE_TRANSLATION, np.asarray(translation, dtype=np.float32), TYPE_TRANSLATION)
+    write_dataset(pose_group, SUBTYPE_ROTATION, np.asarray(rotation, dtype=np.float32), TYPE_QUATERNION)
+    return pose_group
+
+def write_intrinsic(group:h5py.Group, name:str, values:Dict[str, float], frame_id:str) -> h5py.Group:
+    intrinsic_group:h5py.Group = group.create_group(name)
+    set_attrs(intrinsic_group, TYPE_INTRINSIC, frame_id=frame_id)
+    for subtype in [SUBTYPE_FX, SUBTYPE_FY, SUBTYPE_CX, SUBTYPE_CY, SUBTYPE_HEIGHT, SUBTYPE_WIDTH]:
+        intrinsic_group.create_dataset(subtype, data=np.float32(values[subtype]))
+    return intrinsic_group
+
+def write_semantic3d(group:h5py.Group, name:str, points:np.ndarray, labels:np.ndarray, frame_id:str, label_tag:str, stamp:Union[float, None]=None, chunks:Union[bool, Tuple[int, ...], None]=None, compression:Union[str, None]=None) -> h5py.Group:
+    semantic3d_group:h5py.Group = group.create_group(name)
+    set_attrs(semantic3d_group, TYPE_SEMANTIC3D, frame_id=frame_id, label_tag=label_tag, stamp=stamp)
+    write_dataset(semantic3d_group, SUBTYPE_POINTS, points, TYPE_POINTS, chunks=chunks, compression=compression)
+    write_dataset(semantic3d_group, SUBTYPE_SEMANTIC1D, labels, TYPE_SEMANTIC1D, label_tag=label_tag, chunks=chunks, compression=compression)
+    return semantic3d_group
+
+def write_voxel(group:h5py.Group, name:str, points:np.ndarray, labels:Union[np.ndarray, None], voxel_size:float, frame_id:str, label_tag:Union[str, None]=None) -> h5py.Dataset:
+    """点群をボクセル毎の可変長レコード (voxel-points, labelsを指定した場合はvoxel-semantic3d) として書き込む"""
+    data_type:str = TYPE_VOXEL_POINTS if labels is None else TYPE_VOXEL_SEMANTIC3D
+    record_dtype:np.dtype = DTYPE_NUMPY[SUBTYPE_VOXEL_POINTS if labels is None else SUBTYPE_VOXEL_SEMANTIC3D]
+    voxel_min:np.ndarray = np.floor(points.min(axis=0) / voxel_size) * voxel_size
+    cells:np.ndarray = np.floor((points - voxel_min) / voxel_size).astype(np.int64)
+    grid_shape:Tuple[int, ...] = tuple(int(d) for d in cells.max(axis=0) + 1)
+    records:np.ndarray = np.zeros((len(points),), dtype=record_dtype)
+    records['x'], records['y'], records['z'] = points[:, 0], points[:, 1], points[:, 2]
+    if labels is not None:
+        records['label'] = labels
+    flat:np.ndarray = np.ravel_multi_index(cells.T, grid_shape)
+    order:np.ndarray = np.argsort(flat, kind='stable')
+    cell_ids, begins = np.unique(flat[order], return_index=True)
+    voxels:np.ndarray = np.empty((int(np.prod(grid_shape)),), dtype=object)
+    voxels.fill(np.zeros((0,), dtype=record_dtype))
+    for cell_id, cell_records in zip(cell_ids, np.split(records[order], begins[1:])):
+        voxels[cell_id] = cell_records
+    dataset:h5py.Dataset = group.create_dataset(name, shape=grid_shape, dtype=h5py.vlen_dtype(record_dtype))
+    dataset[...] = voxels.reshape(grid_shape)
+    set_attrs(dataset, data_type, frame_id=frame_id, label_tag=label_tag)
+    dataset.attrs[H5_ATTR_VOXELSIZE] = np.float32(voxel_size)
+    dataset.attrs[H5_ATTR_VOXELMIN] = voxel_min.astype(np.float32)
+    dataset.attrs[H5_ATTR_VOXELMAX] = (voxel_min + np.array(grid_shape) * voxel_size).astype(np.float32)
+    return dataset
+
+def write_label(h5file:h5py.File, label_tag:str, classes:Dict[int, Tuple[str, List[int]]]) -> None:
+    """label/<tag>/<idx>/{name,color}を書き込む
+
+    Args:
+        h5file (h5py.File): HDF5ファイル
+        label_tag (str): ラベルのタグ
+        classes (Dict[int, Tuple[str, List[int]]]): インデックス毎の名前とBGRの色
+    """
+    for idx, (name, color) in classes.items():
+        class_group:h5py.Group = h5file.require_group('{0:s}/{1:s}/{2:d}'.format(H5_KEY_LABEL, label_tag, idx))
+        class_group.create_dataset(H5_KEY_NAME, data=name)
+        class_group.create_dataset(CONFIG_TAG_COLOR, data=np.asarray(color, dtype=np.uint8))
+
+def random_quaternion(rng:np.random.Generator, max_angle:float=np.pi) -> np.ndarray:
+    axis:np.ndarray = rng.standard_normal(3)
+    axis /= np.linalg.norm(axis)
+    angle:float = rng.uniform(-max_angle, max_angle)
+    return np.append(axis * np.sin(angle / 2.0), np.cos(angle / 2.0)).astype(np.float32)
+
+def random_data(rng:np.random.Generator, data_type:str, shape:Tuple[int, ...], labels:Union[np.ndarray, None]=None) -> np.ndarray:
+    """型に応じたランダムなデータ"""
+    if data_type in [TYPE_SEMANTIC1D, TYPE_SEMANTIC2D]:
+        if labels is None or len(labels) == 0:
+            labels = np.arange(32, dtype=np.uint8)
+        return rng.choice(labels.astype(np.uint8), size=shape)
+    if data_type == TYPE_POINTS:
+        return (rng.uniform(-1.0, 1.0, size=shape) * np.array([50.0, 50.0, 5.0])[:shape[-1]]).astype(np.float32)
+    if data_type in [TYPE_DEPTH, TYPE_DISPARITY]:
+        return rng.uniform(0.0, 80.0, size=shape).astype(np.float32)
+    dtype = np.dtype(DTYPE_NUMPY.get(data_type, data_type))
+    if dtype.kind in 'iu':
+        info = np.iinfo(dtype)
+        return rng.integers(max(info.min, -128), min(info.max, 255), size=shape, endpoint=True).astype(dtype)
+    return rng.standard_normal(size=shape).astype(dtype)
+
+def get_labelIndices(config:Dict[str, dict], label_tag:Union[str, None]) -> Union[np.ndarray, None]:
+    label_src:Dict[str, dict] = config.get(CONFIG_TAG_LABEL, {}).get(CONFIG_TAG_SRC, {})
+    if label_tag not in label_src.keys(): return None
+    return np.array([int(idx) % 256 for idx in label_src[label_tag].keys()], dtype=np.uint8)
+
+def create_fromConfig(config:Dict[str, dict], h5file:h5py.File, length:int, seed:int=0, max_points:Union[int, None]=None, overrides:Union[Dict[str, Dict[str, Any]], None]=None, chunks:bool=False, compression:Union[str, None]=None) -> None:
+    """設定のsrc-dataと同じ構成の合成データを書き込む
+
+    Args:
+        config (Dict[str, dict]): 設定
+        h5file (h5py.File): 書き込み先
+        length (int): フレーム数
+        seed (int, optional): シード. Defaults to 0.
+        max_points (Union[int, None], optional): 点群の点数の上限. Defaults to None.
+        overrides (Union[Dict[str, Dict[str, Any]], None], optional): キー毎の固定値 (poseは'translation'と'rotation', intrinsicは各サブタイプ). Defaults to None.
+        chunks (bool, optional): 点群と画像をチャンク化するか. Defaults to False.
+        compression (Union[str, None], optional): 圧縮方式 ('gzip', 'lzf'). 指定した場合はチャンク化する. Defaults to None.
+    """
+    rng = np.random.default_rng(seed)
+    chunks = True if chunks or compression is not None else None
+    overrides = {} if overrides is None else overrides
+    srcdata_dict:Dict[str, dict] = config[CONFIG_TAG_SRCDATA]
+    model = ConfigModel(config)
+    group_keys:List[str] = model.get_srcKeys(data_type=[TYPE_POSE, TYPE_INTRINSIC, TYPE_SEMANTIC3D])
+    image_shapes:Dict[str, Tuple[int, int]] = {
+        item[CONFIG_TAG_FRAMEID]: tuple(get_imageShape(item)[:2]) for item in srcdata_dict.values()
+        if get_pixelType(item[CONFIG_TAG_TYPE]) in [TYPE_MONO8, TYPE_MONO16, TYPE_BGR8, TYPE_RGB8, TYPE_BGRA8, TYPE_RGBA8, TYPE_DEPTH, TYPE_DISPARITY, TYPE_SEMANTIC2D]
+        and get_imageShape(item) is not None and None not in get_imageShape(item)[:2]
+    }
+
+    def get_shape(item:dict) -> Tuple[int, ...]:
+        shape:List[Union[int, None]] = item.get(CONFIG_TAG_SHAPEMAX, item[CONFIG_TAG_SHAPE])
+        shape = [DEFAULT_POINTS if dim is None else dim for dim in shape]
+        if max_points is not None and item[CONFIG_TAG_TYPE] in [TYPE_POINTS, TYPE_SEMANTIC1D] and len(shape) > 0:
+            shape[0] = min(shape[0], max_points)
+        return tuple(shape)
+
+    def write_item(group:h5py.Group, name:str, key:str, item:dict, stamp:Union[float, None]) -> None:
+        data_type:str = item[CONFIG_TAG_TYPE]
+        override:Dict[str, Any] = overrides.get(key, {})
+        if data_type == TYPE_POSE:
+            translation = override.get(SUBTYPE_TRANSLATION, rng.uniform(-1.0, 1.0, 3))
+            rotation = override.get(SUBTYPE_ROTATION, random_quaternion(rng, np.pi / 8.0))
+            write_pose(group, name, translation, rotation, item[CONFIG_TAG_FRAMEID], item[CONFIG_TAG_CHILDFRAMEID], stamp)
+        elif data_type == TYPE_INTRINSIC:
+            height, width = image_shapes.get(item[CONFIG_TAG_FRAMEID], DEFAULT_IMAGE_SHAPE)
+            values:Dict[str, float] = {SUBTYPE_FX: width / 2.0, SUBTYPE_FY: width / 2.0, SUBTYPE_CX: width / 2.0, SUBTYPE_CY: height / 2.0, SUBTYPE_HEIGHT: height, SUBTYPE_WIDTH: width}
+            values.update(override)
+            write_intrinsic(group, name, values, item[CONFIG_TAG_FRAMEID])
+        elif data_type == TYPE_SEMANTIC3D:
+            points_item:dict = srcdata_dict.get(key + '/' + SUBTYPE_POINTS, {CONFIG_TAG_TYPE: TYPE_POINTS, CONFIG_TAG_SHAPE: [None, 3]})
+            shape:Tuple[int, ...] = get_shape(points_item)
+            labels:np.ndarray = random_data(rng, TYPE_SEMANTIC1D, shape[:1], get_labelIndices(config, item[CONFIG_TAG_LABELTAG]))
+            write_semantic3d(group, name, random_data(rng, TYPE_POINTS, shape), labels, item[CONFIG_TAG_FRAMEID], item[CONFIG_TAG_LABELTAG], stamp, chunks=chunks, compression=compression)
+        elif data_type in COMPRESSED_TYPES.keys():
+            pixel_type, codec = COMPRESSED_TYPES[data_type]
+            image_shape:List[Union[int, None]] = item.get(CONFIG_TAG_IMAGESHAPE) or list(DEFAULT_IMAGE_SHAPE) + ([] if pixel_type in [TYPE_MONO8, TYPE_MONO16, TYPE_SEMANTIC2D] else [3])
+            shape = tuple(default if dim is None else dim for dim, default in zip(image_shape, list(DEFAULT_IMAGE_SHAPE) + [3]))
+            image:np.ndarray = random_data(rng, pixel_type, shape, get_labelIndices(config, item[CONFIG_TAG_LABELTAG]))
+            write_dataset(group, name, encode_image(image, codec), data_type, frame_id=item[CONFIG_TAG_FRAMEID], label_tag=item[CONFIG_TAG_LABELTAG], stamp=stamp)
+        elif data_type in [TYPE_VOXEL_POINTS, TYPE_VOXEL_SEMANTIC3D]:
+            points:np.ndarray = random_data(rng, TYPE_POINTS, (max_points or DEFAULT_POINTS, 3))
+            labels = random_data(rng, TYPE_SEMANTIC1D, points.shape[:1], get_labelIndices(config, item[CONFIG_TAG_LABELTAG])) if data_type == TYPE_VOXEL_SEMANTIC3D else None
+            write_voxel(group, name, points, labels, DEFAULT_VOXEL_SIZE, item[CONFIG_TAG_FRAMEID], item[CONFIG_TAG_LABELTAG])
+        elif DTYPE_NUMPY.get(data_type) is not object:
+            data:np.ndarray = random_data(rng, data_type, get_shape(item), get_labelIndices(config, item[CONFIG_TAG_LABELTAG]))
+            dataset:h5py.Dataset = write_dataset(group, name, data, data_type, frame_id=item[CONFIG_TAG_FRAMEID], label_tag=item[CONFIG_TAG_LABELTAG], stamp=stamp, chunks=chunks, compression=compression)
+            if data_type == TYPE_DISPARITY:
+                dataset.attrs[H5_ATTR_BASELINE] = np.float32(DEFAULT_BASELINE)
+
+    for key, item in srcdata_dict.items():
+        # グループの子はグループと一緒に書き込む
+        if any(key.startswith(group_key + '/') for group_key in group_keys): continue
+        if key.startswith('/'):
+            parent, name = key.rsplit('/', 1)
+            write_item(h5file.require_group(parent), name, key, item, None)
+        else:
+            for idx in range(length):
+                write_item(h5file.require_group('{0:s}/{1:d}'.format(H5_KEY_DATA, idx)), key, key, item, idx / DEFAULT_FRAME_RATE)
+
+    for label_tag, label_src in config.get(CONFIG_TAG_LABEL, {}).get(CONFIG_TAG_SRC, {}).items():
+        write_label(h5file, label_tag, {int(idx): (item[CONFIG_TAG_TAG], item[CONFIG_TAG_COLOR]) for idx, item in label_src.items()})
+
+    header:h5py.Group = h5file.require_group(H5_KEY_HEADER)
+    header.create_dataset(H5_KEY_LENGTH, data=length)
+
+def create_image(rng:np.random.Generator, shape:Tuple[int, int], channels:int, shift:int) -> np.ndarray:
+    """フレーム毎に流れるグラデーションにノイズを加えた画像 (圧縮率が実データに近くなるように一様乱数は避ける)"""
+    height, width = shape
+    gradient:np.ndarray = np.add.outer(np.arange(height) // 2, (np.arange(width) + shift) // 4)
+    image:np.ndarray = np.stack([(gradient * (c + 1)) % 256 for c in range(channels)], axis=-1)
+    image = image + rng.integers(0, 8, size=image.shape)
+    return np.clip(image, 0, 255).astype(np.uint8)
+
+def create_dataset(
+    h5file:h5py.File, length:int=100, cameras:int=2, image_shape:Tuple[int, int]=DEFAULT_IMAGE_SHAPE, points:int=100000,
+    map_points:int=1000000, classes:int=32, extra_keys:int=0, chunks:bool=False, compression:Union[str, None]=None, seed:int=0,
+    voxel_size:float=0.0
+) -> None:
+    """h5dataloaderの構成の合成データセットを書き込む
+
+    data/N/{image_XX, semantic, depth, velodyne_points, world_to_pose, extra_XXXX}, /intrinsic/image_XX,
+    /map/map, /tf_static/{pose_to_camX, cam0_to_velo}, label/synthetic, header/length を書き込む.
+    voxel_sizeを指定した場合は地図をボクセル化した/map/voxelも書き込む.
+
+    Args:
+        h5file (h5py.File): 書き込み先
+        length (int, optional): フレーム数. Defaults to 100.
+        cameras (int, optional): カメラ数. Defaults to 2.
+        image_shape (Tuple[int, int], optional): 画像サイズ (高さ, 幅). Defaults to DEFAULT_IMAGE_SHAPE.
+        points (int, optional): フレーム毎の点群の点数. Defaults to 100000.
+        map_points (int, optional): 地図の点数. 0の場合は書き込まない. Defaults to 1000000.
+        classes (int, optional): ラベルのクラス数. Defaults to 32.
+        extra_keys (int, optional): キー数を増やすためのフレーム毎の追加のfloat32のキーの数. Defaults to 0.
+        chunks (bool, optional): フレーム毎のデータをチャンク化するか. Defaults to False.
+        compression (Union[str, None], optional): 圧縮方式 ('gzip', 'lzf'). 指定した場合はチャンク化する. Defaults to None.
+        seed (int, optional): シード. Defaults to 0.
+        voxel_size (float, optional): /map/voxelのボクセルの大きさ. 0の場合は書き込まない. Defaults to 0.0.
+    """
+    rng = np.random.default_rng(seed)
+    chunks = True if chunks or compression is not None else None
+    height, width = image_shape
+    camera_frames:List[str] = ['cam{0:d}'.format(cam) for cam in range(cameras)]
+    camera_quaternion:np.ndarray = matrix2quaternion(POSE_TO_CAMERA)
+
+    write_label(h5file, DEFAULT_LABELTAG, {idx: ('class_{0:d}'.format(idx), rng.integers(0, 256, 3).tolist()) for idx in range(classes)})
+    labels:np.ndarray = np.arange(classes, dtype=np.uint8)
+
+    intrinsic:Dict[str, float] = {SUBTYPE_FX: width / 2.0, SUBTYPE_FY: width / 2.0, SUBTYPE_CX: width / 2.0, SUBTYPE_CY: height / 2.0, SUBTYPE_HEIGHT: height, SUBTYPE_WIDTH: width}
+    for cam, frame_id in enumerate(camera_frames):
+        write_intrinsic(h5file.require_group('intrinsic'), 'image_{0:02d}'.format(cam), intrinsic, frame_id)
+        write_pose(h5file.require_group('tf_static'), 'pose_to_{0:s}'.format(frame_id), [1.5, 0.5 - 0.5 * cam, 1.6], camera_quaternion, 'pose', frame_id)
+    if cameras > 0:
+        write_pose(h5file.require_group('tf_static'), 'cam0_to_velo', [0.0, -0.3, -0.2], matrix2quaternion(POSE_TO_CAMERA.T), camera_frames[0], 'velodyne')
+
+    if map_points > 0:
+        # 走行経路 (x軸) に沿った地図
+        map_xyz:np.ndarray = rng.uniform([-20.0, -20.0, -2.0], [length * DEFAULT_SPEED / DEFAULT_FRAME_RATE + 20.0, 20.0, 3.0], size=(map_points, 3)).astype(np.float32)
+        map_labels:np.ndarray = rng.choice(labels, size=map_points)
+        write_semantic3d(h5file.require_group('map'), 'map', map_xyz, map_labels, 'world', DEFAULT_LABELTAG, chunks=chunks, compression=compression)
+        if voxel_size > 0:
+            write_voxel(h5file.require_group('map'), 'voxel', map_xyz, map_labels, voxel_size, 'world', DEFAULT_LABELTAG)
+
+    data_group:h5py.Group = h5file.require_group(H5_KEY_DATA)
+    for idx in range(length):
+        stamp:float = idx / DEFAULT_FRAME_RATE
+        frame_group:h5py.Group = data_group.require_group(str(idx))
+        image_chunks = (height, width, 3) if chunks else None
+        for cam, frame_id in enumerate(camera_frames):
+            write_dataset(frame_group, 'image_{0:02d}'.format(cam), create_image(rng, image_shape, 3, idx * 8), TYPE_BGR8, frame_id=frame_id, stamp=stamp, chunks=image_chunks, compression=compression)
+        if cameras > 0:
+            semantic:np.ndarray = np.repeat((np.arange(height) * classes // max(height, 1)).astype(np.uint8)[:, np.newaxis], width, axis=1)
+            write_dataset(frame_group, 'semantic', semantic, TYPE_SEMANTIC2D, frame_id=camera_frames[0], label_tag=DEFAULT_LABELTAG, stamp=stamp, chunks=image_chunks[:2] if chunks else None, compression=compression)
+            depth:np.ndarray = rng.uniform(1.0, 80.0, size=image_shape).astype(np.float32)
+            write_dataset(frame_group, 'depth', depth, TYPE_DEPTH, frame_id=camera_frames[0], stamp=stamp, chunks=image_chunks[:2] if chunks else None, compression=compression)
+        if points > 0:
+            radius:np.ndarray = rng.uniform(2.0, 60.0, size=points)
+            azimuth:np.ndarray = rng.uniform(-np.pi, np.pi, size=points)
+            velodyne:np.ndarray = np.stack([radius * np.cos(azimuth), radius * np.sin(azimuth), rng.uniform(-2.0, 1.0, size=points)], axis=1).astype(np.float32)
+            write_dataset(frame_group, 'velodyne_points', velodyne, TYPE_POINTS, frame_id='velodyne', stamp=stamp, chunks=chunks, compression=compression)
+        yaw:float = 0.05 * np.sin(idx / 20.0)
+        write_pose(frame_group, 'world_to_pose', [idx * DEFAULT_SPEED / DEFAULT_FRAME_RATE, 0.0, 0.0], [0.0, 0.0, np.sin(yaw / 2.0), np.cos(yaw / 2.0)], 'world', 'pose', stamp)
+        for extra in range(extra_keys):
+            write_dataset(frame_group, 'extra_{0:04d}'.format(extra), rng.standard_normal(16).astype(np.float32), TYPE_FLOAT32, stamp=stamp)
+
+    header:h5py.Group = h5file.require_group(H5_KEY_HEADER)
+    header.create_dataset(H5_KEY_LENGTH, data=length)
+
+def add_parser(subparsers) -> None:
+    parser = subparsers.add_parser('synthetic', help='write a synthetic HDF5 dataset with the h5dataloader layout')
+    parser.add_argument('output', type=str, help='output HDF5 file')
+    parser.add_argument('--like', type=str, default=None, help='mirror the src-data of a config (JSON) instead of the built-in layout')
+    parser.add_argument('--frames', type=int, default=100, help='number of frames')
+    parser.add_argument('--cameras', type=int, default=2, help='number of cameras')
+    parser.add_argument('--image-size', type=int, nargs=2, default=list(DEFAULT_IMAGE_SHAPE), metavar=('HEIGHT', 'WIDTH'), help='image size')
+    parser.add_argument('--points', type=int, default=100000, help='points per frame (also the upper bound with --like)')
+    parser.add_argument('--map-points', type=int, default=1000000, help='points of /map/map (0: no map)')
+    parser.add_argument('--classes', type=int, default=32, help='number of label classes')
+    parser.add_argument('--extra-keys', type=int, default=0, help='additional float32 keys per frame')
+    parser.add_argument('--chunks', action='store_true', help='chunk per-frame datasets')
+    parser.add_argument('--compression', type=str, default=None, choices=['gzip', 'lzf'], help='compression filter (implies --chunks)')
+    parser.add_argument('--seed', type=int, default=0, help='random seed')
+    parser.add_argument('--voxel-size', type=float, default=0.0, help='also write /map/voxel (voxel-semantic3d) with this voxel size (0: no voxel map)')
+    parser.set_defaults(func=run)
+
+def run(args) -> None:
+    with h5py.File(args.output, mode='w') as h5file:
+        if args.like is not None:
+            create_fromConfig(load_config(args.like), h5file, args.frames, seed=args.seed, max_points=args.points, chunks=args.chunks, compression=args.compression)
+        else:
+            create_dataset(
+                h5file, args.frames, args.cameras, tuple(args.image_size), args.points, args.map_points,
+                args.classes, args.extra_keys, args.chunks, args.compression, args.seed, args.voxel_size
+            )
+    print('saved: {0:s}'.format(args.output))
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+
+import os
+import json
+from typing import Dict, List, Union
+import numpy as np
+import h5py
+
+from ..common.structure import *
+from ..common.scan import get_h5Key, get_length, index_dtype
+
+def load_config(jsonpath:str) -> Dict[str, dict]:
+    with open(jsonpath, mode='r') as jsonfile:
+        return json.load(jsonfile)
+
+def save_config(config:Dict[str, dict], jsonpath:str) -> None:
+    with open(jsonpath, mode='w') as jsonfile:
+        json.dump(config, jsonfile, indent=2)
+
+def sidecar_path(jsonpath:str, kind:str) -> str:
+    """設定ファイルと同じ場所に置くサイドカーファイルのパス
+
+    Args:
+        jsonpath (str): 設定ファイルのパス
+        kind (str): サイドカーの種類
+
+    Returns:
+        str: '<設定ファイル名>.<kind>.npz'
+    """
+    return '{0:s}.{1:s}.npz'.format(os.path.splitext(jsonpath)[0], kind)
+
+def save_sidecar(config:Dict[str, dict], jsonpath:str, kind:str, arrays:Dict[str, np.ndarray], **meta) -> str:
+    """配列をサイドカーファイルに保存し, 設定の'sidecar'セクションから参照する
+
+    Args:
+        config (Dict[str, dict]): 設定
+        jsonpath (str): 設定ファイルのパス
+        kind (str): サイドカーの種類
+        arrays (Dict[str, np.ndarray]): 保存する配列
+
+    Returns:
+        str: サイドカーファイルのパス
+    """
+    path:str = sidecar_path(jsonpath, kind)
+    np.savez(path, **arrays)
+    sidecar_dict = {CONFIG_TAG_FILE: os.path.basename(path)}
+    sidecar_dict.update(meta)
+    config.setdefault(CONFIG_TAG_SIDECAR, {})[kind] = sidecar_dict
+    return path
+
+def load_sidecar(config:Dict[str, dict], jsonpath:str, kind:str) -> Union[Dict[str, np.ndarray], None]:
+    sidecar_dict:Union[dict, None] = config.get(CONFIG_TAG_SIDECAR, {}).get(kind)
+    if sidecar_dict is None: return None
+    path:str = os.path.join(os.path.dirname(os.path.abspath(jsonpath)), sidecar_dict[CONFIG_TAG_FILE])
+    with np.load(path) as npz:
+        return {key: npz[key] for key in npz.files}
+
+def get_minibatchSources(config:Dict[str, dict], perFrame:Union[bool, None]=None) -> List[str]:
+    """mini-batchが参照するsrc-dataのキーを重複なく取得 (poseはフレームIDのため除く)
+
+    Args:
+        config (Dict[str, dict]): 設定
+        perFrame (Union[bool, None], optional): Trueならフレーム毎のキー, Falseなら'/'で始まるキーのみ. Defaults to None.
+
+    Returns:
+        List[str]: src-dataのキー
+    """
+    sources:List[str] = []
+    for minibatch_dict in config[CONFIG_TAG_MINIBATCH].values():
+        for from_type, from_key in minibatch_dict[CONFIG_TAG_FROM].items():
+            if from_type in [TYPE_POSE] or from_key in sources: continue
+            if perFrame is True and from_key.startswith('/'): continue
+            if perFrame is False and not from_key.startswith('/'): continue
+            sources.append(from_key)
+    return sources
+
+def get_datasets(item:Union[h5py.Group, h5py.Dataset]) -> List[h5py.Dataset]:
+    if isinstance(item, h5py.Dataset): return [item]
+    datasets:List[h5py.Dataset] = []
+    item.visititems(lambda name, obj: datasets.append(obj) if isinstance(obj, h5py.Dataset) else None)
+    return datasets
+
+def get_frameDatasets(h5file:h5py.File, keys:List[str]) -> Dict[str, str]:
+    """src-dataのキーに対応するフレーム毎のデータセット
+
+    Args:
+        h5file (h5py.File): HDF5ファイル
+        keys (List[str]): src-dataのキー
+
+    Returns:
+        Dict[str, str]: HDF5内のパス ('/'なし), src-dataのキー. ファイルに無いフレームは含まない.
+    """
+    length:int = get_length(h5file)
+    datasets:Dict[str, str] = {}
+    for key in keys:
+        for idx in ([0] if key.startswith('/') else range(length)):
+            h5key:str = get_h5Key(key, idx)
+            if h5key in h5file:
+                datasets[h5key.lstrip('/')] = key
+    return datasets
+
+def copy_h5Tree(src:h5py.File, dst:h5py.File, exclude:Union[Dict[str, str], List[str]]) -> None:
+    """HDF5ファイルを属性ごと複製する. excludeのデータセットは複製せず, 親のグループのみ作成する.
+
+    Args:
+        src (h5py.File): 元のHDF5ファイル
+        dst (h5py.File): 書き込み先
+        exclude (Union[Dict[str, str], List[str]]): 複製しないデータセットのHDF5内のパス ('/'なし)
+    """
+    dst.attrs.update(src.attrs)
+
+    def visit(name:str, item:Union[h5py.Group, h5py.Dataset]) -> None:
+        parent:h5py.Group = dst.require_group(os.path.dirname(name) or '/')
+        if isinstance(item, h5py.Group):
+            dst.require_group(name).attrs.update(item.attrs)
+        elif name not in exclude:
+            src.copy(item, parent, name=os.path.basename(name))
+    src.visititems(visit)
@@ -0,0 +1,294 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import json
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple, Union
+import h5py
+
+from ..common.structure import *
+from ..common.scan import byte2str, get_length
+from .utils import *
+from .plan import get_tfChain
+
+VALIDATE_LEVEL_ERROR:str = 'error'
+VALIDATE_LEVEL_WARNING:str = 'warning'
+
+VALIDATE_CHECK_FILE:str = 'file'
+VALIDATE_CHECK_FRAMES:str = 'frames'
+VALIDATE_CHECK_SOURCE:str = 'source'
+VALIDATE_CHECK_TF:str = 'tf'
+VALIDATE_CHECK_LABEL:str = 'label'
+
+VALIDATE_ISSUE_NOFRAME:str = 'no-frame'
+VALIDATE_ISSUE_MISSING:str = 'missing'
+VALIDATE_ISSUE_TYPE:str = 'type'
+VALIDATE_ISSUE_SHAPE:str = 'shape'
+
+VALIDATE_TAG_LEVEL:str = 'level'
+VALIDATE_TAG_CHECK:str = 'check'
+VALIDATE_TAG_TARGET:str = 'target'
+VALIDATE_TAG_MESSAGE:str = 'message'
+VALIDATE_TAG_COUNT:str = 'count'
+VALIDATE_TAG_ISSUES:str = 'issues'
+VALIDATE_TAG_ERRORS:str = 'errors'
+VALIDATE_TAG_WARNINGS:str = 'warnings'
+
+VALIDATE_MESSAGES:Dict[str, str] = {
+    VALIDATE_ISSUE_NOFRAME: 'frame group is missing',
+    VALIDATE_ISSUE_MISSING: 'missing',
+    VALIDATE_ISSUE_TYPE: 'type differs from src-data',
+    VALIDATE_ISSUE_SHAPE: 'shape differs from src-data',
+}
+
+# 報告に残す問題のあるフレームインデックスの数
+VALIDATE_MAX_FRAMES:int = 10
+
+# データセットは (typeの属性, dtype, 形状), グループは (typeの属性, None, None)
+ItemMeta = Tuple[Union[str, None], Union[str, None], Union[List[int], None]]
+# 問題の種類, src-dataのキー毎の (フレーム数, フレームインデックスの例)
+FrameIssues = Dict[str, Dict[str, Tuple[int, List[int]]]]
+
+def get_itemMeta(item:Union[h5py.Group, h5py.Dataset]) -> ItemMeta:
+    data_type:Union[str, None] = byte2str(item.attrs.get(H5_ATTR_TYPE))
+    if isinstance(item, h5py.Dataset):
+        return data_type, str(item.dtype), list(item.shape)
+    return data_type, None, None
+
+def get_groupMeta(group:h5py.Group) -> Dict[str, ItemMeta]:
+    """グループ以下の全ての要素のメタデータを1度の走査で集める (キーはグループからの相対パス)"""
+    metas:Dict[str, ItemMeta] = {}
+    group.visititems(lambda name, item: metas.__setitem__(name, get_itemMeta(item)))
+    return metas
+
+def check_item(item:Dict[str, Union[str, list, dict, None]], meta:Union[ItemMeta, None]) -> Union[str, None]:
+    """src-dataとHDF5の要素のメタデータを比べ, 異なる場合は問題の種類を返す
+
+    typeの属性が無いデータセットはdtypeを型とし, precisionで符号化した場合は符号化後のdtypeと比べる.
+    形状は次元数と, src-dataで一定の次元の大きさを比べる.
+    """
+    if meta is None: return VALIDATE_ISSUE_MISSING
+    attr_type, dtype, shape = meta
+    if attr_type is None:
+        encoding:Union[Dict[str, Union[str, float]], None] = item.get(CONFIG_TAG_ENCODING)
+        if dtype != item[CONFIG_TAG_TYPE] and (encoding is None or dtype != encoding[CONFIG_TAG_DTYPE]): return VALIDATE_ISSUE_TYPE
+    elif attr_type != item[CONFIG_TAG_TYPE]:
+        return VALIDATE_ISSUE_TYPE
+    expected:Union[List[Union[int, None]], None] = item.get(CONFIG_TAG_SHAPE)
+    if expected is None or shape is None: return None
+    if len(expected) != len(shape) or any(e is not None and e != s for e, s in zip(expected, shape)): return VALIDATE_ISSUE_SHAPE
+    return None
+
+def add_frameIssue(issues:FrameIssues, issue:str, key:str, idx:int) -> None:
+    count, frames = issues.setdefault(issue, {}).get(key, (0, []))
+    if len(frames) < VALIDATE_MAX_FRAMES:
+        frames = frames + [idx]
+    issues[issue][key] = (count + 1, frames)
+
+def merge_frameIssues(dst:FrameIssues, src:FrameIssues) -> FrameIssues:
+    for issue, issue_dict in src.items():
+        for key, (count, frames) in issue_dict.items():
+            dst_count, dst_frames = dst.setdefault(issue, {}).get(key, (0, []))
+            dst[issue][key] = (dst_count + count, (dst_frames + frames)[:VALIDATE_MAX_FRAMES])
+    return dst
+
+def check_frames(h5file:h5py.File, srcdata_dict:Dict[str, dict], indices:List[int]) -> FrameIssues:
+    """指定したフレームのdata/Nの全要素をsrc-dataと比べる
+
+    Args:
+        h5file (h5py.File): HDF5ファイル
+        srcdata_dict (Dict[str, dict]): フレーム毎のsrc-data
+        indices (List[int]): フレームインデックス
+
+    Returns:
+        FrameIssues: 問題の種類, src-dataのキー毎のフレーム数と例
+    """
+    issues:FrameIssues = {}
+    h5file_data:h5py.Group = h5file[H5_KEY_DATA]
+    for idx in indices:
+        if str(idx) not in h5file_data:
+            add_frameIssue(issues, VALIDATE_ISSUE_NOFRAME, H5_KEY_DATA, idx)
+            continue
+        metas:Dict[str, ItemMeta] = get_groupMeta(h5file_data[str(idx)])
+        for key, item in srcdata_dict.items():
+            issue:Union[str, None] = check_item(item, metas.get(key))
+            if issue is not None:
+                add_frameIssue(issues, issue, key, idx)
+    return issues
+
+def _check_chunk(h5path:str, srcdata_dict:Dict[str, dict], indices:List[int]) -> FrameIssues:
+    with h5py.File(h5path, mode='r') as h5file:
+        return check_frames(h5file, srcdata_dict, indices)
+
+def create_issue(level:str, check:str, target:str, message:str, count:Union[int, None]=None, frames:Union[List[int], None]=None) -> Dict[str, Union[str, int, List[int]]]:
+    issue:Dict[str, Union[str, int, List[int]]] = {VALIDATE_TAG_LEVEL: level, VALIDATE_TAG_CHECK: check, VALIDATE_TAG_TARGET: target, VALIDATE_TAG_MESSAGE: message}
+    if count is not None:
+        issue[VALIDATE_TAG_COUNT] = count
+    if frames is not None:
+        issue[CONFIG_TAG_FRAMES] = frames
+    return issue
+
+def get_requiredKeys(config:Dict[str, dict]) -> List[str]:
+    """mini-batchの読み込みに必要なsrc-dataとposeのキー"""
+    keys:List[str] = get_minibatchSources(config)
+    for minibatch_config in config[CONFIG_TAG_MINIBATCH].values():
+        pose_frame:Union[str, None] = minibatch_config[CONFIG_TAG_FROM].get(TYPE_POSE)
+        if pose_frame is None: continue
+        src_keys, dst_keys = get_tfChain(config, pose_frame, minibatch_config[CONFIG_TAG_FRAMEID])
+        keys += [key for key in src_keys + dst_keys if key not in keys]
+    return keys
+
+def is_required(key:str, required:List[str]) -> bool:
+    """必要なキーか, その子 (poseのtranslation等) か"""
+    return any(key == required_key or key.startswith(required_key + '/') for required_key in required)
+
+def check_minibatches(config:Dict[str, dict]) -> List[Dict[str, Union[str, int, List[int]]]]:
+    """mini-batchの入力のsrc-data, 座標変換の経路, ラベルの設定を確認する"""
+    issues:List[Dict[str, Union[str, int, List[int]]]] = []
+    srcdata_dict:Dict[str, dict] = config[CONFIG_TAG_SRCDATA]
+    label_configs:Dict[str, dict] = config[CONFIG_TAG_LABEL].get(CONFIG_TAG_CONFIG, {})
+    tf_list:List[str] = config.get(CONFIG_TAG_TF, {}).get(CONFIG_TAG_LIST, [])
+    for minibatch_tag, minibatch_config in config[CONFIG_TAG_MINIBATCH].items():
+        dst_frame:str = minibatch_config[CONFIG_TAG_FRAMEID]
+        label_tag:str = minibatch_config.get(CONFIG_TAG_LABELTAG, '')
+        from_dict:Dict[str, str] = minibatch_config[CONFIG_TAG_FROM]
+        # poseを用いない場合, ソースの座標系からframe-idへの経路も必要
+        src_frames:List[str] = sorted({srcdata_dict[from_key].get(CONFIG_TAG_FRAMEID) for from_type, from_key in from_dict.items() if from_type != TYPE_POSE and from_key in srcdata_dict.keys()} - {None, dst_frame})
+        if dst_frame not in tf_list and (TYPE_POSE in from_dict.keys() or len(src_frames) > 0):
+            issues.append(create_issue(VALIDATE_LEVEL_ERROR, VALIDATE_CHECK_TF, minibatch_tag, 'frame-id {0:s} is not in the tf list'.format(dst_frame)))
+        elif TYPE_POSE not in from_dict.keys():
+            for src_frame in src_frames:
+                src_keys, dst_keys = get_tfChain(config, src_frame, dst_frame)
+                if len(src_keys) + len(dst_keys) == 0:
+                    issues.append(create_issue(VALIDATE_LEVEL_ERROR, VALIDATE_CHECK_TF, minibatch_tag, 'no TF path from {0:s} to {1:s}'.format(src_frame, dst_frame)))
+        for from_type, from_key in from_dict.items():
+            if from_type == TYPE_POSE:
+                src_keys, dst_keys = get_tfChain(config, from_key, dst_frame)
+                if from_key != dst_frame and len(src_keys) + len(dst_keys) == 0:
+                    issues.append(create_issue(VALIDATE_LEVEL_ERROR, VALIDATE_CHECK_TF, minibatch_tag, 'no TF path from {0:s} to {1:s}'.format(from_key, dst_frame)))
+                continue
+            if from_key not in srcdata_dict.keys():
+                issues.append(create_issue(VALIDATE_LEVEL_ERROR, VALIDATE_CHECK_SOURCE, minibatch_tag, '{0:s} source {1:s} is not in src-data'.format(from_type, from_key)))
+                continue
+            src_type:str = srcdata_dict[from_key][CONFIG_TAG_TYPE]
+            if src_type != from_type:
+                issues.append(create_issue(VALIDATE_LEVEL_ERROR, VALIDATE_CHECK_SOURCE, minibatch_tag, '{0:s} source {1:s} is {2:s} in src-data'.format(from_type, from_key, src_type)))
+            if USE_LABEL.get(from_type) is not True or label_tag == '': continue
+            if label_tag not in label_configs.keys():
+                issues.append(create_issue(VALIDATE_LEVEL_ERROR, VALIDATE_CHECK_LABEL, minibatch_tag, 'label-tag {0:s} is not in label config'.format(label_tag)))
+                continue
+            src_label:Union[str, None] = srcdata_dict[from_key].get(CONFIG_TAG_LABELTAG)
+            if src_label is not None and src_label != label_configs[label_tag][CONFIG_TAG_SRC]:
+                issues.append(create_issue(VALIDATE_LEVEL_WARNING, VALIDATE_CHECK_LABEL, minibatch_tag, '{0:s} is labeled {1:s} but label config {2:s} converts {3:s}'.format(from_key, src_label, label_tag, label_configs[label_tag][CONFIG_TAG_SRC])))
+    return issues
+
+def check_labels(h5file:h5py.File, config:Dict[str, dict]) -> List[Dict[str, Union[str, int, List[int]]]]:
+    """label/src, label/configのクラスがHDF5ファイルのlabel/以下にあるか確認する"""
+    issues:List[Dict[str, Union[str, int, List[int]]]] = []
+    label_srcs:Dict[str, dict] = config[CONFIG_TAG_LABEL].get(CONFIG_TAG_SRC, {})
+    h5file_label:Dict[str, List[str]] = {}
+    if H5_KEY_LABEL in h5file:
+        h5file_label = {label_tag: list(item.keys()) for label_tag, item in h5file[H5_KEY_LABEL].items() if isinstance(item, h5py.Group)}
+    for label_tag, label_src in label_srcs.items():
+        if label_tag not in h5file_label.keys():
+            issues.append(create_issue(VALIDATE_LEVEL_ERROR, VALIDATE_CHECK_LABEL, label_tag, '{0:s}/{1:s} is not in the file'.format(H5_KEY_LABEL, label_tag)))
+            continue
+        missing:List[str] = [idx for idx in label_src.keys() if idx not in h5file_label[label_tag]]
+        if len(missing) > 0:
+            issues.append(create_issue(VALIDATE_LEVEL_ERROR, VALIDATE_CHECK_LABEL, label_tag, 'classes {0:s} are not in the file'.format(', '.join(missing)), len(missing)))
+        unknown:List[str] = [idx for idx in h5file_label[label_tag] if idx not in label_src.keys()]
+        if len(unknown) > 0:
+            issues.append(create_issue(VALIDATE_LEVEL_WARNING, VALIDATE_CHECK_LABEL, label_tag, 'classes {0:s} of the file are not in label src'.format(', '.join(unknown)), len(unknown)))
+    for label_tag in h5file_label.keys():
+        if label_tag not in label_srcs.keys():
+            issues.append(create_issue(VALIDATE_LEVEL_WARNING, VALIDATE_CHECK_LABEL, label_tag, '{0:s}/{1:s} of the file is not in label src'.format(H5_KEY_LABEL, label_tag)))
+    for config_tag, label_config in config[CONFIG_TAG_LABEL].get(CONFIG_TAG_CONFIG, {}).items():
+        if label_config[CONFIG_TAG_SRC] not in label_srcs.keys():
+            issues.append(create_issue(VALIDATE_LEVEL_ERROR, VALIDATE_CHECK_LABEL, config_tag, 'label config converts {0:s}, which is not in label src'.format(label_config[CONFIG_TAG_SRC])))
+            continue
+        unknown = [idx for idx in label_config[CONFIG_TAG_CONVERT].keys() if idx not in label_srcs[label_config[CONFIG_TAG_SRC]].keys()]
+        if len(unknown) > 0:
+            issues.append(create_issue(VALIDATE_LEVEL_WARNING, VALIDATE_CHECK_LABEL, config_tag, 'classes {0:s} are converted but not in label src'.format(', '.join(unknown)), len(unknown)))
+    return issues
+
+def validate_config(h5path:str, config:Dict[str, dict], jobs:int=1, chunk_size:int=256) -> Dict[str, Union[str, int, list]]:
+    """設定をHDF5ファイルの全フレームと照合する
+
+    フレームをchunk_size毎に分けてプロセスプールで照合し, data/Nの要素のメタデータは1フレームにつき1度の走査で集める.
+    mini-batchの読み込みに必要なキーの問題はエラー, それ以外のsrc-dataの問題は警告とする.
+
+    Args:
+        h5path (str): HDF5ファイルのパス
+        config (Dict[str, dict]): 設定
+        jobs (int, optional): プロセス数. Defaults to 1.
+        chunk_size (int, optional): 1プロセスが1度に照合するフレーム数. Defaults to 256.
+
+    Returns:
+        Dict[str, Union[str, int, list]]: 報告 (file, frames, errors, warnings, issues)
+    """
+    issues:List[Dict[str, Union[str, int, List[int]]]] = check_minibatches(config)
+    length:int = 0
+    if not os.path.isfile(h5path):
+        issues.append(create_issue(VALIDATE_LEVEL_ERROR, VALIDATE_CHECK_FILE, h5path, 'file not found'))
+    else:
+        srcdata_dict:Dict[str, dict] = config[CONFIG_TAG_SRCDATA]
+        required:List[str] = get_requiredKeys(config)
+        # src-dataに無いposeのキーも, 全フレームにあるかを確認する
+        poses:Dict[str, dict] = {tf_dict[CONFIG_TAG_KEY]: {CONFIG_TAG_TYPE: TYPE_POSE, CONFIG_TAG_SHAPE: None} for tf_dict in config[CONFIG_TAG_TF][CONFIG_TAG_DATA].values() if tf_dict[CONFIG_TAG_KEY] not in srcdata_dict.keys()}
+        static_srcdata:Dict[str, dict] = {key: item for key, item in list(srcdata_dict.items()) + list(poses.items()) if key.startswith('/')}
+        frame_srcdata:Dict[str, dict] = {key: item for key, item in list(srcdata_dict.items()) + list(poses.items()) if not key.startswith('/')}
+
+        with h5py.File(h5path, mode='r') as h5file:
+            length = get_length(h5file)
+            for key, item in static_srcdata.items():
+                issue:Union[str, None] = check_item(item, get_itemMeta(h5file[key]) if key in h5file else None)
+                if issue is not None:
+                    issues.append(create_issue(VALIDATE_LEVEL_ERROR if is_required(key, required) else VALIDATE_LEVEL_WARNING, VALIDATE_CHECK_SOURCE, key, VALIDATE_MESSAGES[issue]))
+            issues += check_labels(h5file, config)
+            chunks:List[List[int]] = [list(range(begin, min(begin + chunk_size, length))) for begin in range(0, length, chunk_size)]
+            if jobs > 1 and len(chunks) > 1:
+                with ProcessPoolExecutor(max_workers=jobs) as executor:
+                    chunk_results:List[FrameIssues] = list(executor.map(_check_chunk, [h5path] * len(chunks), [frame_srcdata] * len(chunks), chunks))
+            else:
+                chunk_results = [check_frames(h5file, frame_srcdata, chunk) for chunk in chunks]
+
+        frame_issues:FrameIssues = {}
+        for chunk_result in chunk_results:
+            merge_frameIssues(frame_issues, chunk_result)
+        for issue, issue_dict in frame_issues.items():
+            for key, (count, frames) in issue_dict.items():
+                level:str = VALIDATE_LEVEL_ERROR if issue == VALIDATE_ISSUE_NOFRAME or is_required(key, required) else VALIDATE_LEVEL_WARNING
+                issues.append(create_issue(level, VALIDATE_CHECK_FRAMES, key, VALIDATE_MESSAGES[issue], count, frames))
+
+    return {
+        CONFIG_TAG_FILE: h5path,
+        CONFIG_TAG_FRAMES: length,
+        VALIDATE_TAG_ERRORS: sum(issue[VALIDATE_TAG_LEVEL] == VALIDATE_LEVEL_ERROR for issue in issues),
+        VALIDATE_TAG_WARNINGS: sum(issue[VALIDATE_TAG_LEVEL] == VALIDATE_LEVEL_WARNING for issue in issues),
+        VALIDATE_TAG_ISSUES: issues,
+    }
+
+def add_parser(subparsers) -> None:
+    parser = subparsers.add_parser('validate', help='check the config against every frame, TF path and label of the HDF5 file (exit code 1 on errors)')
+    parser.add_argument('config', type=str, help='config file (JSON)')
+    parser.add_argument('-o', '--output', type=str, default=None, help='write the report as JSON')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1, help='number of processes')
+    parser.add_argument('--chunk-size', type=int, default=256, help='frames per process task')
+    parser.set_defaults(func=run)
+
+def run(args) -> None:
+    config = load_config(args.config)
+    report:Dict[str, Union[str, int, list]] = validate_config(config[H5_ATTR_FILEPATH], config, args.jobs, args.chunk_size)
+    for issue in report[VALIDATE_TAG_ISSUES]:
+        print('{0:s} [{1:s}] {2:s}: {3:s}{4:s}'.format(
+            issue[VALIDATE_TAG_LEVEL].upper(), issue[VALIDATE_TAG_CHECK], issue[VALIDATE_TAG_TARGET], issue[VALIDATE_TAG_MESSAGE],
+            ' ({0:d} frames, e.g. {1:s})'.format(issue[VALIDATE_TAG_COUNT], ', '.join(str(idx) for idx in issue[CONFIG_TAG_FRAMES])) if CONFIG_TAG_FRAMES in issue.keys() else ''
+        ))
+    print('{0:s}: {1:d} frames, {2:d} errors, {3:d} warnings'.format(report[CONFIG_TAG_FILE], report[CONFIG_TAG_FRAMES], report[VALIDATE_TAG_ERRORS], report[VALIDATE_TAG_WARNINGS]))
+    if args.output is not None:
+        with open(args.output, mode='w') as jsonfile:
+            json.dump(report, jsonfile, indent=2)
+        print('saved: {0:s}'.format(args.output))
+    if report[VALIDATE_TAG_ERRORS] > 0:
+        sys.exit(1)
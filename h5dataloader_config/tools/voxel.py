@@ -0,0 +1,379 @@
+# -*- coding: utf-8 -*-
+
+import time
+import heapq
+from typing import Dict, List, Tuple, Union
+import numpy as np
+import h5py
+
+from ..common.structure import *
+from ..common.scan import byte2str
+from .utils import *
+from .cull import CULL_MARGIN_DEPTH, CULL_MARGIN_PIXELS, get_visibleIndices
+from .loader import read_dataset
+
+# Mortonコードの1軸当たりのビット数 (3軸で64bitに収める)
+MORTON_BITS:int = 21
+MORTON_MAX:int = (1 << MORTON_BITS) - 1
+# 1回の問い合わせで分割するMortonコードの範囲の最大数
+VOXEL_MAX_RANGES:int = 64
+# 問い合わせの範囲をボクセルの大きさに対して広げる割合 (境界上の点の丸め誤差のため)
+VOXEL_QUERY_PADDING:float = 1e-3
+
+def split_by3(values:np.ndarray) -> np.ndarray:
+    """各ビットの間に2ビットずつ0を挟む"""
+    x:np.ndarray = np.asarray(values, dtype=np.uint64) & np.uint64(MORTON_MAX)
+    x = (x | (x << np.uint64(32))) & np.uint64(0x1f00000000ffff)
+    x = (x | (x << np.uint64(16))) & np.uint64(0x1f0000ff0000ff)
+    x = (x | (x << np.uint64(8))) & np.uint64(0x100f00f00f00f00f)
+    x = (x | (x << np.uint64(4))) & np.uint64(0x10c30c30c30c30c3)
+    x = (x | (x << np.uint64(2))) & np.uint64(0x1249249249249249)
+    return x
+
+def compact_by3(codes:np.ndarray) -> np.ndarray:
+    """split_by3の逆変換"""
+    x:np.ndarray = np.asarray(codes, dtype=np.uint64) & np.uint64(0x1249249249249249)
+    x = (x | (x >> np.uint64(2))) & np.uint64(0x10c30c30c30c30c3)
+    x = (x | (x >> np.uint64(4))) & np.uint64(0x100f00f00f00f00f)
+    x = (x | (x >> np.uint64(8))) & np.uint64(0x1f0000ff0000ff)
+    x = (x | (x >> np.uint64(16))) & np.uint64(0x1f00000000ffff)
+    x = (x | (x >> np.uint64(32))) & np.uint64(MORTON_MAX)
+    return x.astype(np.int64)
+
+def encode_morton(cells:np.ndarray) -> np.ndarray:
+    """ボクセルのインデックス (N, 3) をMortonコード (N,) に変換"""
+    cells = np.asarray(cells)
+    return split_by3(cells[..., 0]) | (split_by3(cells[..., 1]) << np.uint64(1)) | (split_by3(cells[..., 2]) << np.uint64(2))
+
+def decode_morton(codes:np.ndarray) -> np.ndarray:
+    codes = np.asarray(codes, dtype=np.uint64)
+    return np.stack([compact_by3(codes), compact_by3(codes >> np.uint64(1)), compact_by3(codes >> np.uint64(2))], axis=-1)
+
+# 8bitの値をsplit_by3した値の表 (1つのボクセルのMortonコードをPythonの整数で求めるため)
+SPREAD_BYTE:List[int] = [int(code) for code in split_by3(np.arange(256))]
+
+def encode_cell(cell:List[int]) -> int:
+    code:int = 0
+    for axis, value in enumerate(cell):
+        code |= (SPREAD_BYTE[value & 0xff] | (SPREAD_BYTE[(value >> 8) & 0xff] << 24) | (SPREAD_BYTE[(value >> 16) & 0x1f] << 48)) << axis
+    return code
+
+def get_mortonRanges(cell_min:np.ndarray, cell_max:np.ndarray, max_ranges:int=VOXEL_MAX_RANGES) -> Tuple[np.ndarray, np.ndarray]:
+    """直方体のボクセル範囲を覆うMortonコードの範囲 (両端を含む)
+
+    直方体の範囲外のコードの数が最も多い範囲から, 最上位の異なるビットの位置で2分割することを繰り返す.
+
+    Args:
+        cell_min (np.ndarray): 直方体の最小のボクセルインデックス (3,)
+        cell_max (np.ndarray): 直方体の最大のボクセルインデックス (3,)
+        max_ranges (int, optional): 範囲の最大数. Defaults to VOXEL_MAX_RANGES.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: 昇順の範囲の始点と終点
+    """
+    def make_box(lo:List[int], hi:List[int]) -> Tuple[int, int, int, List[int], List[int]]:
+        code_lo, code_hi = encode_cell(lo), encode_cell(hi)
+        volume:int = (hi[0] - lo[0] + 1) * (hi[1] - lo[1] + 1) * (hi[2] - lo[2] + 1)
+        return (volume - (code_hi - code_lo + 1), code_lo, code_hi, lo, hi)
+
+    boxes:List[Tuple[int, int, int, List[int], List[int]]] = [make_box([int(c) for c in cell_min], [int(c) for c in cell_max])]
+    while len(boxes) < max_ranges and boxes[0][0] < 0:
+        _, code_lo, code_hi, lo, hi = heapq.heappop(boxes)
+        bit:int = (code_lo ^ code_hi).bit_length() - 1
+        axis, level = bit % 3, bit // 3
+        split:int = (hi[axis] >> level) << level
+        lower_hi:List[int] = list(hi)
+        lower_hi[axis] = split - 1
+        upper_lo:List[int] = list(lo)
+        upper_lo[axis] = split
+        heapq.heappush(boxes, make_box(lo, lower_hi))
+        heapq.heappush(boxes, make_box(upper_lo, hi))
+
+    merged:List[List[int]] = []
+    for _, begin, end, _, _ in sorted(boxes, key=lambda box: box[1]):
+        if len(merged) > 0 and merged[-1][1] + 1 >= begin:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([begin, end])
+    return np.array([r[0] for r in merged], dtype=np.uint64), np.array([r[1] for r in merged], dtype=np.uint64)
+
+def expand_ranges(begins:np.ndarray, ends:np.ndarray) -> np.ndarray:
+    """[begin, end)の連番を連結する"""
+    counts:np.ndarray = ends - begins
+    counts = np.maximum(counts, 0)
+    total:int = int(counts.sum())
+    if total == 0: return np.zeros((0,), dtype=np.int64)
+    starts:np.ndarray = np.repeat(begins - np.cumsum(counts) + counts, counts)
+    return starts + np.arange(total, dtype=np.int64)
+
+def get_voxelGrid(attrs:Dict[str, Union[float, List[float]]], grid_shape:Union[Tuple[int, ...], None]=None) -> Tuple[Union[np.ndarray, None], Union[np.ndarray, None]]:
+    """ボクセル地図の属性から, インデックス(0, 0, 0)のボクセルの最小の角の座標とボクセルの大きさを求める
+
+    voxel_min (またはvoxel_origin) を最小の角とし, 無い場合はvoxel_centerとvoxel_maxから格子の大きさを用いて求める.
+    voxel_sizeが無い場合はvoxel_minとvoxel_maxの差を格子の大きさで割る.
+
+    Args:
+        attrs (Dict[str, Union[float, List[float]]]): 属性
+        grid_shape (Union[Tuple[int, ...], None], optional): 格子の大きさ. Defaults to None.
+
+    Returns:
+        Tuple[Union[np.ndarray, None], Union[np.ndarray, None]]: 最小の角 (3,), ボクセルの大きさ (3,). 求められない場合はNone
+    """
+    def get_attr(attr:str) -> Union[np.ndarray, None]:
+        if attr not in attrs: return None
+        return np.broadcast_to(np.asarray(attrs[attr], dtype=np.float64).reshape(-1), (3,)).copy()
+
+    dims:Union[np.ndarray, None] = None if grid_shape is None or len(grid_shape) < 3 else np.array(grid_shape[:3], dtype=np.float64)
+    size:Union[np.ndarray, None] = get_attr(H5_ATTR_VOXELSIZE)
+    voxel_min:Union[np.ndarray, None] = get_attr(H5_ATTR_VOXELMIN)
+    voxel_max:Union[np.ndarray, None] = get_attr(H5_ATTR_VOXELMAX)
+    if size is None and voxel_min is not None and voxel_max is not None and dims is not None:
+        size = (voxel_max - voxel_min) / dims
+    if voxel_min is None:
+        voxel_min = get_attr(H5_ATTR_VOXELORIGIN)
+    if voxel_min is None and size is not None and dims is not None:
+        voxel_center:Union[np.ndarray, None] = get_attr(H5_ATTR_VOXELCENTER)
+        if voxel_center is not None:
+            voxel_min = voxel_center - dims * size / 2.0
+        elif voxel_max is not None:
+            voxel_min = voxel_max - dims * size
+    return voxel_min, size
+
+class VoxelIndex(object):
+    """点群をボクセルのMortonコード順に並べた索引
+
+    全て連続した配列で保持し, 直方体の問い合わせはMortonコードの範囲に対するsearchsortedで候補のボクセルを求める.
+
+    Args:
+        origin (np.ndarray): インデックス(0, 0, 0)のボクセルの最小の角 (3,)
+        size (np.ndarray): ボクセルの大きさ (3,)
+        codes (np.ndarray): 点を含むボクセルのMortonコード (昇順, 重複なし)
+        offsets (np.ndarray): ボクセル毎の点の範囲 (len(codes) + 1,)
+        points (np.ndarray): Mortonコード順の点 (N, 3)
+        order (np.ndarray): 並べ替え前の点のインデックス (N,)
+        labels (Union[np.ndarray, None], optional): Mortonコード順のラベル (N,). Defaults to None.
+    """
+    def __init__(self, origin:np.ndarray, size:np.ndarray, codes:np.ndarray, offsets:np.ndarray, points:np.ndarray, order:np.ndarray, labels:Union[np.ndarray, None]=None) -> None:
+        self.origin:np.ndarray = np.asarray(origin, dtype=np.float64)
+        self.size:np.ndarray = np.asarray(size, dtype=np.float64)
+        self.codes:np.ndarray = codes
+        self.offsets:np.ndarray = offsets
+        self.points:np.ndarray = points
+        self.order:np.ndarray = order
+        self.labels:Union[np.ndarray, None] = labels
+
+    @classmethod
+    def from_points(cls, points:np.ndarray, origin:np.ndarray, size:np.ndarray, labels:Union[np.ndarray, None]=None) -> 'VoxelIndex':
+        points = np.ascontiguousarray(points, dtype=np.float32)
+        index:VoxelIndex = cls(origin, size, np.zeros((0,), dtype=np.uint64), np.zeros((1,), dtype=np.int64), points, np.zeros((0,), dtype=np.int64))
+        point_codes:np.ndarray = encode_morton(index.get_cells(points))
+        order:np.ndarray = np.argsort(point_codes, kind='stable')
+        codes, begins = np.unique(point_codes[order], return_index=True)
+        index.codes = codes
+        index.offsets = np.append(begins, len(points)).astype(np.int64)
+        index.points = np.ascontiguousarray(points[order])
+        index.order = order.astype(index_dtype(len(points)))
+        index.labels = None if labels is None else np.ascontiguousarray(np.asarray(labels)[order])
+        return index
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def get_cells(self, xyz:np.ndarray) -> np.ndarray:
+        """座標を含むボクセルのインデックス (格子の外側は端のボクセルに丸める)"""
+        cells:np.ndarray = np.floor((np.asarray(xyz, dtype=np.float64) - self.origin) / self.size)
+        return np.clip(cells, 0, MORTON_MAX).astype(np.int64)
+
+    def to_arrays(self, prefix:str) -> Dict[str, np.ndarray]:
+        arrays:Dict[str, np.ndarray] = {
+            prefix + '.grid': np.stack([self.origin, self.size]),
+            prefix + '.codes': self.codes,
+            prefix + '.offsets': self.offsets,
+            prefix + '.points': self.points,
+            prefix + '.order': self.order,
+        }
+        if self.labels is not None:
+            arrays[prefix + '.labels'] = self.labels
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays:Dict[str, np.ndarray], prefix:str) -> 'VoxelIndex':
+        grid:np.ndarray = arrays[prefix + '.grid']
+        return cls(grid[0], grid[1], arrays[prefix + '.codes'], arrays[prefix + '.offsets'], arrays[prefix + '.points'], arrays[prefix + '.order'], arrays.get(prefix + '.labels'))
+
+    def query_box(self, xyz_min:np.ndarray, xyz_max:np.ndarray) -> np.ndarray:
+        """直方体と重なるボクセルの点 (Mortonコード順の位置)
+
+        Args:
+            xyz_min (np.ndarray): 直方体の最小の角 (3,)
+            xyz_max (np.ndarray): 直方体の最大の角 (3,)
+        """
+        padding:np.ndarray = self.size * VOXEL_QUERY_PADDING
+        cell_min:np.ndarray = self.get_cells(np.asarray(xyz_min) - padding)
+        cell_max:np.ndarray = self.get_cells(np.asarray(xyz_max) + padding)
+        range_begins, range_ends = get_mortonRanges(cell_min, cell_max)
+        voxels:np.ndarray = expand_ranges(np.searchsorted(self.codes, range_begins, side='left'), np.searchsorted(self.codes, range_ends, side='right'))
+        # 分割しきれなかった範囲に含まれる直方体の外側のボクセルを除く
+        cells:np.ndarray = decode_morton(self.codes[voxels])
+        voxels = voxels[np.all((cells >= cell_min) & (cells <= cell_max), axis=1)]
+        return expand_ranges(self.offsets[voxels], self.offsets[voxels + 1])
+
+    def query_radius(self, center:np.ndarray, radius:float) -> np.ndarray:
+        """centerから距離radius以内の点のインデックス (並べ替え前, 昇順)"""
+        center = np.asarray(center, dtype=np.float32)
+        candidates:np.ndarray = self.query_box(center - radius, center + radius)
+        inside:np.ndarray = get_radiusMask(self.points[candidates], center, radius)
+        return np.sort(self.order[candidates[inside]])
+
+    def query_frustum(self, matrix:np.ndarray, intrinsic:Tuple[float, float, float, float], shape:Tuple[int, int], max_depth:Union[float, None]=None) -> np.ndarray:
+        """視錐台 (と距離の上限) に含まれる点のインデックス (並べ替え前, 昇順). 引数はcull.get_visibleIndicesと同じ."""
+        if max_depth is None:
+            candidates:np.ndarray = np.arange(len(self.points), dtype=np.int64)
+        else:
+            fx, fy, cx, cy = intrinsic
+            height, width = shape
+            depth:float = max_depth * (1.0 + CULL_MARGIN_DEPTH)
+            corners:List[List[float]] = [[0.0, 0.0, 0.0]]
+            for u in [-CULL_MARGIN_PIXELS, width + CULL_MARGIN_PIXELS]:
+                for v in [-CULL_MARGIN_PIXELS, height + CULL_MARGIN_PIXELS]:
+                    corners.append([(u - cx) / fx * depth, (v - cy) / fy * depth, depth])
+            inverse:np.ndarray = np.linalg.inv(np.asarray(matrix, dtype=np.float64))
+            corners_map:np.ndarray = np.array(corners) @ inverse[:3, :3].T + inverse[:3, 3]
+            candidates = self.query_box(corners_map.min(axis=0), corners_map.max(axis=0))
+        visible:np.ndarray = get_visibleIndices(self.points[candidates], matrix, intrinsic, shape, max_depth)
+        return np.sort(self.order[candidates[visible]])
+
+def get_radiusMask(points:np.ndarray, center:np.ndarray, radius:float) -> np.ndarray:
+    return np.sum(np.square(points - center), axis=1) <= np.float32(radius) ** 2
+
+def get_voxelSources(config:Dict[str, dict], include_points:bool=False) -> List[str]:
+    """索引を作るフレームに依存しない地図のキー (include_pointsがTrueの場合はpoints, semantic3dも含む)"""
+    data_types:List[str] = [TYPE_VOXEL_POINTS, TYPE_VOXEL_SEMANTIC3D]
+    if include_points:
+        data_types += [TYPE_POINTS, TYPE_SEMANTIC3D]
+    srcdata_dict:Dict[str, dict] = config[CONFIG_TAG_SRCDATA]
+    keys:List[str] = [key for key, item in srcdata_dict.items() if key.startswith('/') and item.get(CONFIG_TAG_TYPE) in data_types]
+    # semantic3dの子のpointsはsemantic3dとして索引を作る
+    return [key for key in keys if srcdata_dict.get(key.rsplit('/', 1)[0], {}).get(CONFIG_TAG_TYPE) != TYPE_SEMANTIC3D]
+
+def read_voxelMap(h5file:h5py.File, key:str, voxel_size:Union[float, None]=None) -> Tuple[np.ndarray, Union[np.ndarray, None], np.ndarray, np.ndarray]:
+    """地図を連続した配列として読み込む
+
+    voxel-points, voxel-semantic3dはボクセル毎のレコードを連結し, 格子をvoxel_*属性から求める.
+    points, semantic3dはvoxel_sizeの格子を点群の最小の角に合わせる.
+
+    Args:
+        h5file (h5py.File): HDF5ファイル
+        key (str): 地図のキー
+        voxel_size (Union[float, None], optional): voxel_size属性が無い場合のボクセルの大きさ. Defaults to None.
+
+    Returns:
+        Tuple[np.ndarray, Union[np.ndarray, None], np.ndarray, np.ndarray]: 点 (N, 3), ラベル (N,), 最小の角 (3,), ボクセルの大きさ (3,)
+    """
+    item:Union[h5py.Group, h5py.Dataset] = h5file[key]
+    data_type:Union[str, None] = byte2str(item.attrs.get(H5_ATTR_TYPE))
+    labels:Union[np.ndarray, None] = None
+    if data_type in [TYPE_VOXEL_POINTS, TYPE_VOXEL_SEMANTIC3D]:
+        voxels:np.ndarray = item[()]
+        if voxels.dtype == object:
+            cells:List[np.ndarray] = [cell for cell in voxels.reshape(-1) if cell is not None and len(cell) > 0]
+            records:np.ndarray = np.concatenate(cells) if len(cells) > 0 else np.zeros((0,), dtype=DTYPE_NUMPY[SUBTYPE_VOXEL_POINTS])
+        else:
+            records = voxels.reshape(-1)
+        points:np.ndarray = np.stack([records['x'], records['y'], records['z']], axis=1).astype(np.float32)
+        if 'label' in records.dtype.names:
+            labels = records['label']
+        attrs = {attr: np.asarray(item.attrs[attr]).tolist() for attr in H5_ATTRS_VOXEL if attr in item.attrs}
+        origin, size = get_voxelGrid(attrs, item.shape)
+    else:
+        if isinstance(item, h5py.Group):
+            points = item[SUBTYPE_POINTS][()]
+            if SUBTYPE_SEMANTIC1D in item:
+                labels = item[SUBTYPE_SEMANTIC1D][()]
+        else:
+            points = read_dataset(item)
+        origin, size = None, None
+    if size is None:
+        if voxel_size is None:
+            raise ValueError('{0:s}: voxel size is unknown (use --voxel-size)'.format(key))
+        size = np.full((3,), voxel_size, dtype=np.float64)
+    if origin is None:
+        origin = np.floor(points.min(axis=0) / size) * size if len(points) > 0 else np.zeros((3,), dtype=np.float64)
+    return points, labels, origin, size
+
+def load_voxelIndices(config:Dict[str, dict], jsonpath:str) -> Dict[str, VoxelIndex]:
+    """サイドカーから地図のキー毎の索引を読み込む"""
+    arrays:Union[Dict[str, np.ndarray], None] = load_sidecar(config, jsonpath, CONFIG_TAG_VOXEL)
+    if arrays is None: return {}
+    keys:List[str] = config[CONFIG_TAG_SIDECAR][CONFIG_TAG_VOXEL][CONFIG_TAG_SRCDATA]
+    return {key: VoxelIndex.from_arrays(arrays, str(idx)) for idx, key in enumerate(keys)}
+
+def benchmark_index(index:VoxelIndex, queries:int, radius:float, max_depth:float, seed:int=0) -> None:
+    """ランダムな位置の半径と視錐台の問い合わせを, 全点を調べる方法と比べる"""
+    rng = np.random.default_rng(seed)
+    if len(index) == 0 or queries < 1: return
+    points:np.ndarray = np.empty_like(index.points)
+    points[index.order] = index.points
+    centers:np.ndarray = points[rng.integers(0, len(points), size=queries)]
+    yaws:np.ndarray = rng.uniform(-np.pi, np.pi, size=queries)
+    shape:Tuple[int, int] = (480, 640)
+    intrinsic:Tuple[float, float, float, float] = (320.0, 320.0, 320.0, 240.0)
+    matrices:List[np.ndarray] = []
+    for center, yaw in zip(centers, yaws):
+        # カメラ (x: 右, y: 下, z: 前方) を水平にyawの方向へ向ける
+        rotation:np.ndarray = np.array([[-np.sin(yaw), np.cos(yaw), 0.0], [0.0, 0.0, -1.0], [np.cos(yaw), np.sin(yaw), 0.0]])
+        matrix:np.ndarray = np.eye(4)
+        matrix[:3, :3] = rotation
+        matrix[:3, 3] = -rotation @ center
+        matrices.append(matrix)
+
+    cases:Dict[str, Tuple] = {
+        'radius': (lambda c, m: index.query_radius(c, radius), lambda c, m: np.flatnonzero(get_radiusMask(points, c, radius))),
+        'frustum': (lambda c, m: index.query_frustum(m, intrinsic, shape, max_depth), lambda c, m: get_visibleIndices(points, m, intrinsic, shape, max_depth)),
+    }
+    for name, (query_index, query_brute) in cases.items():
+        elapsed:List[float] = [0.0, 0.0]
+        found:int = 0
+        mismatches:int = 0
+        for center, matrix in zip(centers, matrices):
+            begin:float = time.perf_counter()
+            result_index:np.ndarray = query_index(center, matrix)
+            elapsed[0] += time.perf_counter() - begin
+            begin = time.perf_counter()
+            result_brute:np.ndarray = query_brute(center, matrix)
+            elapsed[1] += time.perf_counter() - begin
+            found += len(result_brute)
+            mismatches += int(np.array_equal(result_index, result_brute) is False)
+        print('  {0:s}: index {1:.3f} ms, brute force {2:.3f} ms per query ({3:.1f}x), {4:.1f} points per query, {5:d} mismatches'.format(
+            name, elapsed[0] / queries * 1e3, elapsed[1] / queries * 1e3, elapsed[1] / max(elapsed[0], 1e-12), found / queries, mismatches))
+
+def add_parser(subparsers) -> None:
+    parser = subparsers.add_parser('voxel', help='build Morton-ordered voxel indices of static maps for radius/frustum queries')
+    parser.add_argument('config', type=str, help='config file (JSON)')
+    parser.add_argument('--voxel-size', type=float, default=None, help='voxel size for maps without the voxel_size attribute (also indexes static points/semantic3d maps)')
+    parser.add_argument('--benchmark', type=int, default=0, metavar='QUERIES', help='compare random queries against brute-force filtering')
+    parser.add_argument('--radius', type=float, default=5.0, help='radius of the benchmark queries')
+    parser.add_argument('--max-depth', type=float, default=30.0, help='depth limit of the benchmark frustum queries')
+    parser.add_argument('--seed', type=int, default=0, help='random seed of the benchmark queries')
+    parser.set_defaults(func=run)
+
+def run(args) -> None:
+    config = load_config(args.config)
+    keys:List[str] = get_voxelSources(config, args.voxel_size is not None)
+    if len(keys) == 0:
+        print('no static voxel map')
+        return
+    arrays:Dict[str, np.ndarray] = {}
+    with h5py.File(config[H5_ATTR_FILEPATH], mode='r') as h5file:
+        for idx, key in enumerate(keys):
+            begin:float = time.perf_counter()
+            points, labels, origin, size = read_voxelMap(h5file, key, args.voxel_size)
+            index:VoxelIndex = VoxelIndex.from_points(points, origin, size, labels)
+            print('{0:s}: {1:d} points in {2:d} voxels of {3:s} ({4:.2f} s)'.format(key, len(index), len(index.codes), np.array2string(index.size, precision=3), time.perf_counter() - begin))
+            arrays.update(index.to_arrays(str(idx)))
+            if args.benchmark > 0:
+                benchmark_index(index, args.benchmark, args.radius, args.max_depth, args.seed)
+
+    path = save_sidecar(config, args.config, CONFIG_TAG_VOXEL, arrays, **{CONFIG_TAG_SRCDATA: keys})
+    save_config(config, args.config)
+    print('saved: {0:s}'.format(path))
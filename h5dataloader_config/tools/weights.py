@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+
+from typing import Dict, List, Tuple, Union
+import numpy as np
+import h5py
+
+from ..common.structure import *
+from ..common.scan import get_length
+from .utils import *
+
+DEFAULT_CHUNK_FRAMES:int = 64
+DEFAULT_POWER:float = 1.0
+
+def create_labelLut(label_config:Dict[str, dict]) -> Tuple[np.ndarray, int]:
+    """label configの'convert'から, 保存値 (uint8) から変換後のクラスへのLUTを作成
+
+    Args:
+        label_config (Dict[str, dict]): label/config/<tag>
+
+    Returns:
+        Tuple[np.ndarray, int]: LUT (対応しない値は-1), クラス数
+    """
+    dst_indices:List[int] = [int(key) for key in label_config[CONFIG_TAG_DST].keys()]
+    num_classes:int = max(dst_indices) + 1 if len(dst_indices) > 0 else 0
+    lut:np.ndarray = np.full((256,), -1, dtype=np.int64)
+    for src_idx, dst_idx in label_config[CONFIG_TAG_CONVERT].items():
+        if dst_idx is None: continue
+        lut[int(src_idx) % 256] = dst_idx
+    return lut, num_classes
+
+def get_labelSource(minibatch_config:Dict[str, Union[str, dict]]) -> Union[str, None]:
+    """mini-batchのラベルを持つフレーム毎のsrc-dataのHDF5内の相対パス
+
+    Returns:
+        Union[str, None]: 存在しない場合はNone
+    """
+    from_dict:Dict[str, str] = minibatch_config[CONFIG_TAG_FROM]
+    for from_type in [TYPE_SEMANTIC2D, TYPE_SEMANTIC1D, TYPE_SEMANTIC3D]:
+        from_key:Union[str, None] = from_dict.get(from_type)
+        if from_key is None or from_key.startswith('/'): continue
+        if from_type == TYPE_SEMANTIC3D:
+            return '{0:s}/{1:s}'.format(from_key, SUBTYPE_SEMANTIC1D)
+        return from_key
+    return None
+
+def count_classes(h5file:h5py.File, key:str, lut:np.ndarray, num_classes:int, chunk_frames:int=DEFAULT_CHUNK_FRAMES) -> np.ndarray:
+    """フレーム毎の変換後クラスの画素 (点) 数を計数する
+
+    Args:
+        h5file (h5py.File): HDF5ファイル
+        key (str): フレーム毎のsrc-dataのキー
+        lut (np.ndarray): create_labelLutで作成したLUT
+        num_classes (int): クラス数
+        chunk_frames (int, optional): まとめて計数するフレーム数. Defaults to DEFAULT_CHUNK_FRAMES.
+
+    Returns:
+        np.ndarray: (フレーム数, クラス数) の計数行列
+    """
+    length:int = get_length(h5file)
+    counts:np.ndarray = np.zeros((length, num_classes), dtype=np.uint32)
+    # 対応しないクラスは末尾の列に集めて捨てる
+    lut_ext:np.ndarray = np.where(lut < 0, num_classes, lut)
+    width:int = num_classes + 1
+    for start in range(0, length, chunk_frames):
+        stop:int = min(start + chunk_frames, length)
+        flat_list:List[np.ndarray] = []
+        for idx in range(start, stop):
+            h5key:str = get_h5Key(key, idx)
+            if h5key not in h5file: continue
+            data:np.ndarray = h5file[h5key][()].astype(np.uint8, copy=False).ravel()
+            flat_list.append(lut_ext[data] + (idx - start) * width)
+        if len(flat_list) == 0: continue
+        chunk_counts:np.ndarray = np.bincount(np.concatenate(flat_list), minlength=(stop - start) * width)
+        counts[start:stop] = chunk_counts.reshape((stop - start, width))[:, :num_classes]
+    return counts
+
+def create_weights(counts:np.ndarray, power:float=DEFAULT_POWER) -> np.ndarray:
+    """クラスの出現フレーム頻度の逆数から, フレーム毎のサンプリング重みを求める
+
+    フレームの重みは含まれるクラスの (1 / 出現頻度) ** power の最大値とし, 平均が1になるよう正規化する.
+
+    Args:
+        counts (np.ndarray): (フレーム数, クラス数) の計数行列
+        power (float, optional): 逆頻度の指数. Defaults to DEFAULT_POWER.
+
+    Returns:
+        np.ndarray: フレーム毎の重み (float32)
+    """
+    presence:np.ndarray = counts > 0
+    frequency:np.ndarray = presence.mean(axis=0)
+    inverse:np.ndarray = np.where(frequency > 0, 1.0 / np.maximum(frequency, 1e-12), 0.0) ** power
+    weights:np.ndarray = np.max(np.where(presence, inverse[np.newaxis, :], 0.0), axis=1, initial=0.0)
+    weights[weights <= 0.0] = np.min(weights[weights > 0.0]) if np.any(weights > 0.0) else 1.0
+    return (weights / np.mean(weights)).astype(np.float32)
+
+def add_parser(subparsers) -> None:
+    parser = subparsers.add_parser('weights', help='compute class-balanced per-frame sampling weights')
+    parser.add_argument('config', type=str, help='config file (JSON)')
+    parser.add_argument('--power', type=float, default=DEFAULT_POWER, help='exponent of the inverse class frequency')
+    parser.add_argument('--chunk-frames', type=int, default=DEFAULT_CHUNK_FRAMES, help='frames per vectorized chunk')
+    parser.set_defaults(func=run)
+
+def run(args) -> None:
+    config = load_config(args.config)
+    label_configs:Dict[str, dict] = config[CONFIG_TAG_LABEL][CONFIG_TAG_CONFIG]
+    arrays:Dict[str, np.ndarray] = {}
+    classes:Dict[str, List[str]] = {}
+    with h5py.File(config[H5_ATTR_FILEPATH], mode='r') as h5file:
+        for minibatch_tag, minibatch_config in config[CONFIG_TAG_MINIBATCH].items():
+            if minibatch_config[CONFIG_TAG_TYPE] not in [TYPE_SEMANTIC2D, TYPE_SEMANTIC3D]: continue
+            label_tag:str = minibatch_config[CONFIG_TAG_LABELTAG]
+            if label_tag not in label_configs.keys(): continue
+            key:Union[str, None] = get_labelSource(minibatch_config)
+            if key is None: continue
+
+            lut, num_classes = create_labelLut(label_configs[label_tag])
+            counts:np.ndarray = count_classes(h5file, key, lut, num_classes, args.chunk_frames)
+            arrays[minibatch_tag + '.counts'] = counts
+            arrays[minibatch_tag + '.weights'] = create_weights(counts, args.power)
+            dst_dict:Dict[str, dict] = label_configs[label_tag][CONFIG_TAG_DST]
+            classes[minibatch_tag] = [dst_dict.get(str(i), {}).get(CONFIG_TAG_TAG, '') for i in range(num_classes)]
+            frames_per_class:np.ndarray = np.count_nonzero(counts, axis=0)
+            frames_per_class = frames_per_class[frames_per_class > 0]
+            print('{0:s}: {1:d} frames, rarest class present in {2:d} frames'.format(minibatch_tag, counts.shape[0], int(np.min(frames_per_class, initial=counts.shape[0]))))
+
+    if len(arrays) == 0:
+        print('no semantic mini-batch with a label-tag')
+        return
+    path = save_sidecar(config, args.config, CONFIG_TAG_WEIGHTS, arrays, **{'power': args.power, CONFIG_TAG_CLASS: classes})
+    save_config(config, args.config)
+    print('saved: {0:s}'.format(path))
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+
+from typing import Dict, Union
+import numpy as np
+
+from ..common.structure import *
+from ..common.window import FrameMetaCache
+from .utils import *
+
+def add_parser(subparsers) -> None:
+    parser = subparsers.add_parser('window', help='precompute valid window start indices of windowed mini-batches')
+    parser.add_argument('config', type=str, help='config file (JSON)')
+    parser.set_defaults(func=run)
+
+def run(args) -> None:
+    config = load_config(args.config)
+    cache = FrameMetaCache(config[H5_ATTR_FILEPATH])
+    arrays:Dict[str, np.ndarray] = {}
+    for minibatch_tag, minibatch_config in config[CONFIG_TAG_MINIBATCH].items():
+        starts:Union[np.ndarray, None] = cache.valid_windowStarts(minibatch_config)
+        if starts is None: continue
+        arrays[minibatch_tag] = starts
+        print('{0:s}: {1:d} valid windows'.format(minibatch_tag, len(starts)))
+
+    if len(arrays) == 0:
+        print('no windowed mini-batch')
+        return
+    path = save_sidecar(config, args.config, CONFIG_TAG_WINDOW, arrays)
+    save_config(config, args.config)
+    print('saved: {0:s}'.format(path))
@@ -0,0 +1,234 @@
+from typing import Any, Callable, Dict, List, Tuple, Union
+from PySide2.QtCore import QAbstractItemModel, QModelIndex, Qt
+
+# fetchMoreで1度に追加する行数
+FETCH_SIZE:int = 256
+
+def sort_key(text:str) -> Tuple[int, Union[float, str]]:
+    """数値として解釈できる場合は数値で比較する"""
+    try:
+        return (0, float(text))
+    except ValueError:
+        return (1, text)
+
+class DictListModel(QAbstractItemModel):
+    """dictのキーを行とするフラットなモデル
+
+    行はビューが必要とした時点でFETCH_SIZEずつ追加し, 行の追加・変更・削除は該当する行だけを通知する.
+    """
+    def __init__(self, headers:List[str], columns:Callable[[str, dict], List[str]], parent=None) -> None:
+        super(DictListModel, self).__init__(parent)
+        self.headers:List[str] = headers
+        self.columns:Callable[[str, dict], List[str]] = columns
+        self.source:Dict[str, dict] = {}
+        self.keys:List[str] = []
+        self.fetched:int = 0
+        self.sortColumn:Union[int, None] = None
+        self.sortOrder:Qt.SortOrder = Qt.AscendingOrder
+
+    def setSource(self, source:Dict[str, dict]) -> None:
+        self.beginResetModel()
+        self.source = source
+        self.keys = list(source.keys())
+        self.fetched = 0
+        if self.sortColumn is not None:
+            self.__sortKeys()
+        self.endResetModel()
+
+    def setKeys(self, keys:List[str]) -> None:
+        """sourceのうち, 指定したキーだけを指定した順に表示する"""
+        self.beginResetModel()
+        self.keys = list(keys)
+        self.fetched = 0
+        self.endResetModel()
+
+    def rowCount(self, parent:QModelIndex=QModelIndex()) -> int:
+        return 0 if parent.isValid() else self.fetched
+
+    def columnCount(self, parent:QModelIndex=QModelIndex()) -> int:
+        return len(self.headers)
+
+    def index(self, row:int, column:int, parent:QModelIndex=QModelIndex()) -> QModelIndex:
+        if parent.isValid() or row < 0 or row >= self.fetched or column < 0 or column >= len(self.headers):
+            return QModelIndex()
+        return self.createIndex(row, column)
+
+    def parent(self, index:QModelIndex) -> QModelIndex:
+        return QModelIndex()
+
+    def data(self, index:QModelIndex, role:int=Qt.DisplayRole) -> Any:
+        if index.isValid() is False or role != Qt.DisplayRole: return None
+        key:str = self.keys[index.row()]
+        return self.columns(key, self.source[key])[index.column()]
+
+    def headerData(self, section:int, orientation:Qt.Orientation, role:int=Qt.DisplayRole) -> Any:
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole and section < len(self.headers):
+            return self.headers[section]
+        return None
+
+    def canFetchMore(self, parent:QModelIndex) -> bool:
+        return parent.isValid() is False and self.fetched < len(self.keys)
+
+    def fetchMore(self, parent:QModelIndex) -> None:
+        if self.canFetchMore(parent) is False: return
+        count:int = min(FETCH_SIZE, len(self.keys) - self.fetched)
+        self.beginInsertRows(QModelIndex(), self.fetched, self.fetched + count - 1)
+        self.fetched += count
+        self.endInsertRows()
+
+    def sort(self, column:int, order:Qt.SortOrder=Qt.AscendingOrder) -> None:
+        self.sortColumn, self.sortOrder = column, order
+        self.layoutAboutToBeChanged.emit()
+        persistent:List[QModelIndex] = self.persistentIndexList()
+        persistentKeys:List[str] = [self.keys[index.row()] for index in persistent]
+        self.__sortKeys()
+        rows:Dict[str, int] = {key: row for row, key in enumerate(self.keys)}
+        self.changePersistentIndexList(persistent, [
+            self.createIndex(rows[key], index.column()) if rows[key] < self.fetched else QModelIndex()
+            for key, index in zip(persistentKeys, persistent)
+        ])
+        self.layoutChanged.emit()
+
+    def __sortKeys(self) -> None:
+        self.keys.sort(key=lambda key: sort_key(self.columns(key, self.source[key])[self.sortColumn]), reverse=self.sortOrder == Qt.DescendingOrder)
+
+    def key(self, index:QModelIndex) -> Union[str, None]:
+        if index.isValid() is False or index.row() >= self.fetched: return None
+        return self.keys[index.row()]
+
+    def insertKey(self, key:str) -> None:
+        """sourceに追加したキーを末尾の行として追加"""
+        if self.fetched < len(self.keys):
+            self.keys.append(key)
+            return
+        self.beginInsertRows(QModelIndex(), len(self.keys), len(self.keys))
+        self.keys.append(key)
+        self.fetched += 1
+        self.endInsertRows()
+
+    def updateKey(self, oldKey:str, newKey:str) -> None:
+        """sourceで変更・改名したキーの行を更新"""
+        row:int = self.keys.index(oldKey)
+        self.keys[row] = newKey
+        if row < self.fetched:
+            self.dataChanged.emit(self.createIndex(row, 0), self.createIndex(row, len(self.headers) - 1))
+
+    def removeKey(self, key:str) -> None:
+        """sourceから削除したキーの行を削除"""
+        row:int = self.keys.index(key)
+        if row >= self.fetched:
+            self.keys.pop(row)
+            return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        self.keys.pop(row)
+        self.fetched -= 1
+        self.endRemoveRows()
+
+class TreeNode(object):
+    __slots__ = ['values', 'payload', 'parent', 'children']
+    def __init__(self, values:List[str], payload:Any, parent:Union['TreeNode', None]) -> None:
+        self.values:List[str] = values
+        self.payload:Any = payload
+        self.parent:Union[TreeNode, None] = parent
+        self.children:Union[List[TreeNode], None] = None
+
+    def row(self) -> int:
+        return self.parent.children.index(self) if self.parent is not None else 0
+
+class LazyTreeModel(QAbstractItemModel):
+    """入れ子のdict等から, 展開された時点で子の行を作る木構造のモデル
+
+    Args:
+        headers (List[str]): 列の見出し
+        childrenOf (Callable[[Any], List[Tuple[List[str], Any]]]): payloadから, 子の列の値とpayloadの組を返す
+        hasChildren (Callable[[Any], bool]): payloadが子を持つか
+    """
+    def __init__(self, headers:List[str], childrenOf:Callable[[Any], List[Tuple[List[str], Any]]], hasChildren:Callable[[Any], bool], parent=None) -> None:
+        super(LazyTreeModel, self).__init__(parent)
+        self.headers:List[str] = headers
+        self.childrenOf:Callable[[Any], List[Tuple[List[str], Any]]] = childrenOf
+        self.payloadHasChildren:Callable[[Any], bool] = hasChildren
+        self.root:TreeNode = TreeNode([], None, None)
+        self.root.children = []
+        self.sortColumn:Union[int, None] = None
+        self.sortOrder:Qt.SortOrder = Qt.AscendingOrder
+
+    def setRoot(self, payload:Any) -> None:
+        self.beginResetModel()
+        self.root = TreeNode([], payload, None)
+        self.__fetch(self.root)
+        self.endResetModel()
+
+    def __node(self, index:QModelIndex) -> TreeNode:
+        return index.internalPointer() if index.isValid() else self.root
+
+    def __fetch(self, node:TreeNode) -> None:
+        node.children = [TreeNode(values, payload, node) for values, payload in self.childrenOf(node.payload)] if self.payloadHasChildren(node.payload) else []
+        self.__sortChildren(node)
+
+    def __sortChildren(self, node:TreeNode) -> None:
+        if self.sortColumn is None or node.children is None: return
+        node.children.sort(key=lambda child: sort_key(child.values[self.sortColumn] if self.sortColumn < len(child.values) else ''), reverse=self.sortOrder == Qt.DescendingOrder)
+
+    def rowCount(self, parent:QModelIndex=QModelIndex()) -> int:
+        if parent.column() > 0: return 0
+        children:Union[List[TreeNode], None] = self.__node(parent).children
+        return 0 if children is None else len(children)
+
+    def columnCount(self, parent:QModelIndex=QModelIndex()) -> int:
+        return len(self.headers)
+
+    def hasChildren(self, parent:QModelIndex=QModelIndex()) -> bool:
+        node:TreeNode = self.__node(parent)
+        if node.children is not None: return len(node.children) > 0
+        return self.payloadHasChildren(node.payload)
+
+    def canFetchMore(self, parent:QModelIndex) -> bool:
+        return self.__node(parent).children is None
+
+    def fetchMore(self, parent:QModelIndex) -> None:
+        node:TreeNode = self.__node(parent)
+        if node.children is not None: return
+        children:List[Tuple[List[str], Any]] = self.childrenOf(node.payload) if self.payloadHasChildren(node.payload) else []
+        if len(children) == 0:
+            node.children = []
+            return
+        self.beginInsertRows(parent, 0, len(children) - 1)
+        node.children = [TreeNode(values, payload, node) for values, payload in children]
+        self.__sortChildren(node)
+        self.endInsertRows()
+
+    def index(self, row:int, column:int, parent:QModelIndex=QModelIndex()) -> QModelIndex:
+        node:TreeNode = self.__node(parent)
+        if node.children is None or row < 0 or row >= len(node.children) or column < 0 or column >= len(self.headers):
+            return QModelIndex()
+        return self.createIndex(row, column, node.children[row])
+
+    def parent(self, index:QModelIndex) -> QModelIndex:
+        if index.isValid() is False: return QModelIndex()
+        parentNode:Union[TreeNode, None] = index.internalPointer().parent
+        if parentNode is None or parentNode is self.root: return QModelIndex()
+        return self.createIndex(parentNode.row(), 0, parentNode)
+
+    def data(self, index:QModelIndex, role:int=Qt.DisplayRole) -> Any:
+        if index.isValid() is False or role != Qt.DisplayRole: return None
+        values:List[str] = index.internalPointer().values
+        return values[index.column()] if index.column() < len(values) else None
+
+    def headerData(self, section:int, orientation:Qt.Orientation, role:int=Qt.DisplayRole) -> Any:
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole and section < len(self.headers):
+            return self.headers[section]
+        return None
+
+    def sort(self, column:int, order:Qt.SortOrder=Qt.AscendingOrder) -> None:
+        self.sortColumn, self.sortOrder = column, order
+        self.layoutAboutToBeChanged.emit()
+        persistent:List[QModelIndex] = self.persistentIndexList()
+        nodes:List[TreeNode] = [index.internalPointer() for index in persistent]
+        stack:List[TreeNode] = [self.root]
+        while len(stack) > 0:
+            node:TreeNode = stack.pop()
+            self.__sortChildren(node)
+            stack.extend(node.children or [])
+        self.changePersistentIndexList(persistent, [self.createIndex(node.row(), index.column(), node) for node, index in zip(nodes, persistent)])
+        self.layoutChanged.emit()
@@ -18,6 +18,7 @@ setup(
     entry_points={
         'console_scripts': [
             'h5dataloader-config = h5dataloader_config:main',
+            'h5dataloader-tools = h5dataloader_config.tools:main',
         ]
     },
     python_requires='>=3.6'
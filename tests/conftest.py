@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+
+from typing import Any, Dict, List, Union
+import numpy as np
+import h5py
+import pytest
+
+from h5dataloader_config.common.structure import *
+from h5dataloader_config.common.codec import get_pixelType
+from h5dataloader_config.tools.synthetic import create_fromConfig
+
+IMAGE_SHAPE:List[int] = [24, 32]
+OUTPUT_SHAPE:List[int] = [12, 16]
+POINTS:int = 64
+LENGTH:int = 4
+
+CHANNELS:Dict[str, int] = {TYPE_BGR8: 3, TYPE_RGB8: 3, TYPE_BGRA8: 4, TYPE_RGBA8: 4, TYPE_COLOR: 3}
+STATIC_KEYS:Dict[str, str] = {
+    TYPE_INTRINSIC: '/static/intrinsic',
+    TYPE_VOXEL_POINTS: '/static/voxel_points',
+    TYPE_VOXEL_SEMANTIC3D: '/static/voxel_semantic3d',
+}
+# 型毎のソースの座標系. カメラ (cam) の画像, LiDAR (lidar) の点群, 世界座標系 (world) の地図.
+FRAME_IDS:Dict[str, str] = {TYPE_POINTS: 'lidar', TYPE_SEMANTIC1D: 'lidar', TYPE_SEMANTIC3D: 'lidar', TYPE_VOXEL_POINTS: 'world', TYPE_VOXEL_SEMANTIC3D: 'world'}
+
+def get_shape(data_type:str, shape:List[int]) -> Union[List[Union[int, None]], None]:
+    data_type = get_pixelType(data_type)
+    if data_type in [TYPE_MONO8, TYPE_MONO16, TYPE_DEPTH, TYPE_DISPARITY, TYPE_SEMANTIC2D]: return list(shape)
+    if data_type in CHANNELS.keys() and data_type != TYPE_COLOR: return list(shape) + [CHANNELS[data_type]]
+    if data_type in [TYPE_POINTS, TYPE_SEMANTIC3D]: return [POINTS, 3]
+    if data_type == TYPE_SEMANTIC1D: return [POINTS]
+    if data_type == TYPE_POSE: return [4, 4]
+    if data_type == TYPE_TRANSLATION: return [3]
+    if data_type == TYPE_QUATERNION: return [4]
+    if data_type == TYPE_COLOR: return [3]
+    if data_type in [TYPE_VOXEL_POINTS, TYPE_VOXEL_SEMANTIC3D, TYPE_INTRINSIC]: return None
+    return [8]
+
+def create_srcItem(key:str, data_type:str, frame_id:Union[str, None], child_frame_id:Union[str, None]=None, label_tag:Union[str, None]=None) -> Dict[str, Any]:
+    # グループ (pose, semantic3d) は走査結果と同じく形状を持たない
+    shape:Union[List[Union[int, None]], None] = None if data_type in [TYPE_POSE, TYPE_SEMANTIC3D] else get_shape(data_type, IMAGE_SHAPE)
+    item:Dict[str, Any] = {
+        CONFIG_TAG_TAG: key, CONFIG_TAG_TYPE: data_type, CONFIG_TAG_SHAPE: shape,
+        CONFIG_TAG_FRAMEID: frame_id, CONFIG_TAG_CHILDFRAMEID: child_frame_id, CONFIG_TAG_LABELTAG: label_tag,
+    }
+    if data_type in COMPRESSED_TYPES.keys():
+        item[CONFIG_TAG_IMAGESHAPE] = item[CONFIG_TAG_SHAPE]
+        item[CONFIG_TAG_SHAPE] = [None]
+    return item
+
+def create_baseConfig() -> Dict[str, dict]:
+    """全ての型のソース, 静的なTF (cam -> lidar) とフレーム毎のTF (world -> cam), ラベルを持つ設定"""
+    srcdata:Dict[str, dict] = {}
+    for data_type in FROM_TYPES.keys():
+        for from_types in FROM_TYPES[data_type]:
+            for from_type in from_types:
+                if from_type in [TYPE_POSE, TYPE_TRANSLATION, TYPE_QUATERNION]: continue
+                key:str = STATIC_KEYS.get(from_type, from_type)
+                label_tag:Union[str, None] = 'lbl' if USE_LABEL[from_type] is True else None
+                srcdata[key] = create_srcItem(key, from_type, FRAME_IDS.get(from_type, 'cam'), label_tag=label_tag)
+    srcdata['world_to_cam'] = create_srcItem('world_to_cam', TYPE_POSE, 'world', 'cam')
+    srcdata['world_to_cam/translation'] = create_srcItem('world_to_cam/translation', TYPE_TRANSLATION, None)
+    srcdata['world_to_cam/rotation'] = create_srcItem('world_to_cam/rotation', TYPE_QUATERNION, None)
+    srcdata['/tf_static/cam_to_lidar'] = create_srcItem('/tf_static/cam_to_lidar', TYPE_POSE, 'cam', 'lidar')
+    return {
+        H5_ATTR_FILEPATH: '',
+        CONFIG_TAG_MINIBATCH: {},
+        CONFIG_TAG_SRCDATA: srcdata,
+        CONFIG_TAG_TF: {
+            CONFIG_TAG_TREE: {'world': {'cam': {'lidar': {}}}},
+            CONFIG_TAG_LIST: ['world', 'cam', 'lidar'],
+            CONFIG_TAG_DATA: {
+                'cam': {CONFIG_TAG_KEY: 'world_to_cam', CONFIG_TAG_FRAMEID: 'world', CONFIG_TAG_CHILDFRAMEID: 'cam'},
+                'lidar': {CONFIG_TAG_KEY: '/tf_static/cam_to_lidar', CONFIG_TAG_FRAMEID: 'cam', CONFIG_TAG_CHILDFRAMEID: 'lidar'},
+            },
+        },
+        CONFIG_TAG_LABEL: {
+            CONFIG_TAG_SRC: {'lbl': {str(idx): {CONFIG_TAG_TAG: 'class_{0:d}'.format(idx), CONFIG_TAG_COLOR: [idx * 40, 255 - idx * 40, idx * 20]} for idx in range(5)}},
+            CONFIG_TAG_CONFIG: {'cfg': {
+                CONFIG_TAG_SRC: 'lbl',
+                CONFIG_TAG_CONVERT: {'0': 0, '1': 1, '2': 1, '3': 2, '4': 2},
+                CONFIG_TAG_DST: {str(idx): {CONFIG_TAG_TAG: 'dst_{0:d}'.format(idx), CONFIG_TAG_COLOR: [0, idx * 100, 255]} for idx in range(3)},
+            }},
+        },
+    }
+
+def create_minibatch(dst_type:str, from_types:List[str]) -> Dict[str, Any]:
+    """FROM_TYPESの組み合わせ1つ分のmini-batch. poseは幾何のソースの座標系からcamへの変換とする."""
+    from_dict:Dict[str, str] = {}
+    for from_type in from_types:
+        if from_type == TYPE_POSE:
+            geometry_types:List[str] = [t for t in from_types if t not in [TYPE_POSE, TYPE_INTRINSIC]]
+            from_dict[from_type] = FRAME_IDS.get(geometry_types[0], 'cam') if len(geometry_types) > 0 else 'world'
+        elif from_type == TYPE_TRANSLATION:
+            from_dict[from_type] = 'world_to_cam/translation'
+        elif from_type == TYPE_QUATERNION:
+            from_dict[from_type] = 'world_to_cam/rotation'
+        else:
+            from_dict[from_type] = STATIC_KEYS.get(from_type, from_type)
+    labelled:bool = any(USE_LABEL[from_type] is True for from_type in from_types)
+    return {
+        CONFIG_TAG_TYPE: dst_type,
+        CONFIG_TAG_FRAMEID: 'cam',
+        CONFIG_TAG_FROM: from_dict,
+        CONFIG_TAG_SHAPE: get_shape(dst_type, OUTPUT_SHAPE),
+        CONFIG_TAG_NORMALIZE: False,
+        CONFIG_TAG_RANGE: None if DEFAULT_RANGE[dst_type] is None else list(DEFAULT_RANGE[dst_type]),
+        CONFIG_TAG_LABELTAG: 'cfg' if labelled and dst_type in [TYPE_SEMANTIC1D, TYPE_SEMANTIC2D, TYPE_SEMANTIC3D] else '',
+    }
+
+def get_combinations() -> List[List[Any]]:
+    return [[dst_type, from_types] for dst_type in FROM_TYPES.keys() for from_types in FROM_TYPES[dst_type]]
+
+def create_h5(config:Dict[str, dict], length:int=LENGTH, seed:int=0) -> h5py.File:
+    h5file = h5py.File('{0:d}.h5'.format(id(config)), mode='w', driver='core', backing_store=False)
+    create_fromConfig(config, h5file, length, seed=seed, max_points=POINTS)
+    return h5file
+
+def write_h5(config:Dict[str, dict], h5path:str, length:int=LENGTH, seed:int=0, max_points:int=POINTS) -> str:
+    """合成データをファイルに書き込み, 設定のファイルパスをそのファイルにする"""
+    with h5py.File(h5path, mode='w') as h5file:
+        create_fromConfig(config, h5file, length, seed=seed, max_points=max_points)
+    config[H5_ATTR_FILEPATH] = h5path
+    return h5path
+
+@pytest.fixture
+def base_config() -> Dict[str, dict]:
+    return create_baseConfig()
+
+@pytest.fixture(scope='module')
+def all_config() -> Dict[str, dict]:
+    """全ての組み合わせのmini-batchを持つ設定"""
+    config:Dict[str, dict] = create_baseConfig()
+    for dst_type, from_types in get_combinations():
+        config[CONFIG_TAG_MINIBATCH]['{0:s}<-{1:s}'.format(dst_type, ','.join(from_types))] = create_minibatch(dst_type, from_types)
+    return config
+
+@pytest.fixture
+def depth_config(base_config, tmp_path) -> Dict[str, dict]:
+    """深度のsrc-dataだけを範囲付きでそのまま出力する設定と, そのファイル"""
+    config:Dict[str, dict] = base_config
+    config[CONFIG_TAG_SRCDATA] = {TYPE_DEPTH: config[CONFIG_TAG_SRCDATA][TYPE_DEPTH]}
+    minibatch:Dict[str, Any] = create_minibatch(TYPE_DEPTH, [TYPE_DEPTH])
+    minibatch[CONFIG_TAG_RANGE] = [0.0, 100.0]
+    config[CONFIG_TAG_MINIBATCH] = {'depth': minibatch}
+    write_h5(config, str(tmp_path / 'depth.h5'))
+    return config
+
+@pytest.fixture(scope='module')
+def all_h5(all_config):
+    h5file = create_h5(all_config)
+    yield h5file
+    h5file.close()
+
+def assert_equal(a:Any, b:Any) -> None:
+    if isinstance(a, dict) or isinstance(b, dict):
+        assert isinstance(a, dict) and isinstance(b, dict) and a.keys() == b.keys()
+        for key in a.keys(): assert_equal(a[key], b[key])
+        return
+    if isinstance(a, tuple) or isinstance(b, tuple):
+        assert isinstance(a, tuple) and isinstance(b, tuple) and len(a) == len(b)
+        for x, y in zip(a, b): assert_equal(x, y)
+        return
+    a, b = np.asarray(a), np.asarray(b)
+    assert a.shape == b.shape
+    assert a.dtype == b.dtype
+    assert np.allclose(a, b, equal_nan=True)
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+
+import json
+import argparse
+from typing import Any, Dict, List, Union
+import pytest
+
+from h5dataloader_config.tools import benchmark
+from h5dataloader_config.tools.benchmark import DEFAULT_MEMORY_THRESHOLD, compare_runs, get_change, get_commit
+
+def create_run(times:Dict[str, float], memories:Union[Dict[str, float], None]=None) -> Dict[str, Any]:
+    memories = {} if memories is None else memories
+    results:Dict[str, Dict[str, Any]] = {case: {'median': value, 'min': value, 'max': value, 'repeat': 1} for case, value in times.items()}
+    results.update({case: {'median': value, 'min': value, 'max': value, 'repeat': 1, 'unit': 'KiB'} for case, value in memories.items()})
+    return {'time': '2000-01-01T00:00:00', 'commit': None, 'results': results}
+
+def test_compare_time():
+    base = create_run({'same': 1.0, 'faster': 1.0, 'slower': 1.0, 'noise': 1.0, 'zero': 0.0, 'from-zero': 0.0})
+    target = create_run({'same': 1.0, 'faster': 0.5, 'slower': 1.5, 'noise': 1.05, 'zero': 0.0, 'from-zero': 0.1, 'new': 9.0})
+    regressions = compare_runs(base, target, threshold=0.1)
+    assert [case for case, _, _, _ in regressions] == ['slower', 'from-zero']
+    assert regressions[0][1:] == (1.0, 1.5, 1.5)
+    # 0から0, 速くなった場合は回帰としない
+    assert compare_runs(create_run({'a': 0.0}), create_run({'a': 0.0})) == []
+    assert get_change({'median': 2.0}, {'median': 1.0}) == 1.0
+
+def test_compare_memory():
+    """メモリのケースは増加量 [B] で判定し, 0付近や負の値でも比を取らない"""
+    threshold_kib:float = DEFAULT_MEMORY_THRESHOLD / 1024
+    base = create_run({}, {'rss': -10.0, 'zero': 0.0, 'grow': 100.0, 'shrink': 100.0})
+    target = create_run({}, {'rss': 10.0, 'zero': threshold_kib + 1.0, 'grow': 100.0 + threshold_kib - 1.0, 'shrink': 1.0})
+    regressions = compare_runs(base, target)
+    assert [case for case, _, _, _ in regressions] == ['zero']
+    assert regressions[0][3] == (threshold_kib + 1.0) * 1024
+    assert [case for case, _, _, _ in compare_runs(base, target, memory_threshold=0)] == ['rss', 'zero', 'grow']
+    assert get_change({'median': -10.0}, {'median': 10.0, 'unit': 'KiB'}) == 20.0 * 1024
+
+def test_compare_command(tmp_path, capsys):
+    history:str = str(tmp_path / 'history.json')
+    args = argparse.Namespace(history=history, base=-2, target=-1, threshold=0.1, memory_threshold=DEFAULT_MEMORY_THRESHOLD)
+    with open(history, mode='w') as jsonfile:
+        json.dump([create_run({'a': 0.0}, {'rss': 0.0}), create_run({'a': 0.0}, {'rss': -5.0})], jsonfile)
+    benchmark.compare(args)
+    assert 'REGRESSION' not in capsys.readouterr().out
+    with open(history, mode='w') as jsonfile:
+        json.dump([create_run({'a': 1.0}, {'rss': 0.0}), create_run({'a': 2.0}, {'rss': 1024.0})], jsonfile)
+    with pytest.raises(SystemExit):
+        benchmark.compare(args)
+    out:List[str] = capsys.readouterr().out.splitlines()
+    assert 'REGRESSION a: 2.00x' in out
+    assert 'REGRESSION rss: +1048576 B' in out
+
+def test_get_commit():
+    commit = get_commit()
+    assert commit is None or (isinstance(commit, str) and len(commit) > 0)
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+
+import os
+import copy
+import argparse
+from typing import Any, Dict, List
+import numpy as np
+import cv2
+import h5py
+import pytest
+
+from h5dataloader_config.common.structure import *
+from h5dataloader_config.common.codec import encode_image, get_compressedType, get_pixelType, parse_imageHeader
+from h5dataloader_config.tools import compress
+from h5dataloader_config.tools.loader import ReferenceLoader, decode_image
+from h5dataloader_config.tools.utils import load_config, save_config
+from conftest import IMAGE_SHAPE, LENGTH, create_minibatch, write_h5
+
+def create_image(shape:List[int], dtype=np.uint8) -> np.ndarray:
+    return np.random.default_rng(0).integers(0, np.iinfo(dtype).max, size=shape, endpoint=True).astype(dtype)
+
+@pytest.mark.parametrize('codec, shape, dtype', [
+    (CODEC_PNG, [24, 32], np.uint8),
+    (CODEC_PNG, [24, 32, 3], np.uint8),
+    (CODEC_PNG, [24, 32, 4], np.uint8),
+    (CODEC_PNG, [24, 32], np.uint16),
+    (CODEC_PNG, [1, 300], np.uint8),
+    (CODEC_JPEG, [24, 32], np.uint8),
+    (CODEC_JPEG, [24, 32, 3], np.uint8),
+    (CODEC_JPEG, [300, 1, 3], np.uint8),
+])
+def test_parse_imageHeader(codec, shape, dtype):
+    """ヘッダから得た形状は復号した画像の形状と一致する"""
+    encoded:np.ndarray = encode_image(create_image(shape, dtype), codec)
+    assert encoded.dtype == np.uint8 and encoded.ndim == 1
+    assert parse_imageHeader(encoded.tobytes()) == shape
+    assert list(decode_image(encoded).shape) == shape
+
+def test_parse_imageHeader_jpeg_segments():
+    """SOFより前のセグメント (APP, DQT等) とフィルバイトを読み飛ばす"""
+    encoded:bytes = encode_image(create_image([24, 32, 3]), CODEC_JPEG).tobytes()
+    comment:bytes = b'\xff\xfe' + (2 + 5).to_bytes(2, 'big') + b'hello'
+    assert parse_imageHeader(encoded[:2] + comment + b'\xff' + encoded[2:]) == [24, 32, 3]
+
+@pytest.mark.parametrize('codec, shape', [(CODEC_PNG, [24, 32, 3]), (CODEC_JPEG, [24, 32, 3]), (CODEC_JPEG, [24, 32])])
+def test_parse_imageHeader_truncated(codec, shape):
+    encoded:bytes = encode_image(create_image(shape), codec).tobytes()
+    # 形状を得るのに足りない長さではNone
+    limit:int = 26 if codec == CODEC_PNG else encoded.index(b'\xff\xc0') + 10
+    for length in range(limit):
+        assert parse_imageHeader(encoded[:length]) is None, length
+    assert parse_imageHeader(encoded[:limit]) == shape
+
+@pytest.mark.parametrize('data', [b'', b'GIF89a' + bytes(32), b'\x89PNG\r\n\x1a\n' + bytes(4) + b'IDAT' + bytes(16), b'\xff\xd8\x00\x00\x00\x00'])
+def test_parse_imageHeader_invalid(data):
+    assert parse_imageHeader(data) is None
+
+@pytest.mark.parametrize('data_type, codec', [(pixel_type, codec) for pixel_type, codec in COMPRESSED_TYPES.values()])
+def test_round_trip(data_type, codec):
+    """PNGは元の画像に, JPEGは近い画像に戻り, 型の対応も往復する"""
+    compressed_type:str = get_compressedType(data_type, codec)
+    assert get_pixelType(compressed_type) == data_type
+    shape:List[int] = [24, 32, 3] if data_type in [TYPE_BGR8, TYPE_RGB8] else [24, 32]
+    if codec == CODEC_JPEG:
+        # JPEGは滑らかな画像で誤差を比べる
+        image:np.ndarray = cv2.GaussianBlur(create_image(shape), (0, 0), 3.0)
+    else:
+        image = create_image(shape, DTYPE_NUMPY[data_type])
+    decoded:np.ndarray = decode_image(encode_image(image, codec))
+    assert decoded.dtype == image.dtype and decoded.shape == image.shape
+    if codec == CODEC_PNG:
+        assert np.array_equal(decoded, image)
+    else:
+        assert np.abs(decoded.astype(np.int32) - image).mean() < 2.0
+    assert get_compressedType(TYPE_DEPTH, codec) is None
+
+def test_get_compressSources(base_config):
+    sources:Dict[str, str] = compress.get_compressSources(base_config, CODEC_PNG)
+    assert sources[TYPE_BGR8] == TYPE_BGR8_PNG
+    assert sources[TYPE_MONO16] == TYPE_MONO16_PNG
+    assert sources[TYPE_SEMANTIC2D] == TYPE_SEMANTIC2D_PNG
+    assert TYPE_DEPTH not in sources.keys() and TYPE_BGR8_PNG not in sources.keys()
+    jpeg:Dict[str, str] = compress.get_compressSources(base_config, CODEC_JPEG, [TYPE_BGR8, TYPE_MONO16, 'missing'])
+    assert jpeg == {TYPE_BGR8: TYPE_BGR8_JPEG}
+
+def test_update_srcData(base_config):
+    item:Dict[str, Any] = copy.deepcopy(base_config[CONFIG_TAG_SRCDATA][TYPE_BGR8])
+    compress.update_srcData(item, TYPE_BGR8_PNG, [100, 100])
+    assert item[CONFIG_TAG_TYPE] == TYPE_BGR8_PNG
+    assert item[CONFIG_TAG_IMAGESHAPE] == IMAGE_SHAPE + [3]
+    assert item[CONFIG_TAG_SHAPE] == [100]
+    assert CONFIG_TAG_SHAPEMIN not in item.keys()
+    item = copy.deepcopy(base_config[CONFIG_TAG_SRCDATA][TYPE_BGR8])
+    compress.update_srcData(item, TYPE_BGR8_PNG, [120, 100, 110])
+    assert item[CONFIG_TAG_SHAPE] == [None]
+    assert (item[CONFIG_TAG_SHAPEMIN], item[CONFIG_TAG_SHAPEMAX]) == ([100], [120])
+
+def test_retype_minibatches(base_config):
+    config:Dict[str, dict] = base_config
+    config[CONFIG_TAG_MINIBATCH] = {
+        'direct': create_minibatch(TYPE_BGR8, [TYPE_BGR8]),
+        'convert': create_minibatch(TYPE_MONO8, [TYPE_BGR8]),
+        'other': create_minibatch(TYPE_MONO8, [TYPE_MONO16]),
+    }
+    assert compress.retype_minibatches(config, TYPE_BGR8, TYPE_BGR8_PNG) == ['direct', 'convert']
+    direct:Dict[str, Any] = config[CONFIG_TAG_MINIBATCH]['direct']
+    assert direct[CONFIG_TAG_FROM] == {TYPE_BGR8_PNG: TYPE_BGR8}
+    # 復号だけで出力になる場合は変換の手順を追加しない
+    assert CONFIG_TAG_STEPS not in direct.keys()
+    convert:Dict[str, Any] = config[CONFIG_TAG_MINIBATCH]['convert']
+    assert convert[CONFIG_TAG_FROM] == {TYPE_BGR8_PNG: TYPE_BGR8}
+    # 復号の手順を先頭に追加する
+    assert convert[CONFIG_TAG_STEPS] == [
+        {CONFIG_TAG_TYPE: TYPE_BGR8, CONFIG_TAG_FROM: [TYPE_BGR8_PNG]},
+        {CONFIG_TAG_TYPE: TYPE_MONO8, CONFIG_TAG_FROM: [TYPE_BGR8]},
+    ]
+    assert config[CONFIG_TAG_MINIBATCH]['other'][CONFIG_TAG_FROM] == {TYPE_MONO16: TYPE_MONO16}
+    assert CONFIG_TAG_STEPS not in config[CONFIG_TAG_MINIBATCH]['other'].keys()
+
+def test_compress_run(base_config, tmp_path, capsys):
+    """PNGに符号化したファイルと書き換えた設定で, 元と同じmini-batchを読み込める"""
+    config:Dict[str, dict] = base_config
+    config[CONFIG_TAG_MINIBATCH] = {
+        'direct': create_minibatch(TYPE_BGR8, [TYPE_BGR8]),
+        'convert': create_minibatch(TYPE_MONO8, [TYPE_BGR8]),
+        'mono16': create_minibatch(TYPE_BGR8, [TYPE_MONO16]),
+    }
+    write_h5(config, str(tmp_path / 'raw.h5'))
+    jsonpath:str = str(tmp_path / 'raw.json')
+    save_config(config, jsonpath)
+    output:str = str(tmp_path / 'png.h5')
+    compress.run(argparse.Namespace(config=jsonpath, output=output, codec=CODEC_PNG, quality=None, keys=[TYPE_BGR8, TYPE_MONO16], jobs=1, chunk_size=2))
+    compressed_config:Dict[str, dict] = load_config(jsonpath)
+    assert compressed_config[H5_ATTR_FILEPATH] == os.path.abspath(output)
+    assert compressed_config[CONFIG_TAG_SRCDATA][TYPE_BGR8][CONFIG_TAG_TYPE] == TYPE_BGR8_PNG
+    with h5py.File(config[H5_ATTR_FILEPATH], mode='r') as src, h5py.File(output, mode='r') as dst:
+        assert dst['{0:s}/0/{1:s}'.format(H5_KEY_DATA, TYPE_BGR8)].attrs[H5_ATTR_TYPE] == TYPE_BGR8_PNG
+        reference = ReferenceLoader(config, src)
+        compressed = ReferenceLoader(compressed_config, dst)
+        for idx in range(LENGTH):
+            expected:Dict[str, Any] = reference[idx]
+            actual:Dict[str, Any] = compressed[idx]
+            for tag in config[CONFIG_TAG_MINIBATCH].keys():
+                assert np.array_equal(actual[tag], expected[tag]), tag
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+
+import copy
+from typing import Any, Dict
+import numpy as np
+import h5py
+import pytest
+
+from h5dataloader_config.common.structure import *
+from h5dataloader_config.tools import cull
+from h5dataloader_config.tools.loader import ReferenceLoader
+from conftest import LENGTH, create_minibatch, create_srcItem, write_h5
+
+CULL_POINTS:int = 4096
+
+@pytest.fixture
+def cull_config(base_config, tmp_path) -> Dict[str, dict]:
+    """世界座標系の静的な点群を深度に投影するmini-batchを持つ設定"""
+    config:Dict[str, dict] = base_config
+    config[CONFIG_TAG_SRCDATA]['/static/points'] = create_srcItem('/static/points', TYPE_POINTS, 'world')
+    config[CONFIG_TAG_SRCDATA]['/static/points'][CONFIG_TAG_SHAPE] = [CULL_POINTS, 3]
+    minibatch:Dict[str, Any] = create_minibatch(TYPE_DEPTH, [TYPE_POINTS, TYPE_POSE, TYPE_INTRINSIC])
+    minibatch[CONFIG_TAG_FROM].update({TYPE_POINTS: '/static/points', TYPE_POSE: 'world'})
+    minibatch[CONFIG_TAG_RANGE] = [0.0, 30.0]
+    config[CONFIG_TAG_MINIBATCH] = {'depth': minibatch}
+    write_h5(config, str(tmp_path / 'cull.h5'), max_points=CULL_POINTS)
+    return config
+
+def test_get_cullSources(cull_config):
+    assert cull.get_cullSources(cull_config[CONFIG_TAG_MINIBATCH]['depth']) == ['/static/points']
+    # フレーム毎の点群は間引かない
+    assert cull.get_cullSources(create_minibatch(TYPE_DEPTH, [TYPE_POINTS, TYPE_POSE, TYPE_INTRINSIC])) == []
+    assert cull.get_cullSources(create_minibatch(TYPE_DEPTH, [TYPE_DEPTH])) == []
+
+def test_get_visibleIndices():
+    rng = np.random.default_rng(0)
+    points:np.ndarray = rng.uniform(-20.0, 20.0, size=(2000, 3)).astype(np.float32)
+    matrix:np.ndarray = np.eye(4)
+    fx, fy, cx, cy = intrinsic = (8.0, 8.0, 8.0, 6.0)
+    visible:np.ndarray = cull.get_visibleIndices(points, matrix, intrinsic, (12, 16), 10.0)
+    # 余裕を持たせずに投影した点は全て残る
+    z:np.ndarray = points[:, 2]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        u, v = fx * points[:, 0] / z + cx, fy * points[:, 1] / z + cy
+    inside:np.ndarray = np.flatnonzero((z > 0) & (z <= 10.0) & (u >= 0) & (u < 16) & (v >= 0) & (v < 12))
+    assert len(inside) > 0
+    assert np.all(np.isin(inside, visible))
+    assert np.all(np.diff(visible) > 0)
+    assert np.all(points[visible, 2] > 0)
+
+def test_cull_keeps_output(cull_config):
+    """間引いた点群からの出力は, 全ての点を用いた出力と一致する"""
+    minibatch:Dict[str, Any] = cull_config[CONFIG_TAG_MINIBATCH]['depth']
+    indptr, indices = cull.cull_minibatch(cull_config[H5_ATTR_FILEPATH], cull_config, minibatch)
+    assert len(indptr) == LENGTH + 1 and indptr[-1] == len(indices)
+    assert 0 < len(indices) < LENGTH * CULL_POINTS
+
+    culled_config:Dict[str, dict] = copy.deepcopy(cull_config)
+    culled_config[CONFIG_TAG_SIDECAR] = {CONFIG_TAG_CULL: {CONFIG_TAG_MINIBATCH: ['depth']}}
+    with h5py.File(cull_config[H5_ATTR_FILEPATH], mode='r') as h5file:
+        reference = ReferenceLoader(cull_config, h5file)
+        culled = ReferenceLoader(culled_config, h5file, {'depth': (indptr, indices)})
+        for idx in range(LENGTH):
+            depth:np.ndarray = reference[idx]['depth']
+            assert np.any(depth > 0)
+            assert np.array_equal(depth, culled[idx]['depth'])
+
+def test_cull_jobs(cull_config):
+    h5path:str = cull_config[H5_ATTR_FILEPATH]
+    minibatch:Dict[str, Any] = cull_config[CONFIG_TAG_MINIBATCH]['depth']
+    single = cull.cull_minibatch(h5path, cull_config, minibatch)
+    pooled = cull.cull_minibatch(h5path, cull_config, minibatch, jobs=2, chunk_size=1)
+    assert all(np.array_equal(a, b) for a, b in zip(single, pooled))
+
+def test_worker_points(cull_config, tmp_path, monkeypatch):
+    """ワーカーは点群を1度だけ読み込み, ファイルが変わった場合は読み直す"""
+    monkeypatch.setattr(cull, '_worker_points', None)
+    h5path:str = cull_config[H5_ATTR_FILEPATH]
+    other:str = write_h5(copy.deepcopy(cull_config), str(tmp_path / 'other.h5'), seed=1, max_points=CULL_POINTS)
+    points:np.ndarray = cull._get_workerPoints(h5path, '/static/points')
+    assert cull._get_workerPoints(h5path, '/static/points') is points
+    with h5py.File(h5path, mode='r') as h5file:
+        assert np.array_equal(points, h5file['/static/points'][()])
+    assert not np.array_equal(cull._get_workerPoints(other, '/static/points'), points)
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+
+from typing import Dict, List, Union
+
+from h5dataloader_config.common.structure import *
+from h5dataloader_config.common.graph import CONVERSION_GRAPH, ConversionGraph, ConversionPlan, get_conversionCost
+from h5dataloader_config.common.model import ConfigModel
+
+def test_get_conversionCost():
+    assert get_conversionCost(TYPE_DEPTH, [TYPE_DEPTH]) == 0
+    assert get_conversionCost(TYPE_MONO8, [TYPE_MONO16]) == COST_CAST
+    assert get_conversionCost(TYPE_MONO8, [TYPE_MONO8_PNG]) == COST_CAST + COST_DECODE
+    assert get_conversionCost(TYPE_POSE, [TYPE_TRANSLATION, TYPE_QUATERNION]) == COST_COMPOSE
+    assert get_conversionCost(TYPE_DEPTH, [TYPE_DISPARITY, TYPE_INTRINSIC]) == COST_DISPARITY
+    assert get_conversionCost(TYPE_DEPTH, [TYPE_POINTS, TYPE_POSE, TYPE_INTRINSIC]) == COST_TRANSFORM + COST_PROJECT
+    assert get_conversionCost(TYPE_DEPTH, [TYPE_VOXEL_POINTS, TYPE_POSE, TYPE_INTRINSIC]) == COST_VOXEL + COST_TRANSFORM + COST_PROJECT
+
+def test_multi_step():
+    """src-dataに無いposeを, translationとquaternionから作って投影に用いる"""
+    resolved:Dict[str, ConversionPlan] = CONVERSION_GRAPH.resolve([TYPE_TRANSLATION, TYPE_QUATERNION, TYPE_POINTS, TYPE_INTRINSIC])
+    assert resolved[TYPE_POSE].from_types == [TYPE_TRANSLATION, TYPE_QUATERNION]
+    plans:List[Union[ConversionPlan, None]] = CONVERSION_GRAPH.get_plans(TYPE_DEPTH, resolved)
+    assert len(plans) == len(FROM_TYPES[TYPE_DEPTH])
+    assert [plan is not None for plan in plans] == [combination == [TYPE_POINTS, TYPE_POSE, TYPE_INTRINSIC] for combination in FROM_TYPES[TYPE_DEPTH]]
+    plan:ConversionPlan = plans[FROM_TYPES[TYPE_DEPTH].index([TYPE_POINTS, TYPE_POSE, TYPE_INTRINSIC])]
+    assert plan.cost == COST_COMPOSE + COST_TRANSFORM + COST_PROJECT
+    assert plan.get_leaves() == [TYPE_POINTS, TYPE_TRANSLATION, TYPE_QUATERNION, TYPE_INTRINSIC]
+    assert plan.get_steps() == [
+        {CONFIG_TAG_TYPE: TYPE_POSE, CONFIG_TAG_FROM: [TYPE_TRANSLATION, TYPE_QUATERNION]},
+        {CONFIG_TAG_TYPE: TYPE_DEPTH, CONFIG_TAG_FROM: [TYPE_POINTS, TYPE_POSE, TYPE_INTRINSIC]},
+    ]
+    assert plan.get_types() == {TYPE_DEPTH, TYPE_POINTS, TYPE_POSE, TYPE_TRANSLATION, TYPE_QUATERNION, TYPE_INTRINSIC}
+    assert plan.describe() == 'translation + quaternion → pose, points + pose + intrinsic → depth (cost 13)'
+
+def test_self_combination():
+    """自身を入力とする組み合わせは, 自身がsrc-dataにある場合だけ使える"""
+    resolved:Dict[str, ConversionPlan] = CONVERSION_GRAPH.resolve([TYPE_DISPARITY, TYPE_INTRINSIC])
+    plans:List[Union[ConversionPlan, None]] = CONVERSION_GRAPH.get_plans(TYPE_DEPTH, resolved)
+    assert plans[FROM_TYPES[TYPE_DEPTH].index([TYPE_DEPTH])] is None
+    assert plans[FROM_TYPES[TYPE_DEPTH].index([TYPE_DISPARITY, TYPE_INTRINSIC])].cost == COST_DISPARITY
+    resolved = CONVERSION_GRAPH.resolve([TYPE_DEPTH])
+    assert CONVERSION_GRAPH.get_plans(TYPE_DEPTH, resolved)[0].cost == 0
+
+def test_cheapest_path():
+    """多段の変換 (a → b → c) より安い直接の変換 (a → c) を選ぶ"""
+    graph = ConversionGraph({
+        'a': [['a']], 'b': [['b'], ['a']], 'c': [['c'], ['b'], ['a']],
+    })
+    resolved:Dict[str, ConversionPlan] = graph.resolve(['a'])
+    assert resolved['b'].from_types == ['a']
+    assert resolved['c'].from_types == ['a'] and resolved['c'].cost == COST_CAST
+    assert [plan.cost for plan in graph.get_plans('c', resolved)[1:]] == [2 * COST_CAST, COST_CAST]
+    # src-dataにある型は変換しない
+    assert graph.resolve(['a', 'b'])['b'].from_types is None
+    assert graph.get_reachableTypes(resolved) == ['a', 'b', 'c']
+    assert graph.get_reachableTypes(graph.resolve([])) == []
+    assert graph.get_plans('unknown', resolved) == []
+
+def test_get_conversionPlans(base_config):
+    """mini-batchのダイアログのタブと対応するよう, 計画はFROM_TYPESの組み合わせ毎に1つ"""
+    model = ConfigModel(base_config)
+    for dst_type, combinations in FROM_TYPES.items():
+        plans:List[Union[ConversionPlan, None]] = model.get_conversionPlans(dst_type)
+        assert len(plans) == len(combinations), dst_type
+        for combination, plan in zip(combinations, plans):
+            if plan is None: continue
+            assert plan.data_type == dst_type and plan.from_types == combination
+            assert set(plan.get_leaves()) <= model.get_srcTypes()
+    assert model.get_reachableTypes() == [dst_type for dst_type in FROM_TYPES.keys() if any(plan is not None for plan in model.get_conversionPlans(dst_type))]
+    empty = ConfigModel({})
+    assert all(plan is None for plan in empty.get_conversionPlans(TYPE_DEPTH))
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+
+import copy
+from typing import Any, Dict
+import numpy as np
+import pytest
+
+from h5dataloader_config.common.structure import *
+from h5dataloader_config.common.intrinsic import get_intrinsicKey, get_minibatchIntrinsic, get_projection, get_scaledIntrinsic, update_intrinsics
+from conftest import IMAGE_SHAPE, OUTPUT_SHAPE, STATIC_KEYS, create_minibatch
+
+INTRINSIC:Dict[str, float] = {SUBTYPE_FX: 400.0, SUBTYPE_FY: 300.0, SUBTYPE_CX: 320.0, SUBTYPE_CY: 240.0, SUBTYPE_HEIGHT: 480.0, SUBTYPE_WIDTH: 640.0}
+
+def project(intrinsic:Dict[str, float], points:np.ndarray) -> np.ndarray:
+    fx, fy, cx, cy = get_projection(intrinsic)
+    return np.stack([fx * points[:, 0] / points[:, 2] + cx, fy * points[:, 1] / points[:, 2] + cy], axis=1)
+
+def test_resize():
+    scaled:Dict[str, float] = get_scaledIntrinsic(INTRINSIC, [240, 160])
+    assert scaled == pytest.approx({SUBTYPE_FX: 100.0, SUBTYPE_FY: 150.0, SUBTYPE_CX: 80.0, SUBTYPE_CY: 120.0, SUBTYPE_HEIGHT: 240.0, SUBTYPE_WIDTH: 160.0})
+    # 3次元目以降は無視する
+    assert get_scaledIntrinsic(INTRINSIC, [240, 160, 3]) == scaled
+
+@pytest.mark.parametrize('roi, shape', [
+    (None, [480, 640]), ([100, 200, 240, 320], [240, 320]), ([100, 200, 240, 320], [120, 80]), ([0, 0, 480, 640], [48, 64]),
+])
+def test_roi_and_resize(roi, shape):
+    """元の画像に投影した点を切り出して縮小した位置は, 変換した内部パラメータで投影した位置と一致する"""
+    rng = np.random.default_rng(0)
+    points:np.ndarray = rng.uniform([-5.0, -5.0, 2.0], [5.0, 5.0, 20.0], size=(50, 3))
+    top, left, height, width = [0, 0, 480, 640] if roi is None else roi
+    expected:np.ndarray = (project(INTRINSIC, points) - [left, top]) * [shape[1] / width, shape[0] / height]
+    scaled:Dict[str, float] = get_scaledIntrinsic(INTRINSIC, shape, roi)
+    assert np.allclose(project(scaled, points), expected)
+    assert (scaled[SUBTYPE_HEIGHT], scaled[SUBTYPE_WIDTH]) == (shape[0], shape[1])
+
+def test_get_intrinsicKey(base_config):
+    config:Dict[str, dict] = copy.deepcopy(base_config)
+    minibatch:Dict[str, Any] = create_minibatch(TYPE_DEPTH, [TYPE_POINTS, TYPE_POSE, TYPE_INTRINSIC])
+    # 走査時に値が得られていない場合はNone
+    assert get_intrinsicKey(config, minibatch) is None
+    config[CONFIG_TAG_SRCDATA][STATIC_KEYS[TYPE_INTRINSIC]][CONFIG_TAG_INTRINSIC] = dict(INTRINSIC)
+    assert get_intrinsicKey(config, minibatch) == STATIC_KEYS[TYPE_INTRINSIC]
+    # fromに無い場合はframe-idが同じintrinsicを用いる
+    depth:Dict[str, Any] = create_minibatch(TYPE_DEPTH, [TYPE_DEPTH])
+    assert get_intrinsicKey(config, depth) == STATIC_KEYS[TYPE_INTRINSIC]
+    depth[CONFIG_TAG_FRAMEID] = 'lidar'
+    assert get_intrinsicKey(config, depth) is None
+    # フレーム毎のintrinsicは用いない
+    config[CONFIG_TAG_SRCDATA]['intrinsic'] = dict(config[CONFIG_TAG_SRCDATA][STATIC_KEYS[TYPE_INTRINSIC]], **{CONFIG_TAG_TAG: 'intrinsic'})
+    minibatch[CONFIG_TAG_FROM][TYPE_INTRINSIC] = 'intrinsic'
+    assert get_intrinsicKey(config, minibatch) is None
+
+def test_update_intrinsics(base_config):
+    config:Dict[str, dict] = copy.deepcopy(base_config)
+    config[CONFIG_TAG_SRCDATA][STATIC_KEYS[TYPE_INTRINSIC]][CONFIG_TAG_INTRINSIC] = dict(INTRINSIC)
+    depth:Dict[str, Any] = create_minibatch(TYPE_DEPTH, [TYPE_POINTS, TYPE_POSE, TYPE_INTRINSIC])
+    depth[CONFIG_TAG_ROI] = [0, 0, 240, 320]
+    unknown:Dict[str, Any] = create_minibatch(TYPE_DEPTH, [TYPE_DEPTH])
+    unknown[CONFIG_TAG_SHAPE] = [None, None]
+    unknown[CONFIG_TAG_INTRINSIC] = dict(INTRINSIC)
+    config[CONFIG_TAG_MINIBATCH] = {'depth': depth, 'points': create_minibatch(TYPE_POINTS, [TYPE_POINTS]), 'unknown': unknown}
+    assert update_intrinsics(config) == ['depth']
+    assert depth[CONFIG_TAG_INTRINSIC] == get_scaledIntrinsic(INTRINSIC, OUTPUT_SHAPE, [0, 0, 240, 320])
+    assert get_minibatchIntrinsic(config, depth) == depth[CONFIG_TAG_INTRINSIC]
+    # 求められなくなった内部パラメータは削除する
+    assert CONFIG_TAG_INTRINSIC not in unknown.keys()
+    assert CONFIG_TAG_INTRINSIC not in config[CONFIG_TAG_MINIBATCH]['points'].keys()
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+
+import copy
+from typing import Any, Dict, List
+import pytest
+
+from h5dataloader_config.common.structure import *
+from h5dataloader_config.tools.codegen import LoaderGenerator
+from h5dataloader_config.tools.loader import ReferenceLoader, read_intrinsic
+from h5dataloader_config.tools.plan import PLAN_STAGE_CONVERT, PLAN_TAG_REPORT, PlanBuilder, compile_plan
+from conftest import LENGTH, STATIC_KEYS, assert_equal, create_h5, create_minibatch, get_combinations
+
+def load_generated(config:Dict[str, dict], h5file, constants:bool) -> Dict[str, Any]:
+    """生成したモジュールを読み込み, その名前空間を返す"""
+    namespace:Dict[str, Any] = {'__name__': 'generated'}
+    exec(compile(LoaderGenerator(config, h5file if constants else None).generate(), 'generated', 'exec'), namespace)
+    return namespace
+
+@pytest.mark.parametrize('dst_type, from_types', get_combinations(), ids=['{0:s}<-{1:s}'.format(d, ','.join(f)) for d, f in get_combinations()])
+@pytest.mark.parametrize('constants', [True, False], ids=['constants', 'runtime'])
+def test_generated_matches_reference(all_config, all_h5, dst_type:str, from_types:List[str], constants:bool):
+    config:Dict[str, dict] = copy.deepcopy(all_config)
+    config[CONFIG_TAG_MINIBATCH] = {'out': create_minibatch(dst_type, from_types)}
+    reference = ReferenceLoader(config, all_h5)
+    generated:Dict[str, Any] = load_generated(config, all_h5, constants)
+    static:Dict[str, Any] = generated['load_static'](all_h5)
+    for idx in range(LENGTH):
+        expected:Dict[str, Any] = reference[idx]
+        actual:Dict[str, Any] = generated['load_sample'](all_h5, static, idx)
+        assert expected.keys() == actual.keys()
+        for tag in expected.keys():
+            assert_equal(expected[tag], actual[tag])
+
+def test_shared_plan(all_config, all_h5):
+    """全てのmini-batchを1つの計画にまとめても, mini-batch毎の出力と一致する"""
+    plan:Dict[str, dict] = compile_plan(all_config)
+    report:Dict[str, int] = plan[PLAN_TAG_REPORT]
+    assert report['plan-reads'] <= report['naive-reads']
+    reference = ReferenceLoader(all_config, all_h5)
+    generated:Dict[str, Any] = load_generated(all_config, all_h5, True)
+    static:Dict[str, Any] = generated['load_static'](all_h5)
+    expected:Dict[str, Any] = reference[1]
+    actual:Dict[str, Any] = generated['load_sample'](all_h5, static, 1)
+    for tag in expected.keys():
+        assert_equal(expected[tag], actual[tag])
+
+def test_points_output_drops_values(all_config, all_h5):
+    config:Dict[str, dict] = copy.deepcopy(all_config)
+    config[CONFIG_TAG_MINIBATCH] = {'out': create_minibatch(TYPE_POINTS, [TYPE_SEMANTIC3D, TYPE_POSE])}
+    points = ReferenceLoader(config, all_h5)[0]['out']
+    assert points.ndim == 2 and points.shape[1] == 3
+
+def test_disparity_to_depth(all_config, all_h5):
+    config:Dict[str, dict] = copy.deepcopy(all_config)
+    config[CONFIG_TAG_MINIBATCH] = {'out': create_minibatch(TYPE_DEPTH, [TYPE_DISPARITY, TYPE_INTRINSIC])}
+    config[CONFIG_TAG_MINIBATCH]['out'][CONFIG_TAG_SHAPE] = config[CONFIG_TAG_SRCDATA][TYPE_DISPARITY][CONFIG_TAG_SHAPE]
+    depth = ReferenceLoader(config, all_h5)[0]['out']
+    disparity = all_h5['{0:s}/0/{1:s}'.format(H5_KEY_DATA, TYPE_DISPARITY)]
+    fx:float = read_intrinsic(all_h5[STATIC_KEYS[TYPE_INTRINSIC]])[SUBTYPE_FX]
+    valid = disparity[()] > 0
+    assert_equal(depth[valid], (fx * float(disparity.attrs[H5_ATTR_BASELINE]) / disparity[()][valid]).astype(depth.dtype))
+
+@pytest.fixture
+def unknown_op(monkeypatch):
+    """計画の末尾に未知の演算子を追加する"""
+    add_outputs = PlanBuilder.add_outputs
+    def add_unknown(self, minibatch_config:Dict[str, Any], tag:str) -> Dict[str, str]:
+        outputs:Dict[str, str] = add_outputs(self, minibatch_config, tag)
+        self.add_node(PLAN_STAGE_CONVERT, 'unknown-op', [], {})
+        return outputs
+    monkeypatch.setattr(PlanBuilder, 'add_outputs', add_unknown)
+
+def test_unknown_op(base_config, unknown_op):
+    config:Dict[str, dict] = copy.deepcopy(base_config)
+    config[CONFIG_TAG_MINIBATCH] = {'out': create_minibatch(TYPE_MONO8, [TYPE_MONO8])}
+    h5file = create_h5(config, length=1)
+    try:
+        with pytest.raises(ValueError, match='unknown plan op unknown-op'):
+            ReferenceLoader(config, h5file)[0]
+        with pytest.raises(ValueError, match='unknown plan op unknown-op'):
+            LoaderGenerator(config, h5file).generate()
+    finally:
+        h5file.close()
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+
+import tracemalloc
+from typing import Any, Dict, List
+import pytest
+
+from h5dataloader_config.common import memory
+from h5dataloader_config.common.memory import MemoryReport, deep_sizeof
+
+class Window(object):
+    def __init__(self) -> None:
+        self.dataloader_config:Dict[str, Any] = {}
+
+    def load(self) -> None:
+        self.__loadData()
+
+    def __loadData(self) -> None:
+        self.dataloader_config['src-data'] = {str(idx): list(range(16)) for idx in range(64)}
+
+@pytest.fixture(autouse=True)
+def stop_tracing():
+    """MemoryReportが開始したtracemallocを止め, 以降のテストを遅くしない"""
+    tracing:bool = tracemalloc.is_tracing()
+    yield
+    if tracing is False:
+        tracemalloc.stop()
+
+def test_deep_sizeof():
+    shared:List[int] = list(range(100))
+    assert deep_sizeof([shared, shared]) < 2 * deep_sizeof(shared)
+    assert deep_sizeof({'a': shared}) > deep_sizeof(shared)
+
+def test_sections_per_phase():
+    """セクションのサイズをフェーズの境界毎に記録する"""
+    report = MemoryReport()
+    config:Dict[str, Any] = {'minibatch': {}}
+    with report.phase('scan', lambda: config):
+        config['src-data'] = {str(idx): [idx] * 32 for idx in range(32)}
+    scan:Dict[str, int] = dict(report.sections)
+    with report.phase('render', lambda: config):
+        config['tf'] = {'tree': {'a': {'b': {}}}}
+    with report.phase('other'):
+        pass
+    records:List[Dict[str, Any]] = report.phases
+    assert [record['phase'] for record in records] == ['scan', 'render', 'other']
+    assert records[0]['sections'] == scan and scan.keys() == {'minibatch', 'src-data'}
+    assert records[1]['sections'].keys() == {'minibatch', 'src-data', 'tf'}
+    assert 'sections' not in records[2].keys()
+    summary:Dict[str, Dict[str, int]] = report.summary()
+    assert summary['scan']['config'] == sum(scan.values())
+    assert summary['other']['config'] == 0
+    assert 'config [KiB]' in report.format_summary().splitlines()[0]
+
+def test_nested_phase():
+    report = MemoryReport()
+    with report.phase('outer'):
+        with report.phase('inner'):
+            data:List[bytes] = [bytes(1024) for _ in range(256)]
+    inner, outer = report.phases
+    assert inner['traced'] >= 256 * 1024
+    # 子のフェーズの増分は親から除く
+    assert outer['traced'] < inner['traced']
+    del data
+
+def test_install():
+    report = MemoryReport()
+    report.install(Window, {'loadData': 'populate'}, config_attr='dataloader_config')
+    try:
+        Window().load()
+    finally:
+        Window._Window__loadData = Window._Window__loadData.__wrapped__
+    record:Dict[str, Any] = report.phases[0]
+    assert record['phase'] == 'populate'
+    assert list(record['sections'].keys()) == ['src-data'] and record['sections']['src-data'] > 0
+
+def test_module_phase(monkeypatch):
+    monkeypatch.setattr(memory, '_report', None)
+    with memory.phase('disabled', lambda: {'a': 1}):
+        pass
+    assert memory.enabled() is False
+    report = memory.enable()
+    with memory.phase('enabled', lambda: {'a': 1}):
+        pass
+    assert [record['phase'] for record in report.phases] == ['enabled']
+    assert report.sections.keys() == {'a'}
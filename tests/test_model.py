@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+
+import copy
+from typing import Any, Dict, List, Tuple, Union
+
+from h5dataloader_config.common.structure import *
+from h5dataloader_config.common.model import MODEL_EVENT_INSERT, MODEL_EVENT_REMOVE, MODEL_EVENT_RESET, MODEL_EVENT_UPDATE, ConfigModel
+from conftest import create_minibatch
+
+Event = Tuple[str, str, Union[str, None], Union[str, None]]
+
+def listen(model:ConfigModel) -> List[Event]:
+    events:List[Event] = []
+    model.add_listener(lambda event, section, key, old_key: events.append((event, section, key, old_key)))
+    return events
+
+def test_minibatch_events(base_config):
+    model = ConfigModel(copy.deepcopy(base_config))
+    events:List[Event] = listen(model)
+    depth:Dict[str, Any] = create_minibatch(TYPE_DEPTH, [TYPE_DEPTH])
+    model.set_minibatch('a', depth)
+    model.set_minibatch('a', dict(depth, **{CONFIG_TAG_NORMALIZE: True}))
+    model.set_minibatch('b', depth, old_tag='a')
+    model.set_minibatch('b', depth, old_tag='b')
+    model.remove_minibatch('b')
+    model.remove_minibatch('missing')
+    assert events == [
+        (MODEL_EVENT_INSERT, CONFIG_TAG_MINIBATCH, 'a', 'a'),
+        (MODEL_EVENT_UPDATE, CONFIG_TAG_MINIBATCH, 'a', 'a'),
+        (MODEL_EVENT_UPDATE, CONFIG_TAG_MINIBATCH, 'b', 'a'),
+        (MODEL_EVENT_UPDATE, CONFIG_TAG_MINIBATCH, 'b', 'b'),
+        (MODEL_EVENT_REMOVE, CONFIG_TAG_MINIBATCH, 'b', None),
+    ]
+    assert model.config[CONFIG_TAG_MINIBATCH] == {}
+
+def test_rename_keeps_config(base_config):
+    """改名した時点で, リスナーからは新しいタグのmini-batchだけが見える"""
+    model = ConfigModel(copy.deepcopy(base_config))
+    model.set_minibatch('a', create_minibatch(TYPE_DEPTH, [TYPE_DEPTH]))
+    seen:List[List[str]] = []
+    model.add_listener(lambda event, section, key, old_key: seen.append(list(model.config[CONFIG_TAG_MINIBATCH].keys())))
+    model.set_minibatch('b', create_minibatch(TYPE_MONO8, [TYPE_MONO8]), old_tag='a')
+    assert seen == [['b']]
+    assert model.config[CONFIG_TAG_MINIBATCH]['b'][CONFIG_TAG_TYPE] == TYPE_MONO8
+
+def test_labelConfig_events(base_config):
+    model = ConfigModel(copy.deepcopy(base_config))
+    events:List[Event] = listen(model)
+    label_config:Dict[str, Any] = copy.deepcopy(base_config[CONFIG_TAG_LABEL][CONFIG_TAG_CONFIG]['cfg'])
+    model.set_labelConfig('new', label_config)
+    assert model.get_labelConfigs('lbl') == ['cfg', 'new']
+    model.set_labelConfig('new', label_config)
+    model.set_labelConfig('renamed', label_config, old_tag='new')
+    assert model.get_labelConfigs('lbl') == ['cfg', 'renamed']
+    model.remove_labelConfig('cfg')
+    model.remove_labelConfig('cfg')
+    assert model.get_labelConfigs('lbl') == ['renamed']
+    assert events == [
+        (MODEL_EVENT_INSERT, CONFIG_TAG_LABEL, 'new', 'new'),
+        (MODEL_EVENT_UPDATE, CONFIG_TAG_LABEL, 'new', 'new'),
+        (MODEL_EVENT_UPDATE, CONFIG_TAG_LABEL, 'renamed', 'new'),
+        (MODEL_EVENT_REMOVE, CONFIG_TAG_LABEL, 'cfg', None),
+    ]
+
+def test_reset(base_config):
+    model = ConfigModel()
+    assert model.get_srcKeys() == [] and model.get_tfList() == []
+    events:List[Event] = listen(model)
+    model.reset(base_config)
+    assert events == [(MODEL_EVENT_RESET, '', None, None)]
+    # 索引は新しい設定から作り直す
+    assert model.get_tfList() == ['cam', 'lidar', 'world']
+    assert model.get_srcKeys(data_type=TYPE_DEPTH) == [TYPE_DEPTH]
+    assert model.get_labelConfigs('lbl') == ['cfg']
+
+def test_remove_listener(base_config):
+    model = ConfigModel(copy.deepcopy(base_config))
+    events:List[str] = []
+    listener = lambda event, section, key, old_key: events.append(event)
+    model.add_listener(listener)
+    model.set_minibatch('a', create_minibatch(TYPE_DEPTH, [TYPE_DEPTH]))
+    model.remove_listener(listener)
+    model.remove_listener(listener)
+    model.remove_minibatch('a')
+    assert events == [MODEL_EVENT_INSERT]
+
+def test_get_srcKeys(base_config):
+    model = ConfigModel(base_config)
+    assert model.get_srcKeys() == sorted(base_config[CONFIG_TAG_SRCDATA].keys())
+    assert model.get_srcKeys(frame_id='lidar') == sorted([TYPE_POINTS, TYPE_SEMANTIC1D, TYPE_SEMANTIC3D])
+    assert model.get_srcKeys(data_type=[TYPE_POINTS, TYPE_DEPTH], frame_id='lidar') == [TYPE_POINTS]
+    assert model.get_srcKeys(data_type=TYPE_POSE, frame_id='cam') == ['/tf_static/cam_to_lidar']
+    assert model.get_srcKeys(label_tag='lbl', frame_id='cam') == sorted(key for key, item in base_config[CONFIG_TAG_SRCDATA].items() if item[CONFIG_TAG_LABELTAG] == 'lbl' and item[CONFIG_TAG_FRAMEID] == 'cam')
+    assert model.get_srcKeys(data_type='unknown') == []
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+
+from typing import Dict, List
+
+from h5dataloader_config.common.structure import *
+from h5dataloader_config.tools.plan import PLAN_OP_READ, PLAN_TAG_NODES, PLAN_TAG_OP, PLAN_TAG_OUTPUTS, PLAN_TAG_PARAMS, PLAN_TAG_REPORT, compile_plan, get_itemsize, get_readBytes, get_tfChain
+from conftest import IMAGE_SHAPE, STATIC_KEYS, create_minibatch
+
+def get_reads(plan:Dict[str, dict]) -> List[str]:
+    return [node[PLAN_TAG_PARAMS][CONFIG_TAG_KEY] for node in plan[PLAN_TAG_NODES].values() if node[PLAN_TAG_OP] == PLAN_OP_READ]
+
+def test_get_tfChain(base_config):
+    assert get_tfChain(base_config, 'lidar', 'cam') == (['/tf_static/cam_to_lidar'], [])
+    assert get_tfChain(base_config, 'world', 'lidar') == ([], ['/tf_static/cam_to_lidar', 'world_to_cam'])
+    assert get_tfChain(base_config, 'cam', 'cam') == ([], [])
+    assert get_tfChain(base_config, 'cam', 'unknown') == ([], [])
+
+def test_get_readBytes(base_config):
+    assert get_itemsize(TYPE_DEPTH) == 4 and get_itemsize(TYPE_MONO16) == 2
+    # 要素がオブジェクトの型 (ボクセル) は大きさを見積もらない
+    assert get_itemsize(TYPE_VOXEL_POINTS) == 0
+    assert get_readBytes(base_config, TYPE_DEPTH) == IMAGE_SHAPE[0] * IMAGE_SHAPE[1] * 4
+    assert get_readBytes(base_config, TYPE_DEPTH, [0, 0, 4, 5]) == 4 * 5 * 4
+    # グループ (pose) は子のデータセットの合計
+    assert get_readBytes(base_config, 'world_to_cam') == (3 + 4) * 4
+    assert get_readBytes(base_config, 'unknown') == 0
+
+def test_shared_reads(base_config):
+    """同じソースを参照するmini-batchは読み込みと変換を共有する"""
+    config:Dict[str, dict] = base_config
+    config[CONFIG_TAG_MINIBATCH] = {
+        'mono': create_minibatch(TYPE_MONO8, [TYPE_BGR8]),
+        'rgb': create_minibatch(TYPE_RGB8, [TYPE_BGR8]),
+        'bgr': create_minibatch(TYPE_BGR8, [TYPE_BGR8]),
+    }
+    plan:Dict[str, dict] = compile_plan(config)
+    assert sorted(plan[PLAN_TAG_OUTPUTS].keys()) == ['bgr', 'mono', 'rgb']
+    assert get_reads(plan) == [TYPE_BGR8]
+    report:Dict[str, int] = plan[PLAN_TAG_REPORT]
+    image_bytes:int = get_readBytes(config, TYPE_BGR8)
+    assert report['naive-reads'] == 3 and report['plan-reads'] == 1
+    assert report['naive-bytes'] == 3 * image_bytes and report['plan-bytes'] == image_bytes
+    assert report['saved-bytes'] == 2 * image_bytes
+    assert report['saved-ops'] == report['naive-ops'] - report['plan-ops'] > 0
+
+def test_static_reads(base_config):
+    """静的なデータの読み込みは1度だけのため, サンプル毎のバイト数に含めない"""
+    config:Dict[str, dict] = base_config
+    config[CONFIG_TAG_MINIBATCH] = {
+        'depth': create_minibatch(TYPE_DEPTH, [TYPE_POINTS, TYPE_POSE, TYPE_INTRINSIC]),
+        'semantic': create_minibatch(TYPE_SEMANTIC2D, [TYPE_SEMANTIC3D, TYPE_POSE, TYPE_INTRINSIC]),
+    }
+    plan:Dict[str, dict] = compile_plan(config)
+    reads:List[str] = get_reads(plan)
+    assert reads.count(STATIC_KEYS[TYPE_INTRINSIC]) == 1 and reads.count('/tf_static/cam_to_lidar') == 1
+    report:Dict[str, int] = plan[PLAN_TAG_REPORT]
+    frame_bytes:int = sum(get_readBytes(config, key) for key in set(reads) if not key.startswith('/'))
+    assert report['plan-bytes'] == frame_bytes
+    assert report['naive-bytes'] == frame_bytes
+    assert report['plan-reads'] < report['naive-reads']
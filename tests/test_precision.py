@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+
+import os
+import argparse
+from typing import Any, Dict
+import numpy as np
+import h5py
+import pytest
+
+from h5dataloader_config.common.structure import *
+from h5dataloader_config.tools import precision
+from h5dataloader_config.tools.loader import ReferenceLoader
+from h5dataloader_config.tools.utils import load_config, save_config
+from conftest import LENGTH, create_minibatch
+
+def test_get_floatSources(depth_config):
+    assert precision.get_floatSources(depth_config) == {TYPE_DEPTH: [0.0, 100.0]}
+    # 範囲を指定しないmini-batchがある場合は範囲を求めない
+    raw:Dict[str, Any] = create_minibatch(TYPE_DEPTH, [TYPE_DEPTH])
+    raw[CONFIG_TAG_RANGE] = None
+    depth_config[CONFIG_TAG_MINIBATCH]['raw'] = raw
+    assert precision.get_floatSources(depth_config) == {TYPE_DEPTH: None}
+    # 符号化済みのsrc-dataは対象にしない
+    depth_config[CONFIG_TAG_SRCDATA][TYPE_DEPTH][CONFIG_TAG_ENCODING] = precision.get_encoding(ENCODING_UINT16, (0.0, 100.0), [0.0, 100.0])
+    assert precision.get_floatSources(depth_config) == {}
+
+def test_get_floatSources_object(all_config):
+    """オブジェクト型 (ボクセル) や整数型のsrc-dataは対象にしない"""
+    sources:Dict[str, Any] = precision.get_floatSources(all_config)
+    for key in sources.keys():
+        assert DTYPE_NUMPY[all_config[CONFIG_TAG_SRCDATA][key][CONFIG_TAG_TYPE]] is not object
+        assert np.dtype(DTYPE_NUMPY[all_config[CONFIG_TAG_SRCDATA][key][CONFIG_TAG_TYPE]]).kind == 'f'
+    assert TYPE_DEPTH in sources.keys()
+
+def test_encode_round_trip():
+    data:np.ndarray = np.random.default_rng(0).uniform(0.0, 80.0, size=(64,)).astype(np.float32)
+    for name in ENCODINGS:
+        encoding = precision.get_encoding(name, (0.0, 100.0), [0.0, 100.0])
+        error:Dict[str, float] = precision.measure_error(data, encoding, [0.0, 100.0])
+        assert error['lost'] == 0 and error['max'] <= max(encoding[CONFIG_TAG_SCALE], 0.05)
+    encoding = precision.get_encoding(ENCODING_UINT16, (0.0, 10.0), None)
+    _, lost = precision.encode(np.array([5.0, 20.0, np.nan], dtype=np.float32), encoding, None)
+    assert lost == 2
+
+def test_encode_keeps_range():
+    """範囲内の値は復号しても範囲の外に出ない"""
+    encoding = precision.get_encoding(ENCODING_UINT16, (0.3, 80.0), [0.3, 80.0])
+    data:np.ndarray = np.array([0.3, 0.30001, 79.99999, 80.0, 0.0, 90.0], dtype=np.float32)
+    encoded, lost = precision.encode(data, encoding, [0.3, 80.0])
+    decoded:np.ndarray = precision.decode(encoded, encoding[CONFIG_TAG_SCALE], encoding[CONFIG_TAG_OFFSET])
+    assert lost == 0
+    assert np.all((decoded[:4] >= np.float32(0.3)) & (decoded[:4] <= np.float32(80.0)))
+    assert np.all(decoded[4:] == 0.0)
+
+def test_precision_rewrite(depth_config, tmp_path, capsys):
+    jsonpath:str = str(tmp_path / 'depth.json')
+    save_config(depth_config, jsonpath)
+    output:str = str(tmp_path / 'encoded.h5')
+    precision.run(argparse.Namespace(config=jsonpath, samples=1, tolerance=1e-4, seed=None, output=output))
+    encoded_config:Dict[str, dict] = load_config(jsonpath)
+    encoding:Dict[str, Any] = encoded_config[CONFIG_TAG_SRCDATA][TYPE_DEPTH][CONFIG_TAG_ENCODING]
+    assert encoded_config[H5_ATTR_FILEPATH] == os.path.abspath(output)
+    with h5py.File(depth_config[H5_ATTR_FILEPATH], mode='r') as src, h5py.File(output, mode='r') as dst:
+        reference = ReferenceLoader(depth_config, src)
+        encoded = ReferenceLoader(encoded_config, dst)
+        for idx in range(LENGTH):
+            assert np.abs(reference[idx]['depth'] - encoded[idx]['depth']).max() <= 1e-4 * 100.0
+            assert dst['{0:s}/{1:d}/{2:s}'.format(H5_KEY_DATA, idx, TYPE_DEPTH)].dtype == precision.ENCODING_DTYPE[encoding[CONFIG_TAG_DTYPE]]
+
+def test_precision_aborts_on_lost_values(depth_config, tmp_path, monkeypatch, capsys):
+    """飽和した値がある場合は出力を消し, 設定を変更しない"""
+    jsonpath:str = str(tmp_path / 'depth.json')
+    save_config(depth_config, jsonpath)
+    output:str = str(tmp_path / 'encoded.h5')
+    saved:Dict[str, dict] = load_config(jsonpath)
+    monkeypatch.setattr(precision, 'write_encoded', lambda src, dst, encodings, ranges: {key: 1 for key in encodings.keys()})
+    with pytest.raises(SystemExit):
+        precision.run(argparse.Namespace(config=jsonpath, samples=1, tolerance=1e-4, seed=None, output=output))
+    assert not os.path.exists(output)
+    assert load_config(jsonpath) == saved
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+
+import json
+import time
+from typing import Any, Dict
+
+from h5dataloader_config.common import profile
+from h5dataloader_config.common.profile import Profiler
+
+class Target(object):
+    def __init__(self) -> None:
+        self.value:int = 0
+
+    def add(self, value:int) -> int:
+        return self.__add(value)
+
+    def __add(self, value:int) -> int:
+        self.value += value
+        return self.value
+
+def test_span():
+    profiler = Profiler()
+    with profiler.span('outer', 'scan'):
+        time.sleep(0.01)
+        with profiler.span('inner'):
+            pass
+    inner, outer = profiler.events
+    assert (outer['name'], outer['cat'], outer['ph']) == ('outer', 'scan', 'X')
+    assert inner['cat'] == 'gui'
+    # trace-eventの時刻と長さはマイクロ秒
+    assert outer['dur'] >= 1e4
+    assert outer['ts'] <= inner['ts'] and inner['ts'] + inner['dur'] <= outer['ts'] + outer['dur']
+
+def test_summary(tmp_path):
+    profiler = Profiler()
+    for _ in range(3):
+        with profiler.span('fast'): pass
+    with profiler.span('slow'):
+        time.sleep(0.01)
+    rows = profiler.summary()
+    assert [row[0] for row in rows] == ['slow', 'fast']
+    assert rows[1][1] == 3 and rows[0][2] >= 10.0
+    assert profiler.format_summary().splitlines()[1].startswith('slow')
+    path:str = str(tmp_path / 'trace.json')
+    profiler.save(path)
+    with open(path, mode='r') as jsonfile:
+        trace:Dict[str, Any] = json.load(jsonfile)
+    assert len(trace['traceEvents']) == 4
+
+def test_install(monkeypatch):
+    monkeypatch.setattr(Target, '_Target__add', Target._Target__add)
+    profiler = Profiler()
+    profiler.install(Target, ['add'])
+    assert Target().add(2) == 2
+    assert [event['name'] for event in profiler.events] == ['add']
+
+def test_module_span(monkeypatch):
+    monkeypatch.setattr(profile, '_profiler', None)
+    with profile.span('disabled'): pass
+    profiler = profile.enable()
+    with profile.span('enabled'): pass
+    assert [event['name'] for event in profiler.events] == ['enabled']
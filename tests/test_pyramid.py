@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from h5dataloader_config.common.structure import *
+from h5dataloader_config.common.pyramid import format_pyramid, get_levelShape, get_pyramidTags, is_pyramidType, parse_pyramid
+
+SHAPE = [480, 640]
+
+@pytest.mark.parametrize('text, shape, expected', [
+    ('', SHAPE, None),
+    ('240x320, 120x160', SHAPE, [[240, 320], [120, 160]]),
+    ('240X320', SHAPE, [[240, 320]]),
+    ('0.5, 0.25', SHAPE, [[240, 320], [120, 160]]),
+    ('0.5, 120x160', SHAPE, [[240, 320], [120, 160]]),
+    ('1', SHAPE, [[480, 640]]),
+    ('0.0001', SHAPE, [[1, 1]]),
+    # 同じ大きさの段は許す
+    ('240x320, 240x320', SHAPE, [[240, 320], [240, 320]]),
+    # 形状が不明な場合も段同士は比較する
+    ('240x320, 120x160', None, [[240, 320], [120, 160]]),
+    ('240x320', [None, 640], [[240, 320]]),
+])
+def test_parse_pyramid(text, shape, expected):
+    assert parse_pyramid(text, shape) == expected
+
+@pytest.mark.parametrize('text, shape', [
+    ('abc', SHAPE),
+    ('240x', SHAPE),
+    ('240x320x3', SHAPE),
+    ('0x320', SHAPE),
+    # 前の段より大きい
+    ('120x160, 240x320', SHAPE),
+    ('240x160, 120x320', SHAPE),
+    ('0.25, 0.5', SHAPE),
+    ('120x160, 240x320', None),
+    ('960x1280', SHAPE),
+    # 倍率は0より大きく1以下
+    ('2', SHAPE),
+    ('1.5', SHAPE),
+    ('0', SHAPE),
+    ('-0.5', SHAPE),
+    ('0.5', None),
+    ('0.5', [None, 640]),
+])
+def test_parse_pyramid_invalid(text, shape):
+    with pytest.raises(ValueError):
+        parse_pyramid(text, shape)
+
+def test_format_pyramid():
+    assert format_pyramid(None) == ''
+    pyramid = [[240, 320], [120, 160]]
+    assert format_pyramid(pyramid) == '240x320, 120x160'
+    assert parse_pyramid(format_pyramid(pyramid), SHAPE) == pyramid
+
+def test_get_pyramidTags():
+    minibatch = {CONFIG_TAG_SHAPE: [480, 640, 3], CONFIG_TAG_PYRAMID: [[240, 320], [120, 160]]}
+    assert get_pyramidTags('image', minibatch) == [PYRAMID_TAG_FORMAT.format('image', 1), PYRAMID_TAG_FORMAT.format('image', 2)]
+    assert get_pyramidTags('image', {CONFIG_TAG_PYRAMID: None}) == []
+    assert get_pyramidTags('image', {}) == []
+    assert get_levelShape(minibatch, [120, 160]) == [120, 160, 3]
+
+def test_is_pyramidType():
+    assert is_pyramidType(TYPE_BGR8)
+    assert is_pyramidType(TYPE_DEPTH)
+    assert not is_pyramidType(TYPE_POINTS)
+    assert not is_pyramidType(TYPE_POSE)
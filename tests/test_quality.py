@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+
+from typing import Any, Dict
+import numpy as np
+import h5py
+
+from h5dataloader_config.common.structure import *
+from h5dataloader_config.common.quality import is_certified
+from h5dataloader_config.tools.quality import check_sources, get_qualitySources
+from conftest import LENGTH, STATIC_KEYS, write_h5
+
+def corrupt_depth(h5path:str) -> None:
+    """フレーム1にNaN, Inf, 範囲外の値を入れ, フレーム2を全て0にする"""
+    with h5py.File(h5path, mode='r+') as h5file:
+        dataset:h5py.Dataset = h5file['{0:s}/1/{1:s}'.format(H5_KEY_DATA, TYPE_DEPTH)]
+        data:np.ndarray = dataset[()]
+        data[0, 0], data[0, 1], data[0, 2] = np.nan, np.inf, 150.0
+        dataset[...] = data
+        h5file['{0:s}/2/{1:s}'.format(H5_KEY_DATA, TYPE_DEPTH)][...] = 0.0
+
+def test_get_qualitySources(all_config):
+    """数値のデータセットだけを検査し, オブジェクト型 (ボクセル) や符号化した画像は除く"""
+    sources:Dict[str, Dict[str, Any]] = get_qualitySources(all_config)
+    assert TYPE_DEPTH in sources.keys() and TYPE_POINTS in sources.keys()
+    for key in sources.keys():
+        data_type:str = all_config[CONFIG_TAG_SRCDATA][key][CONFIG_TAG_TYPE]
+        assert DTYPE_NUMPY[data_type] is not object and data_type not in COMPRESSED_TYPES.keys()
+    assert STATIC_KEYS[TYPE_VOXEL_POINTS] not in sources.keys() and TYPE_BGR8_PNG not in sources.keys()
+
+def test_quality_counts(depth_config):
+    h5path:str = depth_config[H5_ATTR_FILEPATH]
+    corrupt_depth(h5path)
+    stats:Dict[str, Any] = check_sources(h5path, depth_config)[TYPE_DEPTH]
+    assert stats[CONFIG_TAG_FRAMES] == LENGTH
+    assert stats[CONFIG_TAG_NAN] == 1 and stats[CONFIG_TAG_INF] == 1
+    assert stats[CONFIG_TAG_ZEROFRAMES] == 1
+    # Infは範囲の判定から除く
+    assert stats[CONFIG_TAG_OUTOFRANGE] == {'depth': 1}
+    assert stats[CONFIG_TAG_CLEAN] is False
+    assert stats[CONFIG_TAG_FILE] == h5path
+
+def test_quality_jobs(depth_config):
+    """プロセスに分けて集計しても結果は同じ"""
+    h5path:str = depth_config[H5_ATTR_FILEPATH]
+    corrupt_depth(h5path)
+    assert check_sources(h5path, depth_config, jobs=2, chunk_size=1) == check_sources(h5path, depth_config)
+
+def test_is_certified(depth_config, tmp_path):
+    h5path:str = depth_config[H5_ATTR_FILEPATH]
+    minibatch:Dict[str, Any] = depth_config[CONFIG_TAG_MINIBATCH]['depth']
+    assert is_certified(depth_config, minibatch) is False
+    stats:Dict[str, Any] = check_sources(h5path, depth_config)[TYPE_DEPTH]
+    depth_config[CONFIG_TAG_SRCDATA][TYPE_DEPTH][CONFIG_TAG_QUALITY] = stats
+    assert stats[CONFIG_TAG_CLEAN] is True
+    assert is_certified(depth_config, minibatch) is (stats[CONFIG_TAG_OUTOFRANGE]['depth'] == 0)
+    # rangeに収まらない値がある場合
+    minibatch[CONFIG_TAG_RANGE] = [stats[CONFIG_TAG_SPAN][0], stats[CONFIG_TAG_SPAN][1] / 2]
+    assert is_certified(depth_config, minibatch) is False
+    minibatch[CONFIG_TAG_RANGE] = [stats[CONFIG_TAG_SPAN][0], stats[CONFIG_TAG_SPAN][1]]
+    assert is_certified(depth_config, minibatch) is True
+    # 検査後にファイルを差し替えた場合
+    write_h5(depth_config, str(tmp_path / 'other.h5'))
+    assert is_certified(depth_config, minibatch) is False
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from h5dataloader_config.common.structure import *
+from h5dataloader_config.common.roi import format_roi, get_centerCrop, get_roiShape, get_roiSlices, parse_roi
+
+SRC_SHAPE = [480, 640]
+
+def test_get_centerCrop():
+    assert get_centerCrop(SRC_SHAPE, 1.0, 1.0) == [0, 0, 480, 640]
+    assert get_centerCrop(SRC_SHAPE, 0.5, 0.25) == [120, 240, 240, 160]
+    # 奇数の余白は下端・右端を大きくする
+    assert get_centerCrop([5, 7], 0.6, 0.6) == [1, 1, 3, 4]
+    # 1画素未満にはしない
+    assert get_centerCrop(SRC_SHAPE, 0.0001, 0.0001) == [239, 319, 1, 1]
+
+@pytest.mark.parametrize('text, src_shape, expected', [
+    ('', SRC_SHAPE, None),
+    (' , ', SRC_SHAPE, None),
+    ('10, 20, 100, 200', SRC_SHAPE, [10, 20, 100, 200]),
+    ('10 20 100 200', SRC_SHAPE, [10, 20, 100, 200]),
+    ('0,0,480,640', SRC_SHAPE, [0, 0, 480, 640]),
+    ('0.5', SRC_SHAPE, [120, 160, 240, 320]),
+    ('0.5, 0.25', SRC_SHAPE, [120, 240, 240, 160]),
+    ('1', SRC_SHAPE, [0, 0, 480, 640]),
+    # 形状が不明な場合も範囲の指定はできる
+    ('10, 20, 1000, 2000', None, [10, 20, 1000, 2000]),
+    ('10, 20, 1000, 2000', [None, 640], [10, 20, 1000, 2000]),
+])
+def test_parse_roi(text, src_shape, expected):
+    assert parse_roi(text, src_shape) == expected
+
+@pytest.mark.parametrize('text, src_shape', [
+    ('abc', SRC_SHAPE),
+    ('10, 20, 100', SRC_SHAPE),
+    ('10, 20, 100, 200, 5', SRC_SHAPE),
+    ('10, 20, 100.5, 200', SRC_SHAPE),
+    ('-1, 20, 100, 200', SRC_SHAPE),
+    ('10, -1, 100, 200', SRC_SHAPE),
+    ('10, 20, 0, 200', SRC_SHAPE),
+    ('10, 20, 100, 0', SRC_SHAPE),
+    ('400, 20, 100, 200', SRC_SHAPE),
+    ('10, 500, 100, 200', SRC_SHAPE),
+    ('0', SRC_SHAPE),
+    ('1.5', SRC_SHAPE),
+    ('0.5, -0.5', SRC_SHAPE),
+    ('0.5', None),
+    ('0.5', [None, 640]),
+])
+def test_parse_roi_invalid(text, src_shape):
+    with pytest.raises(ValueError):
+        parse_roi(text, src_shape)
+
+def test_format_roi():
+    assert format_roi(None) == ''
+    for roi in [[10, 20, 100, 200], get_centerCrop(SRC_SHAPE, 0.5, 0.25)]:
+        assert parse_roi(format_roi(roi), SRC_SHAPE) == roi
+
+def test_get_roiShape():
+    roi = [10, 20, 100, 200]
+    assert get_roiShape([480, 640, 3], roi) == [100, 200, 3]
+    assert get_roiShape([480, 640], None) == [480, 640]
+    assert get_roiShape(None, roi) is None
+    assert get_roiShape([5], roi) == [5]
+    assert get_roiSlices(roi) == (slice(10, 110), slice(20, 220))
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+
+from typing import Dict, List
+import numpy as np
+import h5py
+import pytest
+
+from h5dataloader_config.common.structure import *
+from h5dataloader_config.common.scan import finalize_srcData, infer_schema, merge_srcData, sample_frameIndices, scan_frames
+
+SCAN_LENGTH:int = 40
+# この番号以降のフレームにだけ存在するキー
+LATE_FRAME:int = 30
+
+def set_attrs(item, data_type:str, frame_id:str='', child_frame_id:str='') -> None:
+    item.attrs[H5_ATTR_TYPE] = data_type
+    item.attrs[H5_ATTR_FRAMEID] = frame_id
+    item.attrs[H5_ATTR_CHILDFRAMEID] = child_frame_id
+
+def get_points(idx:int) -> int:
+    return 100 + (idx * 7) % 50
+
+@pytest.fixture(scope='module')
+def h5path(tmp_path_factory) -> str:
+    """点数が変化する点群, 途中から現れるキー, 次元数が変化するキー, 欠けたフレームを持つファイル"""
+    h5path:str = str(tmp_path_factory.mktemp('scan') / 'scan.h5')
+    with h5py.File(h5path, mode='w') as h5file:
+        for idx in range(SCAN_LENGTH):
+            if idx == 3: continue
+            frame:h5py.Group = h5file.create_group('{0:s}/{1:d}'.format(H5_KEY_DATA, idx))
+            set_attrs(frame.create_dataset('velodyne', data=np.zeros((get_points(idx), 3), dtype=np.float32)), TYPE_POINTS, 'velodyne')
+            set_attrs(frame.create_dataset('image', data=np.zeros((6, 8), dtype=np.uint8)), TYPE_MONO8, 'camera')
+            set_attrs(frame.create_dataset('flat', data=np.zeros((4,) if idx % 2 == 0 else (2, 2), dtype=np.float32)), TYPE_FLOAT32)
+            if idx >= LATE_FRAME:
+                set_attrs(frame.create_dataset('late', data=np.zeros((6, 8), dtype=np.float32)), TYPE_DEPTH, 'camera')
+            pose:h5py.Group = frame.create_group('pose')
+            set_attrs(pose, TYPE_POSE, 'map', 'velodyne')
+            pose.create_dataset(SUBTYPE_TRANSLATION, data=np.zeros((3,), dtype=np.float32))
+            pose.create_dataset(SUBTYPE_ROTATION, data=np.array([0, 0, 0, 1], dtype=np.float32))
+        set_attrs(h5file.create_dataset('/map/points', data=np.zeros((10, 3), dtype=np.float32)), TYPE_POINTS, 'map')
+        h5file.create_dataset('{0:s}/{1:s}'.format(H5_KEY_HEADER, H5_KEY_LENGTH), data=SCAN_LENGTH)
+    return h5path
+
+def test_sample_frameIndices():
+    assert len(sample_frameIndices(0, 4)) == 0
+    assert np.array_equal(sample_frameIndices(5, 10), np.arange(5))
+    assert np.array_equal(sample_frameIndices(5, 0), np.arange(5))
+    # 層の先頭を選び, 最終層は末尾のフレームを選ぶ
+    indices:np.ndarray = sample_frameIndices(100, 10)
+    assert indices.tolist() == list(range(0, 90, 10)) + [99]
+
+def test_sample_frameIndices_seed():
+    bounds:np.ndarray = np.linspace(0, 103, 9).astype(np.int64)
+    indices:np.ndarray = sample_frameIndices(103, 8, seed=1)
+    assert np.array_equal(indices, sample_frameIndices(103, 8, seed=1))
+    assert len(indices) == 8
+    assert np.all((bounds[:-1] <= indices) & (indices < bounds[1:]))
+
+def test_merge_srcData():
+    merged:Dict[str, dict] = {}
+    frames:List[Dict[str, dict]] = [
+        {'points': {CONFIG_TAG_SHAPE: [10, 3]}, 'pose': {CONFIG_TAG_SHAPE: None}, 'flat': {CONFIG_TAG_SHAPE: [4]}, 'image': {CONFIG_TAG_SHAPE: [6, 8]}},
+        {'points': {CONFIG_TAG_SHAPE: [20, 3]}, 'pose': {CONFIG_TAG_SHAPE: None}, 'flat': {CONFIG_TAG_SHAPE: [2, 2]}, 'image': {CONFIG_TAG_SHAPE: [6, 8]}},
+        {'points': {CONFIG_TAG_SHAPE: [15, 3]}, 'late': {CONFIG_TAG_SHAPE: [2]}, 'image': {CONFIG_TAG_SHAPE: [6, 8]}},
+    ]
+    for frame in frames:
+        merge_srcData(merged, frame)
+    assert merged['points'] == {CONFIG_TAG_SHAPE: [None, 3], CONFIG_TAG_SHAPEMIN: [10, 3], CONFIG_TAG_SHAPEMAX: [20, 3]}
+    assert merged['pose'] == {CONFIG_TAG_SHAPE: None}
+    # 次元数が変化する場合は形状を記録しない
+    assert merged['flat'] == {CONFIG_TAG_SHAPE: None}
+    assert merged['late'][CONFIG_TAG_SHAPE] == [2]
+    finalize_srcData(merged)
+    assert merged['image'] == {CONFIG_TAG_SHAPE: [6, 8]}
+    assert merged['late'] == {CONFIG_TAG_SHAPE: [2]}
+    assert CONFIG_TAG_SHAPEMIN in merged['points'].keys()
+
+def test_merge_srcData_chunks():
+    """部分的に統合した結果 (shape-min/shape-maxを持つ) を更に統合しても範囲が保たれる"""
+    chunks:List[Dict[str, dict]] = [
+        merge_srcData(merge_srcData({}, {'points': {CONFIG_TAG_SHAPE: [10, 3]}}), {'points': {CONFIG_TAG_SHAPE: [30, 3]}}),
+        merge_srcData(merge_srcData({}, {'points': {CONFIG_TAG_SHAPE: [5, 3]}}), {'points': {CONFIG_TAG_SHAPE: [20, 3]}}),
+    ]
+    merged:Dict[str, dict] = {}
+    for chunk in chunks:
+        merge_srcData(merged, chunk)
+    assert merged['points'] == {CONFIG_TAG_SHAPE: [None, 3], CONFIG_TAG_SHAPEMIN: [5, 3], CONFIG_TAG_SHAPEMAX: [30, 3]}
+
+def test_full_scan(h5path:str):
+    with h5py.File(h5path, mode='r') as h5file:
+        srcdata, poses = infer_schema(h5file, full_scan=True, processes=2)
+    frames:List[int] = [idx for idx in range(SCAN_LENGTH) if idx != 3]
+    velodyne:dict = srcdata['velodyne']
+    assert velodyne[CONFIG_TAG_TYPE] == TYPE_POINTS and velodyne[CONFIG_TAG_FRAMEID] == 'velodyne'
+    assert velodyne[CONFIG_TAG_SHAPE] == [None, 3]
+    assert velodyne[CONFIG_TAG_SHAPEMIN] == [min(get_points(idx) for idx in frames), 3]
+    assert velodyne[CONFIG_TAG_SHAPEMAX] == [max(get_points(idx) for idx in frames), 3]
+    assert srcdata['image'][CONFIG_TAG_SHAPE] == [6, 8] and CONFIG_TAG_SHAPEMIN not in srcdata['image'].keys()
+    assert srcdata['flat'][CONFIG_TAG_SHAPE] is None
+    assert srcdata['late'][CONFIG_TAG_SHAPE] == [6, 8]
+    assert srcdata['pose'][CONFIG_TAG_TYPE] == TYPE_POSE
+    assert srcdata['/map/points'][CONFIG_TAG_SHAPE] == [10, 3]
+    assert poses['velodyne'] == {CONFIG_TAG_KEY: 'pose', CONFIG_TAG_FRAMEID: 'map', CONFIG_TAG_CHILDFRAMEID: 'velodyne'}
+
+def test_sampled_scan(h5path:str):
+    """サンプリングした走査は全フレームの走査の範囲に収まり, サンプル数がフレーム数以上なら一致する"""
+    with h5py.File(h5path, mode='r') as h5file:
+        full, full_poses = infer_schema(h5file, full_scan=True, processes=2)
+        sampled, sampled_poses = infer_schema(h5file, num_samples=8)
+        exhaustive, _ = infer_schema(h5file, num_samples=SCAN_LENGTH)
+    assert exhaustive == full
+    assert sampled_poses == full_poses
+    # 層化により末尾の層のフレームも走査され, 途中から現れるキーを見落とさない
+    assert sampled.keys() == full.keys()
+    assert sampled['velodyne'][CONFIG_TAG_SHAPE] == [None, 3]
+    assert full['velodyne'][CONFIG_TAG_SHAPEMIN][0] <= sampled['velodyne'][CONFIG_TAG_SHAPEMIN][0]
+    assert sampled['velodyne'][CONFIG_TAG_SHAPEMAX][0] <= full['velodyne'][CONFIG_TAG_SHAPEMAX][0]
+    for key in ['image', 'late', 'flat', 'pose', '/map/points']:
+        assert sampled[key] == full[key]
+
+def test_missing_key(h5path:str):
+    """一部のフレームにしか無いキーは, そのフレームを走査した場合にだけ報告され, 欠けたフレームは読み飛ばす"""
+    with h5py.File(h5path, mode='r') as h5file:
+        early, _ = scan_frames(h5file, np.arange(LATE_FRAME))
+        missing, _ = scan_frames(h5file, np.array([3]))
+        sampled, _ = infer_schema(h5file, num_samples=4, seed=0)
+    assert 'late' not in early.keys()
+    assert len(missing) == 0
+    assert 'late' in sampled.keys()
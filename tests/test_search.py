@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+
+import copy
+from typing import Any, Dict, List
+
+from h5dataloader_config.common.structure import *
+from h5dataloader_config.common.search import MATCH_PREFIX, MATCH_SUBSTRING, MATCH_WORD, KeyIndex
+from h5dataloader_config.common.model import ConfigModel
+from conftest import create_srcItem
+
+KEYS:List[str] = ['image_00', 'image_01', 'semantic', 'depth', 'velodyne_points', '/map/points', '/tf_static/cam0_to_velo', 'Depth-Map']
+
+def brute_force(keys:List[str], text:str) -> Dict[str, int]:
+    """全てのキーを走査した場合の一致の種類"""
+    matches:Dict[str, int] = {}
+    for key in keys:
+        lower:str = key.lower()
+        positions:List[int] = [pos for pos in range(len(lower)) if lower.startswith(text.lower(), pos)]
+        if len(positions) == 0: continue
+        matches[key] = min(MATCH_PREFIX if pos == 0 else MATCH_WORD if key[pos - 1] in '/_-.' else MATCH_SUBSTRING for pos in positions)
+    return matches
+
+def test_match_kinds():
+    index = KeyIndex(KEYS + ['depth'])
+    assert len(index) == len(KEYS)
+    assert index.search('depth') == {'depth': MATCH_PREFIX, 'Depth-Map': MATCH_PREFIX}
+    assert index.search('points') == {'velodyne_points': MATCH_WORD, '/map/points': MATCH_WORD}
+    assert index.search('map') == {'/map/points': MATCH_WORD, 'Depth-Map': MATCH_WORD}
+    assert index.search('ept') == {'depth': MATCH_SUBSTRING, 'Depth-Map': MATCH_SUBSTRING}
+    # 複数の位置で一致する場合は最も良い一致
+    assert index.search('velo') == {'velodyne_points': MATCH_PREFIX, '/tf_static/cam0_to_velo': MATCH_WORD}
+    assert index.search('') == {key: MATCH_PREFIX for key in KEYS}
+    assert index.search('none') == {}
+    assert KeyIndex([]).search('a') == {}
+
+def test_match_bruteForce():
+    index = KeyIndex(KEYS)
+    for text in ['e', 'ma', 'MAP', '_', '/', 'o_', 'ts', 'image_0', 'xyz', '0']:
+        assert index.search(text) == brute_force(KEYS, text), text
+
+def test_search_srcKeys(base_config):
+    """mini-batchの型との相性, 一致の種類, キーの順に並べる"""
+    config:Dict[str, Any] = copy.deepcopy(base_config)
+    for key, data_type in [('depth_aux', TYPE_DEPTH), ('aux_depth', TYPE_DEPTH), ('raw_disparity', TYPE_DISPARITY), ('depthwise', TYPE_FLOAT32)]:
+        config[CONFIG_TAG_SRCDATA][key] = create_srcItem(key, data_type, 'cam')
+    model = ConfigModel(config)
+    assert model.search_srcKeys('depth') == ['depth', 'depth_aux', 'depthwise', 'aux_depth']
+    # 同じ型, 変換元になる型, それ以外の順
+    ranked:List[str] = model.search_srcKeys('', dst_type=TYPE_DEPTH)
+    assert ranked[:3] == ['aux_depth', 'depth', 'depth_aux']
+    compatibility:List[int] = [model.get_typeCompatibility(config[CONFIG_TAG_SRCDATA][key][CONFIG_TAG_TYPE], TYPE_DEPTH) for key in ranked]
+    assert compatibility == sorted(compatibility)
+    assert ranked.index('raw_disparity') < ranked.index('depthwise')
+    assert model.search_srcKeys('dep', dst_type=TYPE_FLOAT32) == ['depthwise', 'depth', 'depth_aux', 'aux_depth']
+    assert model.search_srcKeys('d', data_type=TYPE_DISPARITY) == [TYPE_DISPARITY, 'raw_disparity']
+    assert model.search_srcKeys('zzz') == []
+
+def test_search_tfList(base_config):
+    model = ConfigModel(base_config)
+    assert model.search_tfList('') == ['cam', 'lidar', 'world']
+    assert model.search_tfList('D') == ['lidar', 'world']
+    assert model.search_tfList('am') == ['cam']
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+
+from typing import Dict, List, Tuple
+import numpy as np
+import h5py
+import pytest
+
+from h5dataloader_config.common.structure import *
+from h5dataloader_config.tools import shuffle
+
+def write_frames(h5path:str, length:int, chunks:bool=False, empty:Tuple[int, ...]=()) -> str:
+    """フレームを逆順に書き込み, バイトオフセットがフレームインデックスと逆順になるファイル"""
+    with h5py.File(h5path, mode='w') as h5file:
+        for idx in reversed(range(length)):
+            shape = (0,) if idx in empty else (256,)
+            h5file.create_dataset('{0:s}/{1:d}/depth'.format(H5_KEY_DATA, idx), data=np.full(shape, idx, dtype=np.float32), chunks=(64,) if chunks and idx not in empty else None)
+        h5file.create_dataset('{0:s}/{1:s}'.format(H5_KEY_HEADER, H5_KEY_LENGTH), data=length)
+    return h5path
+
+def test_block_shuffle():
+    offsets:np.ndarray = np.random.default_rng(0).permutation(100) * 1000
+    order:np.ndarray = shuffle.block_shuffle(offsets, 16, seed=3)
+    assert np.array_equal(np.sort(order), np.arange(100))
+    assert np.array_equal(order, shuffle.block_shuffle(offsets, 16, seed=3))
+    assert not np.array_equal(order, shuffle.block_shuffle(offsets, 16, seed=4))
+    # ブロック (オフセット順に連続した16フレーム) は連続して読み込まれる
+    block_ids:np.ndarray = np.argsort(np.argsort(offsets))[order] // 16
+    runs:np.ndarray = block_ids[np.append(True, np.diff(block_ids) != 0)]
+    assert np.array_equal(np.sort(runs), np.arange(7))
+    assert len(shuffle.block_shuffle(np.zeros((0,), dtype=np.int64), 16, seed=0)) == 0
+
+def test_locality_metric():
+    offsets:np.ndarray = np.array([0, 10, 30, 60], dtype=np.int64)
+    assert shuffle.locality_metric(np.arange(4), offsets) == {'mean-seek': 20.0, 'sequential': 1.0}
+    assert shuffle.locality_metric(np.arange(4)[::-1], offsets) == {'mean-seek': 20.0, 'sequential': 0.0}
+    assert shuffle.locality_metric(np.array([2]), offsets) == {'mean-seek': 0.0, 'sequential': 1.0}
+    # ブロック単位のシャッフルはランダムな順序より局所性が高い
+    offsets = np.arange(1000, dtype=np.int64) * 4096
+    block:Dict[str, float] = shuffle.locality_metric(shuffle.block_shuffle(offsets, 64, seed=0), offsets)
+    random:Dict[str, float] = shuffle.locality_metric(np.random.default_rng(0).permutation(1000), offsets)
+    assert block['mean-seek'] < random['mean-seek']
+
+@pytest.mark.parametrize('chunks', [False, True], ids=['contiguous', 'chunked'])
+def test_get_frameOffsets(tmp_path, chunks:bool):
+    if chunks and shuffle.CHUNK_INFO is False:
+        pytest.skip('h5py without chunk queries')
+    with h5py.File(write_frames(str(tmp_path / 'frames.h5'), 8, chunks), mode='r') as h5file:
+        offsets:np.ndarray = shuffle.get_frameOffsets(h5file, ['depth'])
+    assert len(offsets) == 8
+    assert np.all(np.diff(offsets) < 0)
+
+def test_get_frameOffsets_fallback(tmp_path, monkeypatch):
+    """オフセットを取得できないフレームがある場合は警告してフレームインデックス順とする"""
+    with h5py.File(write_frames(str(tmp_path / 'empty.h5'), 8, empty=(5,)), mode='r') as h5file:
+        with pytest.warns(UserWarning):
+            assert np.array_equal(shuffle.get_frameOffsets(h5file, ['depth']), np.arange(8))
+    monkeypatch.setattr(shuffle, 'CHUNK_INFO', False)
+    with h5py.File(write_frames(str(tmp_path / 'chunked.h5'), 8, chunks=True), mode='r') as h5file:
+        with pytest.warns(UserWarning):
+            assert np.array_equal(shuffle.get_frameOffsets(h5file, ['depth']), np.arange(8))
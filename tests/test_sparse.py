@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+
+from typing import Any, Dict
+import numpy as np
+import pytest
+
+from h5dataloader_config.common.structure import *
+from h5dataloader_config.common.sparse import get_sparseZero, is_sparseMinibatch
+from h5dataloader_config.tools.loader import apply_output, to_dense, to_sparse
+from conftest import create_minibatch
+
+def get_config(dst_type:str, value_range, normalize:bool) -> Dict[str, Any]:
+    minibatch:Dict[str, Any] = create_minibatch(dst_type, [TYPE_POINTS if dst_type == TYPE_DEPTH else TYPE_SEMANTIC3D, TYPE_POSE, TYPE_INTRINSIC])
+    minibatch[CONFIG_TAG_RANGE] = value_range
+    minibatch[CONFIG_TAG_NORMALIZE] = normalize
+    return minibatch
+
+def test_is_sparseMinibatch():
+    assert is_sparseMinibatch(get_config(TYPE_DEPTH, None, False))
+    assert is_sparseMinibatch(get_config(TYPE_SEMANTIC2D, None, False))
+    # 画像から作る深度や, 視差を使う深度は疎にしない
+    assert not is_sparseMinibatch(create_minibatch(TYPE_DEPTH, [TYPE_DEPTH]))
+    assert not is_sparseMinibatch(create_minibatch(TYPE_DEPTH, [TYPE_DISPARITY, TYPE_INTRINSIC]))
+    assert not is_sparseMinibatch(create_minibatch(TYPE_POINTS, [TYPE_POINTS, TYPE_POSE]))
+
+@pytest.mark.parametrize('dst_type, value_range, normalize, expected', [
+    (TYPE_DEPTH, None, False, 0.0),
+    (TYPE_DEPTH, [0.0, 100.0], True, 0.0),
+    # 深度は範囲外の値を0にするため, 0は範囲に収めない
+    (TYPE_DEPTH, [10.0, 100.0], False, 0.0),
+    (TYPE_DEPTH, [10.0, 100.0], True, np.float32(-10.0) / np.float32(90.0)),
+    (TYPE_SEMANTIC2D, None, False, 0),
+    (TYPE_SEMANTIC2D, None, True, 0),
+    (TYPE_SEMANTIC2D, [2, 10], False, 2),
+    (TYPE_SEMANTIC2D, [2, 10], True, 0.0),
+    (TYPE_SEMANTIC2D, [-5, 5], True, 0.5),
+])
+def test_get_sparseZero(dst_type, value_range, normalize, expected):
+    zero = get_sparseZero(get_config(dst_type, value_range, normalize))
+    assert zero == expected
+
+@pytest.mark.parametrize('dst_type, value_range', [
+    (TYPE_DEPTH, [0.0, 100.0]),
+    (TYPE_DEPTH, [0.3, 80.0]),
+    (TYPE_SEMANTIC2D, [2, 10]),
+    (TYPE_SEMANTIC2D, [-3, 7]),
+])
+def test_normalized_zero(dst_type, value_range):
+    """点の無い画素は, 正規化した出力でもget_sparseZeroの値と一致し, 疎な形式で除かれる"""
+    raw_zero = get_sparseZero(get_config(dst_type, value_range, False))
+    zero = get_sparseZero(get_config(dst_type, value_range, True))
+    rng = np.random.default_rng(0)
+    if dst_type == TYPE_DEPTH:
+        data:np.ndarray = rng.uniform(0.0, 120.0, size=(6, 8)).astype(np.float32)
+    else:
+        data = rng.integers(0, 12, size=(6, 8)).astype(np.int32)
+    data[rng.random((6, 8)) < 0.5] = 0
+    raw:np.ndarray = apply_output(data, dst_type, None, None, value_range, False, raw_zero)
+    normalized:np.ndarray = apply_output(data, dst_type, None, None, value_range, True, raw_zero)
+    assert np.array_equal(normalized == zero, raw == raw_zero)
+    for sparse_format in SPARSE_FORMATS:
+        sparse = to_sparse(normalized, sparse_format, zero)
+        assert len(sparse[-1]) == np.count_nonzero(raw != raw_zero)
+        assert np.array_equal(to_dense(sparse, normalized.shape, zero), normalized)
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+
+import argparse
+from typing import List
+import numpy as np
+import pytest
+
+from h5dataloader_config.tools import split
+
+def owners(length:int, splits:List[np.ndarray]) -> np.ndarray:
+    """フレーム毎のスプリット番号 (どれにも属さない場合は-1)"""
+    owner:np.ndarray = np.full((length,), -1)
+    for split_idx, indices in enumerate(splits):
+        owner[indices] = split_idx
+    return owner
+
+@pytest.mark.parametrize('gap', [0, 3])
+def test_split_partitions_segments(gap:int):
+    length, segment_length = 200, 10
+    splits:List[np.ndarray] = split.create_splits(length, [0.7, 0.2, 0.1], segment_length=segment_length, gap=gap, seed=1)
+    frames:np.ndarray = np.concatenate(splits)
+    assert len(np.unique(frames)) == len(frames)
+    if gap == 0:
+        assert np.array_equal(np.sort(frames), np.arange(length))
+    # 1つの区間のフレームは同じスプリットに属する (gapで除いたフレームを除く)
+    owner:np.ndarray = owners(length, splits)
+    for begin in range(0, length, segment_length):
+        assert len(set(owner[begin:begin + segment_length].tolist()) - {-1}) == 1
+    assert all(len(indices) > 0 for indices in splits)
+
+def test_split_gap_separates_splits():
+    gap:int = 3
+    owner:np.ndarray = owners(200, split.create_splits(200, [0.5, 0.5], segment_length=10, gap=gap, seed=2))
+    frames:np.ndarray = np.flatnonzero(owner >= 0)
+    for a, b in zip(frames[:-1], frames[1:]):
+        if owner[a] != owner[b]:
+            assert b - a > gap
+
+def test_split_short_file():
+    """短いファイルでも最も小さいスプリットに区間が割り当たる"""
+    ratios:List[float] = [0.8, 0.1, 0.1]
+    segment_length:int = split.get_segmentLength(30, ratios)
+    assert 1 <= segment_length < split.DEFAULT_SEGMENT_LENGTH
+    assert all(len(indices) > 0 for indices in split.create_splits(30, ratios, segment_length=segment_length))
+    assert split.get_segmentLength(100000, ratios) == split.DEFAULT_SEGMENT_LENGTH
+
+def test_split_stratified():
+    """層化した割り当てでは, 稀なクラスを含む区間が各スプリットに分かれる"""
+    counts:np.ndarray = np.zeros((100, 2), dtype=np.uint32)
+    counts[:, 0] = 1
+    counts[[5, 25, 45, 65, 85], 1] = 1
+    splits:List[np.ndarray] = split.create_splits(100, [0.6, 0.4], mode=split.SPLIT_STRATIFIED, segment_length=10, counts=counts)
+    assert [int(np.count_nonzero(counts[indices, 1])) for indices in splits] == [3, 2]
+    with pytest.raises(ValueError):
+        split.create_splits(100, [0.5, 0.5], mode=split.SPLIT_STRATIFIED)
+
+def test_split_argument_errors(tmp_path):
+    """引数の誤りはargparseのエラーとして報告する"""
+    parser = argparse.ArgumentParser()
+    split.add_parser(parser.add_subparsers())
+    args = parser.parse_args(['split', str(tmp_path / 'config.json'), '--names', 'train', 'val', '--ratios', '1.0'])
+    with pytest.raises(SystemExit):
+        args.func(args)
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+
+import copy
+from typing import Dict
+import numpy as np
+import h5py
+
+from h5dataloader_config.common.structure import *
+from h5dataloader_config.tools.synthetic import DEFAULT_LABELTAG, create_dataset, create_fromConfig
+from h5dataloader_config.tools.loader import read_pose
+from conftest import IMAGE_SHAPE, LENGTH, POINTS
+
+def create_memoryFile(name:str) -> h5py.File:
+    return h5py.File(name, mode='w', driver='core', backing_store=False)
+
+def test_create_dataset():
+    with create_memoryFile('dataset.h5') as h5file:
+        create_dataset(h5file, length=3, cameras=2, image_shape=(8, 12), points=50, map_points=200, classes=4, extra_keys=2, voxel_size=5.0)
+        assert h5file['{0:s}/{1:s}'.format(H5_KEY_HEADER, H5_KEY_LENGTH)][()] == 3
+        assert sorted(h5file['tf_static'].keys()) == ['cam0_to_velo', 'pose_to_cam0', 'pose_to_cam1']
+        assert sorted(h5file['intrinsic'].keys()) == ['image_00', 'image_01']
+        assert sorted(h5file['{0:s}/{1:s}'.format(H5_KEY_LABEL, DEFAULT_LABELTAG)].keys()) == ['0', '1', '2', '3']
+        frame:h5py.Group = h5file['{0:s}/2'.format(H5_KEY_DATA)]
+        assert sorted(frame.keys()) == ['depth', 'extra_0000', 'extra_0001', 'image_00', 'image_01', 'semantic', 'velodyne_points', 'world_to_pose']
+        assert frame['image_00'].shape == (8, 12, 3) and frame['image_00'].attrs[H5_ATTR_TYPE] == TYPE_BGR8
+        assert frame['velodyne_points'].shape == (50, 3) and frame['velodyne_points'].attrs[H5_ATTR_FRAMEID] == 'velodyne'
+        assert frame['semantic'][()].max() < 4
+        assert frame['image_00'].chunks is None
+        assert h5file['map/map'].attrs[H5_ATTR_TYPE] == TYPE_SEMANTIC3D
+        assert h5file['map/voxel'].attrs[H5_ATTR_TYPE] == TYPE_VOXEL_SEMANTIC3D
+        assert float(h5file['map/voxel'].attrs[H5_ATTR_VOXELSIZE]) == 5.0
+
+def test_create_dataset_compression():
+    with create_memoryFile('compressed.h5') as h5file:
+        create_dataset(h5file, length=1, cameras=1, image_shape=(8, 12), points=50, map_points=0, classes=4, compression='gzip')
+        frame:h5py.Group = h5file['{0:s}/0'.format(H5_KEY_DATA)]
+        assert frame['image_00'].chunks == (8, 12, 3) and frame['image_00'].compression == 'gzip'
+        assert frame['velodyne_points'].compression == 'gzip'
+        assert 'map' not in h5file.keys()
+        assert list(h5file['tf_static'].keys()) == ['cam0_to_velo', 'pose_to_cam0']
+
+def test_create_dataset_deterministic():
+    with create_memoryFile('a.h5') as a, create_memoryFile('b.h5') as b:
+        for h5file in [a, b]:
+            create_dataset(h5file, length=2, cameras=1, image_shape=(8, 12), points=20, map_points=0, classes=4, seed=3)
+        for key in ['image_00', 'depth', 'velodyne_points']:
+            assert np.array_equal(a['{0:s}/1/{1:s}'.format(H5_KEY_DATA, key)][()], b['{0:s}/1/{1:s}'.format(H5_KEY_DATA, key)][()])
+
+def test_create_fromConfig(base_config):
+    """src-dataの全てのキーが, 型と座標系を保って書き込まれる"""
+    with create_memoryFile('like.h5') as h5file:
+        create_fromConfig(base_config, h5file, LENGTH, max_points=POINTS)
+        assert h5file['{0:s}/{1:s}'.format(H5_KEY_HEADER, H5_KEY_LENGTH)][()] == LENGTH
+        for key, item in base_config[CONFIG_TAG_SRCDATA].items():
+            h5key:str = key if key.startswith('/') else '{0:s}/{1:d}/{2:s}'.format(H5_KEY_DATA, LENGTH - 1, key)
+            assert h5key in h5file, key
+            if item[CONFIG_TAG_TYPE] in [TYPE_TRANSLATION, TYPE_QUATERNION]: continue
+            assert h5file[h5key].attrs[H5_ATTR_TYPE] == item[CONFIG_TAG_TYPE]
+            if item[CONFIG_TAG_FRAMEID] is not None:
+                assert h5file[h5key].attrs[H5_ATTR_FRAMEID] == item[CONFIG_TAG_FRAMEID]
+        frame:h5py.Group = h5file['{0:s}/0'.format(H5_KEY_DATA)]
+        assert frame[TYPE_DEPTH].shape == tuple(IMAGE_SHAPE)
+        assert frame[TYPE_POINTS].shape == (POINTS, 3)
+        # ラベルは設定のlabel/srcのインデックスだけを使う
+        assert set(np.unique(frame[TYPE_SEMANTIC2D][()]).tolist()) <= set(range(5))
+        assert sorted(h5file['{0:s}/lbl'.format(H5_KEY_LABEL)].keys()) == ['0', '1', '2', '3', '4']
+
+def test_create_fromConfig_overrides(base_config):
+    overrides:Dict[str, dict] = {
+        '/tf_static/cam_to_lidar': {SUBTYPE_TRANSLATION: [1.0, 2.0, 3.0], SUBTYPE_ROTATION: [0.0, 0.0, 0.0, 1.0]},
+        '/static/intrinsic': {SUBTYPE_FX: 7.0},
+    }
+    with create_memoryFile('overrides.h5') as h5file:
+        create_fromConfig(base_config, h5file, 1, overrides=overrides)
+        pose:np.ndarray = read_pose(h5file['/tf_static/cam_to_lidar'])
+        assert np.allclose(pose[:3, 3], [1.0, 2.0, 3.0]) and np.allclose(pose[:3, :3], np.eye(3))
+        intrinsic:h5py.Group = h5file['/static/intrinsic']
+        assert float(intrinsic[SUBTYPE_FX][()]) == 7.0
+        # 内部パラメータの画像サイズは同じ座標系の画像から求める
+        assert (float(intrinsic[SUBTYPE_HEIGHT][()]), float(intrinsic[SUBTYPE_WIDTH][()])) == tuple(IMAGE_SHAPE)
+
+def test_create_fromConfig_compression(base_config):
+    config:Dict[str, dict] = copy.deepcopy(base_config)
+    config[CONFIG_TAG_SRCDATA][TYPE_POINTS][CONFIG_TAG_SHAPE] = [None, 3]
+    with create_memoryFile('chunked.h5') as h5file:
+        create_fromConfig(config, h5file, 1, max_points=POINTS, compression='gzip')
+        frame:h5py.Group = h5file['{0:s}/0'.format(H5_KEY_DATA)]
+        assert frame[TYPE_POINTS].shape == (POINTS, 3)
+        assert frame[TYPE_POINTS].compression == 'gzip'
+        assert frame[TYPE_DEPTH].compression == 'gzip'
+        assert frame[TYPE_SEMANTIC3D][SUBTYPE_POINTS].compression == 'gzip'
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+
+import os
+from typing import Any, Dict, List, Tuple
+import pytest
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+from PySide2.QtCore import QModelIndex, QPersistentModelIndex, Qt
+from PySide2.QtWidgets import QApplication
+
+from h5dataloader_config.ui.TreeModel import FETCH_SIZE, DictListModel, LazyTreeModel
+
+@pytest.fixture(scope='module')
+def app():
+    return QApplication.instance() or QApplication([])
+
+def data_columns(key:str, item:dict) -> List[str]:
+    return [key, str(item['value'])]
+
+def create_listModel(count:int) -> DictListModel:
+    model = DictListModel(['key', 'value'], data_columns)
+    model.setSource({'key_{0:d}'.format(idx): {'value': count - idx} for idx in range(count)})
+    return model
+
+def tree_children(payload:Dict[str, Any]) -> List[Tuple[List[str], Any]]:
+    return [([key, str(len(item))], item) for key, item in payload.items()]
+
+def fetch_all(model:DictListModel) -> None:
+    while model.canFetchMore(QModelIndex()):
+        model.fetchMore(QModelIndex())
+
+def test_list_fetch(app):
+    count:int = FETCH_SIZE * 2 + 10
+    model:DictListModel = create_listModel(count)
+    # 行はfetchMoreで追加するまで存在しない
+    assert model.rowCount() == 0 and model.canFetchMore(QModelIndex()) is True
+    model.fetchMore(QModelIndex())
+    assert model.rowCount() == FETCH_SIZE
+    fetch_all(model)
+    assert model.rowCount() == count and model.canFetchMore(QModelIndex()) is False
+    assert model.columnCount() == 2
+    index:QModelIndex = model.index(3, 1)
+    assert model.data(index) == str(count - 3) and model.data(index, Qt.EditRole) is None
+    assert model.key(model.index(3, 0)) == 'key_3'
+    assert model.index(count, 0).isValid() is False
+    assert model.rowCount(model.index(0, 0)) == 0
+    assert model.headerData(1, Qt.Horizontal) == 'value'
+
+def test_list_sort(app):
+    model:DictListModel = create_listModel(20)
+    fetch_all(model)
+    persistent = QPersistentModelIndex(model.index(0, 0))
+    # 数値として比較する (文字列の比較では'10'が'2'より前になる)
+    model.sort(1, Qt.AscendingOrder)
+    assert [model.data(model.index(row, 1)) for row in range(3)] == ['1', '2', '3']
+    assert persistent.row() == 19
+    model.sort(1, Qt.DescendingOrder)
+    assert model.key(model.index(0, 0)) == 'key_0'
+    # 並べ替えはsetSource後も保たれる
+    model.setSource({'a': {'value': 1}, 'b': {'value': 3}, 'c': {'value': 2}})
+    fetch_all(model)
+    assert [model.key(model.index(row, 0)) for row in range(3)] == ['b', 'c', 'a']
+
+def test_list_edit(app):
+    model:DictListModel = create_listModel(3)
+    fetch_all(model)
+    inserted:List[Tuple[int, int]] = []
+    removed:List[Tuple[int, int]] = []
+    changed:List[int] = []
+    model.rowsInserted.connect(lambda parent, first, last: inserted.append((first, last)))
+    model.rowsRemoved.connect(lambda parent, first, last: removed.append((first, last)))
+    model.dataChanged.connect(lambda top, bottom: changed.append(top.row()))
+    model.source['new'] = {'value': 0}
+    model.insertKey('new')
+    assert inserted == [(3, 3)] and model.rowCount() == 4
+    model.source['renamed'] = model.source.pop('key_1')
+    model.updateKey('key_1', 'renamed')
+    assert changed == [1] and model.key(model.index(1, 0)) == 'renamed'
+    model.source.pop('key_0')
+    model.removeKey('key_0')
+    assert removed == [(0, 0)] and model.rowCount() == 3
+    model.setKeys(['new'])
+    fetch_all(model)
+    assert model.rowCount() == 1 and model.key(model.index(0, 0)) == 'new'
+
+def test_list_edit_unfetched(app):
+    """未取得の行への追加・削除は通知せず, キーの一覧だけを更新する"""
+    model:DictListModel = create_listModel(FETCH_SIZE + 1)
+    model.fetchMore(QModelIndex())
+    model.source['new'] = {'value': 0}
+    model.insertKey('new')
+    assert model.rowCount() == FETCH_SIZE
+    model.removeKey('key_{0:d}'.format(FETCH_SIZE))
+    fetch_all(model)
+    assert model.rowCount() == FETCH_SIZE + 1
+    assert model.key(model.index(FETCH_SIZE, 0)) == 'new'
+
+def test_tree_lazy(app):
+    calls:List[str] = []
+    def children_of(payload:Dict[str, Any]) -> List[Tuple[List[str], Any]]:
+        calls.append(','.join(payload.keys()))
+        return tree_children(payload)
+    model = LazyTreeModel(['frame', 'children'], children_of, lambda payload: len(payload) > 0)
+    model.setRoot({'world': {'cam': {'lidar': {}}, 'map': {}}})
+    # 根の子だけを作る
+    assert calls == ['world'] and model.rowCount() == 1
+    world:QModelIndex = model.index(0, 0)
+    assert model.data(world) == 'world' and model.data(model.index(0, 1)) == '2'
+    assert model.hasChildren(world) is True and model.canFetchMore(world) is True
+    assert model.rowCount(world) == 0
+    model.fetchMore(world)
+    assert calls == ['world', 'cam,map'] and model.rowCount(world) == 2
+    assert model.canFetchMore(world) is False
+    cam:QModelIndex = model.index(0, 0, world)
+    assert model.data(cam) == 'cam'
+    assert model.parent(cam) == world and model.parent(world).isValid() is False
+    leaf:QModelIndex = model.index(1, 0, world)
+    assert model.hasChildren(leaf) is False
+    model.fetchMore(leaf)
+    assert model.rowCount(leaf) == 0 and model.canFetchMore(leaf) is False
+    assert model.index(5, 0, world).isValid() is False
+    assert model.rowCount(model.index(0, 1)) == 0
+
+def test_tree_sort(app):
+    model = LazyTreeModel(['key', 'children'], tree_children, lambda payload: len(payload) > 0)
+    model.setRoot({'10': {'b': {}, 'a': {}}, '9': {}, 'x': {}})
+    root_keys = lambda: [model.data(model.index(row, 0)) for row in range(model.rowCount())]
+    model.sort(0, Qt.AscendingOrder)
+    assert root_keys() == ['9', '10', 'x']
+    ten:QModelIndex = model.index(1, 0)
+    model.fetchMore(ten)
+    # 後から取得した子も並べ替える
+    assert [model.data(model.index(row, 0, ten)) for row in range(2)] == ['a', 'b']
+    model.sort(0, Qt.DescendingOrder)
+    assert root_keys() == ['x', '10', '9']
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+
+import copy
+import argparse
+from typing import Any, Dict, List
+import numpy as np
+import h5py
+import pytest
+
+from h5dataloader_config.common.structure import *
+from h5dataloader_config.tools import validate
+from h5dataloader_config.tools.utils import save_config
+from conftest import LENGTH, create_minibatch, create_srcItem, write_h5
+
+def get_issues(report:Dict[str, Any], level:str) -> List[Dict[str, Any]]:
+    return [issue for issue in report[validate.VALIDATE_TAG_ISSUES] if issue[validate.VALIDATE_TAG_LEVEL] == level]
+
+def test_validate_clean(all_config, tmp_path):
+    config:Dict[str, dict] = copy.deepcopy(all_config)
+    report:Dict[str, Any] = validate.validate_config(write_h5(config, str(tmp_path / 'all.h5')), config)
+    assert report[CONFIG_TAG_FRAMES] == LENGTH
+    assert report[validate.VALIDATE_TAG_ERRORS] == 0, get_issues(report, validate.VALIDATE_LEVEL_ERROR)
+
+def test_validate_missing_frame(depth_config):
+    h5path:str = depth_config[H5_ATTR_FILEPATH]
+    with h5py.File(h5path, mode='r+') as h5file:
+        del h5file['{0:s}/2/{1:s}'.format(H5_KEY_DATA, TYPE_DEPTH)]
+    errors:List[Dict[str, Any]] = get_issues(validate.validate_config(h5path, depth_config), validate.VALIDATE_LEVEL_ERROR)
+    assert len(errors) == 1
+    assert errors[0][validate.VALIDATE_TAG_TARGET] == TYPE_DEPTH and errors[0][CONFIG_TAG_FRAMES] == [2]
+    assert errors[0][validate.VALIDATE_TAG_MESSAGE] == validate.VALIDATE_MESSAGES[validate.VALIDATE_ISSUE_MISSING]
+
+def test_validate_unused_source(depth_config):
+    """mini-batchが参照しないsrc-dataの問題は警告とする"""
+    h5path:str = depth_config[H5_ATTR_FILEPATH]
+    with h5py.File(h5path, mode='r+') as h5file:
+        for idx in range(LENGTH):
+            h5file.create_dataset('{0:s}/{1:d}/extra'.format(H5_KEY_DATA, idx), data=np.zeros((4, 3), dtype=np.float32)).attrs[H5_ATTR_TYPE] = TYPE_POINTS
+    depth_config[CONFIG_TAG_SRCDATA]['extra'] = create_srcItem('extra', TYPE_POINTS, 'lidar')
+    report:Dict[str, Any] = validate.validate_config(h5path, depth_config)
+    assert report[validate.VALIDATE_TAG_ERRORS] == 0
+    # mini-batchが用いないtfのposeの警告は除く
+    warnings:List[Dict[str, Any]] = [issue for issue in get_issues(report, validate.VALIDATE_LEVEL_WARNING) if issue[validate.VALIDATE_TAG_TARGET] == 'extra']
+    assert len(warnings) == 1
+    assert warnings[0][validate.VALIDATE_TAG_MESSAGE] == validate.VALIDATE_MESSAGES[validate.VALIDATE_ISSUE_SHAPE]
+    assert warnings[0][validate.VALIDATE_TAG_COUNT] == LENGTH
+
+def test_validate_jobs(depth_config):
+    """プロセスに分けて照合しても報告は同じ"""
+    h5path:str = depth_config[H5_ATTR_FILEPATH]
+    with h5py.File(h5path, mode='r+') as h5file:
+        for idx in [0, 3]:
+            del h5file['{0:s}/{1:d}/{2:s}'.format(H5_KEY_DATA, idx, TYPE_DEPTH)]
+    assert validate.validate_config(h5path, depth_config, jobs=2, chunk_size=1) == validate.validate_config(h5path, depth_config)
+
+def test_validate_missing_file(depth_config, tmp_path):
+    report:Dict[str, Any] = validate.validate_config(str(tmp_path / 'missing.h5'), depth_config)
+    assert report[CONFIG_TAG_FRAMES] == 0
+    assert [issue[validate.VALIDATE_TAG_CHECK] for issue in get_issues(report, validate.VALIDATE_LEVEL_ERROR)] == [validate.VALIDATE_CHECK_FILE]
+
+def test_merge_frameIssues():
+    issues:validate.FrameIssues = {}
+    for idx in range(validate.VALIDATE_MAX_FRAMES + 5):
+        add:validate.FrameIssues = {}
+        validate.add_frameIssue(add, validate.VALIDATE_ISSUE_MISSING, 'key', idx)
+        validate.merge_frameIssues(issues, add)
+    count, frames = issues[validate.VALIDATE_ISSUE_MISSING]['key']
+    assert count == validate.VALIDATE_MAX_FRAMES + 5
+    assert frames == list(range(validate.VALIDATE_MAX_FRAMES))
+
+def test_validate_minibatches(base_config):
+    config:Dict[str, dict] = base_config
+    points:Dict[str, Any] = create_minibatch(TYPE_POINTS, [TYPE_POINTS, TYPE_POSE])
+    points[CONFIG_TAG_FRAMEID] = 'unknown'
+    missing:Dict[str, Any] = create_minibatch(TYPE_DEPTH, [TYPE_DEPTH])
+    missing[CONFIG_TAG_FROM][TYPE_DEPTH] = 'missing'
+    # poseを用いず, tfの木に繋がっていない座標系のソースを読む
+    unlinked:Dict[str, Any] = create_minibatch(TYPE_DEPTH, [TYPE_DEPTH])
+    config[CONFIG_TAG_SRCDATA]['other_depth'] = create_srcItem('other_depth', TYPE_DEPTH, 'other')
+    unlinked[CONFIG_TAG_FROM][TYPE_DEPTH] = 'other_depth'
+    config[CONFIG_TAG_TF][CONFIG_TAG_LIST].append('other')
+    config[CONFIG_TAG_MINIBATCH] = {
+        'points': points, 'missing': missing, 'unlinked': unlinked,
+        'ok': create_minibatch(TYPE_POINTS, [TYPE_POINTS, TYPE_POSE]), 'direct': create_minibatch(TYPE_DEPTH, [TYPE_DEPTH]),
+    }
+    issues:List[Dict[str, Any]] = validate.check_minibatches(config)
+    messages:Dict[str, List[str]] = {}
+    for issue in issues:
+        messages.setdefault(issue[validate.VALIDATE_TAG_TARGET], []).append(issue[validate.VALIDATE_TAG_MESSAGE])
+    assert messages == {
+        'points': ['frame-id unknown is not in the tf list', 'no TF path from lidar to unknown'],
+        'missing': ['depth source missing is not in src-data'],
+        'unlinked': ['no TF path from other to cam'],
+    }
+
+def test_validate_labels(depth_config):
+    h5path:str = depth_config[H5_ATTR_FILEPATH]
+    label:Dict[str, dict] = depth_config[CONFIG_TAG_LABEL]
+    label[CONFIG_TAG_SRC]['lbl'].pop('4')
+    label[CONFIG_TAG_SRC]['absent'] = {}
+    label[CONFIG_TAG_CONFIG]['broken'] = {CONFIG_TAG_SRC: 'nothing', CONFIG_TAG_CONVERT: {}, CONFIG_TAG_DST: {}}
+    with h5py.File(h5path, mode='r') as h5file:
+        issues:List[Dict[str, Any]] = validate.check_labels(h5file, depth_config)
+    assert [(issue[validate.VALIDATE_TAG_LEVEL], issue[validate.VALIDATE_TAG_TARGET]) for issue in issues] == [
+        (validate.VALIDATE_LEVEL_WARNING, 'lbl'),
+        (validate.VALIDATE_LEVEL_ERROR, 'absent'),
+        (validate.VALIDATE_LEVEL_WARNING, 'cfg'),
+        (validate.VALIDATE_LEVEL_ERROR, 'broken'),
+    ]
+
+def test_validate_run(depth_config, tmp_path, capsys):
+    """エラーがある場合は終了コード1で終了する"""
+    jsonpath:str = str(tmp_path / 'depth.json')
+    save_config(depth_config, jsonpath)
+    validate.run(argparse.Namespace(config=jsonpath, output=None, jobs=1, chunk_size=256))
+    with h5py.File(depth_config[H5_ATTR_FILEPATH], mode='r+') as h5file:
+        del h5file['{0:s}/1'.format(H5_KEY_DATA)]
+    with pytest.raises(SystemExit) as excinfo:
+        validate.run(argparse.Namespace(config=jsonpath, output=None, jobs=1, chunk_size=256))
+    assert excinfo.value.code == 1
+    assert validate.VALIDATE_MESSAGES[validate.VALIDATE_ISSUE_NOFRAME] in capsys.readouterr().out
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+
+import itertools
+from typing import Dict, List
+import numpy as np
+import pytest
+
+from h5dataloader_config.common.structure import *
+from h5dataloader_config.tools import cull, synthetic
+from h5dataloader_config.tools.voxel import (
+    MORTON_MAX, VoxelIndex, decode_morton, encode_cell, encode_morton, expand_ranges, get_mortonRanges,
+    get_radiusMask, get_voxelGrid, get_voxelSources, read_voxelMap
+)
+from conftest import POINTS, STATIC_KEYS
+
+def test_morton_round_trip():
+    rng = np.random.default_rng(0)
+    cells:np.ndarray = rng.integers(0, MORTON_MAX, size=(100, 3), endpoint=True)
+    cells[0] = [MORTON_MAX, 0, MORTON_MAX]
+    codes:np.ndarray = encode_morton(cells)
+    assert np.array_equal(decode_morton(codes), cells)
+    assert [encode_cell(cell.tolist()) for cell in cells] == [int(code) for code in codes]
+    # x, y, zの順に下位のビットから並ぶ
+    assert encode_morton(np.array([[1, 0, 0], [0, 1, 0], [0, 0, 1], [2, 0, 0]])).tolist() == [1, 2, 4, 8]
+
+@pytest.mark.parametrize('cell_min, cell_max, max_ranges', [
+    ([0, 0, 0], [7, 7, 7], 1), ([1, 2, 3], [6, 4, 9], 64), ([5, 5, 5], [5, 5, 5], 64), ([3, 0, 1], [12, 9, 2], 4),
+])
+def test_get_mortonRanges(cell_min:List[int], cell_max:List[int], max_ranges:int):
+    """範囲は直方体の全てのボクセルを覆い, 範囲の数の上限まで分割した場合は外側を含まない"""
+    begins, ends = get_mortonRanges(np.array(cell_min), np.array(cell_max), max_ranges)
+    assert len(begins) <= max_ranges and np.all(begins <= ends) and np.all(ends[:-1] < begins[1:])
+    box:List[List[int]] = [list(cell) for cell in itertools.product(*[range(lo, hi + 1) for lo, hi in zip(cell_min, cell_max)])]
+    codes:np.ndarray = encode_morton(np.array(box))
+    covered:np.ndarray = np.zeros(len(codes), dtype=bool)
+    for begin, end in zip(begins, ends):
+        covered |= (codes >= begin) & (codes <= end)
+    assert np.all(covered)
+    if max_ranges == 64:
+        assert int(np.sum(ends - begins + np.uint64(1))) == len(box)
+
+def test_expand_ranges():
+    assert expand_ranges(np.array([2, 10, 5]), np.array([4, 10, 7])).tolist() == [2, 3, 5, 6]
+    assert len(expand_ranges(np.array([3]), np.array([3]))) == 0
+
+def test_get_voxelGrid():
+    origin, size = get_voxelGrid({H5_ATTR_VOXELSIZE: 0.5, H5_ATTR_VOXELMIN: [1.0, 2.0, 3.0]})
+    assert np.allclose(origin, [1.0, 2.0, 3.0]) and np.allclose(size, 0.5)
+    # 大きさはvoxel_minとvoxel_maxの差と格子の大きさから求める
+    origin, size = get_voxelGrid({H5_ATTR_VOXELMIN: [0.0, 0.0, 0.0], H5_ATTR_VOXELMAX: [4.0, 2.0, 1.0]}, (4, 4, 4))
+    assert np.allclose(size, [1.0, 0.5, 0.25]) and np.allclose(origin, 0.0)
+    origin, _ = get_voxelGrid({H5_ATTR_VOXELSIZE: 1.0, H5_ATTR_VOXELCENTER: [0.0, 0.0, 0.0]}, (4, 2, 2))
+    assert np.allclose(origin, [-2.0, -1.0, -1.0])
+    origin, _ = get_voxelGrid({H5_ATTR_VOXELSIZE: 1.0, H5_ATTR_VOXELMAX: [4.0, 4.0, 4.0]}, (4, 2, 2))
+    assert np.allclose(origin, [0.0, 2.0, 2.0])
+    origin, size = get_voxelGrid({H5_ATTR_VOXELSIZE: 1.0})
+    assert origin is None and np.allclose(size, 1.0)
+    assert get_voxelGrid({}) == (None, None)
+
+def test_voxel_queries_match_brute_force():
+    rng = np.random.default_rng(0)
+    points:np.ndarray = (rng.uniform(-1.0, 1.0, size=(2000, 3)) * np.array([20.0, 20.0, 4.0])).astype(np.float32)
+    size:np.ndarray = np.full((3,), 1.5)
+    index:VoxelIndex = VoxelIndex.from_points(points, np.floor(points.min(axis=0) / size) * size, size)
+    assert len(index) == len(points)
+    for center in rng.uniform(-15.0, 15.0, size=(5, 3)).astype(np.float32):
+        assert np.array_equal(index.query_radius(center, 4.0), np.flatnonzero(get_radiusMask(points, center, 4.0)))
+    matrix:np.ndarray = np.array([[0, -1, 0, 0], [0, 0, -1, 1], [1, 0, 0, 0], [0, 0, 0, 1]], dtype=np.float64)
+    intrinsic = (8.0, 8.0, 8.0, 6.0)
+    expected:np.ndarray = cull.get_visibleIndices(points, matrix, intrinsic, (12, 16), 10.0)
+    assert len(expected) > 0
+    assert np.array_equal(index.query_frustum(matrix, intrinsic, (12, 16), 10.0), expected)
+    assert np.array_equal(index.query_frustum(matrix, intrinsic, (12, 16)), cull.get_visibleIndices(points, matrix, intrinsic, (12, 16)))
+
+def test_arrays_round_trip():
+    rng = np.random.default_rng(1)
+    points:np.ndarray = rng.uniform(0.0, 10.0, size=(300, 3)).astype(np.float32)
+    labels:np.ndarray = rng.integers(0, 5, size=300).astype(np.uint8)
+    index:VoxelIndex = VoxelIndex.from_points(points, np.zeros(3), np.full((3,), 2.0), labels)
+    # 並べ替えた点とラベルは元の点とラベルに対応する
+    assert np.array_equal(index.points, points[index.order]) and np.array_equal(index.labels, labels[index.order])
+    arrays:Dict[str, np.ndarray] = index.to_arrays('0')
+    assert sorted(arrays.keys()) == ['0.codes', '0.grid', '0.labels', '0.offsets', '0.order', '0.points']
+    restored:VoxelIndex = VoxelIndex.from_arrays(arrays, '0')
+    center:np.ndarray = np.array([5.0, 5.0, 5.0])
+    assert np.array_equal(restored.query_radius(center, 3.0), index.query_radius(center, 3.0))
+    assert VoxelIndex.from_arrays(VoxelIndex.from_points(points, np.zeros(3), np.ones(3)).to_arrays('1'), '1').labels is None
+
+def test_read_voxelMap(all_h5):
+    points, labels, origin, size = read_voxelMap(all_h5, STATIC_KEYS[TYPE_VOXEL_SEMANTIC3D])
+    assert points.shape == (POINTS, 3) and labels.shape == (POINTS,)
+    assert np.allclose(size, synthetic.DEFAULT_VOXEL_SIZE)
+    assert np.all(points >= origin - 1e-4)
+    points, labels, _, _ = read_voxelMap(all_h5, STATIC_KEYS[TYPE_VOXEL_POINTS])
+    assert points.shape == (POINTS, 3) and labels is None
+    with pytest.raises(ValueError):
+        read_voxelMap(all_h5, '/tf_static/cam_to_lidar' + '/' + SUBTYPE_TRANSLATION)
+
+def test_get_voxelSources(base_config):
+    config:Dict[str, dict] = base_config
+    config[CONFIG_TAG_SRCDATA]['/map/map'] = {CONFIG_TAG_TYPE: TYPE_SEMANTIC3D}
+    config[CONFIG_TAG_SRCDATA]['/map/map/points'] = {CONFIG_TAG_TYPE: TYPE_POINTS}
+    config[CONFIG_TAG_SRCDATA]['/map/points'] = {CONFIG_TAG_TYPE: TYPE_POINTS}
+    assert sorted(get_voxelSources(config)) == [STATIC_KEYS[TYPE_VOXEL_POINTS], STATIC_KEYS[TYPE_VOXEL_SEMANTIC3D]]
+    # semantic3dの子のpointsは含めない, フレーム毎の点群も含めない
+    assert sorted(get_voxelSources(config, include_points=True)) == sorted([STATIC_KEYS[TYPE_VOXEL_POINTS], STATIC_KEYS[TYPE_VOXEL_SEMANTIC3D], '/map/map', '/map/points'])
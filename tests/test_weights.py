@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+
+from typing import Dict
+import numpy as np
+import h5py
+import pytest
+
+from h5dataloader_config.common.structure import *
+from h5dataloader_config.tools.weights import count_classes, create_labelLut, create_weights, get_labelSource
+
+# 保存値 0..4 を3クラスに変換し, 4は対応しない (クラス3は変換元が無い)
+LABEL_CONFIG:Dict[str, dict] = {
+    CONFIG_TAG_SRC: 'src',
+    CONFIG_TAG_CONVERT: {'0': 0, '1': 1, '2': 1, '3': 2, '4': None},
+    CONFIG_TAG_DST: {str(idx): {CONFIG_TAG_TAG: 'class_{0:d}'.format(idx), CONFIG_TAG_COLOR: [0, 0, 0]} for idx in range(4)},
+}
+LENGTH:int = 7
+
+def get_labels(idx:int) -> np.ndarray:
+    rng = np.random.default_rng(idx)
+    # クラス2 (保存値3) はフレーム5にしか無い
+    return rng.choice([0, 1, 2, 4] + ([3] if idx == 5 else []), size=(4, 5)).astype(np.uint8)
+
+@pytest.fixture
+def h5file(tmp_path):
+    with h5py.File(str(tmp_path / 'labels.h5'), mode='w') as h5file:
+        for idx in range(LENGTH):
+            if idx == 2: continue
+            h5file.create_dataset('{0:s}/{1:d}/label'.format(H5_KEY_DATA, idx), data=get_labels(idx))
+        h5file.create_dataset('{0:s}/{1:s}'.format(H5_KEY_HEADER, H5_KEY_LENGTH), data=LENGTH)
+    with h5py.File(str(tmp_path / 'labels.h5'), mode='r') as h5file:
+        yield h5file
+
+def test_create_labelLut():
+    lut, num_classes = create_labelLut(LABEL_CONFIG)
+    assert num_classes == 4
+    assert lut[:6].tolist() == [0, 1, 1, 2, -1, -1]
+
+def test_get_labelSource():
+    assert get_labelSource({CONFIG_TAG_FROM: {TYPE_SEMANTIC2D: 'label'}}) == 'label'
+    assert get_labelSource({CONFIG_TAG_FROM: {TYPE_SEMANTIC3D: 'map', TYPE_POSE: 'camera'}}) == 'map/' + SUBTYPE_SEMANTIC1D
+    assert get_labelSource({CONFIG_TAG_FROM: {TYPE_SEMANTIC3D: '/map'}}) is None
+
+@pytest.mark.parametrize('chunk_frames', [1, 3, 64])
+def test_count_classes(h5file, chunk_frames:int):
+    lut, num_classes = create_labelLut(LABEL_CONFIG)
+    counts:np.ndarray = count_classes(h5file, 'label', lut, num_classes, chunk_frames)
+    assert counts.shape == (LENGTH, 4)
+    for idx in range(LENGTH):
+        if idx == 2:
+            assert np.all(counts[idx] == 0)
+            continue
+        labels:np.ndarray = get_labels(idx)
+        expected = [np.count_nonzero(labels == 0), np.count_nonzero((labels == 1) | (labels == 2)), np.count_nonzero(labels == 3), 0]
+        assert counts[idx].tolist() == expected
+    assert np.flatnonzero(counts[:, 2]).tolist() == [5]
+
+def test_create_weights():
+    # クラス0は全フレーム, クラス1は半分, クラス2は1フレームに出現し, クラス3は出現しない
+    counts:np.ndarray = np.array([
+        [5, 1, 0, 0],
+        [5, 0, 0, 0],
+        [5, 1, 2, 0],
+        [5, 0, 0, 0],
+    ], dtype=np.uint32)
+    weights:np.ndarray = create_weights(counts)
+    assert weights.dtype == np.float32
+    assert weights.mean() == pytest.approx(1.0)
+    # 含まれるクラスの逆頻度の最大値 (1, 2, 4) に比例する
+    assert weights / weights[1] == pytest.approx([2.0, 1.0, 4.0, 1.0])
+    squared:np.ndarray = create_weights(counts, power=2.0)
+    assert squared / squared[1] == pytest.approx([4.0, 1.0, 16.0, 1.0])
+
+def test_create_weights_without_classes():
+    """どのクラスも含まないフレームは最小の重みとし, 全フレームがそうなら一様にする"""
+    counts:np.ndarray = np.array([[0, 0], [0, 3], [2, 3]], dtype=np.uint32)
+    weights:np.ndarray = create_weights(counts)
+    assert weights / weights[1] == pytest.approx([1.0, 1.0, 2.0])
+    assert create_weights(np.zeros((3, 2), dtype=np.uint32)) == pytest.approx([1.0, 1.0, 1.0])
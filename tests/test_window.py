@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import subprocess
+import threading
+from typing import Any, Dict, List
+import numpy as np
+import h5py
+import pytest
+
+from h5dataloader_config.common.structure import *
+from h5dataloader_config.common.window import FrameMetaCache, valid_windowStarts
+
+LENGTH:int = 10
+# フレーム4が無く, フレーム7でタイムスタンプが飛ぶ
+MISSING:int = 4
+JUMP:int = 7
+
+def get_stamp(idx:int) -> float:
+    return idx * 0.1 + (1.0 if idx >= JUMP else 0.0)
+
+@pytest.fixture
+def h5path(tmp_path) -> str:
+    h5path:str = str(tmp_path / 'window.h5')
+    with h5py.File(h5path, mode='w') as h5file:
+        for idx in range(LENGTH):
+            if idx == MISSING: continue
+            dataset:h5py.Dataset = h5file.create_dataset('{0:s}/{1:d}/image'.format(H5_KEY_DATA, idx), data=np.zeros((2, 2), dtype=np.uint8))
+            dataset.attrs[H5_ATTR_STAMPSEC] = int(get_stamp(idx))
+            dataset.attrs[H5_ATTR_STAMPNSEC] = int(round(get_stamp(idx) % 1 * 1e9))
+            h5file.create_dataset('{0:s}/{1:d}/depth'.format(H5_KEY_DATA, idx), data=np.zeros((2, 2), dtype=np.float32))
+        h5file.create_dataset('{0:s}/{1:s}'.format(H5_KEY_HEADER, H5_KEY_LENGTH), data=LENGTH)
+    return h5path
+
+def create_minibatch(length:int, stride:int=1, max_gap:Any=None) -> Dict[str, Any]:
+    window:Dict[str, Any] = {CONFIG_TAG_LENGTH: length, CONFIG_TAG_STRIDE: stride}
+    if max_gap is not None:
+        window[CONFIG_TAG_MAXGAP] = max_gap
+    return {CONFIG_TAG_FROM: {TYPE_MONO8: 'image', TYPE_DEPTH: 'depth', TYPE_POSE: 'camera'}, CONFIG_TAG_WINDOW: window}
+
+def test_missing_frames():
+    """欠けたフレームをまたぐウィンドウは無効"""
+    presence:np.ndarray = np.ones((10,), dtype=np.bool_)
+    presence[4] = False
+    stamps:np.ndarray = np.full((10,), np.nan)
+    assert valid_windowStarts(presence, stamps, 3).tolist() == [0, 1, 5, 6, 7]
+    assert valid_windowStarts(presence, stamps, 1).tolist() == [0, 1, 2, 3, 5, 6, 7, 8, 9]
+    # strideで飛ばしたフレームは欠けていてもよい
+    assert valid_windowStarts(presence, stamps, 2, stride=3).tolist() == [0, 2, 3, 5, 6]
+
+def test_length_and_stride():
+    presence:np.ndarray = np.ones((5,), dtype=np.bool_)
+    stamps:np.ndarray = np.arange(5, dtype=np.float64)
+    assert len(valid_windowStarts(presence, stamps, 6)) == 0
+    assert valid_windowStarts(presence, stamps, 5).tolist() == [0]
+    # strideがウィンドウ長より大きい場合も, 最後のフレームが範囲内の先頭だけを返す
+    assert valid_windowStarts(presence, stamps, 2, stride=4).tolist() == [0]
+    assert len(valid_windowStarts(presence, stamps, 2, stride=5)) == 0
+    assert len(valid_windowStarts(np.zeros((0,), dtype=np.bool_), np.zeros((0,)), 1)) == 0
+
+def test_stamps():
+    presence:np.ndarray = np.ones((2, 8), dtype=np.bool_)
+    stamps:np.ndarray = np.stack([np.arange(8) * 0.1, np.full((8,), np.nan)])
+    # 逆行するタイムスタンプと, 大きな間隔を含むウィンドウは無効
+    stamps[0, 3] = 0.15
+    stamps[0, 6:] += 1.0
+    assert valid_windowStarts(presence, stamps, 2).tolist() == [0, 1, 4, 6]
+    assert valid_windowStarts(presence, stamps, 2, max_gap=2.0).tolist() == [0, 1, 3, 4, 5, 6]
+    # タイムスタンプを持つ全てのキーを検査する
+    stamps[1] = np.arange(8) * 0.1
+    stamps[1, 1] = 0.0
+    assert valid_windowStarts(presence, stamps, 2, max_gap=2.0).tolist() == [1, 3, 4, 5, 6]
+
+def test_frameMetaCache(h5path:str):
+    cache = FrameMetaCache(h5path)
+    assert cache.is_cached(['image']) is False
+    presence, stamps = cache.get(['image', 'depth'])
+    assert presence.shape == (2, LENGTH) and stamps.shape == (2, LENGTH)
+    assert np.flatnonzero(~presence[0]).tolist() == [MISSING]
+    assert np.allclose(stamps[0, :JUMP], [get_stamp(idx) if idx != MISSING else np.nan for idx in range(JUMP)], equal_nan=True)
+    assert np.all(np.isnan(stamps[1]))
+    assert cache.is_cached(['image', 'depth'])
+    assert cache.valid_windowStarts(create_minibatch(2)).tolist() == [0, 1, 2, 5, 7, 8]
+    assert cache.valid_windowStarts(create_minibatch(2, max_gap=2.0)).tolist() == [0, 1, 2, 5, 6, 7, 8]
+    assert cache.valid_windowStarts({CONFIG_TAG_FROM: {TYPE_MONO8: 'image'}}) is None
+
+def test_scan_async(h5path:str):
+    results:List[bool] = []
+    threads:List[threading.Thread] = []
+    done = threading.Event()
+    def callback(result:bool) -> None:
+        results.append(result)
+        threads.append(threading.current_thread())
+        done.set()
+
+    cache = FrameMetaCache(h5path)
+    cache.scan_async(['image', 'depth'], callback).join(timeout=10.0)
+    assert done.is_set() and results == [True]
+    # 結果は走査したスレッドから通知する
+    assert threads[0] is not threading.main_thread()
+    assert cache.is_cached(['image', 'depth'])
+
+    done.clear()
+    FrameMetaCache(h5path + '.missing').scan_async(['image'], callback).join(timeout=10.0)
+    assert done.is_set() and results == [True, False]
+
+def test_gui_does_not_load_tools():
+    """GUIの起動時にtoolsパッケージを読み込まない"""
+    pytest.importorskip('PySide2')
+    script:str = 'import sys, h5dataloader_config.main; print(any(name.startswith("h5dataloader_config.tools") for name in sys.modules))'
+    env:Dict[str, str] = dict(os.environ, QT_QPA_PLATFORM='offscreen', PYTHONPATH=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    result = subprocess.run([sys.executable, '-c', script], stdout=subprocess.PIPE, universal_newlines=True, env=env, check=True)
+    assert result.stdout.strip() == 'False'